@@ -25,6 +25,8 @@ try:
     from docx import Document
     from docx.oxml.ns import qn
     from lxml import etree
+    from fc_insider.segment_index import INDEX_MODES, index_finder, open_index
+    from fc_insider.stdio import display_name, is_stdio, read_input_bytes
 except ImportError:
     print("错误：需要安装 python-docx 和 lxml")
     print("运行: pip install python-docx lxml")
@@ -297,6 +299,7 @@ def generate_solution_recommendation(analysis: Dict) -> str:
     if summary['total_runs'] > 10:
         recommendations.append("\n⚠️  复杂结构：runs 数量较多")
         recommendations.append("   建议：使用 --export-xml 导出 XML 进行详细检查")
+        recommendations.append("   格式相同的 run 可先合并：coalesce_runs.py，或更新时加 --coalesce-runs")
 
     recommendations.append("\n" + "="*80)
 
@@ -310,6 +313,34 @@ def find_table(doc) -> Optional:
     return doc.tables[0]
 
 
+def find_sample_cell(table, segment_id: str, input_path: str, docx_bytes: bytes,
+                     mode: str = 'off'):
+    """
+    查找样本 Segment 的 Target 列单元格
+
+    mode 不为 'off' 时使用 segment 位置索引（<input>.segidx.json），否则逐行扫描
+
+    Returns:
+        (cell, row_idx)；未找到时返回 (None, None)
+    """
+    if mode != 'off' and not is_stdio(input_path):
+        index, status = open_index(table, input_path, docx_bytes, mode)
+        if status == 'loaded':
+            print(f"✓ 使用 segment 索引（{len(index['segments'])} 个）")
+        entry = index['segments'].get(segment_id)
+        if entry is None:
+            return None, None
+        return index_finder(table, index)(segment_id), entry['row']
+
+    for i, row in enumerate(table.rows[1:], start=1):  # 跳过表头
+        if len(row.cells) >= 4:
+            if row.cells[0].text.strip() == segment_id:
+                # Target 列（第 4 列，索引 3）
+                return row.cells[3], i
+
+    return None, None
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='方案 3: 深度 XML 分析工具',
@@ -341,18 +372,23 @@ def main():
         """
     )
 
-    parser.add_argument('--input', required=True, help='输入 Word 文档路径')
+    parser.add_argument('--input', required=True, help='输入 Word 文档路径（"-" 表示 stdin）')
     parser.add_argument('--sample-segment', help='样本 Segment ID（分析此行）')
     parser.add_argument('--verbose', action='store_true', help='显示详细的 run 属性')
     parser.add_argument('--export-xml', action='store_true', help='导出单元格的原始 XML')
     parser.add_argument('--export-json', help='导出分析结果为 JSON 文件')
+    parser.add_argument('--segment-index', choices=INDEX_MODES, default='off',
+                        help='查找 --sample-segment 时使用的 segment 位置索引（<input>.segidx.json）：'
+                             'off 逐行扫描（默认）；auto 有效时复用、否则构建；rebuild 强制重建')
 
     args = parser.parse_args()
 
     try:
         # 加载文档
-        print(f"\n📖 加载文档: {args.input}")
-        doc = Document(args.input)
+        from io import BytesIO
+        print(f"\n📖 加载文档: {display_name(args.input)}")
+        docx_bytes = read_input_bytes(args.input)
+        doc = Document(BytesIO(docx_bytes))
 
         # 查找表格
         table = find_table(doc)
@@ -364,26 +400,16 @@ def main():
 
         # 如果指定了 sample_segment，分析该行
         if args.sample_segment:
-            # 查找行
-            target_row = None
-            target_row_idx = None
-
-            for i, row in enumerate(table.rows[1:], start=1):  # 跳过表头
-                if len(row.cells) >= 4:
-                    segment_id = row.cells[0].text.strip()
-                    if segment_id == args.sample_segment:
-                        target_row = row
-                        target_row_idx = i
-                        break
+            # 查找 Target 列（第 4 列，索引 3）
+            target_cell, target_row_idx = find_sample_cell(
+                table, args.sample_segment, args.input, docx_bytes, args.segment_index)
 
-            if not target_row:
+            if target_cell is None:
                 print(f"❌ 错误：未找到 Segment ID: {args.sample_segment}")
                 sys.exit(1)
 
             print(f"✓ 找到目标行: 第 {target_row_idx} 行")
 
-            # 分析 Target 列（第 4 列，索引 3）
-            target_cell = target_row.cells[3]
             analysis = analyze_cell_deep(target_cell, f"Target 列 (行 {target_row_idx})")
 
             # 打印报告
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+批量处理多个文档（asyncio）
+
+一次活动通常有 30–80 份文档（每个市场/卡片一份）。本脚本同时处理多个任务：
+- 并发上限由 asyncio.Semaphore 控制（--jobs）
+- 提取、匹配、应用等 CPU 密集阶段交给进程池（--workers）
+- docx 的读取和写出在线程中执行，不阻塞事件循环
+- 单个任务失败不影响其他任务，所有任务的结果汇总到一份报告
+- 每个任务完成后写入检查点日志（含输入哈希）；中断后重新运行会跳过已完成的任务，
+  只重做失败的或输入有变化的任务
+- 处理过程中报告吞吐量（文档/分钟、段落/秒）
+
+任务来源（二选一）：
+1. --jobs-dir 目录中的同名文件对：<名称>.docx + <名称>.txt（或 .json），
+   输出到 --output-dir/<名称>_tracked.docx
+2. --manifest 任务清单（CSV 或 JSON），每个任务一行：
+   input, new_translations, output, author, match_by, update_mode
+   路径相对于清单所在目录；output 为空时输出到 <input>_tracked.docx
+
+使用方法：
+python3 batch_translate.py --jobs-dir campaign/ --output-dir campaign_out/ --jobs 8
+python3 batch_translate.py --manifest campaign.csv
+"""
+
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List
+
+try:
+    from fc_insider import FcInsiderError, apply, extract, match
+except ImportError as e:
+    print(f"错误：缺少依赖 ({e})")
+    print("运行: pip install python-docx lxml markitdown[docx]")
+    sys.exit(1)
+
+
+TRANSLATION_SUFFIXES = ('.txt', '.json')
+OUTPUT_SUFFIX = '_tracked.docx'
+SUMMARY_NAME = 'batch_summary.json'
+CHECKPOINT_NAME = '.batch_checkpoint.jsonl'
+
+# 任务清单的列（name 可选，默认取 input 的文件名）
+MANIFEST_FIELDS = ('name', 'input', 'new_translations', 'output', 'author', 'match_by', 'update_mode')
+
+
+def discover_jobs(jobs_dir: str, output_dir: str, defaults: Dict) -> List[Dict]:
+    """按文件名配对 <名称>.docx 与 <名称>.txt / .json"""
+    jobs = []
+    for name in sorted(os.listdir(jobs_dir)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() != '.docx' or name.startswith('~$') or stem.endswith('_tracked'):
+            continue
+
+        for suffix in TRANSLATION_SUFFIXES:
+            translations_path = os.path.join(jobs_dir, stem + suffix)
+            if os.path.isfile(translations_path):
+                jobs.append(dict(defaults,
+                                 name=stem,
+                                 input=os.path.join(jobs_dir, name),
+                                 new_translations=translations_path,
+                                 output=os.path.join(output_dir, stem + OUTPUT_SUFFIX)))
+                break
+        else:
+            print(f"⚠️  跳过 {name}：未找到 {stem}.txt 或 {stem}.json")
+
+    return jobs
+
+
+def manifest_value(value, line_no: int, field: str) -> str:
+    """清单中的值转为去掉首尾空白的字符串（JSON 中的数字等标量按字面转换）"""
+    if value is None:
+        return ''
+    if isinstance(value, (list, dict)):
+        raise ValueError(f"任务清单第 {line_no} 项的 {field} 应为字符串: {value!r}")
+    return str(value).strip()
+
+
+def load_manifest(manifest_path: str, output_dir: str, defaults: Dict) -> List[Dict]:
+    """
+    读取任务清单（.csv 带表头，或 .json 列表 / {"jobs": [...]}）
+
+    空白的 author / match_by / update_mode 使用命令行默认值
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+
+    with open(manifest_path, 'r', encoding='utf-8-sig', newline='') as f:
+        if manifest_path.lower().endswith('.csv'):
+            entries = list(csv.DictReader(f))
+        else:
+            data = json.load(f)
+            entries = data.get('jobs', []) if isinstance(data, dict) else data
+
+    if not isinstance(entries, list):
+        raise ValueError("任务清单应为任务列表，或 {\"jobs\": [...]}")
+
+    jobs = []
+    names = set()
+    for line_no, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict):
+            raise ValueError(f"任务清单第 {line_no} 项不是对象: {entry!r}")
+        entry = {k.strip(): manifest_value(v, line_no, k.strip()) for k, v in entry.items()
+                 if isinstance(k, str) and k.strip() in MANIFEST_FIELDS}
+        if not entry.get('input') or not entry.get('new_translations'):
+            raise ValueError(f"任务清单第 {line_no} 项缺少 input 或 new_translations")
+
+        input_path = os.path.join(base_dir, entry['input'])
+        stem = os.path.splitext(os.path.basename(input_path))[0]
+        if entry.get('output'):
+            output = os.path.join(base_dir, entry['output'])
+        elif output_dir:
+            output = os.path.join(output_dir, stem + OUTPUT_SUFFIX)
+        else:
+            output = os.path.splitext(input_path)[0] + OUTPUT_SUFFIX
+
+        name = entry.get('name') or stem
+        if name in names:
+            raise ValueError(f"任务清单第 {line_no} 项的名称重复: {name}（可用 name 列区分）")
+        names.add(name)
+
+        jobs.append({
+            'name': name,
+            'input': input_path,
+            'new_translations': os.path.join(base_dir, entry['new_translations']),
+            'output': output,
+            'author': entry.get('author') or defaults['author'],
+            'match_by': entry.get('match_by') or defaults['match_by'],
+            'update_mode': entry.get('update_mode') or defaults['update_mode'],
+        })
+
+    return jobs
+
+
+def job_hash(job: Dict, docx_bytes: bytes, translations_bytes: bytes) -> str:
+    """按输入内容和处理选项计算任务哈希"""
+    digest = hashlib.sha256()
+    for data in (docx_bytes, b'\0', translations_bytes, b'\0'):
+        digest.update(data)
+    digest.update('\0'.join(
+        job[key] for key in ('author', 'match_by', 'update_mode', 'output')).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load_checkpoint(path: str) -> Dict[str, Dict]:
+    """
+    读取检查点日志，返回每个任务最后一条记录
+
+    日志为追加写入的 JSON Lines；中断时最后一行可能不完整，忽略即可
+    """
+    entries = {}
+    if not os.path.exists(path):
+        return entries
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            entries[entry['job']] = entry
+    return entries
+
+
+class Checkpoint:
+    """检查点日志：每个任务结束后追加一行并落盘"""
+
+    def __init__(self, path: str, previous: Dict[str, Dict]):
+        self.path = path
+        self.previous = previous
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def is_done(self, job: Dict, digest: str) -> bool:
+        """上次已成功完成，输入未变，且输出仍在"""
+        entry = self.previous.get(job['name'])
+        return (entry is not None and entry.get('status') == 'done'
+                and entry.get('hash') == digest and os.path.exists(job['output']))
+
+    def record(self, result: Dict) -> None:
+        entry = {key: result.get(key) for key in
+                 ('job', 'hash', 'status', 'output', 'rows', 'success', 'failed', 'error')}
+        entry['finished_at'] = datetime.now().isoformat(timespec='seconds')
+        self.file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        self.file.close()
+
+
+# ---- 进程池中执行的阶段（模块级函数，可被 pickle） ----
+
+def extract_stage(docx_bytes: bytes) -> List[Dict]:
+    """提取表格行"""
+    return extract(docx_bytes)['rows']
+
+
+def match_stage(rows: List[Dict], translations_bytes: bytes, match_by: str) -> Dict:
+    """匹配新译文，只返回对照表和校验错误"""
+    matched = match(rows, translations_bytes, match_by=match_by)
+    return {'rows': len(matched['rows']), 'mappings': matched['mappings'],
+            'errors': matched['errors']}
+
+
+def apply_stage(docx_bytes: bytes, mappings: List[Dict], author: str, update_mode: str) -> Dict:
+    """应用追踪修订，返回成功/失败数量和输出 bytes"""
+    result = apply(docx_bytes, mappings, author=author, reading_mode=update_mode)
+    return {'success': result['success'], 'failed': result['failed'], 'docx': result['docx']}
+
+
+# ---- 事件循环侧 ----
+
+def read_file(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def write_file(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def report_progress(progress: Dict, result: Dict) -> None:
+    """输出单个任务结果和当前吞吐量"""
+    progress['finished'] += 1
+    if result['status'] != 'skipped':
+        progress['processed'] += 1
+        progress['segments'] += result['success']
+
+    elapsed = time.perf_counter() - progress['started']
+    docs_per_min = progress['processed'] / elapsed * 60 if elapsed else 0.0
+    segments_per_s = progress['segments'] / elapsed if elapsed else 0.0
+
+    icon = {'done': '✓', 'partial': '⚠️ ', 'failed': '✗', 'skipped': '↷'}[result['status']]
+    if result['status'] == 'skipped':
+        detail = "已完成，跳过"
+    else:
+        detail = result.get('error') or f"成功 {result['success']}，失败 {result['failed']}"
+        detail += f"（{result['seconds']:.2f}s）"
+    print(f"[{progress['finished']}/{progress['total']}] {icon} {result['job']}: {detail}"
+          f"  | {docs_per_min:.1f} 文档/分钟, {segments_per_s:.1f} 段落/秒")
+
+
+async def run_job(job: Dict, semaphore: asyncio.Semaphore, pool: ProcessPoolExecutor,
+                  checkpoint: Checkpoint, progress: Dict) -> Dict:
+    """处理一个任务；任何异常都记录在结果中，不向上抛出"""
+    loop = asyncio.get_running_loop()
+    result = {'job': job['name'], 'input': job['input'], 'output': job['output'],
+              'status': 'failed', 'rows': 0, 'mappings': 0, 'success': 0, 'failed': 0,
+              'timings': {}}
+
+    async with semaphore:
+        started = time.perf_counter()
+        stage = 'read'
+        try:
+            stage_started = time.perf_counter()
+            docx_bytes, translations_bytes = await asyncio.gather(
+                asyncio.to_thread(read_file, job['input']),
+                asyncio.to_thread(read_file, job['new_translations']))
+            result['timings']['read'] = time.perf_counter() - stage_started
+
+            result['hash'] = job_hash(job, docx_bytes, translations_bytes)
+            if checkpoint.is_done(job, result['hash']):
+                previous = checkpoint.previous[job['name']]
+                result.update(status='skipped', rows=previous.get('rows') or 0,
+                              success=previous.get('success') or 0, timings={}, seconds=0.0)
+                report_progress(progress, result)
+                return result
+
+            stage = 'extract'
+            stage_started = time.perf_counter()
+            rows = await loop.run_in_executor(pool, extract_stage, docx_bytes)
+            result['timings']['extract'] = time.perf_counter() - stage_started
+
+            stage = 'match'
+            stage_started = time.perf_counter()
+            matched = await loop.run_in_executor(
+                pool, match_stage, rows, translations_bytes, job['match_by'])
+            result['timings']['match'] = time.perf_counter() - stage_started
+            result['rows'] = matched['rows']
+            result['mappings'] = len(matched['mappings'])
+            if matched['errors']:
+                raise FcInsiderError("对照表校验失败: " + "; ".join(matched['errors']))
+
+            stage = 'apply'
+            stage_started = time.perf_counter()
+            applied = await loop.run_in_executor(
+                pool, apply_stage, docx_bytes, matched['mappings'], job['author'], job['update_mode'])
+            result['timings']['apply'] = time.perf_counter() - stage_started
+            result['success'] = applied['success']
+            result['failed'] = applied['failed']
+
+            stage = 'write'
+            stage_started = time.perf_counter()
+            await asyncio.to_thread(write_file, job['output'], applied['docx'])
+            result['timings']['write'] = time.perf_counter() - stage_started
+
+            result['status'] = 'done' if applied['failed'] == 0 else 'partial'
+
+        except FcInsiderError as e:
+            result['error'] = f"{stage}: {e}"
+        except Exception as e:
+            result['error'] = f"{stage}: {type(e).__name__}: {e}"
+            result['traceback'] = traceback.format_exc()
+
+        result['seconds'] = round(time.perf_counter() - started, 3)
+        result['timings'] = {k: round(v, 3) for k, v in result['timings'].items()}
+
+    checkpoint.record(result)
+    report_progress(progress, result)
+    return result
+
+
+async def run_batch(jobs: List[Dict], concurrency: int, workers: int,
+                    checkpoint: Checkpoint) -> List[Dict]:
+    """并发处理全部任务，按原顺序返回结果"""
+    semaphore = asyncio.Semaphore(concurrency)
+    progress = {'finished': 0, 'processed': 0, 'segments': 0, 'total': len(jobs),
+                'started': time.perf_counter()}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return await asyncio.gather(*(
+            run_job(job, semaphore, pool, checkpoint, progress) for job in jobs))
+
+
+def print_summary(results: List[Dict], elapsed: float) -> None:
+    """输出汇总"""
+    counts = {status: sum(1 for r in results if r['status'] == status)
+              for status in ('done', 'partial', 'failed', 'skipped')}
+    processed = [r for r in results if r['status'] != 'skipped']
+    segments = sum(r['success'] for r in processed)
+
+    print("\n" + "=" * 80)
+    print("批量处理汇总")
+    print("=" * 80)
+    print(f"  任务: {len(results)}（完成 {counts['done']}，部分失败 {counts['partial']}，"
+          f"失败 {counts['failed']}，跳过 {counts['skipped']}）")
+    print(f"  更新段落: {segments}")
+    print(f"  总耗时: {elapsed:.2f}s")
+    if processed and elapsed:
+        print(f"  吞吐量: {len(processed) / elapsed * 60:.1f} 文档/分钟, {segments / elapsed:.1f} 段落/秒")
+
+    problems = [r for r in results if r['status'] not in ('done', 'skipped')]
+    if problems:
+        print("\n需要检查的任务:")
+        for r in problems:
+            detail = r.get('error') or f"{r['failed']} 个段落未更新"
+            print(f"  - {r['job']}: {detail}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='批量处理多个 FC Insider 文档（asyncio 并发）',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+示例：
+  # 目录结构：campaign/TW.docx + campaign/TW.txt、campaign/HK.docx + campaign/HK.txt ...
+  python3 batch_translate.py --jobs-dir campaign/ --output-dir campaign_out/
+
+  # 限制同时处理 4 个任务、进程池 4 个进程
+  python3 batch_translate.py --jobs-dir campaign/ --output-dir campaign_out/ --jobs 4 --workers 4
+
+  # 任务清单（CSV）
+  #   input,new_translations,output,author,match_by,update_mode
+  #   TW.docx,TW.txt,out/TW.docx,tw@company.com,smart,
+  #   HK.docx,HK.txt,out/HK.docx,,segment_id,read_inserted
+  python3 batch_translate.py --manifest campaign.csv
+
+  # 中断后重新运行同一命令即可续跑；--restart 忽略检查点全部重做
+  python3 batch_translate.py --manifest campaign.csv --restart
+        '''
+    )
+
+    source_group = parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument('--jobs-dir', help='任务目录（<名称>.docx + <名称>.txt/.json）')
+    source_group.add_argument('--manifest', help='任务清单（.csv 或 .json）')
+    parser.add_argument('--output-dir',
+                        help='输出目录（--jobs-dir 时必需；清单中未指定 output 的任务也输出到这里）')
+    parser.add_argument('--author', default='Claire.lee@amway.com',
+                        help='追踪修订作者（默认：Claire.lee@amway.com，清单可逐项覆盖）')
+    parser.add_argument('--match-by', choices=['smart', 'segment_id', 'index'], default='smart',
+                        help='匹配方式（默认：smart，清单可逐项覆盖）')
+    parser.add_argument('--update-mode', choices=['auto', 'read_deleted', 'read_inserted'],
+                        default='auto', help='读取模式（默认：auto，清单可逐项覆盖）')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 4,
+                        help='同时处理的任务数上限（默认：CPU 核数）')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4,
+                        help='进程池大小（默认：CPU 核数）')
+    parser.add_argument('--summary',
+                        help=f'汇总报告路径（默认：<输出目录或清单目录>/{SUMMARY_NAME}）')
+    parser.add_argument('--checkpoint',
+                        help=f'检查点日志路径（默认：<输出目录或清单目录>/{CHECKPOINT_NAME}）')
+    parser.add_argument('--restart', action='store_true', help='忽略检查点，全部任务重新处理')
+
+    args = parser.parse_args()
+    defaults = {'author': args.author, 'match_by': args.match_by, 'update_mode': args.update_mode}
+
+    if args.jobs_dir:
+        if not os.path.isdir(args.jobs_dir):
+            print(f"✗ 错误：任务目录不存在: {args.jobs_dir}")
+            return 1
+        if not args.output_dir:
+            parser.error('使用 --jobs-dir 时必须指定 --output-dir')
+        os.makedirs(args.output_dir, exist_ok=True)
+        jobs = discover_jobs(args.jobs_dir, args.output_dir, defaults)
+        report_dir = args.output_dir
+    else:
+        if not os.path.isfile(args.manifest):
+            print(f"✗ 错误：任务清单不存在: {args.manifest}")
+            return 1
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+        try:
+            jobs = load_manifest(args.manifest, args.output_dir, defaults)
+        except (ValueError, json.JSONDecodeError, csv.Error) as e:
+            print(f"✗ 错误：无法读取任务清单: {e}")
+            return 1
+        report_dir = args.output_dir or os.path.dirname(os.path.abspath(args.manifest))
+
+    if not jobs:
+        print("✗ 错误：没有找到任务")
+        return 1
+
+    checkpoint_path = args.checkpoint or os.path.join(report_dir, CHECKPOINT_NAME)
+    if args.restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    previous = load_checkpoint(checkpoint_path)
+
+    print(f"📦 {len(jobs)} 个任务（并发 {args.jobs}，进程池 {args.workers}）")
+    if previous:
+        print(f"↷ 检查点: {checkpoint_path}（{len(previous)} 条记录，已完成且输入未变的任务将跳过）")
+    print()
+
+    checkpoint = Checkpoint(checkpoint_path, previous)
+    started = time.perf_counter()
+    try:
+        results = asyncio.run(run_batch(jobs, args.jobs, args.workers, checkpoint))
+    finally:
+        checkpoint.close()
+    elapsed = time.perf_counter() - started
+
+    summary_path = args.summary or os.path.join(report_dir, SUMMARY_NAME)
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'seconds': round(elapsed, 3),
+            'jobs': results
+        }, f, ensure_ascii=False, indent=2)
+
+    print_summary(results, elapsed)
+    print(f"\n📄 汇总报告: {summary_path}")
+
+    return 0 if all(r['status'] in ('done', 'skipped') for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,790 @@
+#!/usr/bin/env python3
+"""
+FC Insider 性能基准测试
+
+功能：
+1. 生成指定行数的合成 FC Insider 文档（四列表格）和对应的新译文
+2. 对比工作流程各执行方式（子进程 / 进程内 / 流水线）的端到端耗时
+3. 对比更新阶段的单元格定位引擎（docx / lxml），并校验两者输出的 XML 相同
+4. 微基准：每个单元格生成修订元素的耗时（逐个 parse_xml / 原型复制）
+5. 对比输出写出方式（doc.save 整包重写 / 只替换改动部件的补丁写出）
+6. 对比更新脚本的内存峰值（载入整个文档 / --streaming 流式更新）
+7. 分片并行更新在不同进程数下的耗时，并校验输出与串行逐字节相同
+8. 不同差异粒度（cell / word / char）输出的 document.xml 大小与修订数量
+9. run 合并：译文单元格拆成多个 run 的文档，合并前后的 run 数量与更新耗时
+10. 全文接受 / 拒绝修订：resolve() 与逐个单元格经由 python-docx 处理的耗时
+
+使用方法：
+python3 benchmark_fc_insider.py --suite workflow --rows 20 2000 --repeat 3
+python3 benchmark_fc_insider.py --suite engine --rows 1000 5000 10000 --repeat 1
+python3 benchmark_fc_insider.py --suite revision --rows 10000
+python3 benchmark_fc_insider.py --suite output --rows 20 2000 --media-mb 20
+python3 benchmark_fc_insider.py --suite streaming --rows 10000 100000 --repeat 1
+python3 benchmark_fc_insider.py --suite sharded --rows 10000 --workers 1 2 4 8 16
+python3 benchmark_fc_insider.py --suite diff --rows 2000 --repeat 1
+python3 benchmark_fc_insider.py --suite runs --rows 2000 --repeat 3
+python3 benchmark_fc_insider.py --suite resolve --rows 2000 10000 --repeat 1
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import struct
+import tempfile
+import time
+import zipfile
+import zlib
+from datetime import datetime
+from io import BytesIO
+from typing import Dict, List
+
+try:
+    from docx import Document
+    from docx.oxml import OxmlElement, parse_xml
+    from lxml import etree
+    from fc_insider import tracked
+    from fc_insider.coalescing import coalesce
+    from fc_insider.package import SourcePackage, save_document
+    from fc_insider.diff import GRANULARITIES
+    from fc_insider.revisions import resolve
+    from fc_insider.sharded import apply_sharded
+    from fc_insider.stats import document_stats
+except ImportError:
+    print("错误：需要安装 python-docx 和 lxml")
+    print("运行: pip install python-docx lxml")
+    sys.exit(1)
+
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+HEADER = ['Segment ID', 'Segment status', 'Source segment', 'Target segment']
+
+
+def _cell_xml(text: str, style: str = None) -> str:
+    """生成单元格 XML（可选 Tag 样式的占位符 run）"""
+    runs = f'<w:r><w:t xml:space="preserve">{text}</w:t></w:r>'
+    if style:
+        runs += (f'<w:r><w:rPr><w:rStyle w:val="{style}"/></w:rPr>'
+                 f'<w:t xml:space="preserve">&lt;1/&gt;</w:t></w:r>')
+    return f'<w:tc><w:p>{runs}</w:p></w:tc>'
+
+
+# python-docx 默认模板的文档默认语言（styles.xml 的 w:docDefaults）
+_DEFAULT_LANG = '<w:lang w:val="en-US" w:eastAsia="en-US" w:bidi="ar-SA"/>'
+
+
+def _fragmented_cell_xml(text: str, size: int = 3) -> str:
+    """
+    生成拆成多个 run 的单元格 XML（模拟 Word / CAT 工具导出）：每 size 个字符一个 run，
+    run 的 w:rsidR 各不相同，每隔一个 run 标注默认语言，run 之间夹有拼写检查标记
+    """
+    runs = []
+    for number, start in enumerate(range(0, len(text), size)):
+        rpr = f'<w:rPr>{_DEFAULT_LANG}</w:rPr>' if number % 2 else ''
+        runs.append(f'<w:r w:rsidR="00{number:06X}">{rpr}'
+                    f'<w:t xml:space="preserve">{text[start:start + size]}</w:t></w:r>')
+        if number % 4 == 1:
+            runs.append('<w:proofErr w:type="spellStart"/>')
+        elif number % 4 == 3:
+            runs.append('<w:proofErr w:type="spellEnd"/>')
+    return f'<w:tc><w:p>{"".join(runs)}</w:p></w:tc>'
+
+
+def synthetic_target_text(index: int) -> str:
+    """第 index 行的旧译文"""
+    return f'第{index}段旧译文：我们期待在会议上与您相聚，共同庆祝今年的成就'
+
+
+def synthetic_new_text(index: int) -> str:
+    """第 index 行的新译文"""
+    return f'第{index}段新译文：我们诚挚期待在会议上与您相聚，一同庆祝今年的辉煌成就'
+
+
+def synthetic_long_text(index: int) -> str:
+    """第 index 行的旧译文（英文长段落）"""
+    return (f'Paragraph {index}: ' + 'Amway is built on the power of community and human '
+            'connection, and leaders like you turn these strengths into reality every day. ' * 4)
+
+
+def synthetic_long_new_text(index: int) -> str:
+    """第 index 行的新译文：长段落中只改动一个词"""
+    return synthetic_long_text(index).replace('every day', 'each day', 1)
+
+
+def _random_png(size_bytes: int) -> bytes:
+    """随机像素的 PNG（几乎不可压缩，模拟邀请卡中的大图片）"""
+    width = 1024
+    height = max(1, size_bytes // (width * 3))
+    raw = b''.join(b'\x00' + os.urandom(width * 3) for _ in range(height))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (struct.pack('>L', len(data)) + kind + data
+                + struct.pack('>L', zlib.crc32(kind + data)))
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>2L5B', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw, 1))
+            + chunk(b'IEND', b''))
+
+
+def make_synthetic_docx(path: str, rows: int, media_bytes: int = 0,
+                        target_text=synthetic_target_text, fragmented: bool = False) -> None:
+    """
+    生成包含 rows 行数据的合成 FC Insider 文档
+
+    表格结构与真实导出文件一致：Segment ID | Segment status | Source segment | Target segment
+    media_bytes 大于 0 时在表格后插入一张约该大小的图片；target_text(i) 生成第 i 行的旧译文；
+    fragmented 为 True 时译文单元格拆成多个 run（见 _fragmented_cell_xml()）
+    """
+    target_cell = _fragmented_cell_xml if fragmented else _cell_xml
+    doc = Document()
+    if media_bytes:
+        doc.add_picture(BytesIO(_random_png(media_bytes)))
+
+    parts = [f'<w:tbl xmlns:w="{W_NS}"><w:tblPr><w:tblW w:w="0" w:type="auto"/></w:tblPr>',
+             '<w:tblGrid><w:gridCol/><w:gridCol/><w:gridCol/><w:gridCol/></w:tblGrid>',
+             '<w:tr>' + ''.join(_cell_xml(h) for h in HEADER) + '</w:tr>']
+
+    for i in range(1, rows + 1):
+        parts.append(
+            '<w:tr>'
+            + _cell_xml(f'{i}seg-{i:06d}')
+            + _cell_xml('Translation Approved (PM)')
+            + _cell_xml(f'Segment {i}: we look forward to celebrating with you', 'Tag')
+            + target_cell(target_text(i))
+            + '</w:tr>'
+        )
+    parts.append('</w:tbl>')
+
+    body = doc.element.body
+    body.insert(0, parse_xml(''.join(parts)))
+    doc.save(path)
+
+
+def make_synthetic_translations(path: str, rows: int) -> None:
+    """生成与合成文档逐行对应的新译文（纯文本，每行一个）"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(1, rows + 1):
+            f.write(synthetic_new_text(i) + '\n')
+
+
+def time_command(cmd: List[str], repeat: int) -> float:
+    """运行命令 repeat 次，返回耗时中位数（秒）"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+# 在子进程中运行脚本，结束时把进程的内存峰值（KB）写到 stderr 最后一行。
+# Linux 上 ru_maxrss 会继承父进程（生成合成文档时）的峰值，优先读取 exec 后重新计数的 VmHWM
+_PEAK_RSS_RUNNER = (
+    'import resource, runpy, sys\n'
+    'sys.argv = sys.argv[1:]\n'
+    'try:\n'
+    '    runpy.run_path(sys.argv[0], run_name="__main__")\n'
+    'finally:\n'
+    '    try:\n'
+    '        with open("/proc/self/status") as f:\n'
+    '            peak = next(line.split()[1] for line in f if line.startswith("VmHWM:"))\n'
+    '    except (OSError, StopIteration):\n'
+    '        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n'
+    '    print(peak, file=sys.stderr)\n'
+)
+
+
+def measure_command(script: str, args: List[str], repeat: int) -> Dict:
+    """
+    以全新的子进程运行脚本 repeat 次
+
+    Returns:
+        {'seconds': 耗时中位数, 'peak_mb': 内存峰值的最大值（MB）}
+    """
+    seconds = []
+    peaks = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        completed = subprocess.run([sys.executable, '-c', _PEAK_RSS_RUNNER, script] + args,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        seconds.append(time.perf_counter() - started)
+        if completed.returncode != 0:
+            raise RuntimeError(f"{os.path.basename(script)} 失败: "
+                               f"{completed.stderr.decode('utf-8', 'replace')[-500:]}")
+        peaks.append(int(completed.stderr.split()[-1]) / 1024)
+    return {'seconds': statistics.median(seconds), 'peak_mb': max(peaks)}
+
+
+def benchmark_workflow(rows_list: List[int], repeat: int, work_dir: str) -> List[Dict]:
+    """对比 run_complete_workflow.py 的三种执行方式"""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'run_complete_workflow.py')
+    modes = [
+        ('子进程', ['--subprocess']),
+        ('进程内', []),
+        ('流水线', ['--pipeline']),
+    ]
+    results = []
+
+    for rows in rows_list:
+        docx_path = os.path.join(work_dir, f'synthetic_{rows}.docx')
+        trans_path = os.path.join(work_dir, f'synthetic_{rows}.txt')
+        make_synthetic_docx(docx_path, rows)
+        make_synthetic_translations(trans_path, rows)
+
+        row_result = {'rows': rows}
+        for name, flags in modes:
+            cmd = [
+                sys.executable, script,
+                '--input', docx_path,
+                '--new-translations', trans_path,
+                '--output', os.path.join(work_dir, f'out_{rows}.docx'),
+                '--match-by', 'segment_id',
+                '--skip-dependencies-check',
+            ] + flags
+            row_result[name] = time_command(cmd, repeat)
+            print(f"  {rows} 行 / {name}: {row_result[name]:.2f}s")
+        results.append(row_result)
+
+    return results
+
+
+def synthetic_mappings(rows: int) -> List[Dict]:
+    """与合成文档逐行对应的翻译映射（跳过提取和匹配阶段）"""
+    return [{'segment_id': f'{i}seg-{i:06d}',
+             'old_text': synthetic_target_text(i),
+             'new_text': synthetic_new_text(i)}
+            for i in range(1, rows + 1)]
+
+
+def benchmark_engine(rows_list: List[int], repeat: int, work_dir: str) -> List[Dict]:
+    """
+    对比 apply_to_document() 的两种单元格定位引擎
+
+    只计时应用追踪修订（不含加载和保存）；同一修订日期下两种引擎的 document.xml 必须相同
+    """
+    date = datetime(2025, 1, 1)
+    results = []
+
+    for rows in rows_list:
+        docx_path = os.path.join(work_dir, f'synthetic_{rows}.docx')
+        make_synthetic_docx(docx_path, rows)
+        mappings = synthetic_mappings(rows)
+
+        row_result = {'rows': rows}
+        outputs = {}
+        for engine in tracked.ENGINES:
+            samples = []
+            for _ in range(repeat):
+                doc = Document(docx_path)
+                started = time.perf_counter()
+                result = tracked.apply_to_document(doc, mappings, date=date, engine=engine)
+                samples.append(time.perf_counter() - started)
+            if result['failed']:
+                raise RuntimeError(f"{engine} 引擎有 {result['failed']} 条失败")
+            outputs[engine] = etree.tostring(doc.element)
+            row_result[engine] = statistics.median(samples)
+            print(f"  {rows} 行 / {engine}: {row_result[engine]:.2f}s")
+
+        if len(set(outputs.values())) != 1:
+            raise RuntimeError(f"{rows} 行：两种引擎输出的 XML 不同")
+        print(f"  {rows} 行：输出 XML 相同 ✓")
+        results.append(row_result)
+
+    return results
+
+
+def _parse_xml_revision(old_text: str, new_text: str, author: str, date_str: str,
+                        revision_id: int):
+    """基线：按单元格格式化 XML 字符串再 parse_xml（RevisionFactory 之前的做法）"""
+    del_run = OxmlElement('w:r')
+    del_run.text = old_text
+    del_element = parse_xml(f'''
+            <w:del w:id="{revision_id}" w:author="{author}" w:date="{date_str}"
+                   xmlns:w="{W_NS}">
+            </w:del>
+        ''')
+    del_element.append(del_run)
+    ins_element = parse_xml(f'''
+            <w:ins w:id="{revision_id + 1}" w:author="{author}" w:date="{date_str}"
+                   xmlns:w="{W_NS}">
+            </w:ins>
+        ''')
+    ins_element.append(parse_xml(f'''
+            <w:r xmlns:w="{W_NS}">
+                <w:t xml:space="preserve">{new_text}</w:t>
+            </w:r>
+        '''))
+    return del_element, ins_element
+
+
+def _parse_xml_linebreak_revision(old_text: str, new_text: str, author: str, date_str: str,
+                                  revision_id: int):
+    """基线：换行符脚本的旧做法（<w:br/> 拼接为字符串后 parse_xml）"""
+    def run_xml(text: str, tag: str) -> str:
+        parts = []
+        for i, part in enumerate(text.split('\n')):
+            if i > 0:
+                parts.append('<w:br/>')
+            if part:
+                parts.append(f'<w:{tag} xml:space="preserve">{part}</w:{tag}>')
+        return f'<w:r xmlns:w="{W_NS}">' + ''.join(parts) + '</w:r>'
+
+    del_element = parse_xml(f'<w:del w:id="{revision_id}" w:author="{author}" '
+                            f'w:date="{date_str}" xmlns:w="{W_NS}"></w:del>')
+    del_element.append(parse_xml(run_xml(old_text, 'delText')))
+    ins_element = parse_xml(f'<w:ins w:id="{revision_id + 1}" w:author="{author}" '
+                            f'w:date="{date_str}" xmlns:w="{W_NS}"></w:ins>')
+    ins_element.append(parse_xml(run_xml(new_text, 't')))
+    return del_element, ins_element
+
+
+def benchmark_revision(rows_list: List[int], repeat: int, work_dir: str) -> List[Dict]:
+    """
+    微基准：生成每个单元格的 <w:del>/<w:ins> 修订元素（不含读取、清空单元格）
+
+    结果为每个单元格的微秒数
+    """
+    author = 'Translator'
+    date_str = tracked.revision_date(datetime(2025, 1, 1))
+    results = []
+
+    def factory_revision(factory, old_text, new_text, revision_id):
+        return (factory.deletion(revision_id, old_text),
+                factory.insertion(revision_id + 1, new_text))
+
+    def factory_linebreak_revision(factory, old_text, new_text, revision_id):
+        return (factory.linebreak_deletion(revision_id, old_text),
+                factory.linebreak_insertion(revision_id + 1, new_text))
+
+    for rows in rows_list:
+        texts = [(synthetic_target_text(i), synthetic_new_text(i)) for i in range(1, rows + 1)]
+        multiline = [(old.replace('，', '\n'), new.replace('，', '\n')) for old, new in texts]
+
+        builders = [
+            ('parse_xml', texts, lambda old, new, rid:
+                _parse_xml_revision(old, new, author, date_str, rid)),
+            ('原型复制', texts, None),
+            ('parse_xml（换行脚本，单行）', texts, lambda old, new, rid:
+                _parse_xml_linebreak_revision(old, new, author, date_str, rid)),
+            ('原型复制（换行脚本，单行）', texts, None),
+            ('parse_xml（换行脚本，3 行）', multiline, lambda old, new, rid:
+                _parse_xml_linebreak_revision(old, new, author, date_str, rid)),
+            ('原型复制（换行脚本，3 行）', multiline, None),
+        ]
+
+        row_result = {'rows': rows}
+        for name, cell_texts, build in builders:
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                if build is None:
+                    # 原型只在开始时解析一次
+                    factory = tracked.RevisionFactory(author, date_str)
+                    make = factory_linebreak_revision if '换行脚本' in name else factory_revision
+                    for i, (old, new) in enumerate(cell_texts):
+                        make(factory, old, new, 1000 + i * 2)
+                else:
+                    for i, (old, new) in enumerate(cell_texts):
+                        build(old, new, 1000 + i * 2)
+                samples.append((time.perf_counter() - started) / rows * 1e6)
+            row_result[name] = statistics.median(samples)
+            print(f"  {rows} 个单元格 / {name}: {row_result[name]:.1f}µs/单元格")
+        results.append(row_result)
+
+    return results
+
+
+def benchmark_output(rows_list: List[int], repeat: int, work_dir: str,
+                     media_mb: float = 20) -> List[Dict]:
+    """
+    对比写出输出文档的两种方式（只计时写出，不含加载和应用修订）
+
+    文档中嵌入约 media_mb MB 的图片：doc.save() 会重新压缩它，补丁写出则原样复制
+    """
+    date = datetime(2025, 1, 1)
+    results = []
+
+    for rows in rows_list:
+        docx_path = os.path.join(work_dir, f'synthetic_{rows}_media.docx')
+        make_synthetic_docx(docx_path, rows, int(media_mb * 1024 * 1024))
+        mappings = synthetic_mappings(rows)
+
+        row_result = {'rows': rows}
+        outputs = {}
+        for name in ('doc.save', '补丁写出'):
+            samples = []
+            for _ in range(repeat):
+                with SourcePackage(docx_path) as package:
+                    doc = Document(package.stream)
+                    result = tracked.apply_to_document(doc, mappings, date=date)
+                    parts = tracked.changed_parts(doc, result['track_changes_existed'])
+                    buffer = BytesIO()
+                    started = time.perf_counter()
+                    if name == 'doc.save':
+                        doc.save(buffer)
+                    else:
+                        save_document(doc, package, buffer, parts)
+                    samples.append(time.perf_counter() - started)
+            outputs[name] = etree.tostring(Document(BytesIO(buffer.getvalue())).element)
+            row_result[name] = statistics.median(samples)
+            print(f"  {rows} 行 / {name}: {row_result[name]:.2f}s")
+
+        if len(set(outputs.values())) != 1:
+            raise RuntimeError(f"{rows} 行：两种写出方式的文档内容不同")
+        print(f"  {rows} 行：文档内容相同 ✓")
+        results.append(row_result)
+
+    return results
+
+
+def benchmark_streaming(rows_list: List[int], repeat: int, work_dir: str) -> List[Dict]:
+    """
+    对比 update_fc_insider_tracked.py 载入整个文档与 --streaming 的内存峰值
+
+    结果为 MB；两种方式输出的 document.xml 必须相同
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          'update_fc_insider_tracked.py')
+    modes = [
+        ('载入整个文档（lxml 引擎）', ['--engine', 'lxml', '--segment-index', 'off']),
+        ('流式', ['--streaming']),
+    ]
+    results = []
+
+    for rows in rows_list:
+        docx_path = os.path.join(work_dir, f'synthetic_{rows}.docx')
+        mappings_path = os.path.join(work_dir, f'synthetic_{rows}.json')
+        make_synthetic_docx(docx_path, rows)
+        with open(mappings_path, 'w', encoding='utf-8') as f:
+            json.dump({'translations': synthetic_mappings(rows)}, f, ensure_ascii=False)
+        print(f"  {rows} 行：document.xml {_member_size(docx_path) / 1024 / 1024:.0f}MB")
+
+        row_result = {'rows': rows}
+        outputs = []
+        for name, extra in modes:
+            output_path = os.path.join(work_dir, f'synthetic_{rows}_out.docx')
+            measured = measure_command(script, ['--input', docx_path,
+                                                '--translations', mappings_path,
+                                                '--output', output_path] + extra, repeat)
+            row_result[name] = measured['peak_mb']
+            outputs.append(_normalized_document_xml(output_path))
+            print(f"  {rows} 行 / {name}: {measured['seconds']:.2f}s，"
+                  f"内存峰值 {measured['peak_mb']:.0f}MB")
+
+        if len(set(outputs)) != 1:
+            raise RuntimeError(f"{rows} 行：两种方式输出的 document.xml 不同")
+        print(f"  {rows} 行：输出 document.xml 相同 ✓")
+        results.append(row_result)
+
+    return results
+
+
+def benchmark_sharded(rows_list: List[int], repeat: int, work_dir: str,
+                      workers_list: List[int] = (1, 2, 4, 8, 16)) -> List[Dict]:
+    """
+    分片并行更新（apply_sharded）在不同进程数下的端到端耗时，以串行 apply(engine='lxml') 为基线
+
+    计时包含读取、更新和写出；每种进程数的输出文档必须与串行逐字节相同
+    """
+    date = datetime(2025, 1, 1)
+    print(f"  CPU 核数: {os.cpu_count()}")
+    results = []
+
+    for rows in rows_list:
+        docx_path = os.path.join(work_dir, f'synthetic_{rows}.docx')
+        make_synthetic_docx(docx_path, rows)
+        mappings = synthetic_mappings(rows)
+
+        row_result = {'rows': rows}
+        runs = [('串行', lambda: tracked.apply(docx_path, mappings, date=date, engine='lxml'))]
+        runs += [(f'{workers} 进程', lambda workers=workers: apply_sharded(
+                     docx_path, mappings, date=date, workers=workers))
+                 for workers in workers_list]
+
+        expected = None
+        for name, run in runs:
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                result = run()
+                samples.append(time.perf_counter() - started)
+            if result['failed']:
+                raise RuntimeError(f"{name} 有 {result['failed']} 条失败")
+            if expected is None:
+                expected = result['docx']
+            elif result['docx'] != expected:
+                raise RuntimeError(f"{rows} 行 / {name}：输出与串行不同")
+            row_result[name] = statistics.median(samples)
+            print(f"  {rows} 行 / {name}: {row_result[name]:.2f}s")
+
+        print(f"  {rows} 行：各进程数的输出与串行逐字节相同 ✓")
+        results.append(row_result)
+
+    return results
+
+
+def benchmark_diff(rows_list: List[int], repeat: int, work_dir: str) -> List[Dict]:
+    """
+    各差异粒度输出的 document.xml 大小（KB），另打印耗时和修订数量
+
+    两种文本：短句（合成文档的中文译文，每行三处改动）、长段落（英文长段落，只改动一个词）
+    """
+    date = datetime(2025, 1, 1)
+    texts = [
+        ('短句', synthetic_target_text, synthetic_new_text),
+        ('长段落', synthetic_long_text, synthetic_long_new_text),
+    ]
+    results = []
+
+    for rows in rows_list:
+        row_result = {'rows': rows}
+        for label, old_text, new_text in texts:
+            docx_path = os.path.join(work_dir, f'synthetic_{rows}_{label}.docx')
+            make_synthetic_docx(docx_path, rows, target_text=old_text)
+            mappings = [{'segment_id': f'{i}seg-{i:06d}', 'old_text': old_text(i),
+                         'new_text': new_text(i)} for i in range(1, rows + 1)]
+            before = document_stats(docx_path)
+            print(f"  {rows} 行 / {label}: 更新前 document.xml {before['xml_bytes'] / 1024:.0f}KB")
+
+            for granularity in GRANULARITIES:
+                samples = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    result = tracked.apply(docx_path, mappings, date=date, engine='lxml',
+                                           granularity=granularity)
+                    samples.append(time.perf_counter() - started)
+                if result['failed']:
+                    raise RuntimeError(f"{label} / {granularity} 有 {result['failed']} 条失败")
+                after = document_stats(result['docx'])
+                row_result[f'{granularity} {label}'] = after['xml_bytes'] / 1024
+                print(f"  {rows} 行 / {label} / {granularity}: {statistics.median(samples):.2f}s，"
+                      f"document.xml {after['xml_bytes'] / 1024:.0f}KB，修订 {after['revisions']}")
+        results.append(row_result)
+
+    return results
+
+
+def benchmark_runs(rows_list: List[int], repeat: int, work_dir: str) -> List[Dict]:
+    """
+    run 合并：译文单元格拆成多个 run 的合成文档（见 _fragmented_cell_xml()）
+
+    对比三种情况下载入、更新（lxml 引擎）、保存的耗时：不合并 / 更新前合并（--coalesce-runs，
+    含合并耗时）/ 已合并的文档（coalesce() 的输出）；后两者输出的 document.xml 必须相同
+    （不合并时整格替换留下原有的 <w:proofErr>，输出不同）
+    """
+    date = datetime(2025, 1, 1)
+    results = []
+
+    def update(source, coalesce_first: bool) -> bytes:
+        if coalesce_first:
+            source = coalesce(source)['docx']
+        with SourcePackage(source) as package:
+            doc = tracked.load_document(package)
+            tracked.apply_to_document(doc, mappings, date=date, engine='lxml')
+            buffer = BytesIO()
+            save_document(doc, package, buffer, (doc.part,))
+        return buffer.getvalue()
+
+    for rows in rows_list:
+        docx_path = os.path.join(work_dir, f'fragmented_{rows}.docx')
+        make_synthetic_docx(docx_path, rows, fragmented=True)
+        mappings = synthetic_mappings(rows)
+
+        started = time.perf_counter()
+        coalesced = coalesce(docx_path)
+        elapsed = time.perf_counter() - started
+        before, after = coalesced['runs']
+        print(f"  {rows} 行：run {before} → {after}，document.xml "
+              f"{coalesced['xml_bytes'][0] / 1024:.0f}KB → {coalesced['xml_bytes'][1] / 1024:.0f}KB，"
+              f"coalesce() {elapsed:.2f}s")
+
+        row_result = {'rows': rows}
+        outputs = {}
+        for label, source, coalesce_first in (('不合并', docx_path, False),
+                                              ('--coalesce-runs', docx_path, True),
+                                              ('已合并的文档', coalesced['docx'], False)):
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                output = update(source, coalesce_first)
+                samples.append(time.perf_counter() - started)
+            if coalesce_first or source is not docx_path:
+                outputs[label] = _normalized_document_xml(BytesIO(output))
+            row_result[label] = statistics.median(samples)
+            print(f"  {rows} 行 / {label}: {row_result[label]:.2f}s")
+
+        if len(set(outputs.values())) != 1:
+            raise RuntimeError(f"{rows} 行：更新前合并与先合并文档的输出不同")
+        print(f"  {rows} 行：更新前合并与先合并文档的输出相同 ✓")
+        results.append(row_result)
+
+    return results
+
+
+def benchmark_resolve(rows_list: List[int], repeat: int, work_dir: str) -> List[Dict]:
+    """
+    全文接受 / 拒绝修订：按词写入修订（--diff-granularity word，每行 6 条修订）的合成文档
+
+    对比 resolve()（只解析、重写 document.xml）与逐个单元格 clear_cell_tracked_changes() /
+    reject_cell_tracked_changes() 后保存的耗时；接受后每个单元格应为新译文、拒绝后应为原译文
+    """
+    date = datetime(2025, 1, 1)
+    results = []
+
+    def per_cell(source: bytes, accept: bool) -> bytes:
+        with SourcePackage(source) as package:
+            doc = tracked.load_document(package)
+            for table in doc.tables:
+                for row in table.rows:
+                    for cell in row.cells:
+                        if accept:
+                            tracked.clear_cell_tracked_changes(cell)
+                        else:
+                            tracked.reject_cell_tracked_changes(cell)
+            buffer = BytesIO()
+            save_document(doc, package, buffer, (doc.part,))
+        return buffer.getvalue()
+
+    for rows in rows_list:
+        docx_path = os.path.join(work_dir, f'synthetic_{rows}.docx')
+        make_synthetic_docx(docx_path, rows)
+        source = tracked.apply(docx_path, synthetic_mappings(rows), date=date, engine='lxml',
+                               granularity='word')['docx']
+        print(f"  {rows} 行：修订 {document_stats(source)['revisions']}")
+
+        row_result = {'rows': rows}
+        for action, text in (('accept', synthetic_new_text), ('reject', synthetic_target_text)):
+            for label, run in (('resolve()', lambda: resolve(source, action)['docx']),
+                               ('逐个单元格', lambda: per_cell(source, action == 'accept'))):
+                samples = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    output = run()
+                    samples.append(time.perf_counter() - started)
+                row_result[f'{action} / {label}'] = statistics.median(samples)
+                print(f"  {rows} 行 / {action} / {label}: {statistics.median(samples):.2f}s")
+
+            table = Document(BytesIO(resolve(source, action)['docx'])).tables[0]
+            if any(row.cells[3].text != text(i) for i, row in enumerate(table.rows[1:], 1)):
+                raise RuntimeError(f"{rows} 行：{action} 后的译文不符")
+        results.append(row_result)
+
+    return results
+
+
+def _member_size(docx_path: str, name: str = 'word/document.xml') -> int:
+    with zipfile.ZipFile(docx_path) as archive:
+        return archive.getinfo(name).file_size
+
+
+def _normalized_document_xml(docx_path: str) -> str:
+    """document.xml 的哈希（修订日期替换为固定值）"""
+    with zipfile.ZipFile(docx_path) as archive:
+        data = archive.read('word/document.xml')
+    return hashlib.sha256(re.sub(rb'w:date="[^"]*"', b'w:date=""', data)).hexdigest()
+
+
+SUITES = {
+    'workflow': benchmark_workflow,
+    'engine': benchmark_engine,
+    'revision': benchmark_revision,
+    'output': benchmark_output,
+    'streaming': benchmark_streaming,
+    'sharded': benchmark_sharded,
+    'diff': benchmark_diff,
+    'runs': benchmark_runs,
+    'resolve': benchmark_resolve,
+}
+
+# 结果单位（默认秒）
+SUITE_UNITS = {
+    'revision': 'µs',
+    'streaming': 'MB',
+    'diff': 'KB',
+}
+
+
+def print_results(results: List[Dict], unit: str = 's') -> None:
+    """以 Markdown 表格输出结果"""
+    columns = [key for key in results[0] if key != 'rows']
+    print("\n| 行数 | " + " | ".join(columns) + " |")
+    print("|------|" + "|".join('------' for _ in columns) + "|")
+    for result in results:
+        print(f"| {result['rows']} | " + " | ".join(f"{result[c]:.2f}{unit}" for c in columns) + " |")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='FC Insider 性能基准测试',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+示例：
+  # 对比工作流程执行方式（小文档 20 行，大文档 2000 行）
+  python3 benchmark_fc_insider.py --suite workflow --rows 20 2000
+
+  # 对比更新阶段的单元格定位引擎（docx 为 O(n²)，10000 行需要数分钟）
+  python3 benchmark_fc_insider.py --suite engine --rows 1000 5000 10000 --repeat 1
+
+  # 微基准：每个单元格生成修订元素的耗时
+  python3 benchmark_fc_insider.py --suite revision --rows 10000
+
+  # 对比输出写出方式（文档中嵌入 20MB 图片）
+  python3 benchmark_fc_insider.py --suite output --rows 20 2000 --media-mb 20
+
+  # 对比更新脚本的内存峰值（载入整个文档 / 流式）
+  python3 benchmark_fc_insider.py --suite streaming --rows 10000 100000 --repeat 1
+
+  # 分片并行更新：1 到 16 个进程的耗时（输出与串行逐字节相同）
+  python3 benchmark_fc_insider.py --suite sharded --rows 10000 --workers 1 2 4 8 16 --repeat 1
+
+  # 差异粒度：各粒度输出的 document.xml 大小与修订数量
+  python3 benchmark_fc_insider.py --suite diff --rows 2000 --repeat 1
+
+  # run 合并：译文单元格拆成多个 run 时，合并前后的更新耗时
+  python3 benchmark_fc_insider.py --suite runs --rows 2000 --repeat 3
+python3 benchmark_fc_insider.py --suite resolve --rows 2000 10000 --repeat 1
+
+  # 只生成合成文档（供手动测试）
+  python3 benchmark_fc_insider.py --make-docx synthetic.docx --rows 5000
+        '''
+    )
+
+    parser.add_argument('--suite', choices=sorted(SUITES), default='workflow', help='基准测试项目')
+    parser.add_argument('--rows', type=int, nargs='+', default=[20, 2000], help='合成文档的数据行数')
+    parser.add_argument('--repeat', type=int, default=3, help='每项重复次数（取中位数）')
+    parser.add_argument('--media-mb', type=float, default=20,
+                        help='output 项目中嵌入图片的大小（MB，默认：20）')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16],
+                        help='sharded 项目的进程数（默认：1 2 4 8 16）')
+    parser.add_argument('--make-docx', help='只生成合成文档到此路径（同时生成同名 .txt 新译文）')
+
+    args = parser.parse_args()
+
+    if args.make_docx:
+        rows = args.rows[0]
+        make_synthetic_docx(args.make_docx, rows)
+        make_synthetic_translations(os.path.splitext(args.make_docx)[0] + '.txt', rows)
+        print(f"✓ 已生成 {rows} 行合成文档: {args.make_docx}")
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix='fc_insider_bench_') as work_dir:
+        print(f"基准测试: {args.suite}（重复 {args.repeat} 次取中位数）")
+        options = {}
+        if args.suite == 'output':
+            options['media_mb'] = args.media_mb
+        elif args.suite == 'sharded':
+            options['workers_list'] = args.workers
+        results = SUITES[args.suite](args.rows, args.repeat, work_dir, **options)
+
+    print_results(results, SUITE_UNITS.get(args.suite, 's'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,6 +12,9 @@
 用法:
     python clean_translation_text.py input.txt output.txt
     python clean_translation_text.py input.txt output.txt --verbose
+
+  # 管道（"-" 表示 stdin / stdout，统计信息输出到 stderr）
+  pbpaste | python clean_translation_text.py - - > new_translations.txt
 """
 
 import sys
@@ -19,6 +22,9 @@ import argparse
 import re
 from pathlib import Path
 
+from fc_insider.stdio import (display_name, is_stdio, progress_to_stderr, read_input_text,
+                              write_output_text)
+
 
 def clean_line(line: str) -> str:
     """
@@ -90,10 +96,9 @@ def clean_translation_file(input_path: str, output_path: str, verbose: bool = Fa
 
     cleaned_lines = []
 
-    print(f"📖 读取文件: {input_path}")
+    print(f"📖 读取文件: {display_name(input_path)}")
 
-    with open(input_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+    lines = read_input_text(input_path).splitlines(keepends=True)
 
     stats['total_lines'] = len(lines)
 
@@ -128,10 +133,8 @@ def clean_translation_file(input_path: str, output_path: str, verbose: bool = Fa
             print(f"  ✓ [{idx}] {cleaned[:50]}..." if len(cleaned) > 50 else f"  ✓ [{idx}] {cleaned}")
 
     # 写入输出文件
-    print(f"\n💾 写入文件: {output_path}")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        for line in cleaned_lines:
-            f.write(line + '\n')
+    print(f"\n💾 写入文件: {display_name(output_path, 'stdout')}")
+    write_output_text(output_path, ''.join(line + '\n' for line in cleaned_lines))
 
     return stats
 
@@ -148,6 +151,9 @@ def main():
   # 详细模式
   python clean_translation_text.py input.txt output.txt --verbose
 
+  # 管道（"-" 表示 stdin / stdout，统计信息输出到 stderr）
+  pbpaste | python clean_translation_text.py - - > new_translations.txt
+
 清理内容:
   - 删除表格边框字符 │
   - 删除行号（如 "1 ", "  3 "）
@@ -160,14 +166,15 @@ def main():
         '''
     )
 
-    parser.add_argument('input', help='输入文件路径')
-    parser.add_argument('output', help='输出文件路径')
+    parser.add_argument('input', help='输入文件路径（"-" 表示 stdin）')
+    parser.add_argument('output', help='输出文件路径（"-" 表示 stdout）')
     parser.add_argument('--verbose', action='store_true', help='显示详细信息')
 
     args = parser.parse_args()
+    progress_to_stderr(args.output)
 
     # 检查输入文件
-    if not Path(args.input).exists():
+    if not is_stdio(args.input) and not Path(args.input).exists():
         print(f"✗ 错误：文件不存在 - {args.input}")
         return 1
 
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+合并 run：把单元格中相邻、格式相同的 <w:r> 合并为一个
+
+Word 和 CAT 工具导出的文档常把一个单元格拆成十几个 run（编辑会话标记 w:rsidR 不同、
+拼写检查标记 <w:proofErr>、逐段的语言标注 <w:lang>），实际格式完全相同。
+合并后读取单元格文本、写入修订和保存都更快；文本、格式和修订不变。
+
+也可以在更新时加 update_fc_insider_tracked.py --coalesce-runs，作为更新前的一步。
+
+用法:
+    python coalesce_runs.py --input exported.docx --output coalesced.docx
+
+  # 从 stdin 读取、输出到 stdout（进度信息输出到 stderr）
+  cat exported.docx | python coalesce_runs.py --input - --output - > coalesced.docx
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+from fc_insider.coalescing import coalesce
+from fc_insider.errors import FcInsiderError
+from fc_insider.stdio import (display_name, is_stdio, progress_to_stderr,
+                              read_input_bytes, write_output_bytes)
+from fc_insider.tracked import load_document
+
+
+def read_cell_texts(source) -> float:
+    """载入文档并读取所有表格单元格的 cell.text（与更新脚本读取旧译文的方式相同），返回读取耗时（秒）"""
+    doc = load_document(source)
+    started = time.perf_counter()
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                cell.text
+    return time.perf_counter() - started
+
+
+def print_coalescing(result: Dict, elapsed: float) -> None:
+    """打印合并结果：run 数量、去掉的标记与 document.xml 的大小"""
+    before, after = result['runs']
+    print(f"✓ run: {before:,} → {after:,}（-{before - after:,}），耗时 {elapsed:.2f}s")
+    print(f"  合并相邻 run: {result['merged']:,}")
+    print(f"  空 run: {result['empty']:,}")
+    print(f"  拼写检查标记 <w:proofErr>: {result['proofing']:,}")
+    print(f"  多余的语言标注 <w:lang>: {result['languages']:,}")
+    xml_before, xml_after = result['xml_bytes']
+    ratio = (xml_before - xml_after) / xml_before * 100 if xml_before else 0.0
+    print(f"📄 document.xml: {xml_before:,} → {xml_after:,} 字节（-{ratio:.1f}%）")
+
+
+def coalesce_file(input_path: str, output_path: str, measure: bool = False) -> Dict:
+    """
+    合并文档中各单元格的 run 并写出
+
+    Args:
+        input_path: 输入 Word 文档路径（"-" 表示 stdin）
+        output_path: 输出 Word 文档路径（"-" 表示 stdout）
+        measure: 另外测量合并前、后读取全部单元格文本的耗时
+
+    Returns:
+        fc_insider.coalescing.coalesce() 的结果
+    """
+    print(f"\n📖 读取文档: {display_name(input_path)}")
+    source = read_input_bytes(input_path)
+
+    print("🔍 合并单元格中的 run...")
+    started = time.perf_counter()
+    result = coalesce(source)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n💾 保存文档: {display_name(output_path, 'stdout')}")
+    write_output_bytes(output_path, result['docx'])
+
+    print_coalescing(result, elapsed)
+    if measure:
+        read_before, read_after = read_cell_texts(source), read_cell_texts(result['docx'])
+        speedup = read_before / read_after if read_after else 1.0
+        print(f"⏱ 读取全部单元格文本: {read_before:.2f}s → {read_after:.2f}s（{speedup:.1f}x）")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='合并单元格中相邻、格式相同的 run，去掉拼写检查标记、空 run 和多余的语言标注',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+示例:
+  # 合并导出文档中的 run
+  python coalesce_runs.py --input exported.docx --output coalesced.docx
+
+  # 从 stdin 读取、输出到 stdout（进度信息输出到 stderr）
+  cat exported.docx | python coalesce_runs.py --input - --output - > coalesced.docx
+
+  # 同时报告合并前、后读取全部单元格文本的耗时
+  python coalesce_runs.py --input exported.docx --output coalesced.docx --measure
+
+  # 作为更新前的一步
+  python update_fc_insider_tracked.py --input exported.docx --translations translations.json \\
+    --output output.docx --coalesce-runs
+
+说明:
+  - 只处理表格单元格中的 run（含修订 <w:ins> / <w:del> 中的 run）
+  - <w:rPr> 相同的相邻 run 合并；含图片、域等内容的 run 不合并
+  - <w:lang> 与文档默认语言相同、且样式没有设置语言时才视为多余
+  - 文本、格式和修订不变；没有可合并的内容时输出与输入相同
+        '''
+    )
+
+    parser.add_argument('--input', required=True, help='输入 Word 文档路径（"-" 表示 stdin）')
+    parser.add_argument('--output', required=True, help='输出 Word 文档路径（"-" 表示 stdout）')
+    parser.add_argument('--measure', action='store_true',
+                        help='另外测量合并前、后读取全部单元格文本（cell.text）的耗时')
+
+    args = parser.parse_args()
+    progress_to_stderr(args.output)
+
+    if not is_stdio(args.input) and not Path(args.input).exists():
+        print(f"✗ 错误：文件不存在 - {args.input}")
+        return 1
+
+    print("=" * 80)
+    print("合并 run")
+    print("=" * 80)
+
+    try:
+        coalesce_file(args.input, args.output, args.measure)
+    except FcInsiderError as e:
+        print(f"\n✗ 错误: {e}")
+        return 1
+
+    print("\n" + "=" * 80)
+    print("✓ 合并完成！")
+    print("=" * 80)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
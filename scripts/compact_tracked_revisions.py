@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+压缩追踪修订：把每个单元格多轮累积的修订合并为一对 <w:del>(原文) / <w:ins>(当前文本)
+
+多轮翻译、审阅后，单元格中叠加着不同作者的嵌套修订、格式修订和段落标记修订，
+document.xml 越来越大，Word 中的审阅窗格也难以阅读。压缩后每个单元格只剩相对原文的净改动；
+接受或拒绝全部修订得到的文本及格式与压缩前相同（run 格式不一致、无法合并的单元格不改动）。
+
+用法:
+    python compact_tracked_revisions.py --input reviewed.docx --output compacted.docx
+
+  # 从 stdin 读取、输出到 stdout（进度信息输出到 stderr）
+  cat reviewed.docx | python compact_tracked_revisions.py --input - --output - > compacted.docx
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict
+
+from fc_insider.compaction import compact
+from fc_insider.errors import FcInsiderError
+from fc_insider.stats import document_stats
+from fc_insider.stdio import (display_name, is_stdio, progress_to_stderr,
+                              read_input_bytes, write_output_bytes)
+
+
+def print_compaction(result: Dict, before: Dict, after: Dict) -> None:
+    """打印压缩结果：单元格数、修订元素数与 document.xml 的大小（fc_insider.stats.document_stats()）"""
+    print(f"✓ 处理的单元格: {result['cells']}")
+    print(f"  写入净修订: {result['net']}")
+    print(f"  原文与当前文本相同（已接受）: {result['accepted']}")
+    print(f"  格式不一致（跳过）: {result['skipped']}")
+    print(f"🔁 修订元素: 去掉 {result['removed']:,}，写入 {result['revisions']:,}")
+
+    saved = before['xml_bytes'] - after['xml_bytes']
+    ratio = saved / before['xml_bytes'] * 100 if before['xml_bytes'] else 0.0
+    print(f"📄 document.xml: {before['xml_bytes']:,} → {after['xml_bytes']:,} 字节"
+          f"（节省 {saved:,} 字节，{ratio:.1f}%），"
+          f"修订: {before['revisions']:,} → {after['revisions']:,}")
+
+
+def compact_revisions(input_path: str, output_path: str, author: str = "Translator") -> Dict:
+    """
+    压缩文档中各单元格的修订并写出
+
+    Args:
+        input_path: 输入 Word 文档路径（"-" 表示 stdin）
+        output_path: 输出 Word 文档路径（"-" 表示 stdout）
+        author: 修订没有作者属性时使用的作者
+
+    Returns:
+        fc_insider.compaction.compact() 的结果
+    """
+    print(f"\n📖 读取文档: {display_name(input_path)}")
+    source = read_input_bytes(input_path)
+
+    print("🔍 压缩单元格修订...")
+    result = compact(source, author=author)
+
+    print(f"\n💾 保存文档: {display_name(output_path, 'stdout')}")
+    write_output_bytes(output_path, result['docx'])
+
+    print_compaction(result, document_stats(source), document_stats(result['docx']))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='把每个单元格累积的追踪修订压缩为相对原文的一对删除/插入',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+示例:
+  # 压缩多轮审阅后的文档
+  python compact_tracked_revisions.py --input reviewed.docx --output compacted.docx
+
+  # 从 stdin 读取、输出到 stdout（进度信息输出到 stderr）
+  cat reviewed.docx | python compact_tracked_revisions.py --input - --output - > compacted.docx
+
+说明:
+  - 原文 = 拒绝全部修订后的文本，当前文本 = 接受全部修订后的文本
+  - 两者相同的单元格接受内容修订（run 及格式保留），格式修订不接受、仍可拒绝
+  - 只有格式修订的单元格不改动
+  - 不同的单元格写入一对 <w:del> / <w:ins>，作者、日期沿用单元格中最近一次修订的，
+    run 格式分别沿用拒绝、接受全部修订后的格式
+  - 原文或当前文本中各 run 格式不一致的单元格不改动（计为跳过）
+  - 已是一对删除/插入的单元格不改动，重复运行输出与输入相同
+  - 单元格以外的修订不处理
+        '''
+    )
+
+    parser.add_argument('--input', required=True, help='输入 Word 文档路径（"-" 表示 stdin）')
+    parser.add_argument('--output', required=True, help='输出 Word 文档路径（"-" 表示 stdout）')
+    parser.add_argument('--author', default='Translator',
+                        help='修订没有作者属性时使用的作者（默认: Translator）')
+
+    args = parser.parse_args()
+    progress_to_stderr(args.output)
+
+    if not is_stdio(args.input) and not Path(args.input).exists():
+        print(f"✗ 错误：文件不存在 - {args.input}")
+        return 1
+
+    print("=" * 80)
+    print("追踪修订压缩")
+    print("=" * 80)
+
+    try:
+        compact_revisions(args.input, args.output, args.author)
+    except FcInsiderError as e:
+        print(f"\n✗ 错误: {e}")
+        return 1
+
+    print("\n" + "=" * 80)
+    print("✓ 压缩完成！")
+    print("=" * 80)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,44 +5,57 @@
 
 用法:
     python extract_table_markitdown_simple.py input.docx output.md
+
+  # 从 stdin 读取、输出到 stdout（进度信息输出到 stderr）
+  cat input.docx | python extract_table_markitdown_simple.py - - > output.md
 """
 
 import sys
 import argparse
 from pathlib import Path
 
-try:
-    from markitdown import MarkItDown
-except ImportError:
+from fc_insider.extraction import convert_to_markdown, load_markitdown
+from fc_insider.stdio import (display_name, is_stdio, progress_to_stderr,
+                              read_input_bytes, write_output_text)
+
+if load_markitdown() is None:
     print("错误：需要安装 markitdown")
     print("运行: pip install --user markitdown")
     sys.exit(1)
 
 
+def convert_docx_to_markdown(source) -> str:
+    """
+    使用 MarkItDown 将 Word 文档转换为 Markdown，不写文件
+
+    Args:
+        source: Word 文档路径、bytes，或已打开的二进制流（如 BytesIO）
+
+    Returns:
+        转换后的 Markdown 内容
+    """
+    return convert_to_markdown(source)
+
+
 def extract_with_markitdown(docx_path: str, output_md: str) -> str:
     """
     使用 MarkItDown 将 Word 文档转换为 Markdown
 
     Args:
-        docx_path: Word 文档路径
-        output_md: 输出 Markdown 文件路径
+        docx_path: Word 文档路径（"-" 表示 stdin）
+        output_md: 输出 Markdown 文件路径（"-" 表示 stdout）
 
     Returns:
         转换后的 Markdown 内容
     """
-    print(f"使用 MarkItDown 读取: {docx_path}")
-
-    md = MarkItDown()
-    result = md.convert(docx_path)
+    print(f"使用 MarkItDown 读取: {display_name(docx_path)}")
 
-    # 获取 Markdown 内容
-    markdown_content = result.text_content
+    markdown_content = convert_docx_to_markdown(read_input_bytes(docx_path))
 
     # 写入文件
-    with open(output_md, 'w', encoding='utf-8') as f:
-        f.write(markdown_content)
+    write_output_text(output_md, markdown_content)
 
-    print(f"✓ Markdown 已保存: {output_md}")
+    print(f"✓ Markdown 已保存: {display_name(output_md, 'stdout')}")
 
     # 简单统计
     lines = markdown_content.split('\n')
@@ -61,6 +74,9 @@ def main():
   # 转换 Word 为 Markdown
   python extract_table_markitdown_simple.py input.docx output.md
 
+  # 从 stdin 读取、输出到 stdout（进度信息输出到 stderr）
+  cat input.docx | python extract_table_markitdown_simple.py - - > output.md
+
 职责:
   ✓ Word → Markdown 转换（使用 MarkItDown）
   ✗ 不负责解析表格数据（由 generate_translation_mapping.py 负责）
@@ -70,13 +86,14 @@ def main():
         '''
     )
 
-    parser.add_argument('input_docx', help='输入 Word 文档路径')
-    parser.add_argument('output_md', help='输出 Markdown 文件路径')
+    parser.add_argument('input_docx', help='输入 Word 文档路径（"-" 表示 stdin）')
+    parser.add_argument('output_md', help='输出 Markdown 文件路径（"-" 表示 stdout）')
 
     args = parser.parse_args()
+    progress_to_stderr(args.output_md)
 
     # 检查输入文件
-    if not Path(args.input_docx).exists():
+    if not is_stdio(args.input_docx) and not Path(args.input_docx).exists():
         print(f"✗ 错误：文件不存在 - {args.input_docx}")
         return 1
 
@@ -91,9 +108,10 @@ def main():
         print("\n" + "=" * 80)
         print("✓ 转换完成！")
         print("=" * 80)
-        print("\n下一步:")
-        print(f"  1. 查看 Markdown: cat {args.output_md}")
-        print(f"  2. 使用 generate_translation_mapping.py 解析表格")
+        if not is_stdio(args.output_md):
+            print("\n下一步:")
+            print(f"  1. 查看 Markdown: cat {args.output_md}")
+            print(f"  2. 使用 generate_translation_mapping.py 解析表格")
 
         return 0
 
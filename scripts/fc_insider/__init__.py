@@ -0,0 +1,57 @@
+"""
+fc_insider - FC Insider 翻译更新库
+
+可嵌入服务的 Python API，与命令行脚本共享同一套实现：
+
+    import fc_insider
+
+    table = fc_insider.extract(docx_bytes)
+    matched = fc_insider.match(table, new_lines, match_by='smart')
+    result = fc_insider.apply(docx_bytes, matched['mappings'], author='Translator')
+    output_bytes = result['docx']
+
+    # 或一次完成三步
+    result = fc_insider.process(docx_bytes, 'new_translations.txt', output='output.docx')
+
+    # 只校验 old_text 是否与文档一致，不修改文档
+    report = fc_insider.verify(docx_bytes, matched['mappings'])
+
+    # 多轮审阅后，把每个单元格累积的修订压缩为一对删除/插入
+    compacted = fc_insider.compact(docx_bytes, output='compacted.docx')
+
+    # 合并单元格中相邻、格式相同的 run（Word / CAT 工具拆开的）
+    coalesced = fc_insider.coalesce(docx_bytes)
+
+    # 接受或拒绝整个文档的修订（可按作者、日期筛选）
+    resolved = fc_insider.resolve(docx_bytes, 'reject', authors=['Reviewer B'])
+
+约定：
+- 输入可以是 bytes、路径或二进制文件对象
+- 不打印、不调用 sys.exit、没有模块级可变状态，可在多线程中并发调用
+- 返回 dict 结构化结果；错误以 FcInsiderError 子类抛出
+"""
+
+from .coalescing import coalesce
+from .compaction import compact
+from .errors import DependencyError, DocumentError, FcInsiderError, MappingError
+from .extraction import extract
+from .matching import match
+from .revisions import resolve
+from .tracked import apply
+from .verification import verify
+from .workflow import process
+
+__all__ = [
+    'extract',
+    'match',
+    'apply',
+    'verify',
+    'compact',
+    'coalesce',
+    'resolve',
+    'process',
+    'FcInsiderError',
+    'DependencyError',
+    'DocumentError',
+    'MappingError',
+]
@@ -0,0 +1,157 @@
+"""
+阶段缓存：按内容寻址保存各阶段的产物
+
+键由阶段输入的哈希组成，输入不变则直接复用上次的产物（类似 make）：
+- extract: docx 哈希
+- match:   表格哈希 + 新译文哈希 + 匹配选项
+- update:  docx 哈希 + 对照表哈希 + 作者 + 读取模式
+
+目录结构：<cache_dir>/<stage>/<key[:2]>/<key>
+超过容量上限时按最近使用时间（mtime，命中时刷新）淘汰最旧的产物
+
+缓存只用于提速：目录无法创建或读写时（只读的 home、容器用户等）停用缓存，不影响流程本身
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Callable, Iterable, Optional, Union
+
+# 缓存目录的环境变量（优先于 XDG_CACHE_HOME）
+CACHE_DIR_ENV = 'FC_INSIDER_CACHE_DIR'
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+STAGES = ('extract', 'match', 'update')
+
+
+def default_cache_dir() -> str:
+    """默认缓存目录：$FC_INSIDER_CACHE_DIR，否则 $XDG_CACHE_HOME/fc_insider，否则 ~/.cache/fc_insider"""
+    directory = os.environ.get(CACHE_DIR_ENV)
+    if directory:
+        return directory
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'fc_insider')
+
+
+def content_hash(data: Union[bytes, str]) -> str:
+    """内容的 SHA-256"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def stage_key(*parts: str) -> str:
+    """把多个哈希 / 选项组合为一个缓存键"""
+    return content_hash('\0'.join(parts))
+
+
+def mappings_hash(mappings) -> str:
+    """对照表的规范化哈希（与 JSON 缩进、键顺序无关）"""
+    return content_hash(json.dumps(mappings, ensure_ascii=False, sort_keys=True,
+                                   separators=(',', ':')))
+
+
+class StageCache:
+    """
+    本地目录中的内容寻址缓存
+
+    读写失败（OSError，不含未命中）时停用：之后 get() 总是返回 None、put() 不再写入，
+    第一次失败时调用 on_error(异常)，error 记录失败原因
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 on_error: Optional[Callable[[OSError], None]] = None):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.on_error = on_error
+        self.error: Optional[OSError] = None
+
+    def _disable(self, error: OSError) -> None:
+        if self.error is None:
+            self.error = error
+            if self.on_error is not None:
+                self.on_error(error)
+
+    def path(self, stage: str, key: str) -> str:
+        return os.path.join(self.directory, stage, key[:2], key)
+
+    def get(self, stage: str, key: str) -> Optional[bytes]:
+        """读取产物；命中时刷新使用时间"""
+        if self.error is not None:
+            return None
+        path = self.path(stage, key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            self._disable(e)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, stage: str, key: str, data: Union[bytes, str]) -> None:
+        """原子写入产物，然后按容量上限淘汰；失败时停用缓存，不抛出异常"""
+        if self.error is not None:
+            return
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+
+        path = self.path(stage, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                raise
+            self.evict()
+        except OSError as e:
+            self._disable(e)
+
+    def _entries(self) -> Iterable[os.DirEntry]:
+        for stage in STAGES:
+            stage_dir = os.path.join(self.directory, stage)
+            if not os.path.isdir(stage_dir):
+                continue
+            for bucket in os.scandir(stage_dir):
+                if bucket.is_dir():
+                    for entry in os.scandir(bucket.path):
+                        if entry.is_file() and not entry.name.startswith('.tmp-'):
+                            yield entry
+
+    def evict(self) -> int:
+        """
+        淘汰最久未使用的产物，直到总大小不超过上限
+
+        Returns:
+            淘汰的产物数量
+        """
+        entries = []
+        total = 0
+        for entry in self._entries():
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,329 @@
+"""
+run 合并：把单元格中相邻、格式相同的 <w:r> 合并为一个
+
+Word 和 CAT 工具导出的文档常把一个单元格拆成十几个 run：每次编辑会话的 w:rsidR 不同、
+拼写检查插入 <w:proofErr>、逐段标注 <w:lang>，而实际格式完全相同。读取 cell.text /
+paragraph.runs、按差异写入修订和保存时都要逐个处理这些 run。
+
+合并只处理表格单元格中的段落（含修订 <w:ins> / <w:del> 等容器内的 run），每个 run 容器：
+- 去掉拼写、语法检查标记 <w:proofErr>
+- 去掉多余的 <w:lang>：与文档默认语言（styles.xml 的 w:docDefaults）相同，且所在段落、
+  run、表格的样式都没有设置语言；去掉后为空的 <w:rPr> 一并去掉
+- 去掉没有内容的 run（只有 <w:rPr>，或文本为空）
+- 相邻且 <w:rPr> 相同的 run 合并，相邻的 <w:t> / <w:delText> 合为一个；
+  含文本、制表符、换行以外内容（图片、域、脚注引用等）的 run 不合并
+
+合并后的 run 保留第一个 run 的属性（w:rsidR 等编辑会话标记不影响显示）。
+文本、格式和修订不变，接受或拒绝修订得到的文本与合并前相同。
+"""
+
+import zipfile
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.oxml import serialize_part_xml
+from docx.oxml.ns import qn
+from lxml import etree
+
+from .errors import DocumentError
+from .package import SourcePackage, write_patched
+from .sources import Source, write_bytes
+from .streaming import W_BODY, W_TBL, document_part_targets, main_part_names
+from .tracked import (
+    _PROOF_ERR,
+    _XML_SPACE,
+    W_BR,
+    W_CR,
+    W_DEL_TEXT,
+    W_R,
+    W_RPR,
+    W_T,
+    W_TAB,
+)
+
+W_P = qn('w:p')
+W_TC = qn('w:tc')
+W_LANG = qn('w:lang')
+W_VAL = qn('w:val')
+W_STYLE_ID = qn('w:styleId')
+
+# 可以合并的 run 内容：文本、制表符、换行及连字符
+_MERGEABLE = frozenset((W_T, W_DEL_TEXT, W_TAB, W_BR, W_CR,
+                        qn('w:noBreakHyphen'), qn('w:softHyphen')))
+
+# 相邻时合为一个的文本元素
+_TEXT_TAGS = (W_T, W_DEL_TEXT)
+
+# 段落、run、表格的样式引用：(属性元素, 样式元素)，逐级 find（带路径的 find 慢得多）
+_P_STYLE = (qn('w:pPr'), qn('w:pStyle'))
+_R_STYLE = (W_RPR, qn('w:rStyle'))
+_TBL_STYLE = (qn('w:tblPr'), qn('w:tblStyle'))
+
+# 单独解析 document.xml / styles.xml（不使用 python-docx 的元素类）
+_PARSER = etree.XMLParser(resolve_entities=False, huge_tree=True)
+
+
+def language_defaults(styles) -> Tuple[Optional[Tuple], Dict[str, frozenset]]:
+    """
+    styles.xml 中的语言设置
+
+    Returns:
+        (文档默认语言 <w:lang> 的属性或 None,
+         {样式类型: 自身或 basedOn 链上设置了语言的样式 ID}，'default:<类型>' 为该类型的默认样式 ID)
+    """
+    if styles is None:
+        return None, {}
+
+    default = styles.find(f"{qn('w:docDefaults')}/{qn('w:rPrDefault')}/{W_RPR}/{W_LANG}")
+    default_key = _lang_key(default) if default is not None else None
+
+    based_on = {}
+    own_lang = set()
+    by_type: Dict[str, set] = {}
+    defaults = {}
+    for style in styles.iter(qn('w:style')):
+        style_id = style.get(W_STYLE_ID)
+        style_type = style.get(qn('w:type'), 'paragraph')
+        by_type.setdefault(style_type, set()).add(style_id)
+        if style.get(qn('w:default')) in ('1', 'true', 'on'):
+            defaults[f'default:{style_type}'] = frozenset((style_id,))
+        parent = style.find(qn('w:basedOn'))
+        if parent is not None:
+            based_on[style_id] = parent.get(W_VAL)
+        if style.find(f'{W_RPR}/{W_LANG}') is not None:
+            own_lang.add(style_id)
+
+    def sets_lang(style_id: str) -> bool:
+        seen = set()
+        while style_id is not None and style_id not in seen:
+            if style_id in own_lang:
+                return True
+            seen.add(style_id)
+            style_id = based_on.get(style_id)
+        return False
+
+    lang_styles = {style_type: frozenset(s for s in ids if sets_lang(s))
+                   for style_type, ids in by_type.items()}
+    lang_styles.update(defaults)
+    return default_key, lang_styles
+
+
+def _lang_key(lang) -> Tuple:
+    return tuple(sorted(lang.attrib.items()))
+
+
+def _styled_language(element, path: Tuple[str, str], style_type: str,
+                     lang_styles: Dict[str, frozenset]) -> bool:
+    """元素引用的样式（未引用时为该类型的默认样式）是否设置了语言"""
+    properties = element.find(path[0])
+    reference = properties.find(path[1]) if properties is not None else None
+    if reference is not None:
+        style_id = reference.get(W_VAL)
+    else:
+        style_id = next(iter(lang_styles.get(f'default:{style_type}', ())), None)
+    return style_id in lang_styles.get(style_type, frozenset())
+
+
+def _run_content(run) -> Optional[bool]:
+    """
+    run 的内容：None 为没有内容（只有 <w:rPr>，或只有空的文本元素），
+    True 为只有可合并的内容，False 为含其他内容
+    """
+    empty = True
+    for child in run:
+        tag = child.tag
+        if tag == W_RPR:
+            continue
+        if tag not in _MERGEABLE:
+            return False
+        if empty and (tag not in _TEXT_TAGS or child.text):
+            empty = False
+    return None if empty else True
+
+
+def _same_properties(rpr, other) -> bool:
+    """两个 <w:rPr>（可为 None）是否相同：子元素、属性、文本逐一相同"""
+    if rpr is None or other is None:
+        return rpr is other
+    return (rpr.tag == other.tag and rpr.items() == other.items() and rpr.text == other.text
+            and len(rpr) == len(other)
+            and all(_same_properties(a, b) for a, b in zip(rpr, other)))
+
+
+def _merge_into(run, following) -> None:
+    """把 following 的内容移到 run 末尾（相邻的文本元素合为一个），去掉 following"""
+    for child in list(following):
+        if child.tag == W_RPR:
+            continue
+        last = run[-1] if len(run) else None
+        if last is not None and child.tag in _TEXT_TAGS and last.tag == child.tag:
+            text = (last.text or '') + (child.text or '')
+            last.text = text
+            if text != text.strip():
+                last.set(_XML_SPACE, 'preserve')
+        else:
+            run.append(child)
+    following.getparent().remove(following)
+
+
+def coalesce_container(container, strip_lang) -> Dict:
+    """
+    合并一个 run 容器（w:p、w:ins、w:del、w:hyperlink 等）的直接子 run
+
+    Args:
+        strip_lang: run -> 该 run 的 <w:lang> 是否多余
+
+    Returns:
+        {'merged', 'empty', 'proofing', 'languages'} 各项去掉的数量
+    """
+    counts = {'merged': 0, 'empty': 0, 'proofing': 0, 'languages': 0}
+
+    previous = None
+    previous_rpr = None
+    for child in list(container):
+        if child.tag == _PROOF_ERR:
+            # 去掉后前后的 run 相邻
+            container.remove(child)
+            counts['proofing'] += 1
+            continue
+        if child.tag != W_R:
+            previous = None
+            continue
+
+        rpr = child[0] if len(child) and child[0].tag == W_RPR else None
+        if rpr is not None:
+            lang = rpr.find(W_LANG)
+            if lang is not None and strip_lang(child, lang):
+                rpr.remove(lang)
+                counts['languages'] += 1
+            if not len(rpr) and not rpr.attrib:
+                child.remove(rpr)
+                rpr = None
+
+        content = _run_content(child)
+        if content is None:
+            container.remove(child)
+            counts['empty'] += 1
+            continue
+        if not content:
+            previous = None
+            continue
+
+        if previous is not None and _same_properties(rpr, previous_rpr):
+            _merge_into(previous, child)
+            counts['merged'] += 1
+        else:
+            previous, previous_rpr = child, rpr
+
+    return counts
+
+
+def coalesce_runs(document, styles=None) -> Dict:
+    """
+    合并已解析的 document.xml（w:document 元素，原地修改）中所有单元格的 run
+
+    Args:
+        styles: styles.xml 的根元素（w:styles），用于判断 <w:lang> 是否多余；None 时不去掉 <w:lang>
+
+    Returns:
+        {
+            'runs': (合并前, 合并后) 单元格中 <w:r> 的数量,
+            'merged': 合并掉的 run 数,
+            'empty': 去掉的空 run 数,
+            'proofing': 去掉的 <w:proofErr> 数,
+            'languages': 去掉的 <w:lang> 数,
+            'changed': 文档是否有改动
+        }
+    """
+    result = {'runs': (0, 0), 'merged': 0, 'empty': 0, 'proofing': 0, 'languages': 0,
+              'changed': False}
+    body = document.find(W_BODY)
+    if body is None:
+        return result
+
+    default_lang, lang_styles = language_defaults(styles)
+
+    styled = {}  # run 容器 -> 所在段落或表格的样式是否设置了语言
+
+    def container_styled(container) -> bool:
+        if container not in styled:
+            paragraph = container if container.tag == W_P else next(container.iterancestors(W_P), None)
+            table = next(container.iterancestors(W_TBL), None)
+            styled[container] = (
+                (paragraph is not None and _styled_language(paragraph, _P_STYLE, 'paragraph', lang_styles))
+                or (table is not None and _styled_language(table, _TBL_STYLE, 'table', lang_styles)))
+        return styled[container]
+
+    def strip_lang(run, lang) -> bool:
+        if default_lang is None or _lang_key(lang) != default_lang:
+            return False
+        return not (_styled_language(run, _R_STYLE, 'character', lang_styles)
+                    or container_styled(run.getparent()))
+
+    # run 的父元素即 run 容器；只处理单元格中的容器，按文档顺序各处理一次
+    containers = {}
+    before = 0
+    for run in body.iter(W_R):
+        container = run.getparent()
+        if container not in containers:
+            containers[container] = next(container.iterancestors(W_TC), None) is not None
+        if containers[container]:
+            before += 1
+
+    for container, in_cell in containers.items():
+        if not in_cell:
+            continue
+        for key, value in coalesce_container(container, strip_lang).items():
+            result[key] += value
+
+    removed = result['merged'] + result['empty']
+    result['runs'] = (before, before - removed)
+    result['changed'] = bool(removed or result['proofing'] or result['languages'])
+    return result
+
+
+def coalesce(source: Source, output=None) -> Dict:
+    """
+    合并 Word 文档中所有单元格的 run
+
+    只解析 word/document.xml 和 styles.xml（不经过 python-docx 的元素类，同样的合并快约 3 倍），
+    只重写 document.xml，其余成员原样复制；没有可合并的内容时输出与输入相同
+
+    Args:
+        source: 输入 Word 文档（bytes / 路径 / 二进制文件对象）
+        output: 可选的输出路径或二进制文件对象
+
+    Returns:
+        coalesce_runs() 的结果，另含 'xml_bytes'（合并前、后 document.xml 的字节数）
+        和 'docx'（输出文档 bytes）
+    """
+    with SourcePackage(source) as package:
+        try:
+            archive = zipfile.ZipFile(package.stream)
+        except zipfile.BadZipFile as e:
+            raise DocumentError(f"无法打开 Word 文档: {e}") from e
+        with archive:
+            document_name, _ = main_part_names(archive)
+            styles_name = document_part_targets(archive, document_name).get(RT.STYLES)
+            xml = archive.read(document_name)
+            styles_xml = archive.read(styles_name) if styles_name in archive.NameToInfo else None
+        try:
+            document = etree.fromstring(xml, _PARSER)
+            styles = etree.fromstring(styles_xml, _PARSER) if styles_xml else None
+        except etree.XMLSyntaxError as e:
+            raise DocumentError(f"document.xml 解析失败: {e}") from e
+
+        result = coalesce_runs(document, styles)
+        replacements = {}
+        if result['changed']:
+            replacements[document_name] = serialize_part_xml(document)
+        result['xml_bytes'] = (len(xml), len(replacements.get(document_name, xml)))
+
+        buffer = BytesIO()
+        write_patched(package, replacements, buffer)
+        result['docx'] = buffer.getvalue()
+
+    if output is not None:
+        write_bytes(result['docx'], output)
+    return result
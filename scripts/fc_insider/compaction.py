@@ -0,0 +1,429 @@
+"""
+修订压缩：把单元格中多轮累积的修订合并为一对 <w:del>(原文) / <w:ins>(当前文本)
+
+多轮审阅后，同一单元格中叠加着不同作者、日期的修订：<w:ins> 中嵌套 <w:del>（删除了别人插入的文本）、
+移动（<w:moveFrom> / <w:moveTo>）、格式修订（<w:rPrChange> / <w:pPrChange>）、段落标记的插入和删除。
+clear_cell_tracked_changes() 只处理段落直接子元素中的 <w:del> / <w:ins>，其余标记一直保留，
+document.xml 越来越大。
+
+压缩只解析 word/document.xml，一次遍历找出所有含修订的单元格，逐个处理：
+- 读取原文（拒绝全部修订）与当前文本（接受全部修订），段落之间为换行
+- 接受单元格中的全部修订（嵌套的修订由外向内处理，被删除的插入不会留下）
+- 原文与当前文本相同：到此为止，单元格不再有内容修订，run 及格式保留；
+  格式修订（<w:rPrChange> / <w:pPrChange>）不接受、原样保留，仍可拒绝
+- 不同：清空单元格，写入一对 <w:del>(原文) / <w:ins>(当前文本)（与 cell 粒度的更新相同，
+  多个段落合并为一个，段落之间为软换行）；作者、日期沿用单元格中最近一次修订的。
+  原文、当前文本中各 run 的格式分别写在 <w:del> / <w:ins> 的 run 上（格式修订拒绝、接受后的格式）；
+  任一方的 run 格式不一致（无法用一个 run 表示）时不改动单元格，计入 'skipped'；
+  保留下来的段落的 <w:pPrChange> 不接受，拒绝时仍恢复原段落格式
+
+只有格式修订的单元格（文本没有修订）不需要压缩，不改动。
+
+新修订的 ID 从文档中已有的最大 w:id 之后分配。
+单元格以外的修订、表格行与单元格本身的插入删除（<w:cellIns> 等）不处理。
+"""
+
+import zipfile
+from copy import deepcopy
+from datetime import datetime
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+from docx.opc.oxml import serialize_part_xml
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from lxml import etree
+
+from .errors import DocumentError
+from .package import SourcePackage, write_patched
+from .sources import Source, write_bytes
+from .streaming import W_BODY, W_TBL, main_part_names
+from .tracked import (
+    _KEPT_MARKERS,
+    W_BR,
+    W_CR,
+    W_DEL,
+    W_DEL_TEXT,
+    W_INS,
+    W_PPR,
+    W_R,
+    W_RPR,
+    W_T,
+    W_TAB,
+    RevisionFactory,
+    first_revision_id,
+    revision_date,
+)
+
+W_P = qn('w:p')
+W_TC = qn('w:tc')
+W_MOVE_FROM = qn('w:moveFrom')
+W_MOVE_TO = qn('w:moveTo')
+
+# 删除（拒绝时保留）与插入（接受时保留）的内容
+_REMOVED = (W_DEL, W_MOVE_FROM)
+_ADDED = (W_INS, W_MOVE_TO)
+
+# 格式修订
+_RPR_CHANGE = qn('w:rPrChange')
+_PPR_CHANGE = qn('w:pPrChange')
+_FORMAT_CHANGES = (_RPR_CHANGE, _PPR_CHANGE)
+
+# 构成单元格文本的元素（见 net_content()）
+_TEXT_TAGS = (W_T, W_DEL_TEXT, W_BR, W_CR, W_TAB)
+
+# 接受修订时直接去掉的记录：格式修订、移动范围标记
+_CHANGE_RECORDS = _FORMAT_CHANGES + tuple(qn(tag) for tag in (
+    'w:moveFromRangeStart', 'w:moveFromRangeEnd', 'w:moveToRangeStart', 'w:moveToRangeEnd'))
+
+# 计入修订数量的元素
+_REVISION_TAGS = _REMOVED + _ADDED + _FORMAT_CHANGES
+
+# 段落标记的修订：<w:pPr><w:rPr><w:ins/> 或 <w:del/></w:rPr></w:pPr>
+_MARK_RPR = f'{W_PPR}/{qn("w:rPr")}'
+
+_W_AUTHOR = qn('w:author')
+_W_DATE = qn('w:date')
+
+
+def _mark_revision(paragraph) -> Optional[str]:
+    """段落标记的修订：'inserted' | 'deleted' | None"""
+    rpr = paragraph.find(_MARK_RPR)
+    if rpr is None:
+        return None
+    if rpr.find(W_INS) is not None or rpr.find(W_MOVE_TO) is not None:
+        return 'inserted'
+    if rpr.find(W_DEL) is not None or rpr.find(W_MOVE_FROM) is not None:
+        return 'deleted'
+    return None
+
+
+def _format_key(rpr) -> Optional[bytes]:
+    """run 格式的比较键：<w:rPr> 中除 <w:rPrChange> 以外的子元素；没有格式时为 None"""
+    if rpr is None:
+        return None
+    return b''.join(etree.tostring(child) for child in rpr if child.tag != _RPR_CHANGE) or None
+
+
+def _plain_format(rpr):
+    """去掉 <w:rPrChange> 后的 <w:rPr> 副本；没有格式时为 None"""
+    if rpr is None:
+        return None
+    rpr = deepcopy(rpr)
+    for change in rpr.findall(_RPR_CHANGE):
+        rpr.remove(change)
+    return rpr if len(rpr) else None
+
+
+def net_content(tc) -> Tuple[str, str, Optional[Tuple]]:
+    """
+    单元格的（原文, 当前文本, 格式）：分别为拒绝、接受全部修订后的文本，单次遍历
+
+    修订可以嵌套，文本在任一层 <w:ins> 中则不属于原文，在任一层 <w:del> 中则不属于当前文本。
+    段落之间为换行（段落标记被插入时原文中没有这个换行，被删除时当前文本中没有）。
+
+    格式为（原文格式, 当前格式）：两方含文本的 run 的 <w:rPr> 副本（不含 <w:rPrChange>，
+    没有格式时为 None），拒绝时取 <w:rPrChange> 中记录的原格式；任一方的 run 格式不一致时为 None。
+    """
+    original: List[str] = []
+    current: List[str] = []
+    formats = ({}, {})  # 原文 / 当前文本：比较键 -> rPr
+    previous = None
+    paragraphs = tc.findall(W_P)
+    for number, paragraph in enumerate(paragraphs):
+        for element in paragraph.iter(*_TEXT_TAGS):
+            if element.tag in (W_T, W_DEL_TEXT):
+                text = element.text or ''
+            elif element.tag == W_TAB:
+                text = '\t'
+            elif element.tag == W_CR or element.get(qn('w:type'), 'textWrapping') == 'textWrapping':
+                text = '\n'
+            else:
+                continue
+
+            # 同一 run 中的文本元素只检查一次所在的修订和格式
+            run = element.getparent()
+            if run is not previous:
+                previous = run
+                inserted = deleted = False
+                ancestor = run
+                while ancestor is not paragraph:
+                    inserted = inserted or ancestor.tag in _ADDED
+                    deleted = deleted or ancestor.tag in _REMOVED
+                    ancestor = ancestor.getparent()
+
+                rpr = run.find(W_RPR)
+                change = rpr.find(_RPR_CHANGE) if rpr is not None else None
+                rejected = change.find(W_RPR) if change is not None else rpr
+                if not inserted:
+                    formats[0].setdefault(_format_key(rejected), rejected)
+                if not deleted:
+                    formats[1].setdefault(_format_key(rpr), rpr)
+
+            if not inserted:
+                original.append(text)
+            if not deleted:
+                current.append(text)
+
+        if number < len(paragraphs) - 1:
+            mark = _mark_revision(paragraph)
+            if mark != 'inserted':
+                original.append('\n')
+            if mark != 'deleted':
+                current.append('\n')
+
+    if any(len(side) > 1 for side in formats):
+        net_format = None
+    else:
+        net_format = tuple(_plain_format(next(iter(side.values()), None)) for side in formats)
+    return ''.join(original).strip(), ''.join(current).strip(), net_format
+
+
+def net_texts(tc) -> Tuple[str, str]:
+    """单元格的（原文, 当前文本），见 net_content()"""
+    original, current, _ = net_content(tc)
+    return original, current
+
+
+def _apply_format(revision, rpr):
+    """给修订中的 run 加上格式（rpr 的副本）"""
+    if rpr is not None:
+        for run in revision.iter(W_R):
+            run.insert(0, deepcopy(rpr))
+    return revision
+
+
+def _unwrap(element) -> None:
+    """把元素的子元素移到它原来的位置，去掉元素本身"""
+    parent = element.getparent()
+    position = parent.index(element)
+    for child in list(element):
+        parent.insert(position, child)
+        position += 1
+    parent.remove(element)
+
+
+def accept_all(tc, kept: Tuple[str, ...] = ()) -> None:
+    """
+    接受单元格中的全部修订（含嵌套的修订、格式修订和段落标记的修订）
+
+    Args:
+        kept: 不接受、原样保留的格式修订（_FORMAT_CHANGES 中的标签）
+    """
+    # 段落标记：插入的标记直接去掉；删除的标记去掉后，段落内容并入下一段落
+    merged = []
+    for paragraph in tc.findall(W_P):
+        rpr = paragraph.find(_MARK_RPR)
+        if rpr is None:
+            continue
+        if _mark_revision(paragraph) == 'deleted':
+            merged.append(paragraph)
+        for mark in [child for child in rpr if child.tag in _REMOVED + _ADDED]:
+            rpr.remove(mark)
+        if not len(rpr):
+            rpr.getparent().remove(rpr)
+
+    for element in list(tc.iter(*_REMOVED)):
+        parent = element.getparent()
+        if parent is not None:
+            parent.remove(element)
+    for element in list(tc.iter(*_ADDED)):
+        _unwrap(element)
+    for element in list(tc.iter(*_CHANGE_RECORDS)):
+        if element.tag not in kept:
+            element.getparent().remove(element)
+
+    for paragraph in reversed(merged):
+        following = paragraph.getnext()
+        if following is None or following.tag != W_P:
+            continue
+        position = 1 if len(following) and following[0].tag == W_PPR else 0
+        for child in [child for child in paragraph if child.tag != W_PPR]:
+            following.insert(position, child)
+            position += 1
+        paragraph.getparent().remove(paragraph)
+
+
+def _count_revisions(tc) -> int:
+    """单元格中的修订元素数"""
+    return sum(1 for _ in tc.iter(*_REVISION_TAGS))
+
+
+def latest_revision(tc, author: str, date_str: str) -> Tuple[str, str]:
+    """单元格中最近一次修订的（作者, 日期）；修订没有这些属性时使用给定的值"""
+    latest = None
+    for element in tc.iter(*_REVISION_TAGS):
+        key = (element.get(_W_DATE) or '', element.get(_W_AUTHOR) or '')
+        if latest is None or key >= latest:
+            latest = key
+    if latest is None:
+        return author, date_str
+    return latest[1] or author, latest[0] or date_str
+
+
+def _single_paragraph(tc):
+    """清空单元格内容，只保留第一个段落（段落属性和书签保留）"""
+    paragraphs = tc.findall(W_P)
+    first = paragraphs[0]
+    for paragraph in paragraphs:
+        kept = [child for child in paragraph if child.tag in _KEPT_MARKERS]
+        for child in list(paragraph):
+            if child.tag != W_PPR:
+                paragraph.remove(child)
+        if paragraph is not first:
+            tc.remove(paragraph)
+        first.extend(kept)
+    return first
+
+
+def compact_cell(tc, revision_id: int, factories: Dict[Tuple[str, str], RevisionFactory],
+                 author: str, date_str: str) -> Dict:
+    """
+    压缩一个单元格的修订
+
+    Args:
+        factories: (作者, 日期) -> RevisionFactory，同一批压缩共用
+        author / date_str: 单元格中的修订没有作者、日期属性时使用的值
+
+    Returns:
+        {'removed': 去掉的修订元素数, 'revisions': 写入的修订数（占用的修订 ID 数）,
+         'skipped': 是否因 run 格式不一致而未改动}
+    """
+    original, current, formats = net_content(tc)
+    if original != current and formats is None:
+        return {'removed': 0, 'revisions': 0, 'skipped': True}
+
+    removed = _count_revisions(tc)
+    author, date_str = latest_revision(tc, author, date_str)
+
+    if original == current:
+        # 只接受内容修订，格式修订留待审阅
+        accept_all(tc, kept=_FORMAT_CHANGES)
+        return {'removed': removed - _count_revisions(tc), 'revisions': 0, 'skipped': False}
+
+    key = (author, date_str)
+    factory = factories.get(key)
+    if factory is None:
+        factory = factories[key] = RevisionFactory(author, date_str)
+
+    # run 格式写在净修订中；段落格式修订保留在留下的段落上
+    accept_all(tc, kept=(_PPR_CHANGE,))
+    original_format, current_format = formats
+    paragraph = _single_paragraph(tc)
+    removed -= _count_revisions(tc)
+    revisions = 0
+    if original:
+        paragraph.append(_apply_format(factory.linebreak_deletion(revision_id, original),
+                                       original_format))
+        revisions += 1
+    if current:
+        paragraph.append(_apply_format(
+            factory.linebreak_insertion(revision_id + revisions, current), current_format))
+        revisions += 1
+    return {'removed': removed, 'revisions': revisions, 'skipped': False}
+
+
+def is_compact(tc) -> bool:
+    """
+    单元格的内容修订是否已是至多一个 <w:del> 加一个 <w:ins>，且都是段落的直接子元素（没有嵌套）
+
+    格式修订不影响判断：只有格式修订的单元格也视为已压缩
+    """
+    revisions = list(tc.iter(*(_REMOVED + _ADDED)))
+    tags = [element.tag for element in revisions]
+    return (tags.count(W_DEL) <= 1 and tags.count(W_INS) <= 1
+            and len(tags) == tags.count(W_DEL) + tags.count(W_INS)
+            and all(element.getparent().tag == W_P for element in revisions))
+
+
+def revision_cells(document) -> List:
+    """文档正文中含修订、尚未压缩的单元格（单次遍历；含嵌套表格的单元格只处理内层）"""
+    body = document.find(W_BODY)
+    if body is None:
+        return []
+    cells = {}  # w:tc -> 是否需要压缩，按文档顺序
+    for element in body.iter(*_REVISION_TAGS):
+        tc = next(element.iterancestors(W_TC), None)
+        if tc is None or tc in cells:
+            continue
+        cells[tc] = tc.find('.//' + W_TBL) is None and not is_compact(tc)
+    return [tc for tc, pending in cells.items() if pending]
+
+
+def compact_document(document, author: str = "Translator", date: Optional[datetime] = None) -> Dict:
+    """
+    压缩已解析的 document.xml（w:document 元素，原地修改）中所有单元格的修订
+
+    Args:
+        author / date: 修订没有作者、日期属性时使用的值（日期默认当前时间）
+
+    Returns:
+        {
+            'cells': 处理的单元格数,
+            'net': 写入了一对新修订的单元格数,
+            'accepted': 原文与当前文本相同、不再有修订的单元格数,
+            'skipped': run 格式不一致、未改动的单元格数（不计入 'cells'）,
+            'removed': 去掉的修订元素数,
+            'revisions': 写入的修订数
+        }
+    """
+    date_str = revision_date(date)
+    revision_id = first_revision_id(document)
+    factories: Dict[Tuple[str, str], RevisionFactory] = {}
+    result = {'cells': 0, 'net': 0, 'accepted': 0, 'skipped': 0, 'removed': 0, 'revisions': 0}
+
+    for tc in revision_cells(document):
+        outcome = compact_cell(tc, revision_id, factories, author, date_str)
+        if outcome['skipped']:
+            result['skipped'] += 1
+            continue
+        revision_id += outcome['revisions']
+        result['cells'] += 1
+        result['net' if outcome['revisions'] else 'accepted'] += 1
+        result['removed'] += outcome['removed']
+        result['revisions'] += outcome['revisions']
+    return result
+
+
+def compact(source: Source, output=None, author: str = "Translator",
+            date: Optional[datetime] = None) -> Dict:
+    """
+    压缩 Word 文档中各单元格累积的修订
+
+    只解析、重写 word/document.xml，其余成员原样复制；没有需要压缩的单元格时输出与输入相同
+
+    Args:
+        source: 输入 Word 文档（bytes / 路径 / 二进制文件对象）
+        output: 可选的输出路径或二进制文件对象
+        author / date: 修订没有作者、日期属性时使用的值
+
+    Returns:
+        compact_document() 的结果，另含 'xml_bytes'（压缩前、后 document.xml 的字节数）
+        和 'docx'（输出文档 bytes）
+    """
+    with SourcePackage(source) as package:
+        try:
+            archive = zipfile.ZipFile(package.stream)
+        except zipfile.BadZipFile as e:
+            raise DocumentError(f"无法打开 Word 文档: {e}") from e
+        with archive:
+            document_name, _ = main_part_names(archive)
+            xml = archive.read(document_name)
+        try:
+            document = parse_xml(xml)
+        except etree.XMLSyntaxError as e:
+            raise DocumentError(f"document.xml 解析失败: {e}") from e
+
+        result = compact_document(document, author, date)
+        replacements = {}
+        if result['cells']:
+            replacements[document_name] = serialize_part_xml(document)
+        result['xml_bytes'] = (len(xml), len(replacements.get(document_name, xml)))
+
+        buffer = BytesIO()
+        write_patched(package, replacements, buffer)
+        result['docx'] = buffer.getvalue()
+
+    if output is not None:
+        write_bytes(result['docx'], output)
+    return result
@@ -0,0 +1,89 @@
+"""
+增量应用：与上一轮的映射比较，只保留新增或改动的映射
+
+审阅循环中 translations.json 每轮都会增加，大部分映射已经写入上一轮的输出文档。
+以上一轮的输出为输入、上一轮的映射为基准（base），按 segment_id 与文本哈希
+（old_text、new_text）比较：
+- added - 基准中没有该 segment_id
+- changed - segment_id 相同，文本不同（修订按 old_text 重新写入）
+- unchanged - 与基准完全相同，不再应用
+- removed - 只在基准中出现（已写入的修订不会撤销，只报告）
+
+本轮只应用 added 与 changed，逐条定位、比较、写入的开销只与改动的数量有关。
+"""
+
+from typing import Dict, List, Optional
+
+from .cache import content_hash
+from .tracked import load_translations, mapping_texts
+
+
+def mapping_digest(translation: Dict) -> str:
+    """映射文本的哈希（old_text 与 new_text 按 mapping_texts() 去掉首尾空白）"""
+    _, old_text, new_text = mapping_texts(translation)
+    return content_hash(f'{old_text}\0{new_text}')
+
+
+def delta_mappings(translations, base) -> Dict:
+    """
+    本轮映射相对基准的增量
+
+    Args:
+        translations / base: 映射列表、{'translations': [...]}，或映射 JSON 文件
+
+    Returns:
+        {
+            'mappings': 需要应用的映射（added 与 changed，保持本轮的顺序）,
+            'total': 本轮映射数量,
+            'base_total': 基准映射数量,
+            'added' / 'changed' / 'removed': segment_id 列表,
+            'unchanged': 跳过的映射数量
+        }
+    """
+    translations = load_translations(translations)
+    base = load_translations(base)
+
+    base_keys = set()
+    base_ids = set()
+    for translation in base:
+        segment_id = translation.get('segment_id')
+        base_ids.add(segment_id)
+        base_keys.add((segment_id, mapping_digest(translation)))
+
+    mappings = []
+    added: List[Optional[str]] = []
+    changed: List[Optional[str]] = []
+    current_ids = set()
+    for translation in translations:
+        segment_id = translation.get('segment_id')
+        current_ids.add(segment_id)
+        if (segment_id, mapping_digest(translation)) in base_keys:
+            continue
+        (changed if segment_id in base_ids else added).append(segment_id)
+        mappings.append(translation)
+
+    return {
+        'mappings': mappings,
+        'total': len(translations),
+        'base_total': len(base),
+        'added': added,
+        'changed': changed,
+        'removed': [segment_id for segment_id in dict.fromkeys(
+            translation.get('segment_id') for translation in base)
+            if segment_id not in current_ids],
+        'unchanged': len(translations) - len(mappings)
+    }
+
+
+def delta_report(delta: Dict, **context) -> Dict:
+    """
+    结构化的增量摘要（不含映射本身）
+
+    Args:
+        context: 附加到摘要开头的信息（如 input、base_mapping），以及更新结果
+    """
+    report = dict(context)
+    for key in ('total', 'base_total', 'unchanged', 'added', 'changed', 'removed'):
+        report[key] = delta[key]
+    report['applied'] = len(delta['mappings'])
+    return report
@@ -0,0 +1,169 @@
+"""
+最小差异：计算单元格旧译文与新译文之间改动的片段
+
+整格替换（cell）把旧文本整体删除、新文本整体插入；word / char 粒度只在改动的片段
+前后写入 <w:del> / <w:ins>，未改动的文本保留为原来的 run。
+
+分词（word 粒度）兼顾中日韩文本：
+- 汉字、假名、谚文每个字符单独成词（中文没有空格分词）
+- 连续的其他字母、数字为一个词
+- 连续的空白为一个词，其余字符（标点）各自成词
+
+含换行的空白与一个空格视为相同（MarkItDown 提取的新译文中换行是空格），旧文本中的换行保留。
+两处改动之间只隔着空白或很短的未改动片段时合并为一处，避免审阅时出现零碎的修订；
+改动超过旧文本一半时整体替换（一对 <w:del> / <w:ins>）。
+"""
+
+import re
+from difflib import SequenceMatcher
+from typing import List, Tuple
+
+from .errors import FcInsiderError
+
+# 差异粒度
+GRANULARITIES = ('cell', 'word', 'char')
+
+# 单字成词的字符：CJK 部首与符号、假名、注音、汉字（含扩展 A 与兼容汉字）、谚文、半角片假名、扩展 B 及以后
+_CJK = ('\u2e80-\u2fdf\u3040-\u30ff\u3100-\u312f\u3190-\u31ff\u3400-\u4dbf'
+        '\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff66-\uff9f\U00020000-\U0003134f')
+
+# 换行连同两侧的空格、制表符（同 tracked._LINEBREAK）
+_LINEBREAK = re.compile(r'[ \t]*\n[ \t]*')
+
+_WORD_TOKEN = re.compile(rf'[{_CJK}]|(?:(?![{_CJK}])[^\W_])+|\s+|.', re.DOTALL)
+
+# (tag, 旧文本起, 旧文本止, 新文本起, 新文本止)，tag 为 'equal' | 'delete' | 'insert' | 'replace'
+Opcode = Tuple[str, int, int, int, int]
+
+
+def tokenize(text: str, granularity: str = 'word') -> List[str]:
+    """按粒度切分文本，各词拼接后等于原文"""
+    if granularity == 'char':
+        return list(text)
+    if granularity == 'word':
+        return _WORD_TOKEN.findall(text)
+    check_granularity(granularity)
+    return [text] if text else []
+
+
+def check_granularity(granularity: str) -> None:
+    """不支持的粒度抛出 FcInsiderError"""
+    if granularity not in GRANULARITIES:
+        raise FcInsiderError(f"不支持的差异粒度: {granularity}（可选: {', '.join(GRANULARITIES)}）")
+
+
+def _comparison_key(token: str) -> str:
+    """含换行的空白与一个空格视为相同（同 tracked.texts_match()），未改动的片段保留旧文本中的换行"""
+    if '\n' in token and not token.strip():
+        return _LINEBREAK.sub(' ', token)
+    return token
+
+
+def _offsets(tokens: List[str]) -> List[int]:
+    """每个词在原文中的起始位置，末尾附加原文长度"""
+    offsets = [0]
+    for token in tokens:
+        offsets.append(offsets[-1] + len(token))
+    return offsets
+
+
+def diff_opcodes(old: str, new: str, granularity: str = 'word') -> List[Opcode]:
+    """
+    旧文本到新文本的编辑操作（以字符位置表示，与 difflib.SequenceMatcher.get_opcodes() 相同的形式）
+
+    相邻的改动合并为一个 replace；两处改动之间的片段只有空白，或不长于两侧的改动时，
+    连同该片段合并为一处；未改动的文本不到旧文本一半时整体替换
+    """
+    if granularity == 'cell':
+        if old == new:
+            return [('equal', 0, len(old), 0, len(new))] if old else []
+        return [_change(0, len(old), 0, len(new))]
+
+    old_tokens = tokenize(old, granularity)
+    new_tokens = tokenize(new, granularity)
+    old_at = _offsets(old_tokens)
+    new_at = _offsets(new_tokens)
+    old_keys = [_comparison_key(token) for token in old_tokens]
+    new_keys = [_comparison_key(token) for token in new_tokens]
+
+    # 相同的开头和结尾不参与 SequenceMatcher（长段落中只改动一处时比较量只剩改动附近）
+    prefix = 0
+    limit = min(len(old_keys), len(new_keys))
+    while prefix < limit and old_keys[prefix] == new_keys[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old_keys[-1 - suffix] == new_keys[-1 - suffix]:
+        suffix += 1
+
+    matcher = SequenceMatcher(None, old_keys[prefix:len(old_keys) - suffix],
+                              new_keys[prefix:len(new_keys) - suffix], autojunk=False)
+    opcodes = [('equal', 0, prefix, 0, prefix)] if prefix else []
+    opcodes += [(tag, i1 + prefix, i2 + prefix, j1 + prefix, j2 + prefix)
+                for tag, i1, i2, j1, j2 in matcher.get_opcodes()]
+    if suffix:
+        opcodes.append(('equal', len(old_keys) - suffix, len(old_keys),
+                        len(new_keys) - suffix, len(new_keys)))
+    opcodes = [(tag, old_at[i1], old_at[i2], new_at[j1], new_at[j2])
+               for tag, i1, i2, j1, j2 in _merge_equal(opcodes)]
+
+    # 夹在两处改动之间、不长于两侧改动的未改动片段（以及只有空白的片段）并入改动，
+    # 反复进行直到没有可合并的片段：零碎的单字匹配不单独保留
+    while True:
+        merged = _merge_changes(opcodes)
+        absorbed = False
+        for position in range(1, len(merged) - 1):
+            tag, i1, i2, j1, j2 = merged[position]
+            if tag != 'equal':
+                continue
+            if not old[i1:i2].strip() or \
+                    i2 - i1 <= min(_size(merged[position - 1]), _size(merged[position + 1])):
+                merged[position] = ('replace', i1, i2, j1, j2)
+                absorbed = True
+        if not absorbed:
+            break
+        opcodes = merged
+
+    # 保留下来的文本不到旧文本的一半时，逐段标记不比整体替换更易读
+    unchanged = sum(i2 - i1 for tag, i1, i2, _, _ in merged if tag == 'equal')
+    if unchanged * 2 < len(old):
+        return [_change(0, len(old), 0, len(new))]
+    return merged
+
+
+def _merge_equal(opcodes: List[Opcode]) -> List[Opcode]:
+    """去掉空片段，相邻的未改动片段合并为一个"""
+    merged = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if i1 == i2 and j1 == j2:
+            continue
+        if tag == 'equal' and merged and merged[-1][0] == 'equal':
+            i1, j1 = merged.pop()[1::2]
+        merged.append((tag, i1, i2, j1, j2))
+    return merged
+
+
+def _merge_changes(opcodes: List[Opcode]) -> List[Opcode]:
+    """相邻的改动合并为一个"""
+    merged = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == 'equal':
+            merged.append((tag, i1, i2, j1, j2))
+            continue
+        if merged and merged[-1][0] != 'equal':
+            i1, j1 = merged.pop()[1::2]
+        merged.append(_change(i1, i2, j1, j2))
+    return merged
+
+
+def _size(opcode: Opcode) -> int:
+    """改动的长度：删除与插入中较长的一方"""
+    _, i1, i2, j1, j2 = opcode
+    return max(i2 - i1, j2 - j1)
+
+
+def _change(i1: int, i2: int, j1: int, j2: int) -> Opcode:
+    if i1 == i2:
+        return ('insert', i1, i2, j1, j2)
+    if j1 == j2:
+        return ('delete', i1, i2, j1, j2)
+    return ('replace', i1, i2, j1, j2)
@@ -0,0 +1,21 @@
+"""
+fc_insider 异常类型
+
+所有库函数只抛出 FcInsiderError 的子类，调用方可以统一捕获
+"""
+
+
+class FcInsiderError(Exception):
+    """fc_insider 基础异常"""
+
+
+class DependencyError(FcInsiderError):
+    """缺少可选依赖（如 markitdown）"""
+
+
+class DocumentError(FcInsiderError):
+    """Word 文档无法读取，或不包含四列翻译表格"""
+
+
+class MappingError(FcInsiderError):
+    """新译文或翻译映射无效（格式错误、行数不足等）"""
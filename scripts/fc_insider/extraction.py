@@ -0,0 +1,134 @@
+"""
+表格提取：Word → Markdown → 表格行
+
+使用 Microsoft MarkItDown 把 Word 文档转换为 Markdown，再解析四列翻译表格
+"""
+
+import zipfile
+from typing import BinaryIO, Dict, Iterable, Iterator, List
+
+from lxml import etree
+
+from .errors import DependencyError, DocumentError
+from .sources import Source, open_stream
+from .streaming import main_part_names
+
+
+def load_markitdown():
+    """
+    延迟导入 MarkItDown，未安装时返回 None
+
+    导入约需 0.4s，只匹配或命中缓存等不需要提取的场景不必付出
+    """
+    try:
+        from markitdown import MarkItDown
+    except ImportError:
+        return None
+    return MarkItDown
+
+
+def check_word_document(stream: BinaryIO) -> None:
+    """
+    检查输入是否为 Word 文档（zip 包且有主文档部件），不是时抛出 DocumentError
+
+    MarkItDown 会把任意字节当作文本转换，损坏的文档不检查会得到空表格。检查后流回到开头。
+    """
+    if not zipfile.is_zipfile(stream):
+        raise DocumentError("不是 Word 文档（不是有效的 zip 文件）")
+    stream.seek(0)
+    try:
+        with zipfile.ZipFile(stream) as archive:
+            main_part_names(archive)
+    except (zipfile.BadZipFile, etree.XMLSyntaxError) as e:
+        raise DocumentError(f"无法打开 Word 文档: {e}") from e
+    stream.seek(0)
+
+
+def convert_to_markdown(source: Source) -> str:
+    """
+    使用 MarkItDown 将 Word 文档转换为 Markdown
+
+    Args:
+        source: Word 文档（bytes / 路径 / 二进制文件对象）
+
+    Returns:
+        Markdown 文本
+
+    Raises:
+        DocumentError: 输入不是 Word 文档或转换失败
+    """
+    stream = open_stream(source)
+    check_word_document(stream)
+
+    MarkItDown = load_markitdown()
+    if MarkItDown is None:
+        raise DependencyError("需要安装 markitdown：pip install markitdown[docx]")
+
+    try:
+        result = MarkItDown().convert_stream(stream, file_extension='.docx')
+    except Exception as e:
+        raise DocumentError(f"无法转换 Word 文档: {e}") from e
+    return result.text_content
+
+
+def iter_markdown_rows(lines: Iterable[str]) -> Iterator[Dict[str, str]]:
+    """
+    逐行解析 Markdown 表格，边读边产出数据行
+
+    Yields:
+        dicts with keys: segment_id, status, source, target
+    """
+    in_table = False
+
+    for line in lines:
+        line = line.strip()
+
+        if line.startswith('|') and line.endswith('|'):
+            # 跳过分隔符
+            if set(line.replace('|', '').replace('-', '').strip()) == set():
+                in_table = True
+                continue
+
+            # 跳过表头
+            if 'Segment ID' in line or 'segment_id' in line.lower():
+                in_table = True
+                continue
+
+            if in_table:
+                cells = [cell.strip() for cell in line.split('|')[1:-1]]
+                if len(cells) >= 4:
+                    yield {
+                        'segment_id': cells[0],
+                        'status': cells[1],
+                        'source': cells[2],
+                        'target': cells[3]
+                    }
+
+
+def parse_markdown_table(markdown: str) -> List[Dict[str, str]]:
+    """解析 Markdown 中的四列翻译表格"""
+    return list(iter_markdown_rows(markdown.split('\n')))
+
+
+def extract(source: Source) -> Dict:
+    """
+    从 Word 文档提取翻译表格
+
+    Args:
+        source: Word 文档（bytes / 路径 / 二进制文件对象）
+
+    Returns:
+        {
+            'markdown': Markdown 全文,
+            'rows': [{'segment_id', 'status', 'source', 'target'}, ...],
+            'table_lines': Markdown 中表格行的数量
+        }
+    """
+    markdown = convert_to_markdown(source)
+    table_lines = sum(1 for line in markdown.split('\n') if line.strip().startswith('|'))
+
+    return {
+        'markdown': markdown,
+        'rows': parse_markdown_table(markdown),
+        'table_lines': table_lines
+    }
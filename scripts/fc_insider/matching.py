@@ -0,0 +1,378 @@
+"""
+翻译匹配：把新译文配对到表格行，生成新旧翻译对照表
+
+支持三种匹配方式：
+- segment_id: 按 Segment ID 匹配（纯文本新译文按过滤后的行顺序对应）
+- index: 按过滤后的行索引匹配
+- smart: 按文本相似度全局贪婪配对，顺序无关
+"""
+
+import json
+import re
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple, Union
+
+from .errors import MappingError
+from .sources import Source, read_bytes
+
+
+def is_placeholder_row(text: str) -> bool:
+    """
+    判断是否为占位符行
+
+    占位符行的特征：
+    - 主要由 <数字/> 标记组成
+    - 可能包含少量固定文本（如"在第"、"頁"）
+    - 例如: "<0/>"在第 <1/> 頁, "<2/>", 第 <12/> 頁
+
+    Returns:
+        True if the text is primarily placeholders
+    """
+    # 移除所有占位符
+    without_placeholders = re.sub(r'[<"]?\d+/?[>"]?', '', text)
+    # 移除引号
+    without_placeholders = re.sub(r'["""\'\'<>]', '', without_placeholders)
+    # 移除常见的连接词
+    without_placeholders = re.sub(r'(在第|頁|on page|page)', '', without_placeholders, flags=re.IGNORECASE)
+    # 移除空白
+    without_placeholders = without_placeholders.strip()
+
+    # 如果移除占位符后剩余内容很少，认为是占位符行
+    if len(without_placeholders) <= 3:
+        return True
+
+    # 检查是否包含大量占位符标记
+    placeholder_count = len(re.findall(r'<\d+/>', text))
+    if placeholder_count >= 2:
+        # 如果有2个或更多占位符，且总长度很短
+        if len(text) <= 30:
+            return True
+
+    return False
+
+
+def split_placeholder_rows(rows: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """
+    拆分占位符行
+
+    Returns:
+        (保留的行, 跳过的占位符行)
+    """
+    kept = []
+    skipped = []
+    for row in rows:
+        if is_placeholder_row(row['target']):
+            skipped.append(row)
+        else:
+            kept.append(row)
+    return kept, skipped
+
+
+def calculate_text_similarity(text1: str, text2: str) -> float:
+    """
+    计算两段文本的相似度
+
+    使用多种方法综合评分：
+    1. SequenceMatcher - 序列相似度
+    2. 共同字符比例
+    3. 词汇重叠度
+
+    Returns:
+        0.0-1.0 的相似度分数
+    """
+    if not text1 or not text2:
+        return 0.0
+
+    # 方法 1: SequenceMatcher
+    seq_ratio = SequenceMatcher(None, text1, text2).ratio()
+
+    # 方法 2: 共同字符比例
+    set1 = set(text1)
+    set2 = set(text2)
+    if not set1 or not set2:
+        char_ratio = 0.0
+    else:
+        common_chars = set1 & set2
+        char_ratio = len(common_chars) / max(len(set1), len(set2))
+
+    # 方法 3: 词汇重叠（按标点和空格分词）
+    words1 = set(re.findall(r'[\w]+', text1))
+    words2 = set(re.findall(r'[\w]+', text2))
+    if not words1 or not words2:
+        word_ratio = 0.0
+    else:
+        common_words = words1 & words2
+        word_ratio = len(common_words) / max(len(words1), len(words2))
+
+    # 综合评分（序列相似度权重最高）
+    similarity = (seq_ratio * 0.5) + (char_ratio * 0.2) + (word_ratio * 0.3)
+
+    return similarity
+
+
+def smart_pairs(old_table: List[Dict[str, str]], new_texts: List[str]) -> List[Dict]:
+    """
+    智能匹配：计算所有新旧配对的相似度，全局贪婪选出最佳配对
+
+    Returns:
+        配对列表，每项包含 old_idx, new_idx, similarity, old_text, new_text, segment_id
+    """
+    # 计算所有可能的配对相似度
+    all_pairs = []
+    for old_idx, old_row in enumerate(old_table):
+        old_text = old_row['target']
+        for new_idx, new_text in enumerate(new_texts):
+            all_pairs.append({
+                'old_idx': old_idx,
+                'new_idx': new_idx,
+                'similarity': calculate_text_similarity(old_text, new_text),
+                'old_text': old_text,
+                'new_text': new_text,
+                'segment_id': old_row['segment_id']
+            })
+
+    # 按相似度排序所有可能的配对
+    all_pairs.sort(key=lambda x: x['similarity'], reverse=True)
+
+    # 贪婪选择最佳配对
+    matches = []
+    used_old = set()
+    used_new = set()
+    for pair in all_pairs:
+        if pair['old_idx'] not in used_old and pair['new_idx'] not in used_new:
+            matches.append(pair)
+            used_old.add(pair['old_idx'])
+            used_new.add(pair['new_idx'])
+
+            if len(matches) == len(old_table):
+                break
+
+    return matches
+
+
+def parse_new_translations(content: str, format: str = 'auto') -> Dict[str, str]:
+    """
+    解析新译文内容
+
+    支持格式：
+    - json: {"segment_id": "new_text", ...} 或 {"translations": [{"segment_id", "text"}, ...]}
+    - text: 按行分割的译文（与表格行对应）
+    - auto: 自动检测
+    """
+    # 自动检测格式
+    if format == 'auto':
+        format = 'json' if content.strip().startswith('{') else 'text'
+
+    if format == 'json':
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError as e:
+            raise MappingError(f"新译文 JSON 格式错误: {e}") from e
+        return normalize_translations(data)
+
+    if format == 'text':
+        # 每行一个译文
+        lines = [line.strip() for line in content.split('\n') if line.strip()]
+        return {str(i): line for i, line in enumerate(lines)}
+
+    raise MappingError(f"不支持的格式: {format}")
+
+
+def normalize_translations(data) -> Dict[str, str]:
+    """把 list / dict 形式的新译文统一为 key -> text 映射"""
+    if isinstance(data, (list, tuple)):
+        return {str(i): line for i, line in enumerate(data)}
+    if isinstance(data, dict) and 'translations' in data:
+        # 格式 1: {"translations": [{"segment_id": "...", "text": "..."}, ...]}
+        return {
+            item['segment_id']: item.get('text', item.get('new_text', ''))
+            for item in data['translations']
+        }
+    if isinstance(data, dict):
+        # 格式 2: {"segment_id": "new_text", ...}
+        return data
+    raise MappingError("不支持的 JSON 格式")
+
+
+def is_index_keyed(new_translations: Dict[str, str]) -> bool:
+    """判断新译文是否为纯文本格式（键为行索引 "0", "1", ...）"""
+    if not new_translations:
+        return False
+    first_key = next(iter(new_translations))
+    return isinstance(first_key, str) and first_key.isdigit()
+
+
+def make_mapping(segment_id: str, old_text: str, new_text: Optional[str]) -> Optional[Dict[str, str]]:
+    """
+    生成单条对照记录
+
+    只有当新译文存在且与旧译文不同时才返回记录，否则返回 None
+    """
+    if new_text and new_text != old_text:
+        return {
+            'segment_id': segment_id,
+            'old_text': old_text,
+            'new_text': new_text
+        }
+    return None
+
+
+def generate_translation_mapping(
+    old_table: List[Dict[str, str]],
+    new_translations: Dict[str, str],
+    match_by: str = 'segment_id'
+) -> List[Dict[str, str]]:
+    """
+    生成新旧翻译对照表
+
+    Args:
+        old_table: 从 Word 提取的原始表格
+        new_translations: 新译文（segment_id -> new_text）
+        match_by: 匹配方式（'segment_id' 或 'index'）
+
+    Returns:
+        List of translation mappings for update_fc_insider_tracked.py
+    """
+    mappings = []
+
+    for idx, row in enumerate(old_table):
+        segment_id = row['segment_id']
+        old_text = row['target']
+
+        # 匹配新译文
+        if match_by == 'segment_id' or match_by == 'smart':
+            # smart 模式在之前已经转换为 segment_id 映射
+            new_text = new_translations.get(segment_id)
+        elif match_by == 'index':
+            new_text = new_translations.get(str(idx))
+        else:
+            raise MappingError(f"不支持的匹配方式: {match_by}")
+
+        # 只有当新译文存在且与旧译文不同时才添加
+        mapping = make_mapping(segment_id, old_text, new_text)
+        if mapping:
+            mappings.append(mapping)
+
+    return mappings
+
+
+def validate_mappings(mappings: List[Dict[str, str]]) -> List[str]:
+    """
+    验证对照表的完整性
+
+    检查：
+    - 对照表不为空
+    - segment_id 不为空
+    - new_text 不为空
+    - 没有重复的 segment_id
+
+    Returns:
+        错误信息列表（为空表示通过）
+    """
+    if not mappings:
+        return ["对照表为空"]
+
+    seen_ids = set()
+    errors = []
+
+    for i, mapping in enumerate(mappings, 1):
+        seg_id = mapping.get('segment_id', '').strip()
+        new_text = mapping.get('new_text', '').strip()
+
+        if not seg_id:
+            errors.append(f"行 {i}: segment_id 为空")
+
+        if not new_text:
+            errors.append(f"行 {i} ({seg_id}): new_text 为空")
+
+        if seg_id in seen_ids:
+            errors.append(f"行 {i}: segment_id '{seg_id}' 重复")
+
+        seen_ids.add(seg_id)
+
+    return errors
+
+
+def match(
+    table,
+    new_lines: Union[List[str], Dict[str, str], Source],
+    match_by: str = 'smart',
+    min_similarity: float = 0.15,
+    filter_placeholders: bool = True,
+    format: str = 'auto'
+) -> Dict:
+    """
+    把新译文配对到表格行，生成对照表
+
+    Args:
+        table: extract() 的结果，或表格行列表
+        new_lines: 新译文；list（每行一个）、dict（segment_id -> text），
+                   或新译文文件（bytes / 路径 / 二进制文件对象）
+        match_by: 'smart' | 'segment_id' | 'index'
+        min_similarity: smart 模式下低于此相似度的配对会列入 low_similarity
+        filter_placeholders: 是否过滤占位符行
+        format: 新译文文件格式（'auto' | 'json' | 'text'）
+
+    Returns:
+        {
+            'mappings': [{'segment_id', 'old_text', 'new_text'}, ...],
+            'rows': 参与匹配的行,
+            'skipped_rows': 被过滤的占位符行,
+            'pairs': smart 模式的配对（含 similarity），其他模式为空,
+            'low_similarity': 相似度低于 min_similarity 的配对,
+            'line_count': {'new': 新译文行数, 'rows': 表格行数}（纯文本 + segment_id 时）,
+            'errors': 对照表校验错误
+        }
+
+    Raises:
+        MappingError: 新译文格式无效，或纯文本新译文行数少于表格行数
+    """
+    rows = table['rows'] if isinstance(table, dict) else list(table)
+
+    if isinstance(new_lines, (list, tuple, dict)):
+        new_translations = normalize_translations(new_lines)
+    else:
+        new_translations = parse_new_translations(read_bytes(new_lines).decode('utf-8'), format)
+
+    skipped = []
+    if filter_placeholders:
+        rows, skipped = split_placeholder_rows(rows)
+
+    pairs = []
+    low_similarity = []
+    line_count = None
+
+    if match_by == 'smart':
+        if is_index_keyed(new_translations):
+            text_list = [new_translations[str(i)] for i in range(len(new_translations))]
+        else:
+            text_list = list(new_translations.values())
+
+        pairs = smart_pairs(rows, text_list)
+        new_translations = {pair['segment_id']: pair['new_text'] for pair in pairs}
+        low_similarity = [pair for pair in pairs if pair['similarity'] < min_similarity]
+
+    elif match_by == 'segment_id' and is_index_keyed(new_translations):
+        # 纯文本新译文：按过滤后的行顺序对应到 segment_id
+        text_list = [new_translations[str(i)] for i in range(len(new_translations))]
+        line_count = {'new': len(text_list), 'rows': len(rows)}
+
+        if len(text_list) < len(rows):
+            raise MappingError(
+                f"新翻译行数不足：新翻译 {len(text_list)} 行，过滤后表格 {len(rows)} 行")
+
+        new_translations = {
+            row['segment_id']: text_list[idx] for idx, row in enumerate(rows)
+        }
+
+    mappings = generate_translation_mapping(rows, new_translations, match_by=match_by)
+
+    return {
+        'mappings': mappings,
+        'rows': rows,
+        'skipped_rows': skipped,
+        'pairs': pairs,
+        'low_similarity': low_similarity,
+        'line_count': line_count,
+        'errors': validate_mappings(mappings)
+    }
@@ -0,0 +1,342 @@
+"""
+docx 包的读取与补丁式写出
+
+doc.save() 会重新序列化并重新压缩包里的每个部件，包括邀请卡文档中体积很大的
+图片和字体，而更新只改动 word/document.xml（和 word/settings.xml）。
+
+SourcePackage 以只读内存映射打开输入（bytes 输入直接包装）；write_patched()
+按原顺序写出 zip：未改动的成员连同本地文件头、压缩数据原样复制，不解压也不重新压缩；
+只有被替换的成员重新压缩。输出耗时取决于改动的 XML 大小，而不是整个包的大小。
+
+替换内容也可以是逐块产出 bytes 的迭代器（见 fc_insider.streaming）：边生成边压缩写出，
+大小和 CRC 写在数据之后的 data descriptor 中，整个成员不必同时放在内存里。
+
+不支持 ZIP64（单个成员或整个包超过 4GB），遇到时抛出 PackageError，
+save_document() 会改用 doc.save()。
+"""
+
+import mmap
+import os
+import struct
+import zlib
+from io import BytesIO
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+
+from .errors import DocumentError
+from .sources import Source, read_bytes
+
+# zip 记录签名
+LOCAL_HEADER_SIG = b'PK\x03\x04'
+CENTRAL_HEADER_SIG = b'PK\x01\x02'
+END_RECORD_SIG = b'PK\x05\x06'
+DESCRIPTOR_SIG = b'PK\x07\x08'
+
+LOCAL_HEADER_SIZE = 30
+CENTRAL_HEADER_SIZE = 46
+END_RECORD_SIZE = 22
+
+# flag bit 3：大小和 CRC 写在数据之后的 data descriptor 中
+FLAG_DATA_DESCRIPTOR = 0x08
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+ZIP32_LIMIT = 0xFFFFFFFF
+
+
+class PackageError(DocumentError):
+    """zip 结构不支持补丁式写出（如 ZIP64）"""
+
+
+class SourcePackage:
+    """
+    只读打开的 docx 包
+
+    路径以 mmap 映射（不把整个文件读入内存），bytes / 文件对象直接包装。
+    stream 可交给 python-docx 的 Document() 加载。
+    """
+
+    def __init__(self, source: Source):
+        self._file = None
+        self._map = None
+        if isinstance(source, (str, os.PathLike)):
+            self._file = open(source, 'rb')
+            try:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # 空文件无法映射
+                self._file.close()
+                raise DocumentError(f"文件为空: {source}")
+            self.data = memoryview(self._map)
+        else:
+            self.data = memoryview(read_bytes(source))
+
+    @property
+    def stream(self):
+        """从头开始的只读二进制流"""
+        return BytesIO(self.data) if self._map is None else _MappedStream(self._map)
+
+    def close(self) -> None:
+        self.data.release()
+        if self._map is not None:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _MappedStream:
+    """mmap 上的独立读取位置（多个读取者互不影响）"""
+
+    def __init__(self, mapped: mmap.mmap):
+        self._map = mapped
+        self._pos = 0
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._map) if size is None or size < 0 else min(self._pos + size, len(self._map))
+        data = self._map[self._pos:end]
+        self._pos = end
+        return data
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        base = {0: 0, 1: self._pos, 2: len(self._map)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seekable(self) -> bool:
+        return True
+
+    def readable(self) -> bool:
+        return True
+
+
+def _find_end_record(data: memoryview) -> int:
+    """定位 End of Central Directory 记录（可能带最长 64KB 的注释）"""
+    start = max(0, len(data) - END_RECORD_SIZE - 0xFFFF)
+    position = bytes(data[start:]).rfind(END_RECORD_SIG)
+    if position < 0:
+        raise PackageError("不是有效的 zip 文件（未找到中央目录）")
+    return start + position
+
+
+def _iter_central_records(data: memoryview, end: int):
+    """逐条产出 (中央目录记录 bytes, 文件名)"""
+    (_, _, _, _, count, size, offset, _) = struct.unpack(
+        '<4s4H2LH', data[end:end + END_RECORD_SIZE])
+    if count == 0xFFFF or size == ZIP32_LIMIT or offset == ZIP32_LIMIT:
+        raise PackageError("不支持 ZIP64 包")
+
+    position = offset
+    for _ in range(count):
+        if data[position:position + 4] != CENTRAL_HEADER_SIG:
+            raise PackageError("中央目录记录损坏")
+        name_length, extra_length, comment_length = struct.unpack(
+            '<3H', data[position + 28:position + 34])
+        length = CENTRAL_HEADER_SIZE + name_length + extra_length + comment_length
+        record = bytes(data[position:position + length])
+        flags = struct.unpack('<H', record[8:10])[0]
+        raw_name = record[CENTRAL_HEADER_SIZE:CENTRAL_HEADER_SIZE + name_length]
+        name = raw_name.decode('utf-8' if flags & 0x800 else 'cp437')
+        yield record, name
+        position += length
+
+
+def _member_span(data: memoryview, record: bytes):
+    """成员在源文件中的位置：(本地头起点, 数据起点, 数据终点, 含 data descriptor 的终点)"""
+    (flags,) = struct.unpack('<H', record[8:10])
+    (compress_size, file_size) = struct.unpack('<2L', record[20:28])
+    (header_offset,) = struct.unpack('<L', record[42:46])
+    if ZIP32_LIMIT in (compress_size, file_size, header_offset):
+        raise PackageError("不支持 ZIP64 成员")
+
+    if data[header_offset:header_offset + 4] != LOCAL_HEADER_SIG:
+        raise PackageError("本地文件头损坏")
+    name_length, extra_length = struct.unpack(
+        '<2H', data[header_offset + 26:header_offset + 30])
+    data_start = header_offset + LOCAL_HEADER_SIZE + name_length + extra_length
+    data_end = data_start + compress_size
+
+    member_end = data_end
+    if flags & FLAG_DATA_DESCRIPTOR:
+        member_end += 16 if data[data_end:data_end + 4] == DESCRIPTOR_SIG else 12
+    return header_offset, data_start, data_end, member_end
+
+
+def _compressor(method: int):
+    """返回 (compress, flush)；raw deflate 与 zipfile 写出的格式相同"""
+    if method == ZIP_STORED:
+        return (lambda chunk: chunk), (lambda: b'')
+    if method == ZIP_DEFLATED:
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        return compressor.compress, compressor.flush
+    raise PackageError(f"不支持的压缩方式: {method}")
+
+
+def _compress(method: int, content: bytes) -> bytes:
+    compress, flush = _compressor(method)
+    return compress(content) + flush()
+
+
+def _write_streamed(output, method: int, chunks: Iterable[bytes]) -> Tuple[int, int, int]:
+    """
+    逐块压缩写出成员数据
+
+    Returns:
+        (crc, 压缩后大小, 原始大小)
+    """
+    compress, flush = _compressor(method)
+    crc = compressed_size = size = 0
+    for chunk in chunks:
+        crc = zlib.crc32(chunk, crc)
+        size += len(chunk)
+        data = compress(chunk)
+        if data:
+            output.write(data)
+            compressed_size += len(data)
+    data = flush()
+    output.write(data)
+    compressed_size += len(data)
+    if max(compressed_size, size) > ZIP32_LIMIT:
+        raise PackageError("成员超过 4GB，需要 ZIP64")
+    return crc, compressed_size, size
+
+
+def write_patched(package: SourcePackage,
+                  replacements: Dict[str, Union[bytes, Iterable[bytes]]], output) -> Dict:
+    """
+    写出 package 的副本，replacements 中的成员替换为新内容
+
+    Args:
+        package: 源包
+        replacements: 成员名（如 'word/document.xml'）-> 新内容（未压缩），
+                      bytes 或逐块产出 bytes 的迭代器（流式写出，使用 data descriptor）
+        output: 可写的二进制文件对象（不要求可 seek）
+
+    Returns:
+        {'copied': 原样复制的成员数, 'replaced': 替换的成员数, 'bytes': 写出的字节数}
+
+    Raises:
+        PackageError: ZIP64 包、结构损坏，或 replacements 中有源包不存在的成员
+    """
+    data = package.data
+    end = _find_end_record(data)
+
+    missing = set(replacements) - {name for _, name in _iter_central_records(data, end)}
+    if missing:
+        raise PackageError(f"源包中没有这些成员: {', '.join(sorted(missing))}")
+
+    written = 0
+    central = []
+    copied = replaced = 0
+
+    for record, name in _iter_central_records(data, end):
+        header_offset, data_start, data_end, member_end = _member_span(data, record)
+        offset = written
+
+        if name in replacements:
+            content = replacements[name]
+            (method,) = struct.unpack('<H', record[10:12])
+            # 本地头沿用原来的文件名和 extra，只改 flag / CRC / 大小
+            local = bytearray(data[header_offset:data_start])
+            (flags,) = struct.unpack('<H', local[6:8])
+
+            if isinstance(content, (bytes, bytearray, memoryview)):
+                compressed = _compress(method, content)
+                sizes = struct.pack('<3L', zlib.crc32(content), len(compressed), len(content))
+                flags &= ~FLAG_DATA_DESCRIPTOR
+                local[6:8] = struct.pack('<H', flags)
+                local[14:26] = sizes
+                output.write(local)
+                output.write(compressed)
+                written += len(local) + len(compressed)
+            else:
+                # 大小未知：本地头中的 CRC / 大小置 0，实际值写在数据后的 data descriptor
+                flags |= FLAG_DATA_DESCRIPTOR
+                local[6:8] = struct.pack('<H', flags)
+                local[14:26] = bytes(12)
+                output.write(local)
+                crc, compressed_size, size = _write_streamed(output, method, content)
+                sizes = struct.pack('<3L', crc, compressed_size, size)
+                output.write(DESCRIPTOR_SIG + sizes)
+                written += len(local) + compressed_size + len(DESCRIPTOR_SIG) + len(sizes)
+
+            record = bytearray(record)
+            record[8:10] = struct.pack('<H', flags)
+            record[16:28] = sizes
+            replaced += 1
+        else:
+            output.write(data[header_offset:member_end])
+            written += member_end - header_offset
+            record = bytearray(record)
+            copied += 1
+
+        if offset > ZIP32_LIMIT:
+            raise PackageError("输出超过 4GB，需要 ZIP64")
+        record[42:46] = struct.pack('<L', offset)
+        central.append(bytes(record))
+
+    central_offset = written
+    for record in central:
+        output.write(record)
+        written += len(record)
+    if written > ZIP32_LIMIT:
+        raise PackageError("输出超过 4GB，需要 ZIP64")
+
+    # End of Central Directory：沿用原注释，更新中央目录大小和位置
+    end_record = bytearray(data[end:])
+    end_record[12:20] = struct.pack('<2L', written - central_offset, central_offset)
+    output.write(end_record)
+    written += len(end_record)
+
+    return {'copied': copied, 'replaced': replaced, 'bytes': written}
+
+
+def part_blobs(parts: Iterable) -> Dict[str, bytes]:
+    """python-docx 部件 -> {成员名: 序列化内容}"""
+    return {part.partname.lstrip('/'): part.blob for part in parts}
+
+
+def save_document(doc, package: Optional[SourcePackage], output,
+                  parts: Optional[Iterable] = None) -> str:
+    """
+    保存修改后的文档：只重写改动过的部件，其余成员从源包原样复制
+
+    Args:
+        doc: 由 package 加载并修改过的 python-docx 文档
+        package: 源包；None 时直接 doc.save()
+        output: 可写的二进制文件对象
+        parts: 改动过的部件（默认 document.xml 与 settings.xml）
+
+    Returns:
+        'patched' | 'saved'（包结构不支持补丁或新增了部件时改用 doc.save()）
+    """
+    if package is not None:
+        if parts is None:
+            parts = (doc.part, doc.part.part_related_by(RT.SETTINGS))
+        package_parts = {part.partname.lstrip('/') for part in doc.part.package.iter_parts()}
+        blobs = part_blobs(parts)
+
+        buffer = BytesIO()
+        try:
+            known = {name for _, name in _iter_central_records(
+                package.data, _find_end_record(package.data))}
+            # 加载后新增的部件（例如原文档没有 settings.xml）需要同时改写关系和内容类型
+            if package_parts <= known:
+                write_patched(package, blobs, buffer)
+                output.write(buffer.getbuffer())
+                return 'patched'
+        except PackageError:
+            pass
+
+    doc.save(output)
+    return 'saved'
@@ -0,0 +1,349 @@
+"""
+批量接受 / 拒绝修订：一次处理 document.xml 中的全部追踪修订，可按作者和日期筛选
+
+新一轮翻译前往往要先接受已有的修订，或拒绝某位审阅者的修订。逐个单元格经由 python-docx
+处理（clear_cell_tracked_changes() 等）既慢，又只覆盖段落直接子元素中的 <w:ins> / <w:del>。
+这里直接解析 document.xml（不经过 python-docx 的元素类），一次遍历（按标签过滤的 iter()）找出全部修订，
+按文档逆序逐个处理（先内层后外层，移除外层时内层已处理完），再以补丁方式写出。
+（XPath 并集 //w:ins | //w:del | ... 在 libxml2 中合并节点集是平方级的，6 万条修订需 6 秒以上；
+单个 XPath 谓词也比 iter() 慢约 20 倍。）
+
+处理的修订及其结果：
+
+| 修订 | 接受 | 拒绝 |
+|------|------|------|
+| <w:ins> / <w:moveTo>（内容） | 去掉包装，保留内容 | 连同内容删除 |
+| <w:del> / <w:moveFrom>（内容） | 连同内容删除 | 去掉包装，<w:delText> 改回 <w:t> |
+| 段落标记的插入（pPr/rPr/<w:ins>） | 去掉标记 | 段落并入下一段落 |
+| 段落标记的删除（pPr/rPr/<w:del>） | 段落并入下一段落 | 去掉标记 |
+| 表格行的插入 / 删除（trPr/<w:ins>、<w:del>） | 去掉标记 / 删除行 | 删除行 / 去掉标记 |
+| 编号的插入（numPr/<w:ins>） | 去掉标记 | 删除编号（<w:numPr>） |
+| <w:rPrChange> / <w:pPrChange> | 去掉记录 | 恢复记录中的原格式 |
+
+移动范围标记（<w:moveFromRangeStart> 等）随筛选条件一并去掉。单元格的插入删除（<w:cellIns> 等）、
+表格与节属性的格式修订（<w:tblPrChange>、<w:sectPrChange> 等）不处理，保留在文档中。
+
+按作者 / 日期筛选时，连同内容删除的修订（或表格行）中可能嵌套着不匹配的修订（例如 A 插入的文字中
+有 B 的删除）。与 Word 相同，它们随外层内容一并删除，计入 discarded，不计入 remaining。
+"""
+
+import zipfile
+from datetime import datetime, timezone
+from io import BytesIO
+from typing import Dict, Iterable, Optional, Tuple
+
+from docx.opc.oxml import serialize_part_xml
+from docx.oxml.ns import qn
+from lxml import etree
+
+from .coalescing import _PARSER
+from .compaction import _ADDED, _W_AUTHOR, _W_DATE, W_MOVE_FROM, W_MOVE_TO, W_P, _unwrap
+from .errors import DocumentError, FcInsiderError
+from .package import SourcePackage, write_patched
+from .sources import Source, write_bytes
+from .streaming import W_TBL, W_TR, main_part_names
+from .tracked import W_DEL, W_DEL_TEXT, W_INS, W_PPR, W_RPR, W_T
+
+# 操作
+ACTIONS = ('accept', 'reject')
+
+W_RPR_CHANGE = qn('w:rPrChange')
+W_PPR_CHANGE = qn('w:pPrChange')
+W_TRPR = qn('w:trPr')
+W_SECTPR = qn('w:sectPr')
+W_DEL_INSTR_TEXT = qn('w:delInstrText')
+W_INSTR_TEXT = qn('w:instrText')
+W_NUMPR = qn('w:numPr')
+
+# 移动范围标记：结束标记只有 w:id，随同 w:id 的开始标记一并去掉
+_RANGE_STARTS = frozenset(qn(tag) for tag in ('w:moveFromRangeStart', 'w:moveToRangeStart'))
+_RANGE_ENDS = frozenset(qn(tag) for tag in ('w:moveFromRangeEnd', 'w:moveToRangeEnd'))
+_W_ID = qn('w:id')
+
+# 遍历的修订元素（document.iter(*_REVISION_TAGS) 按文档顺序返回）
+_REVISION_TAGS = (W_INS, W_DEL, W_MOVE_FROM, W_MOVE_TO, W_RPR_CHANGE, W_PPR_CHANGE) \
+    + tuple(_RANGE_STARTS) + tuple(_RANGE_ENDS)
+
+# 属性元素中的 <w:ins> / <w:del> 是标记（没有内容），不是内容修订
+_PROPERTY_PARENTS = frozenset((W_RPR, W_TRPR, W_NUMPR))
+
+# 计数的修订（不含移动范围标记）
+_COUNTED_TAGS = (W_INS, W_DEL, W_MOVE_FROM, W_MOVE_TO, W_RPR_CHANGE, W_PPR_CHANGE)
+
+# 拒绝 <w:pPrChange> 时保留的段落属性（不属于 pPrChange 记录的范围）
+_PPR_KEPT = frozenset((W_RPR, W_SECTPR, W_PPR_CHANGE))
+# 拒绝 <w:rPrChange> 时保留的元素（段落标记的插入 / 删除标记是单独的修订）
+_RPR_KEPT = frozenset((W_RPR_CHANGE, W_INS, W_DEL, W_MOVE_FROM, W_MOVE_TO))
+
+
+def check_action(action: str) -> None:
+    """不支持的操作抛出 FcInsiderError"""
+    if action not in ACTIONS:
+        raise FcInsiderError(f"不支持的操作: {action}（可选: {', '.join(ACTIONS)}）")
+
+
+def parse_revision_date(value: Optional[str]) -> Optional[datetime]:
+    """
+    修订日期（w:date，ISO 8601）转为不带时区的 UTC 时间；空值或无法解析时返回 None
+
+    也用于解析筛选条件（'2025-03-01' 或 '2025-03-01T12:00:00Z'）
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class RevisionFilter:
+    """按作者、日期筛选修订；没有条件时全部匹配"""
+
+    def __init__(self, authors: Optional[Iterable[str]] = None,
+                 since: Optional[datetime] = None, before: Optional[datetime] = None):
+        """
+        Args:
+            authors: 只处理这些作者的修订
+            since / before: 只处理日期不早于 since、早于 before 的修订（没有日期的修订不匹配）
+        """
+        self.authors = frozenset(authors) if authors else None
+        self.since = since
+        self.before = before
+
+    def matches(self, revision) -> bool:
+        if self.authors is not None and revision.get(_W_AUTHOR) not in self.authors:
+            return False
+        if self.since is None and self.before is None:
+            return True
+        date = parse_revision_date(revision.get(_W_DATE))
+        if date is None:
+            return False
+        return ((self.since is None or date >= self.since)
+                and (self.before is None or date < self.before))
+
+
+def _drop_if_empty(properties) -> None:
+    """去掉修订标记后为空的属性元素（<w:rPr>、<w:pPr>、<w:trPr>）"""
+    while properties is not None and properties.tag in (W_RPR, W_PPR, W_TRPR) \
+            and not len(properties) and not properties.attrib:
+        parent = properties.getparent()
+        parent.remove(properties)
+        properties = parent
+
+
+def _merge_with_next(paragraph) -> bool:
+    """段落标记去掉后，段落内容并入下一段落（沿用下一段落的属性）；后面不是段落时返回 False"""
+    following = paragraph.getnext()
+    if following is None or following.tag != W_P:
+        return False
+    position = 1 if len(following) and following[0].tag == W_PPR else 0
+    for child in [child for child in paragraph if child.tag != W_PPR]:
+        following.insert(position, child)
+        position += 1
+    paragraph.getparent().remove(paragraph)
+    return True
+
+
+def _remove_row(tr) -> None:
+    """删除表格行；表格因此没有行时连同表格删除"""
+    table = tr.getparent()
+    table.remove(tr)
+    if table.tag == W_TBL and table.find(W_TR) is None:
+        table.getparent().remove(table)
+
+
+def _restore_deleted(revision) -> None:
+    """拒绝删除：删除的文本改回普通文本，去掉包装"""
+    for element in revision.iter(W_DEL_TEXT, W_DEL_INSTR_TEXT):
+        element.tag = W_T if element.tag == W_DEL_TEXT else W_INSTR_TEXT
+    _unwrap(revision)
+
+
+def _reject_property_change(change) -> None:
+    """拒绝格式修订：属性恢复为记录中的原属性"""
+    properties = change.getparent()
+    original = change.find(W_RPR if change.tag == W_RPR_CHANGE else W_PPR)
+    kept = _PPR_KEPT if change.tag == W_PPR_CHANGE else _RPR_KEPT
+    for child in [child for child in properties if child.tag not in kept]:
+        properties.remove(child)
+    # 原属性在保留的元素之前（rPr、sectPr、pPrChange 在 pPr 的末尾）
+    for position, child in enumerate(list(original) if original is not None else []):
+        properties.insert(position, child)
+    properties.remove(change)
+    _drop_if_empty(properties)
+
+
+def _nested_revisions(element) -> int:
+    """元素中嵌套的修订数（不含元素本身）"""
+    return sum(1 for revision in element.iter(*_COUNTED_TAGS) if revision is not element)
+
+
+def _resolve(revision, accept: bool, marks: list) -> Tuple[str, int]:
+    """
+    处理一条修订，返回 (计数的类别, 随之删除的嵌套修订数)
+
+    逆序处理时内层匹配的修订已处理完，删除内容时仍嵌套在其中的都是不匹配的修订。
+    段落标记的合并记入 marks，待全部内容修订处理完后再合并
+    """
+    tag = revision.tag
+    parent = revision.getparent()
+
+    if tag in (W_RPR_CHANGE, W_PPR_CHANGE):
+        if accept:
+            parent.remove(revision)
+            _drop_if_empty(parent)
+        else:
+            _reject_property_change(revision)
+        return 'formatting', 0
+
+    added = tag in _ADDED
+    if parent.tag in _PROPERTY_PARENTS:
+        grandparent = parent.getparent()
+        parent.remove(revision)
+        # 接受删除或拒绝插入时，段落标记 / 表格行 / 编号随之去掉
+        if accept != added:
+            if parent.tag == W_RPR and grandparent is not None and grandparent.tag == W_PPR:
+                marks.append(grandparent.getparent())
+            elif parent.tag == W_TRPR:
+                discarded = _nested_revisions(grandparent)
+                _remove_row(grandparent)
+                return 'rows', discarded
+            elif parent.tag == W_NUMPR:
+                grandparent.remove(parent)
+                _drop_if_empty(grandparent)
+                return 'formatting', 0
+        _drop_if_empty(parent)
+        if parent.tag == W_TRPR:
+            return 'rows', 0
+        return ('paragraph_marks' if parent.tag == W_RPR else 'formatting'), 0
+
+    # 接受删除或拒绝插入：连同内容删除
+    discarded = 0
+    if accept != added:
+        discarded = _nested_revisions(revision)
+        parent.remove(revision)
+    elif added:
+        _unwrap(revision)
+    else:
+        _restore_deleted(revision)
+    if tag in (W_MOVE_FROM, W_MOVE_TO):
+        return 'moves', discarded
+    return ('insertions' if added else 'deletions'), discarded
+
+
+def resolve_revisions(document, action: str = 'accept',
+                      revision_filter: Optional[RevisionFilter] = None) -> Dict:
+    """
+    接受或拒绝已解析的 document.xml（原地修改）中的修订
+
+    Args:
+        action: 'accept' | 'reject'
+        revision_filter: 只处理匹配的修订（默认全部）
+
+    Returns:
+        {
+            'resolved': 处理的修订数,
+            'remaining': 不匹配、保留的修订数,
+            'discarded': 不匹配、但随外层内容或表格行一并删除的修订数,
+            'insertions' / 'deletions' / 'moves' / 'formatting' / 'paragraph_marks' / 'rows': 各类数量,
+            'authors': {作者: 处理的修订数}
+        }
+    """
+    check_action(action)
+    accept = action == 'accept'
+    result = {'resolved': 0, 'remaining': 0, 'discarded': 0, 'insertions': 0, 'deletions': 0, 'moves': 0,
+              'formatting': 0, 'paragraph_marks': 0, 'rows': 0, 'authors': {}}
+
+    revisions = list(document.iter(*_REVISION_TAGS))
+    marks = []
+    ranges = []
+    # 逆序：内层修订先于外层处理，_unwrap / remove 不影响尚未处理的修订的位置
+    for revision in reversed(revisions):
+        if revision.tag in _RANGE_STARTS or revision.tag in _RANGE_ENDS:
+            ranges.append(revision)
+            continue
+        if revision_filter is not None and not revision_filter.matches(revision):
+            result['remaining'] += 1
+            continue
+        author = revision.get(_W_AUTHOR) or ''
+        kind, discarded = _resolve(revision, accept, marks)
+        result[kind] += 1
+        # 嵌套的不匹配修订此前已计入 remaining
+        result['remaining'] -= discarded
+        result['discarded'] += discarded
+        result['resolved'] += 1
+        result['authors'][author] = result['authors'].get(author, 0) + 1
+
+    # 段落标记：逆序收集，后面的段落先合并
+    for paragraph in marks:
+        if paragraph is not None and paragraph.getparent() is not None:
+            _merge_with_next(paragraph)
+
+    # 移动范围标记不计数；开始标记匹配时连同结束标记去掉
+    removed_ranges = set()
+    for marker in reversed(ranges):
+        if marker.tag in _RANGE_STARTS:
+            if revision_filter is not None and not revision_filter.matches(marker):
+                continue
+            removed_ranges.add(marker.get(_W_ID))
+        elif marker.get(_W_ID) not in removed_ranges:
+            continue
+        parent = marker.getparent()
+        if parent is not None:
+            parent.remove(marker)
+
+    return result
+
+
+def resolve(source: Source, action: str = 'accept', output=None,
+            authors: Optional[Iterable[str]] = None,
+            since: Optional[datetime] = None, before: Optional[datetime] = None) -> Dict:
+    """
+    接受或拒绝 Word 文档中的追踪修订
+
+    只解析、重写 word/document.xml，其余成员原样复制；没有匹配的修订时输出与输入相同
+
+    Args:
+        source: 输入 Word 文档（bytes / 路径 / 二进制文件对象）
+        action: 'accept'（接受）| 'reject'（拒绝）
+        output: 可选的输出路径或二进制文件对象
+        authors: 只处理这些作者的修订（默认全部）
+        since / before: 只处理日期不早于 since、早于 before 的修订
+
+    Returns:
+        resolve_revisions() 的结果，另含 'xml_bytes'（处理前、后 document.xml 的字节数）
+        和 'docx'（输出文档 bytes）
+    """
+    check_action(action)
+    revision_filter = RevisionFilter(authors, since, before) \
+        if authors or since is not None or before is not None else None
+
+    with SourcePackage(source) as package:
+        try:
+            archive = zipfile.ZipFile(package.stream)
+        except zipfile.BadZipFile as e:
+            raise DocumentError(f"无法打开 Word 文档: {e}") from e
+        with archive:
+            document_name, _ = main_part_names(archive)
+            xml = archive.read(document_name)
+        try:
+            document = etree.fromstring(xml, _PARSER)
+        except etree.XMLSyntaxError as e:
+            raise DocumentError(f"document.xml 解析失败: {e}") from e
+
+        result = resolve_revisions(document, action, revision_filter)
+        replacements = {}
+        if result['resolved']:
+            replacements[document_name] = serialize_part_xml(document)
+        result['xml_bytes'] = (len(xml), len(replacements.get(document_name, xml)))
+
+        buffer = BytesIO()
+        write_patched(package, replacements, buffer)
+        result['docx'] = buffer.getvalue()
+
+    if output is not None:
+        write_bytes(result['docx'], output)
+    return result
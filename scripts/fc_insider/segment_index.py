@@ -0,0 +1,199 @@
+"""
+Segment 位置索引：segment_id -> 表格、行、译文单元格位置
+
+同一份文档重复更新（修改译文后重跑、审校多轮）时，每次都要扫描整张表格读取
+segment_id。索引在第一次运行时构建，保存为文档旁边的 sidecar 文件
+（<文档>.segidx.json），之后的运行直接按位置取单元格。
+
+索引记录主文档部件（通常为 word/document.xml）的哈希；文档被修改后哈希不同，索引自动失效并重建。
+条目格式错误或位置超出表格的 sidecar 视为不存在，同样重建。
+首次构建比直接扫描慢，只在同一输入反复运行时有收益，因此脚本默认不使用（--segment-index off）。
+
+文件格式：
+    {
+        "version": 1,
+        "document_xml": "<sha256>",
+        "table": 0,
+        "segments": {
+            "<segment_id>": {
+                "row": 行索引,
+                "target": [译文单元格所在行索引, 在该行 w:tc 中的序号],
+                "xpath": "/w:document/w:body/w:tbl[1]/w:tr[2]/w:tc[4]"
+            }
+        }
+    }
+"""
+
+import json
+import os
+import zipfile
+from io import BytesIO
+from typing import Callable, Dict, Optional, Tuple
+
+from docx.table import _Cell
+from lxml import etree
+
+from .cache import content_hash
+from .errors import DocumentError
+from .streaming import main_part_names
+from .tracked import cell_finder, iter_segment_cells
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = '.segidx.json'
+
+# 脚本的 --segment-index 选项
+INDEX_MODES = ('auto', 'rebuild', 'off')
+
+
+def index_path(docx_path: str) -> str:
+    """文档对应的 sidecar 路径"""
+    return docx_path + INDEX_SUFFIX
+
+
+def document_xml_hash(docx) -> str:
+    """
+    主文档部件的 sha256（按关系文件定位，只解压这一个成员）
+
+    docx 为 bytes 或可 seek 的二进制流
+    """
+    stream = docx if hasattr(docx, 'read') else BytesIO(docx)
+    try:
+        with zipfile.ZipFile(stream) as archive:
+            document_name, _ = main_part_names(archive)
+            return content_hash(archive.read(document_name))
+    except (zipfile.BadZipFile, KeyError, etree.XMLSyntaxError) as e:
+        raise DocumentError(f"无法读取主文档部件: {e}") from e
+
+
+def _is_position(value) -> bool:
+    """非负整数（JSON 中的 true / false 不算）"""
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def _valid_entry(entry) -> bool:
+    """索引条目格式正确：{'row': 行索引, 'target': [行索引, w:tc 序号], ...}"""
+    if not isinstance(entry, dict) or not _is_position(entry.get('row')):
+        return False
+    target = entry.get('target')
+    return (isinstance(target, list) and len(target) == 2
+            and all(_is_position(value) for value in target))
+
+
+def _fits_table(table, index: Dict) -> bool:
+    """索引中的每个译文单元格位置都在表格范围内"""
+    rows = table._tbl.tr_lst
+    for entry in index['segments'].values():
+        row_index, tc_index = entry['target']
+        if row_index >= len(rows) or tc_index >= len(rows[row_index].tc_lst):
+            return False
+    return True
+
+
+def build_index(table, document_hash: str, table_index: int = 0) -> Dict:
+    """单次遍历表格构建索引"""
+    segments = {}
+    for segment_id, row_index, (tc, target_row, target_tc) in iter_segment_cells(table):
+        segments[segment_id] = {
+            'row': row_index,
+            'target': [target_row, target_tc],
+            'xpath': (f'/w:document/w:body/w:tbl[{table_index + 1}]'
+                      f'/w:tr[{target_row + 1}]/w:tc[{target_tc + 1}]')
+        }
+    return {
+        'version': INDEX_VERSION,
+        'document_xml': document_hash,
+        'table': table_index,
+        'segments': segments
+    }
+
+
+def load_index(path: str, document_hash: str) -> Optional[Dict]:
+    """
+    读取 sidecar 索引
+
+    Returns:
+        索引；文件不存在、格式错误（含任一条目格式错误）或与文档不一致时返回 None
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if (not isinstance(index, dict)
+            or index.get('version') != INDEX_VERSION
+            or index.get('document_xml') != document_hash
+            or not isinstance(index.get('segments'), dict)
+            or not all(_valid_entry(entry) for entry in index['segments'].values())):
+        return None
+    return index
+
+
+def save_index(path: str, index: Dict) -> None:
+    """原子写入 sidecar 索引"""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temp_path, path)
+
+
+def open_index(table, docx_path: Optional[str], docx_bytes: bytes,
+               mode: str = 'auto') -> Tuple[Optional[Dict], str]:
+    """
+    取得文档的索引：有效的 sidecar 直接读取，否则构建并写入
+
+    Args:
+        table: 文档的第一个表格（python-docx Table）
+        docx_path: 文档路径；None（如 stdin 输入）时只在内存中构建，不写 sidecar
+        docx_bytes: 文档内容或可 seek 的二进制流（用于计算 document.xml 哈希）
+        mode: 'auto' - 读取或构建；'rebuild' - 忽略已有 sidecar；'off' - 不使用索引
+
+    Returns:
+        (index, status)，status 为 'loaded' | 'built' | 'built_unsaved' | 'off'
+    """
+    if mode == 'off':
+        return None, 'off'
+
+    document_hash = document_xml_hash(docx_bytes)
+    path = index_path(docx_path) if docx_path else None
+
+    if path and mode == 'auto':
+        index = load_index(path, document_hash)
+        if index is not None and _fits_table(table, index):
+            return index, 'loaded'
+
+    index = build_index(table, document_hash)
+    if path is None:
+        return index, 'built_unsaved'
+    try:
+        save_index(path, index)
+    except OSError:
+        return index, 'built_unsaved'
+    return index, 'built'
+
+
+def index_finder(table, index: Dict) -> Callable[[str], Optional[_Cell]]:
+    """
+    按索引中的位置查找译文单元格（不读取任何单元格文本）
+
+    index 应来自 open_index()（条目已校验、位置都在表格范围内）
+    """
+    rows = table._tbl.tr_lst
+    segments = index['segments']
+
+    def find(segment_id: str) -> Optional[_Cell]:
+        entry = segments.get(segment_id)
+        if entry is None:
+            return None
+        row_index, tc_index = entry['target']
+        return _Cell(rows[row_index].tc_lst[tc_index], table)
+
+    return find
+
+
+def segment_finder(table, index: Optional[Dict] = None,
+                   engine: str = 'docx') -> Callable[[str], Optional[_Cell]]:
+    """有索引时按索引查找，否则退回 tracked.cell_finder()"""
+    if index is not None:
+        return index_finder(table, index)
+    return cell_finder(table, engine)
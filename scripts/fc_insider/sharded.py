@@ -0,0 +1,376 @@
+"""
+分片并行更新：把一个大表格的行分成连续的几段，在多个进程中同时写入追踪修订
+
+单个上万行的表格逐行更新只用到一个核。分片模式：
+- 主进程解析 word/document.xml，把第一个表格的行按顺序切成 N 段，每段序列化后交给一个工作进程
+- 工作进程解析自己的一段，与非分片相同的 replace_cell() 写入修订
+- 主进程按原顺序把各段返回的行拼回文档
+
+修订 ID 与非分片（apply，按映射顺序依次分配，整格替换时每条成功的翻译占用两个）相同：
+工作进程先以临时 ID 写入修订并返回每条映射是否成功、写入了几个修订，主进程按映射顺序为每段
+预先分配 ID（从文档中已有的最大 w:id 之后开始），各段再写入最终 ID 并序列化。
+输出与 tracked.apply() 逐字节相同（全部映射都已有相同修订时同样原样复制 document.xml）。
+
+与工作进程的交互分三步（每步所有分片同时进行）：
+1. segment_ids - 扫描本段的 segment_id（表格中重复时与非分片一致，取最后一次出现的行）
+2. apply       - 按映射顺序写入本段的翻译，返回每条的校验结果
+3. finish      - 写入预先分配的修订 ID，返回本段序列化后的行
+
+分片边界不会落在纵向合并（vMerge）的行上，合并的单元格总在同一段内。
+document.xml 的解析、拼接和压缩仍在主进程中进行，这部分耗时不随进程数减少。
+"""
+
+import multiprocessing
+import os
+import zipfile
+from datetime import datetime
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+from docx.opc.oxml import serialize_part_xml
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from docx.table import _Cell
+from lxml import etree
+
+from .diff import check_granularity
+from .errors import DocumentError, FcInsiderError
+from .package import SourcePackage, write_patched
+from .sources import Source, write_bytes
+from .streaming import _VMERGE_PATH, W_BODY, W_TBL, W_TR, _Scope, _serialize, main_part_names
+from .tracked import (
+    TARGET_COLUMN,
+    RevisionFactory,
+    add_track_revisions,
+    first_revision_id,
+    load_translations,
+    mapping_texts,
+    replace_cell,
+    revision_date,
+    row_grid,
+)
+
+# 序列化整个文档时代替各分片行的占位（处理指令）
+_ROWS_MARKER = 'fc-insider-rows'
+
+_W_ID = qn('w:id')
+
+
+class _RecordingFactory(RevisionFactory):
+    """记录创建的每个修订元素，以便之后改写 w:id"""
+
+    def __init__(self, author: str, date_str: str):
+        super().__init__(author, date_str)
+        self.created = []
+
+    def _revision(self, prototype, revision_id: int):
+        element = RevisionFactory._revision(prototype, revision_id)
+        self.created.append(element)
+        return element
+
+
+class _Shard:
+    """
+    表格中连续的一段行（在工作进程中，或只有一段时在主进程中）
+
+    Args:
+        head: 带有表格作用域内全部命名空间声明的 <w:tbl> 开始标签
+        rows: 本段的子元素（行以及行之间的书签等）序列化后的 XML
+        first_row: 本段第一行在表格中的行索引
+    """
+
+    def __init__(self, head: bytes, rows: bytes, first_row: int,
+                 author: str, date_str: str, reading_mode: str, granularity: str = 'cell'):
+        self.table = parse_xml(head + rows + b'</w:tbl>')
+        self.first_row = first_row
+        self.author = author
+        self.date_str = date_str
+        self.reading_mode = reading_mode
+        self.granularity = granularity
+        self.factory = _RecordingFactory(author, date_str)
+        self.cells = {}
+        self.revisions = {}  # 映射序号 -> 按文档顺序写入的修订元素
+
+    def segment_ids(self) -> List[str]:
+        """扫描本段，返回按行序出现的 segment_id"""
+        above = {}
+        found = []
+        for row_index, tr in enumerate(self.table.iterchildren(W_TR), start=self.first_row):
+            grid, above = row_grid(tr, row_index, above)
+            if row_index == 0 or len(grid) <= TARGET_COLUMN:
+                continue
+            segment_id = _Cell(grid[0][0], None).text.strip()
+            if segment_id:
+                self.cells[segment_id] = grid[TARGET_COLUMN][0]
+                found.append(segment_id)
+        return found
+
+    def apply(self, translations: List[Tuple[int, str, str, str]]) -> List[Dict]:
+        """
+        按顺序写入 (映射序号, segment_id, old_text, new_text)，修订 ID 暂时为 0
+
+        Returns:
+            每条的 replace_cell() 结果
+        """
+        outcomes = []
+        created = self.factory.created
+        for number, segment_id, old_text, new_text in translations:
+            first = len(created)
+            outcome = replace_cell(_Cell(self.cells[segment_id], None), old_text, new_text,
+                                   self.author, self.date_str, 0, self.reading_mode,
+                                   self.factory, self.granularity)
+            if outcome['ok'] and not outcome['unchanged']:
+                self.revisions[number] = created[first:]
+            outcomes.append(outcome)
+        return outcomes
+
+    def finish(self, revision_ids: Dict[int, int]) -> bytes:
+        """写入预先分配的修订 ID（映射序号 -> 第一个修订的 ID），返回本段序列化后的 XML"""
+        for number, elements in self.revisions.items():
+            revision_id = revision_ids[number]
+            for offset, element in enumerate(elements):
+                element.set(_W_ID, str(revision_id + offset))
+        scope = _Scope(self.table)
+        return b''.join(_serialize(child, scope) for child in self.table)
+
+
+def _serve_shard(conn, *args) -> None:
+    """工作进程：依次执行主进程发来的步骤，出错时把异常传回主进程"""
+    try:
+        shard = _Shard(*args)
+        while True:
+            request = conn.recv()
+            if request is None:
+                break
+            step, step_args = request
+            conn.send(getattr(shard, step)(*step_args))
+    except EOFError:
+        pass
+    except Exception as e:
+        if not isinstance(e, FcInsiderError):
+            e = FcInsiderError(f"分片处理失败: {type(e).__name__}: {e}")
+        conn.send(e)
+    finally:
+        conn.close()
+
+
+class _LocalShard:
+    """只有一段时在主进程中直接执行，不启动工作进程"""
+
+    def __init__(self, *args):
+        self.shard = _Shard(*args)
+        self.result = None
+
+    def start(self, step: str, *step_args) -> None:
+        self.result = getattr(self.shard, step)(*step_args)
+
+    def result_of(self):
+        return self.result
+
+    def close(self) -> None:
+        pass
+
+
+class _RemoteShard:
+    """在工作进程中执行的一段：start() 发出请求后立即返回，result_of() 等待结果"""
+
+    def __init__(self, context, *args):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_serve_shard, args=(child,) + args, daemon=True)
+        self.process.start()
+        child.close()
+
+    def start(self, step: str, *step_args) -> None:
+        self.conn.send((step, step_args))
+
+    def result_of(self):
+        try:
+            result = self.conn.recv()
+        except EOFError:
+            raise FcInsiderError("分片工作进程意外退出") from None
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def close(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.conn.close()
+        self.process.join()
+
+
+def split_rows(table, shards: int) -> List[Tuple[int, int, int]]:
+    """
+    把表格的行切成至多 shards 段连续的子元素
+
+    分片边界只取在不含纵向合并单元格的行之前；行之间的其他元素（书签等）归入前一段。
+
+    Returns:
+        [(起始子元素序号, 结束子元素序号, 第一行的行索引), ...]；表格没有行时为 []
+    """
+    positions = [i for i, child in enumerate(table) if child.tag == W_TR]
+    if not positions:
+        return []
+
+    starts = [0]
+    for k in range(1, max(1, min(shards, len(positions)))):
+        row = max(k * len(positions) // shards, starts[-1] + 1)
+        while row < len(positions) and table[positions[row]].find(_VMERGE_PATH) is not None:
+            row += 1
+        if row < len(positions):
+            starts.append(row)
+
+    ends = starts[1:] + [None]
+    return [(positions[start], positions[end] if end is not None else positions[-1] + 1, start)
+            for start, end in zip(starts, ends)]
+
+
+def apply_sharded(
+    source: Source,
+    mappings,
+    author: str = "Translator",
+    reading_mode: str = 'auto',
+    date: Optional[datetime] = None,
+    output=None,
+    workers: Optional[int] = None,
+    granularity: str = 'cell'
+) -> Dict:
+    """
+    分片并行把翻译映射以追踪修订写入 Word 文档，输出与 tracked.apply() 相同
+
+    Args:
+        source / mappings / author / reading_mode / date / output / granularity: 同 tracked.apply()
+        workers: 分片数（工作进程数），默认 CPU 核数；为 1 时在当前进程中执行
+
+    Returns:
+        同 tracked.apply()，另含 'shards'（实际的分片数）
+    """
+    check_granularity(granularity)
+    translations = load_translations(mappings)
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise FcInsiderError(f"分片数必须为正整数: {workers}")
+
+    with SourcePackage(source) as package:
+        try:
+            archive = zipfile.ZipFile(package.stream)
+        except zipfile.BadZipFile as e:
+            raise DocumentError(f"无法打开 Word 文档: {e}") from e
+
+        with archive:
+            document_name, settings_name = main_part_names(archive)
+            if settings_name is None:
+                raise DocumentError("文档没有 settings 部件，分片模式无法启用追踪修订")
+            settings = parse_xml(archive.read(settings_name))
+            try:
+                document = parse_xml(archive.read(document_name))
+            except etree.XMLSyntaxError as e:
+                raise DocumentError(f"document.xml 解析失败: {e}") from e
+        track_changes_existed = not add_track_revisions(settings)
+        first_id = first_revision_id(document)
+
+        body = document.find(W_BODY)
+        table = body.find(W_TBL) if body is not None else None
+        if table is None:
+            raise DocumentError("文档中未找到表格")
+
+        # 各段的行交给分片，文档其余部分序列化时用占位代替
+        spans = split_rows(table, workers)
+        date_str = revision_date(date)
+        head = etree.tostring(etree.Element(W_TBL, nsmap=table.nsmap))[:-2] + b'>'
+        scope = _Scope(table)
+        shard_args = []
+        for start, end, first_row in spans:
+            rows = b''.join(_serialize(child, scope) for child in table[start:end])
+            shard_args.append((head, rows, first_row, author, date_str, reading_mode, granularity))
+        if spans:
+            table.insert(spans[0][0], etree.ProcessingInstruction(_ROWS_MARKER))
+            del table[spans[0][0] + 1:spans[-1][1] + 1]
+
+        if len(shard_args) > 1:
+            context = multiprocessing.get_context()
+            shards = [_RemoteShard(context, *args) for args in shard_args]
+        else:
+            shards = [_LocalShard(*args) for args in shard_args]
+
+        try:
+            for shard in shards:
+                shard.start('segment_ids')
+
+            # 工作进程扫描期间序列化文档的其余部分
+            outside = serialize_part_xml(document).split(
+                etree.tostring(etree.ProcessingInstruction(_ROWS_MARKER)))
+            del document, table
+
+            # 表格中重复的 segment_id 取最后一次出现的行（与非分片的 cell_finder 一致）
+            owners = {}
+            for index, shard in enumerate(shards):
+                for segment_id in shard.result_of():
+                    owners[segment_id] = index
+
+            results = []
+            assigned = [[] for _ in shards]
+            for number, translation in enumerate(translations):
+                segment_id, old_text, new_text = mapping_texts(translation)
+                results.append({'segment_id': segment_id, 'status': 'not_found',
+                                'expected': old_text, 'actual': None, 'source': None})
+                if segment_id in owners:
+                    assigned[owners[segment_id]].append(
+                        (number, segment_id, old_text, new_text))
+
+            for shard, items in zip(shards, assigned):
+                shard.start('apply', items)
+            counts = {}
+            for shard, items in zip(shards, assigned):
+                for item, outcome in zip(items, shard.result_of()):
+                    counts[item[0]] = outcome['revisions']
+                    result = results[item[0]]
+                    result['actual'] = outcome['actual']
+                    result['source'] = outcome['source']
+                    if outcome['ok']:
+                        result['status'] = 'unchanged' if outcome['unchanged'] else 'updated'
+                    else:
+                        result['status'] = 'mismatch'
+
+            # 与非分片相同：按映射顺序，每条成功的翻译占用它写入的修订数量个 ID
+            revision_ids = {}
+            revision_id = first_id
+            for number, result in enumerate(results):
+                if result['status'] == 'updated':
+                    revision_ids[number] = revision_id
+                    revision_id += counts[number]
+
+            for shard, items in zip(shards, assigned):
+                shard.start('finish', {item[0]: revision_ids[item[0]] for item in items
+                                       if item[0] in revision_ids})
+            rows = [shard.result_of() for shard in shards]
+        finally:
+            for shard in shards:
+                shard.close()
+
+        replacements = {}
+        if any(r['status'] == 'updated' for r in results):
+            replacements[document_name] = outside[0] + b''.join(rows) + b''.join(outside[1:])
+        if not track_changes_existed:
+            replacements[settings_name] = serialize_part_xml(settings)
+
+        buffer = BytesIO()
+        write_patched(package, replacements, buffer)
+
+    unchanged = sum(1 for r in results if r['status'] == 'unchanged')
+    success = sum(1 for r in results if r['status'] == 'updated') + unchanged
+    result = {
+        'success': success,
+        'unchanged': unchanged,
+        'failed': len(results) - success,
+        'revisions': revision_id - first_id,
+        'track_changes_existed': track_changes_existed,
+        'shards': len(shards),
+        'results': results,
+        'docx': buffer.getvalue()
+    }
+    if output is not None:
+        write_bytes(result['docx'], output)
+    return result
@@ -0,0 +1,50 @@
+"""
+输入来源处理
+
+库函数接受三种输入：bytes（含 bytearray / memoryview）、路径（str / PathLike）、
+二进制文件对象（有 read() 方法）
+"""
+
+import os
+from io import BytesIO
+from typing import BinaryIO, Union
+
+from .errors import FcInsiderError
+
+Source = Union[bytes, bytearray, memoryview, str, os.PathLike, BinaryIO]
+
+
+def read_bytes(source: Source) -> bytes:
+    """把任意输入来源读取为 bytes"""
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    if isinstance(source, (str, os.PathLike)):
+        try:
+            with open(source, 'rb') as f:
+                return f.read()
+        except OSError as e:
+            raise FcInsiderError(f"无法读取文件: {source} ({e})") from e
+    if hasattr(source, 'read'):
+        data = source.read()
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return data
+    raise TypeError(f"不支持的输入类型: {type(source).__name__}")
+
+
+def open_stream(source: Source) -> BinaryIO:
+    """返回可 seek 的二进制流（python-docx / MarkItDown 需要）"""
+    return BytesIO(read_bytes(source))
+
+
+def write_bytes(data: bytes, destination) -> None:
+    """把 bytes 写入路径或二进制文件对象"""
+    if isinstance(destination, (str, os.PathLike)):
+        with open(destination, 'wb') as f:
+            f.write(data)
+    elif hasattr(destination, 'write'):
+        destination.write(data)
+    else:
+        raise TypeError(f"不支持的输出类型: {type(destination).__name__}")
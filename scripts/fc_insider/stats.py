@@ -0,0 +1,60 @@
+"""
+文档统计：word/document.xml 的大小与追踪修订（<w:ins> / <w:del>）数量
+
+用于比较更新前后的文档。document.xml 分块解压、逐块计数，不整体读入内存，
+也不解析 XML（适用于流式更新输出的大文档）。
+"""
+
+import re
+import zipfile
+from typing import Dict, Union
+
+from .errors import DocumentError
+from .package import SourcePackage
+from .sources import Source
+from .streaming import main_part_names
+
+# <w:ins ...> / <w:del ...> 开始标签（不含 <w:delText>、<w:instrText>）
+_REVISION_TAG = re.compile(rb'<w:(?:ins|del)[\s/>]')
+
+# 开始标签可能跨越两块，每块末尾保留的字节数（不小于标签长度减一）
+_OVERLAP = 7
+
+# 每次从 zip 成员读取的块大小
+CHUNK_SIZE = 1024 * 1024
+
+
+def document_stats(source: Union[Source, SourcePackage]) -> Dict:
+    """
+    统计文档的 document.xml
+
+    Returns:
+        {'xml_bytes': document.xml 解压后的字节数, 'revisions': <w:ins> 与 <w:del> 的数量}
+    """
+    if not isinstance(source, SourcePackage):
+        with SourcePackage(source) as package:
+            return document_stats(package)
+
+    try:
+        archive = zipfile.ZipFile(source.stream)
+    except zipfile.BadZipFile as e:
+        raise DocumentError(f"无法打开 Word 文档: {e}") from e
+
+    with archive:
+        document_name, _ = main_part_names(archive)
+        revisions = 0
+        tail = b''
+        with archive.open(document_name) as reader:
+            while True:
+                chunk = reader.read(CHUNK_SIZE)
+                data = tail + chunk
+                if not chunk:
+                    revisions += len(_REVISION_TAG.findall(data))
+                    break
+                # 起始位置落在保留部分的标签留到下一块计数
+                limit = max(len(data) - _OVERLAP, 0)
+                revisions += sum(1 for m in _REVISION_TAG.finditer(data) if m.start() < limit)
+                tail = data[limit:]
+        xml_bytes = archive.getinfo(document_name).file_size
+
+    return {'xml_bytes': xml_bytes, 'revisions': revisions}
@@ -0,0 +1,81 @@
+"""
+命令行脚本的标准输入/输出支持
+
+路径参数为 "-" 时：输入从 stdin 读取，输出写入 stdout。
+stdout 承载数据时，进度信息改为输出到 stderr，避免混入数据流。
+
+仅供命令行脚本使用；库函数本身不读写 stdin/stdout。
+"""
+
+import sys
+from typing import Optional
+
+STDIO_PATH = '-'
+
+
+def is_stdio(path: Optional[str]) -> bool:
+    """路径是否表示 stdin/stdout"""
+    return path == STDIO_PATH
+
+
+def display_name(path: str, stream: str = 'stdin') -> str:
+    """用于进度信息的名称"""
+    return f"<{stream}>" if is_stdio(path) else path
+
+
+def read_input_bytes(path: str) -> bytes:
+    """
+    读取输入为 bytes
+
+    stdin 一次读入，得到的 bytes 直接交给 BytesIO（CPython 中共享同一块内存，不会再复制）
+    """
+    if is_stdio(path):
+        return sys.stdin.buffer.read()
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def read_input_text(path: str) -> str:
+    """读取 UTF-8 文本输入"""
+    return read_input_bytes(path).decode('utf-8')
+
+
+def write_output_bytes(path: str, data: bytes) -> None:
+    """写出 bytes；stdout 使用进程原始的 stdout（不受 progress_to_stderr 影响）"""
+    if is_stdio(path):
+        stream = sys.__stdout__.buffer
+        stream.write(data)
+        stream.flush()
+    else:
+        with open(path, 'wb') as f:
+            f.write(data)
+
+
+def write_output_text(path: str, text: str) -> None:
+    """写出 UTF-8 文本"""
+    write_output_bytes(path, text.encode('utf-8'))
+
+
+def progress_to_stderr(*output_paths: Optional[str]) -> bool:
+    """
+    任一输出为 stdout 时，把 print 的进度信息改到 stderr
+
+    Returns:
+        是否已切换
+    """
+    if any(is_stdio(path) for path in output_paths):
+        sys.stdout = sys.stderr
+        return True
+    return False
+
+
+def check_single_stdin(*input_paths: Optional[str]) -> Optional[str]:
+    """
+    stdin 只能提供一个输入
+
+    Returns:
+        错误信息；没有冲突时返回 None
+    """
+    if sum(1 for path in input_paths if is_stdio(path)) > 1:
+        return "只能有一个输入使用 \"-\"（stdin）"
+    return None
@@ -0,0 +1,482 @@
+"""
+流式更新：逐行读取、改写并写出 word/document.xml，内存占用与文档大小无关
+
+python-docx 会把整个 document.xml 解析为一棵树（外加代理对象），数百 MB 的目录文档
+更新时内存会达到数 GB。流式模式用 XMLPullParser 增量解析：
+- w:document、w:body 和正文中的 w:tbl 只写出起止标签
+- 其余正文元素和表格的每一行在解析完成后立即序列化写出，随后从树中释放
+- 第一个表格中有映射的行，在写出前就地写入追踪修订（与非流式相同的 replace_cell）
+
+输出直接压缩写入输出 zip 的 document.xml 成员（fc_insider.package，data descriptor），
+其余成员原样复制。内存峰值取决于最大的一行，而不是整个文档。
+
+与非流式（apply）的差异：
+- 修订 ID 按表格中的行序分配（非流式按映射顺序）；映射与表格顺序一致时输出完全相同
+- 全部映射都已有相同修订时 document.xml 仍重新写出（非流式原样复制）
+- 表格中 segment_id 重复时更新第一次出现的行（非流式为最后一次）
+- 纵向合并（vMerge）的行会暂存到合并结束后再写出
+
+iter_table_rows() 用同样的增量解析只读取表格行（流水线模式的提取阶段），不写出文档。
+"""
+
+import os
+import posixpath
+import re
+import zipfile
+from datetime import datetime
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.oxml import serialize_part_xml
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from docx.oxml.parser import element_class_lookup
+from docx.table import _Cell
+from lxml import etree
+
+from .diff import check_granularity
+from .errors import DocumentError, FcInsiderError
+from .package import SourcePackage, write_patched
+from .sources import Source
+from .tracked import (
+    FIRST_REVISION_ID,
+    TARGET_COLUMN,
+    RevisionFactory,
+    add_track_revisions,
+    load_translations,
+    mapping_texts,
+    read_cell_text,
+    replace_cell,
+    revision_date,
+    row_grid,
+)
+
+# 与 python-docx 保存时相同的 XML 声明
+XML_DECLARATION = b"<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+
+# 每次从 zip 成员读取、向输出产出的块大小
+CHUNK_SIZE = 64 * 1024
+
+_PACKAGE_RELS = '_rels/.rels'
+
+W_BODY = qn('w:body')
+W_TBL = qn('w:tbl')
+W_TR = qn('w:tr')
+_VMERGE_PATH = '/'.join(qn(tag) for tag in ('w:tc', 'w:tcPr', 'w:vMerge'))
+
+# 序列化结果中的开始标签名与紧随其后的命名空间声明
+_TAG_NAME = re.compile(rb'<[^\s/>]+')
+_DECLARATION = re.compile(rb' xmlns(?::[^=\s]+)?="[^"]*"')
+_DECLARATIONS = re.compile(rb'(?: xmlns(?::[^=\s]+)?="[^"]*")+')
+
+# w:id 属性（修订、批注、书签）
+_W_ID = re.compile(rb'\sw:id="(\d+)"')
+
+
+def part_targets(archive: zipfile.ZipFile, rels_name: str, base: str) -> Dict[str, str]:
+    """关系文件中各关系类型的第一个内部目标（成员名）；关系文件不存在时返回空 dict"""
+    try:
+        rels = etree.fromstring(archive.read(rels_name))
+    except KeyError:
+        return {}
+    found = {}
+    for rel in rels:
+        target = rel.get('Target', '')
+        if rel.get('TargetMode') == 'External':
+            continue
+        path = target.lstrip('/') if target.startswith('/') else posixpath.join(base, target)
+        found.setdefault(rel.get('Type'), posixpath.normpath(path))
+    return found
+
+
+def document_part_targets(archive: zipfile.ZipFile, document_name: str) -> Dict[str, str]:
+    """主文档关系文件中的目标（settings、styles 等部件的成员名）"""
+    base, name = posixpath.split(document_name)
+    return part_targets(archive, posixpath.join(base, '_rels', name + '.rels'), base)
+
+
+def main_part_names(archive: zipfile.ZipFile) -> Tuple[str, Optional[str]]:
+    """
+    按关系文件找到主文档和 settings 部件的成员名
+
+    Returns:
+        (document 成员名, settings 成员名或 None)
+    """
+    document_name = part_targets(archive, _PACKAGE_RELS, '').get(RT.OFFICE_DOCUMENT)
+    if document_name is None:
+        raise DocumentError("不是 Word 文档（未找到主文档部件）")
+    return document_name, document_part_targets(archive, document_name).get(RT.SETTINGS)
+
+
+class _TableState:
+    """正文中一个 w:tbl 的逐行状态"""
+
+    def __init__(self, element, update: bool):
+        self.element = element
+        self.update = update
+        self.row_index = 0
+        self.above = {}
+        self.held = 0  # 纵向合并尚未结束、暂不写出的行数（表格开头的子元素）
+
+
+class _Scope:
+    """
+    容器元素作用域内的命名空间声明
+
+    单独序列化子元素时，lxml 会在其开始标签中紧跟标签名重复写出所有作用域内的声明；
+    写出前去掉这些已由祖先声明的部分。同一作用域下这段声明通常每次都相同，结果按原文缓存。
+    """
+
+    def __init__(self, element=None):
+        nsmap = element.nsmap if element is not None else {}
+        self.declarations = frozenset(
+            (f' xmlns:{prefix}="{uri}"' if prefix else f' xmlns="{uri}"').encode('utf-8')
+            for prefix, uri in nsmap.items())
+        self._stripped = {}
+
+    def strip(self, block: bytes) -> bytes:
+        stripped = self._stripped.get(block)
+        if stripped is None:
+            stripped = b''.join(declaration for declaration in _DECLARATION.findall(block)
+                                if declaration not in self.declarations)
+            self._stripped[block] = stripped
+        return stripped
+
+
+def _serialize(element, scope: _Scope) -> bytes:
+    """序列化元素，去掉开始标签中已由祖先声明的命名空间"""
+    data = etree.tostring(element, encoding='UTF-8', xml_declaration=False, with_tail=False)
+    match = _DECLARATIONS.match(data, _TAG_NAME.match(data).end())
+    if match is None:
+        return data
+    return data[:match.start()] + scope.strip(match.group()) + data[match.end():]
+
+
+def _open_tag(element, scope: _Scope) -> bytes:
+    """容器元素的开始标签（只含属性和本元素新增的命名空间声明）"""
+    shallow = etree.Element(element.tag, dict(element.attrib), nsmap=element.nsmap)
+    return _serialize(shallow, scope)[:-2] + b'>'
+
+
+def _close_tag(element) -> bytes:
+    local = etree.QName(element).localname
+    return (f'</{element.prefix}:{local}>' if element.prefix else f'</{local}>').encode('utf-8')
+
+
+def iter_transformed(reader, update_cell: Callable[[str, _Cell], None],
+                     chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    逐块产出改写后的 document.xml
+
+    解析器只为 w:body、w:tbl、w:tr 产生事件（其余元素不创建 Python 代理对象）；
+    其他已解析完成的元素在这些事件之间按文档顺序写出并从树中删除。
+
+    Args:
+        reader: document.xml 的二进制流（如 ZipFile.open() 的返回值）
+        update_cell: 第一个表格中每个数据行调用一次：update_cell(segment_id, 译文单元格)，
+                     可就地修改单元格
+    """
+    parser = etree.XMLPullParser(events=('start', 'end'), tag=(W_BODY, W_TBL, W_TR),
+                                 remove_blank_text=True, resolve_entities=False)
+    parser.set_element_class_lookup(element_class_lookup)
+
+    root = body = table = None
+    root_scope = body_scope = None
+    table_count = 0
+    out = [XML_DECLARATION]
+    size = len(XML_DECLARATION)
+
+    def write(data: bytes) -> None:
+        nonlocal size
+        out.append(data)
+        size += len(data)
+
+    def flush(parent, count: int, scope: _Scope) -> None:
+        """写出 parent 开头的 count 个子元素并从树中删除"""
+        for child in parent[:count]:
+            write(_serialize(child, scope))
+        del parent[:count]
+
+    def preceding(parent, element) -> int:
+        """element 在 parent 中的位置（之前的子元素都已解析完成）"""
+        for index, child in enumerate(parent):
+            if child is element:
+                return index
+        return len(parent)
+
+    def end_row(tr) -> None:
+        position = preceding(table.element, tr)
+        if position > table.held:
+            # 行之间有其他元素（书签等）：连同暂存的行一起按顺序写出
+            flush(table.element, position, body_scope)
+            table.held = 0
+
+        grid, table.above = row_grid(tr, table.row_index, table.above)
+        if table.update and table.row_index > 0 and len(grid) > TARGET_COLUMN:
+            segment_id = _Cell(grid[0][0], None).text.strip()
+            if segment_id:
+                update_cell(segment_id, _Cell(grid[TARGET_COLUMN][0], None))
+        table.row_index += 1
+
+        # 纵向合并的单元格可能引用前面的行，合并结束后再一起写出
+        table.held += 1
+        if tr.find(_VMERGE_PATH) is None:
+            flush(table.element, table.held, body_scope)
+            table.held = 0
+
+    def handle(event: str, element) -> None:
+        nonlocal root, body, table, table_count, root_scope, body_scope
+        tag = element.tag
+
+        if tag == W_BODY:
+            if element.getparent() is not element.getroottree().getroot():
+                return
+            if event == 'start':
+                root = element.getparent()
+                write(_open_tag(root, _Scope()))
+                root_scope = _Scope(root)
+                flush(root, preceding(root, element), root_scope)
+                write(_open_tag(element, root_scope))
+                body = element
+                body_scope = _Scope(element)
+            else:
+                flush(body, len(body), body_scope)
+                write(_close_tag(body))
+                del root[0]
+                body = None
+            return
+
+        if tag == W_TBL:
+            if body is None or element.getparent() is not body:
+                return
+            if event == 'start':
+                flush(body, preceding(body, element), body_scope)
+                write(_open_tag(element, body_scope))
+                table = _TableState(element, update=table_count == 0)
+                table_count += 1
+            else:
+                flush(element, len(element), body_scope)
+                write(_close_tag(element))
+                del body[0]
+                table = None
+            return
+
+        if event == 'end' and table is not None and element.getparent() is table.element:
+            end_row(element)
+
+    try:
+        while True:
+            chunk = reader.read(chunk_size)
+            if chunk:
+                parser.feed(chunk)
+            else:
+                parser.close()
+
+            for event, element in parser.read_events():
+                handle(event, element)
+
+            # 表格之外：正文中除最后一个（可能尚未解析完）以外的元素都可以写出
+            if body is not None and table is None and len(body) > 1:
+                flush(body, len(body) - 1, body_scope)
+
+            if size >= chunk_size or not chunk:
+                if not chunk:
+                    if root is None:
+                        raise DocumentError("document.xml 中没有 w:body")
+                    flush(root, len(root), root_scope)
+                    write(_close_tag(root))
+                yield b''.join(out)
+                out.clear()
+                size = 0
+            if not chunk:
+                break
+    except etree.XMLSyntaxError as e:
+        raise DocumentError(f"document.xml 解析失败: {e}") from e
+
+
+def iter_table_rows(source: Source, reading_mode: str = 'auto',
+                    chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, str]]:
+    """
+    增量解析 document.xml，逐行产出第一个表格的数据行（不经过 MarkItDown）
+
+    每一行解析完成即产出，随后从树中释放；第一个表格结束后停止读取。
+    译文列按 reading_mode 读取（tracked.read_cell_text()，与更新时校验旧译文的读法相同），
+    其余列为单元格文本。
+
+    Yields:
+        {'segment_id', 'status', 'source', 'target'}（同 extraction.extract() 的 rows）
+    """
+    parser = etree.XMLPullParser(events=('start', 'end'), tag=(W_BODY, W_TBL, W_TR),
+                                 remove_blank_text=True, resolve_entities=False)
+    parser.set_element_class_lookup(element_class_lookup)
+
+    with SourcePackage(source) as package:
+        try:
+            archive = zipfile.ZipFile(package.stream)
+        except zipfile.BadZipFile as e:
+            raise DocumentError(f"无法打开 Word 文档: {e}") from e
+
+        with archive:
+            document_name, _ = main_part_names(archive)
+            with archive.open(document_name) as reader:
+                table = None
+                row_index = 0
+                above = {}
+                try:
+                    while True:
+                        chunk = reader.read(chunk_size)
+                        if chunk:
+                            parser.feed(chunk)
+                        else:
+                            parser.close()
+
+                        for event, element in parser.read_events():
+                            parent = element.getparent()
+                            if element.tag == W_TBL:
+                                if parent is None or parent.tag != W_BODY:
+                                    continue
+                                if event == 'start' and table is None:
+                                    table = element
+                                elif event == 'end' and element is table:
+                                    return
+                                continue
+                            if element.tag != W_TR or event != 'end' or parent is not table:
+                                continue
+
+                            grid, above = row_grid(element, row_index, above)
+                            if row_index > 0 and len(grid) > TARGET_COLUMN:
+                                segment_id = _Cell(grid[0][0], None).text.strip()
+                                if segment_id:
+                                    target, _ = read_cell_text(_Cell(grid[TARGET_COLUMN][0], None),
+                                                               reading_mode)
+                                    yield {
+                                        'segment_id': segment_id,
+                                        'status': _Cell(grid[1][0], None).text.strip(),
+                                        'source': _Cell(grid[2][0], None).text.strip(),
+                                        'target': target
+                                    }
+                            row_index += 1
+                            # 已读取的行从树中释放（纵向合并引用的单元格由 above 保留）
+                            del table[:table.index(element) + 1]
+
+                        if not chunk:
+                            return
+                except etree.XMLSyntaxError as e:
+                    raise DocumentError(f"document.xml 解析失败: {e}") from e
+
+
+def scan_first_revision_id(reader, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    逐块扫描 document.xml（不解析 XML），返回新修订的起始 ID（同 tracked.first_revision_id()）
+    """
+    highest = 0
+    tail = b''
+    while True:
+        chunk = reader.read(chunk_size)
+        data = tail + chunk
+        # 属性不会跨越标签：最后一个 '<' 之后的部分留到下一块
+        end = data.rfind(b'<') if chunk else len(data)
+        for match in _W_ID.finditer(data, 0, max(end, 0)):
+            highest = max(highest, int(match.group(1)))
+        if not chunk:
+            return max(FIRST_REVISION_ID, highest + 1)
+        tail = data[max(end, 0):]
+
+
+def apply_streaming(
+    source: Source,
+    mappings,
+    output,
+    author: str = "Translator",
+    reading_mode: str = 'auto',
+    date: Optional[datetime] = None,
+    granularity: str = 'cell'
+) -> Dict:
+    """
+    流式把翻译映射以追踪修订写入 Word 文档，直接写出到 output
+
+    Args:
+        source: 输入 Word 文档（路径以 mmap 读取；bytes / 文件对象）
+        mappings: 翻译映射列表、{'translations': [...]}，或映射 JSON 文件
+        output: 输出路径或可写的二进制文件对象（不要求可 seek，可以是 stdout）
+        author / reading_mode / date / granularity: 同 tracked.apply()
+
+    Returns:
+        同 tracked.apply_to_document()，另含 'rows'（第一个表格中带 segment_id 的数据行数）
+    """
+    check_granularity(granularity)
+    translations = load_translations(mappings)
+
+    if isinstance(output, (str, os.PathLike)) and isinstance(source, (str, os.PathLike)) \
+            and os.path.exists(output) and os.path.samefile(source, output):
+        raise FcInsiderError("流式更新的输出不能覆盖输入文件")
+
+    results = []
+    pending = {}  # segment_id -> [(result, old_text, new_text), ...]，按映射顺序
+    for translation in translations:
+        segment_id, old_text, new_text = mapping_texts(translation)
+        result = {'segment_id': segment_id, 'status': 'not_found',
+                  'expected': old_text, 'actual': None, 'source': None}
+        results.append(result)
+        if segment_id:
+            pending.setdefault(segment_id, []).append((result, old_text, new_text))
+
+    date_str = revision_date(date)
+    factory = RevisionFactory(author, date_str)
+    first_id = revision_id = FIRST_REVISION_ID
+    rows = 0
+
+    def update_cell(segment_id: str, cell: _Cell) -> None:
+        nonlocal revision_id, rows
+        rows += 1
+        for result, old_text, new_text in pending.pop(segment_id, ()):
+            outcome = replace_cell(cell, old_text, new_text, author, date_str,
+                                   revision_id, reading_mode, factory, granularity)
+            result['actual'] = outcome['actual']
+            result['source'] = outcome['source']
+            if outcome['ok']:
+                result['status'] = 'unchanged' if outcome['unchanged'] else 'updated'
+                revision_id += outcome['revisions']
+            else:
+                result['status'] = 'mismatch'
+
+    with SourcePackage(source) as package:
+        try:
+            archive = zipfile.ZipFile(package.stream)
+        except zipfile.BadZipFile as e:
+            raise DocumentError(f"无法打开 Word 文档: {e}") from e
+
+        with archive:
+            document_name, settings_name = main_part_names(archive)
+            if settings_name is None:
+                raise DocumentError("文档没有 settings 部件，流式模式无法启用追踪修订")
+
+            settings = parse_xml(archive.read(settings_name))
+            track_changes_existed = not add_track_revisions(settings)
+
+            # 新修订的 ID 从已有的最大 w:id 之后开始，写出前先扫描一遍
+            with archive.open(document_name) as reader:
+                first_id = revision_id = scan_first_revision_id(reader)
+
+            with archive.open(document_name) as reader:
+                replacements = {document_name: iter_transformed(reader, update_cell)}
+                if not track_changes_existed:
+                    replacements[settings_name] = serialize_part_xml(settings)
+
+                if isinstance(output, (str, os.PathLike)):
+                    with open(output, 'wb') as f:
+                        write_patched(package, replacements, f)
+                else:
+                    write_patched(package, replacements, output)
+
+    unchanged = sum(1 for r in results if r['status'] == 'unchanged')
+    success = sum(1 for r in results if r['status'] == 'updated') + unchanged
+    return {
+        'success': success,
+        'unchanged': unchanged,
+        'failed': len(results) - success,
+        'revisions': revision_id - first_id,
+        'track_changes_existed': track_changes_existed,
+        'rows': rows,
+        'results': results
+    }
@@ -0,0 +1,961 @@
+"""
+追踪修订更新：把翻译映射以 <w:del>/<w:ins> 追踪修订写入 Word 表格
+
+单元格可能已经包含追踪修订（<w:del> 和 <w:ins>），python-docx 的 paragraph.runs
+读不到其中的 runs，因此读取时直接解析 XML：
+- read_deleted - 读取删除的文本（<w:delText>；本工具整格替换写入的 <w:del> 中为 <w:t>）
+- read_inserted - 读取插入的文本（<w:t> in <w:ins>）
+- auto - 先读普通文本，再依次尝试删除、插入的文本
+
+软换行（<w:br/>）在三种模式中都读作 \n（与 python-docx 的 cell.text 一致）。
+MarkItDown 提取时把软换行变成空格，因此比较时换行与空格视为相同；写入修订时
+含换行的文本在 <w:delText> / <w:t> 之间插入 <w:br/>，一次更新即可处理换行。
+
+差异粒度（granularity，见 fc_insider.diff）：
+- cell - 清空单元格，写入一对 <w:del>(旧译文) / <w:ins>(新译文)
+- word / char - 只在改动的片段前后写入修订，未改动的 run 及其格式原样保留
+
+重复运行同一映射时，已含相同修订（修订前为 old_text、接受后为 new_text）的单元格跳过，
+XML 不变；新修订的 ID 从文档中已有的最大 w:id 之后分配，不与已有修订重复。
+
+定位目标单元格有两种引擎（输出 XML 完全相同）：
+- docx - python-docx 表格模型：table.rows[i].cells[3]，每次访问都重建全部行对象，O(n²)
+- lxml - 单次遍历 w:tbl 构建 segment_id -> w:tc 映射，直接在这些元素上写入修订
+"""
+
+import json
+import re
+from copy import deepcopy
+from datetime import datetime
+from io import BytesIO
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from docx import Document
+from docx.oxml import parse_xml
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.ns import nsdecls, qn
+from docx.table import _Cell
+
+from .diff import check_granularity, diff_opcodes
+from .errors import DocumentError, FcInsiderError, MappingError
+from .package import SourcePackage, save_document
+from .sources import Source, open_stream, read_bytes, write_bytes
+
+# 修订 ID 起始值，每条翻译占用两个（删除 + 插入）；文档中已有更大的 w:id 时从其后开始
+FIRST_REVISION_ID = 1000
+
+# 目标单元格定位引擎
+ENGINES = ('docx', 'lxml')
+
+# 译文所在列（Segment ID | Segment status | Source segment | Target segment）
+TARGET_COLUMN = 3
+
+
+W_BR = qn('w:br')
+W_CR = qn('w:cr')
+W_TAB = qn('w:tab')
+W_T = qn('w:t')
+W_DEL_TEXT = qn('w:delText')
+W_R = qn('w:r')
+W_DEL = qn('w:del')
+W_INS = qn('w:ins')
+W_RPR = qn('w:rPr')
+W_PPR = qn('w:pPr')
+
+# 按差异写入修订时随 run 一起保留的段落子元素（拼写检查标记 w:proofErr 丢弃）
+_KEPT_MARKERS = frozenset((qn('w:bookmarkStart'), qn('w:bookmarkEnd')))
+_PROOF_ERR = qn('w:proofErr')
+_XML_SPACE = qn('xml:space')
+
+# 读取模式 -> (与普通 run 一起读取的修订, 其中的文本元素)
+# 整格替换写入的 <w:del> 中是 <w:t>（与 paragraph.add_run() 相同），删除的文本两者都读
+_DELETED_TEXT = (W_DEL_TEXT, W_T)
+_REVISION_VIEWS = {
+    'read_deleted': (W_DEL, _DELETED_TEXT),
+    'read_inserted': (W_INS, (W_T,)),
+}
+
+# 比较时视为与一个空格相同的换行（连同两侧的空格、制表符）
+_LINEBREAK = re.compile(r'[ \t]*\n[ \t]*')
+
+
+def revision_text(revision, *text_tags: str) -> str:
+    """
+    修订元素（<w:del> / <w:ins>）中的文本，按文档顺序读取
+
+    text_tags 为 w:delText 和/或 w:t；<w:br/>、<w:cr/> 读作 \n，<w:tab/> 读作 \t
+    （与 python-docx 的 run.text 相同，分页、分栏符不产生文本）
+    """
+    parts = []
+    for child in revision.iter(*text_tags, W_BR, W_CR, W_TAB):
+        if child.tag in text_tags:
+            if child.text:
+                parts.append(child.text)
+        elif child.tag == W_TAB:
+            parts.append('\t')
+        elif child.tag == W_CR or child.get(qn('w:type'), 'textWrapping') == 'textWrapping':
+            parts.append('\n')
+    return ''.join(parts)
+
+
+def texts_match(actual: str, expected: str) -> bool:
+    """
+    单元格文本与映射中的 old_text 是否一致
+
+    换行（连同两侧空白）与一个空格视为相同：MarkItDown 提取的表格中软换行是空格
+    """
+    if actual == expected:
+        return True
+    if '\n' not in actual and '\n' not in expected:
+        return False
+    return _LINEBREAK.sub(' ', actual) == _LINEBREAK.sub(' ', expected)
+
+
+def get_cell_text_from_tracked_changes(cell, mode: str = 'read_deleted') -> str:
+    """
+    从追踪修订中读取文本
+
+    段落中同时有普通 run 与修订（如按差异写入的修订）时，普通 run 的文本按文档顺序一并读取：
+    read_deleted 得到修订前的文本，read_inserted 得到接受修订后的文本
+
+    Args:
+        mode: 'read_deleted' - 读取删除的文本
+              'read_inserted' - 读取插入的文本
+              'read_both' - 读取两者（先删除，后插入）
+    """
+    text_parts = []
+
+    for paragraph in cell.paragraphs:
+        para_element = paragraph._element
+
+        if mode in _REVISION_VIEWS and para_element.find(W_R) is not None and (
+                para_element.find(W_DEL) is not None or para_element.find(W_INS) is not None):
+            kept, text_tags = _REVISION_VIEWS[mode]
+            for child in para_element:
+                if child.tag == W_R:
+                    text_parts.append(revision_text(child, W_T))
+                elif child.tag == kept:
+                    text_parts.append(revision_text(child, *text_tags))
+            continue
+
+        if mode == 'read_deleted' or mode == 'read_both':
+            # <w:del> 中的 <w:delText>（或 <w:t>）和换行
+            for del_elem in para_element.findall(qn('w:del')):
+                text_parts.append(revision_text(del_elem, *_DELETED_TEXT))
+
+        if mode == 'read_inserted' or mode == 'read_both':
+            # <w:ins> 中的 <w:t> 和换行
+            for ins_elem in para_element.findall(qn('w:ins')):
+                text_parts.append(revision_text(ins_elem, W_T))
+
+    return ''.join(text_parts).strip()
+
+
+def has_tracked_changes(cell) -> bool:
+    """单元格的段落中是否有 <w:del> / <w:ins>"""
+    return any(p.find(W_DEL) is not None or p.find(W_INS) is not None
+               for p in cell._tc.p_lst)
+
+
+def has_identical_revision(cell, old_text: str, new_text: str) -> bool:
+    """
+    单元格是否已含与本次相同的修订：修订前的文本为 old_text、接受修订后的文本为 new_text
+
+    用于重复运行同一映射时跳过已更新的单元格（比较方式同 texts_match()）
+    """
+    if not has_tracked_changes(cell):
+        return False
+    original, accepted = _revision_texts(cell)
+    return texts_match(original, old_text) and texts_match(accepted, new_text)
+
+
+def _revision_texts(cell) -> Tuple[str, str]:
+    """
+    一次遍历读取（修订前的文本, 接受修订后的文本），普通 run 计入两者
+    """
+    original = []
+    accepted = []
+    for paragraph in cell._tc.p_lst:
+        for child in paragraph:
+            if child.tag == W_R:
+                text = revision_text(child, W_T)
+                original.append(text)
+                accepted.append(text)
+            elif child.tag == W_DEL:
+                original.append(revision_text(child, *_DELETED_TEXT))
+            elif child.tag == W_INS:
+                accepted.append(revision_text(child, W_T))
+    return ''.join(original).strip(), ''.join(accepted).strip()
+
+
+def get_cell_text_normal_or_tracked(cell) -> Tuple[str, str]:
+    """
+    智能读取单元格文本
+
+    单元格中有追踪修订时，普通文本不完整（不含修订中的文本），改为读取修订前的文本
+
+    返回: (text, source)
+        text: 读取到的文本
+        source: 'normal' | 'deleted' | 'inserted' | 'empty'
+    """
+    # 先尝试普通读取
+    normal_text = cell.text.strip()
+    if normal_text and not has_tracked_changes(cell):
+        return (normal_text, 'normal')
+
+    # 尝试从追踪修订读取
+    deleted_text = get_cell_text_from_tracked_changes(cell, 'read_deleted')
+    if deleted_text:
+        return (deleted_text, 'deleted')
+
+    inserted_text = get_cell_text_from_tracked_changes(cell, 'read_inserted')
+    if inserted_text:
+        return (inserted_text, 'inserted')
+
+    if normal_text:
+        return (normal_text, 'normal')
+    return ('', 'empty')
+
+
+def read_cell_text(cell, reading_mode: str = 'auto') -> Tuple[str, str]:
+    """
+    按读取模式读取单元格文本
+
+    Returns:
+        (text, source)
+    """
+    if reading_mode == 'auto':
+        return get_cell_text_normal_or_tracked(cell)
+    text = get_cell_text_from_tracked_changes(cell, reading_mode)
+    return (text, reading_mode.replace('read_', ''))
+
+
+def clear_cell_tracked_changes(cell):
+    """
+    清除单元格中的所有追踪修订标记
+
+    保留实际内容，移除 <w:del> 和 <w:ins> 包装
+    """
+    for paragraph in cell.paragraphs:
+        para_element = paragraph._element
+
+        # 处理 <w:del> - 完全移除
+        for del_elem in para_element.findall(qn('w:del')):
+            para_element.remove(del_elem)
+
+        # 处理 <w:ins> - 移除包装，保留内容
+        for ins_elem in para_element.findall(qn('w:ins')):
+            # 将 <w:ins> 中的 <w:r> 移到段落级别
+            insert_position = para_element.index(ins_elem)
+
+            for run in ins_elem.findall(qn('w:r')):
+                ins_elem.remove(run)
+                para_element.insert(insert_position, run)
+                insert_position += 1
+
+            # 移除空的 <w:ins>
+            para_element.remove(ins_elem)
+
+
+def reject_cell_tracked_changes(cell):
+    """
+    拒绝单元格中的所有追踪修订
+
+    移除 <w:ins> 及其内容，<w:del> 中的 run 移回段落（<w:delText> 改回 <w:t>）
+    """
+    for paragraph in cell.paragraphs:
+        para_element = paragraph._element
+
+        for ins_elem in para_element.findall(W_INS):
+            para_element.remove(ins_elem)
+
+        for del_elem in para_element.findall(W_DEL):
+            insert_position = para_element.index(del_elem)
+            for run in del_elem.findall(W_R):
+                for text_element in run.iter(W_DEL_TEXT):
+                    text_element.tag = W_T
+                para_element.insert(insert_position, run)
+                insert_position += 1
+            para_element.remove(del_elem)
+
+
+def has_track_changes_enabled(doc) -> bool:
+    """检查文档是否已启用追踪修订"""
+    try:
+        return doc.settings.element.find(qn('w:trackRevisions')) is not None
+    except Exception:
+        return False
+
+
+def enable_track_changes(doc):
+    """启用文档层级的追踪修订"""
+    add_track_revisions(doc.settings.element)
+
+
+def add_track_revisions(settings) -> bool:
+    """
+    在 w:settings 元素中加入 <w:trackRevisions/>
+
+    Returns:
+        是否新加入（已存在时返回 False，元素不变）
+    """
+    if settings.find(qn('w:trackRevisions')) is not None:
+        return False
+    settings.append(parse_xml('<w:trackRevisions {} />'.format(
+        'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    )))
+    return True
+
+
+# paragraph.add_run() 中会被转换为 <w:tab/> / <w:br/> 的字符
+_RUN_SPECIAL_CHARS = frozenset('\t\r\n')
+
+# RevisionFactory.text_run() 中写为 <w:tab/> / <w:br/> 的字符
+_RUN_SPECIAL = re.compile(r'(\t|\n)')
+
+
+class RevisionFactory:
+    """
+    修订元素工厂
+
+    带命名空间的 <w:del> / <w:ins> 原型只解析一次（作者与日期直接写在原型上），
+    每个修订 deepcopy 原型后只赋值 w:id 和文本：热循环中不调用 XML 解析器，
+    文本与属性由 lxml 负责转义。
+    """
+
+    def __init__(self, author: str, date_str: str):
+        w = nsdecls('w')
+        revision = 'w:id="" w:author="" w:date=""'
+        self._del = parse_xml(f'<w:del {w} {revision}/>')
+        self._ins = parse_xml(f'<w:ins {w} {revision}/>')
+        self._del_text = parse_xml(f'<w:del {w} {revision}><w:r><w:t/></w:r></w:del>')
+        self._ins_text = parse_xml(
+            f'<w:ins {w} {revision}><w:r><w:t xml:space="preserve"/></w:r></w:ins>')
+        self._del_linebreak_text = parse_xml(
+            f'<w:del {w} {revision}><w:r><w:delText xml:space="preserve"/></w:r></w:del>')
+        for prototype in (self._del, self._ins, self._del_text, self._ins_text,
+                          self._del_linebreak_text):
+            prototype.set(qn('w:author'), author)
+            prototype.set(qn('w:date'), date_str)
+
+        self._run = parse_xml(f'<w:r {w}/>')
+        self._t = parse_xml(f'<w:t {w} xml:space="preserve"/>')
+        self._delText = parse_xml(f'<w:delText {w} xml:space="preserve"/>')
+        self._br = parse_xml(f'<w:br {w}/>')
+        self._tab = parse_xml(f'<w:tab {w}/>')
+
+    @staticmethod
+    def _revision(prototype, revision_id: int):
+        element = deepcopy(prototype)
+        element.set(qn('w:id'), str(revision_id))
+        return element
+
+    def deletion(self, revision_id: int, text: str):
+        """
+        <w:del>，其中的 run 与 paragraph.add_run(text) 相同
+
+        （\t、\n 转为 <w:tab/>、<w:br/>；首尾有空白时 <w:t> 带 xml:space="preserve"）
+        """
+        if not text or not _RUN_SPECIAL_CHARS.isdisjoint(text):
+            element = self._revision(self._del, revision_id)
+            run = deepcopy(self._run)
+            if text:
+                run.text = text
+            element.append(run)
+            return element
+
+        element = self._revision(self._del_text, revision_id)
+        t = element[0][0]
+        t.text = text
+        if len(text.strip()) < len(text):
+            t.set(qn('xml:space'), 'preserve')
+        return element
+
+    def insertion(self, revision_id: int, text: str):
+        """<w:ins><w:r><w:t xml:space="preserve">text</w:t></w:r></w:ins>"""
+        element = self._revision(self._ins_text, revision_id)
+        element[0][0].text = text
+        return element
+
+    def linebreak_deletion(self, revision_id: int, text: str):
+        """<w:del>，文本按 \n 分段写入 <w:delText>，段之间插入 <w:br/>"""
+        if text and '\n' not in text:
+            element = self._revision(self._del_linebreak_text, revision_id)
+            element[0][0].text = text
+            return element
+        element = self._revision(self._del, revision_id)
+        element.append(self._linebreak_run(text, self._delText))
+        return element
+
+    def linebreak_insertion(self, revision_id: int, text: str):
+        """<w:ins>，文本按 \n 分段写入 <w:t>，段之间插入 <w:br/>"""
+        if text and '\n' not in text:
+            return self.insertion(revision_id, text)
+        element = self._revision(self._ins, revision_id)
+        element.append(self._linebreak_run(text, self._t))
+        return element
+
+    def empty_deletion(self, revision_id: int):
+        """不含 run 的 <w:del>"""
+        return self._revision(self._del, revision_id)
+
+    def empty_insertion(self, revision_id: int):
+        """不含 run 的 <w:ins>"""
+        return self._revision(self._ins, revision_id)
+
+    def text_run(self, text: str, rpr=None, deleted: bool = False):
+        """
+        带格式（rpr 的副本）的 run：\t、\n 写为 <w:tab/>、<w:br/>，
+        其余文本写入 <w:t>（deleted 时为 <w:delText>）
+        """
+        run = deepcopy(self._run)
+        if rpr is not None:
+            run.append(deepcopy(rpr))
+        text_prototype = self._delText if deleted else self._t
+        for part in _RUN_SPECIAL.split(text):
+            if part == '\n':
+                run.append(deepcopy(self._br))
+            elif part == '\t':
+                run.append(deepcopy(self._tab))
+            elif part:
+                text_element = deepcopy(text_prototype)
+                text_element.text = part
+                if len(part.strip()) == len(part):
+                    del text_element.attrib[_XML_SPACE]
+                run.append(text_element)
+        return run
+
+    def _linebreak_run(self, text: str, text_prototype):
+        """段之间插入 <w:br/>，空段不生成文本元素"""
+        run = deepcopy(self._run)
+        for i, part in enumerate(text.split('\n')):
+            if i > 0:
+                run.append(deepcopy(self._br))
+            if part:
+                text_element = deepcopy(text_prototype)
+                text_element.text = part
+                run.append(text_element)
+        return run
+
+
+def clear_cell(cell):
+    """清除单元格的追踪修订与全部 run，返回第一个段落（没有段落时新建）"""
+    # 清除所有追踪修订
+    clear_cell_tracked_changes(cell)
+
+    # 清空单元格
+    for paragraph in cell.paragraphs:
+        for run in paragraph.runs:
+            run._element.getparent().remove(run._element)
+
+    # 确保至少有一个段落
+    if not cell.paragraphs:
+        cell.add_paragraph()
+
+    return cell.paragraphs[0]
+
+
+def write_tracked_replacement(cell, old_text: str, new_text: str, author: str,
+                              date_str: str, revision_id: int,
+                              factory: Optional[RevisionFactory] = None):
+    """
+    清除单元格现有修订与内容，写入一对新的 <w:del>(old_text) / <w:ins>(new_text)
+
+    Args:
+        factory: 同一批更新共用的 RevisionFactory（作者、日期须一致）；不提供时临时创建
+    """
+    if factory is None:
+        factory = RevisionFactory(author, date_str)
+
+    paragraph = clear_cell(cell)
+
+    # 删除标记 + 插入标记；含换行的文本以 <w:br/> 分隔（删除的文本写入 <w:delText>）
+    deletion = factory.linebreak_deletion if '\n' in old_text else factory.deletion
+    insertion = factory.linebreak_insertion if '\n' in new_text else factory.insertion
+    paragraph._element.append(deletion(revision_id, old_text))
+    paragraph._element.append(insertion(revision_id + 1, new_text))
+
+
+def _plain_run_text(run) -> Optional[str]:
+    """只含文本、制表符和软换行的 run 的文本；含其他内容（图片、域、分页符等）时返回 None"""
+    parts = []
+    for child in run:
+        if child.tag == W_RPR:
+            continue
+        if child.tag == W_T:
+            parts.append(child.text or '')
+        elif child.tag == W_TAB:
+            parts.append('\t')
+        elif child.tag == W_CR or (
+                child.tag == W_BR and child.get(qn('w:type'), 'textWrapping') == 'textWrapping'):
+            parts.append('\n')
+        else:
+            return None
+    return ''.join(parts)
+
+
+def _plain_runs(cell) -> Optional[Tuple]:
+    """
+    可按字符保留的单元格内容：只有一个段落，段落中只有普通 run 和书签
+
+    Returns:
+        (w:p, [(元素, 文本), ...])，书签的文本为 None；不满足条件时返回 None
+    """
+    paragraphs = cell._tc.p_lst
+    if len(paragraphs) != 1:
+        return None
+
+    items = []
+    for child in paragraphs[0]:
+        if child.tag in (W_PPR, _PROOF_ERR):
+            continue
+        if child.tag == W_R:
+            text = _plain_run_text(child)
+            if text is None:
+                return None
+            items.append((child, text))
+        elif child.tag in _KEPT_MARKERS:
+            items.append((child, None))
+        else:
+            return None
+    return paragraphs[0], items
+
+
+def write_diff_replacement(cell, old_text: str, new_text: str, revision_id: int,
+                           factory: RevisionFactory, granularity: str = 'word',
+                           source: str = 'normal') -> int:
+    """
+    按差异写入追踪修订：只有改动的片段包在 <w:del> / <w:ins> 中，每处改动占用一个 ID
+
+    单元格已有修订时，先按 old_text 的来源（source，见 read_cell_text()）拒绝（deleted）
+    或接受（inserted）这些修订，再与 old_text 比较差异
+
+    单元格只有一个段落且只含普通 run 时，未改动的 run 原样保留，被拆开的 run、
+    删除与插入的文本沿用所在（插入时为前一个字符所在）run 的格式；
+    否则（多个段落、已有修订、图片等）与整格替换相同地先清空单元格，
+    未改动的文本写为不带格式的 run。
+
+    Returns:
+        写入的修订数量（新旧文本相同时为 0）
+    """
+    if source == 'deleted':
+        reject_cell_tracked_changes(cell)
+    elif source == 'inserted':
+        clear_cell_tracked_changes(cell)
+
+    layout = _plain_runs(cell)
+    full = ''.join(text for _, text in layout[1] if text) if layout else None
+    if full is None or full.strip() != old_text:
+        paragraph = clear_cell(cell)._element
+        items = [(None, old_text)]
+        full = old_text
+    else:
+        paragraph, items = layout
+
+    # 各 run 在 full 中的位置；书签记录所在位置
+    runs = []
+    markers = []
+    position = 0
+    for element, text in items:
+        if text is None:
+            markers.append((position, element))
+        else:
+            rpr = element.find(W_RPR) if element is not None else None
+            runs.append((position, position + len(text), element, rpr))
+            position += len(text)
+    markers.reverse()
+
+    # 文本首尾的空白不参与比较，作为未改动的部分保留
+    lead = len(full) - len(full.lstrip())
+    spans = [('equal', 0, lead, None)]
+    for tag, i1, i2, j1, j2 in diff_opcodes(old_text, new_text, granularity):
+        if tag == 'equal':
+            spans.append(('equal', lead + i1, lead + i2, None))
+            continue
+        if i2 > i1:
+            spans.append(('delete', lead + i1, lead + i2, None))
+        if j2 > j1:
+            spans.append(('insert', lead + i2, lead + i2, new_text[j1:j2]))
+    spans.append(('equal', lead + len(old_text), len(full), None))
+
+    # 首尾空白与相邻的未改动片段合并，整个 run 都未改动时原样保留
+    merged = []
+    for span in spans:
+        if merged and span[0] == 'equal' and merged[-1][0] == 'equal':
+            span = ('equal', merged.pop()[1], span[2], None)
+        merged.append(span)
+    spans = merged
+
+    children = []
+    deletion = None  # 正在写入的 <w:del>，相邻被删除的 run 放在同一个修订中
+    count = 0
+
+    for kind, start, end, inserted in spans:
+        while markers and markers[-1][0] <= start:
+            children.append(markers.pop()[1])
+            deletion = None
+
+        if kind == 'insert':
+            anchor = next((run for run in runs if run[0] < start <= run[1]), None) or \
+                next((run for run in runs if run[0] <= start < run[1]), None)
+            insertion = factory.empty_insertion(revision_id + count)
+            insertion.append(factory.text_run(inserted, anchor[3] if anchor else None))
+            children.append(insertion)
+            count += 1
+            deletion = None
+            continue
+
+        for run_start, run_end, element, rpr in runs:
+            a, b = max(start, run_start), min(end, run_end)
+            if a >= b:
+                continue
+            if kind == 'equal':
+                deletion = None
+                if element is not None and (a, b) == (run_start, run_end):
+                    children.append(element)
+                else:
+                    children.append(factory.text_run(full[a:b], rpr))
+                continue
+            if deletion is None:
+                deletion = factory.empty_deletion(revision_id + count)
+                children.append(deletion)
+                count += 1
+            deletion.append(factory.text_run(full[a:b], rpr, deleted=True))
+
+    children.extend(element for _, element in reversed(markers))
+
+    for child in list(paragraph):
+        if child.tag != W_PPR:
+            paragraph.remove(child)
+    paragraph.extend(children)
+    return count
+
+
+def replace_cell(cell, old_text: str, new_text: str, author: str, date_str: str,
+                 revision_id: int, reading_mode: str = 'auto',
+                 factory: Optional[RevisionFactory] = None,
+                 granularity: str = 'cell') -> Dict:
+    """
+    校验单元格当前文本后写入追踪修订
+
+    文本只在换行处与 old_text 不同（见 texts_match()）时，删除修订写入单元格中的实际文本，
+    保留原有的换行
+
+    Args:
+        granularity: 'cell' | 'word' | 'char'，见模块说明
+
+    单元格已含相同的修订（见 has_identical_revision()）时不改动 XML，'unchanged' 为 True
+
+    Returns:
+        {'ok': bool, 'unchanged': bool, 'actual': 读取到的文本, 'source': 文本来源,
+         'revisions': 写入的修订数量（占用的修订 ID 数）}
+    """
+    if has_identical_revision(cell, old_text, new_text):
+        return {'ok': True, 'unchanged': True, 'actual': old_text, 'source': 'deleted',
+                'revisions': 0}
+
+    current_text, source = read_cell_text(cell, reading_mode)
+
+    if not texts_match(current_text, old_text):
+        return {'ok': False, 'unchanged': False, 'actual': current_text, 'source': source,
+                'revisions': 0}
+
+    if granularity == 'cell':
+        write_tracked_replacement(cell, current_text, new_text, author, date_str, revision_id,
+                                  factory)
+        revisions = 2
+    else:
+        revisions = write_diff_replacement(cell, current_text, new_text, revision_id,
+                                           factory or RevisionFactory(author, date_str),
+                                           granularity, source)
+    return {'ok': True, 'unchanged': False, 'actual': current_text, 'source': source,
+            'revisions': revisions}
+
+
+def find_table(doc):
+    """查找文档中的第一个表格"""
+    if not doc.tables:
+        return None
+    return doc.tables[0]
+
+
+def build_row_map(table) -> Dict[str, int]:
+    """构建 segment_id -> 行索引 映射（跳过表头）"""
+    row_map = {}
+    for i, row in enumerate(table.rows[1:], start=1):
+        if len(row.cells) >= 4:
+            segment_id = row.cells[0].text.strip()
+            if segment_id:
+                row_map[segment_id] = i
+    return row_map
+
+
+def iter_segment_cells(table) -> Iterator[Tuple[str, int, Tuple]]:
+    """
+    单次遍历 w:tbl，逐行产出 (segment_id, 行索引, 译文单元格位置)（跳过表头）
+
+    译文单元格位置为 (w:tc, 所在行索引, 在该行 w:tc 中的序号)。
+    与 table.rows[i].cells 一致：gridSpan 按网格列展开，
+    vMerge="continue" 的单元格取上一行同一网格列的实际单元格（位置也指向那一行）。
+    """
+    above = {}  # 网格列 -> 上一行该列的实际单元格位置
+
+    for row_index, tr in enumerate(table._tbl.tr_lst):
+        grid, above = row_grid(tr, row_index, above)
+
+        if row_index == 0 or len(grid) <= TARGET_COLUMN:
+            continue
+        segment_id = _Cell(grid[0][0], table).text.strip()
+        if segment_id:
+            yield segment_id, row_index, grid[TARGET_COLUMN]
+
+
+def row_grid(tr, row_index: int, above: Dict[int, Tuple]) -> Tuple[List[Tuple], Dict[int, Tuple]]:
+    """
+    一行 w:tr 按网格列展开后的单元格位置
+
+    Args:
+        above: 上一行 row_grid() 返回的 网格列 -> 单元格位置（第一行传 {}）
+
+    Returns:
+        (grid, current)：grid 为从 grid_before 起每个网格列的单元格位置，
+        current 供下一行作为 above 传入
+    """
+    grid = []
+    current = {}
+    offset = tr.grid_before
+
+    for tc_index, tc in enumerate(tr.tc_lst):
+        span = tc.grid_span
+        position = (tc, row_index, tc_index)
+        if tc.vMerge == 'continue':
+            position = above.get(offset, position)
+        for column in range(offset, offset + span):
+            current[column] = position
+        grid.extend([position] * span)
+        offset += span
+
+    return grid, current
+
+
+def build_cell_map(table) -> Dict[str, _Cell]:
+    """
+    单次遍历 w:tbl 构建 segment_id -> 译文单元格映射
+
+    与 build_row_map() + table.rows[i].cells[3] 结果一致，但不经过 python-docx 的行对象
+    """
+    return {segment_id: _Cell(target[0], table)
+            for segment_id, _, target in iter_segment_cells(table)}
+
+
+def cell_finder(table, engine: str = 'docx') -> Callable[[str], Optional[_Cell]]:
+    """
+    返回按 segment_id 查找译文单元格的函数（找不到时返回 None）
+
+    Args:
+        engine: 'docx' | 'lxml'，见模块说明
+    """
+    if engine == 'lxml':
+        return build_cell_map(table).get
+    if engine != 'docx':
+        raise FcInsiderError(f"不支持的引擎: {engine}（可选: {', '.join(ENGINES)}）")
+
+    row_map = build_row_map(table)
+
+    def find(segment_id: str) -> Optional[_Cell]:
+        if segment_id not in row_map:
+            return None
+        return table.rows[row_map[segment_id]].cells[TARGET_COLUMN]
+
+    return find
+
+
+def load_document(source: Union[Source, SourcePackage]):
+    """打开 Word 文档（bytes / 路径 / 二进制文件对象 / SourcePackage）"""
+    try:
+        if isinstance(source, SourcePackage):
+            return Document(source.stream)
+        return Document(open_stream(source))
+    except Exception as e:
+        raise DocumentError(f"无法打开 Word 文档: {e}") from e
+
+
+def changed_parts(doc, track_changes_existed: bool, document_changed: bool = True) -> Tuple:
+    """
+    apply_to_document() 改动的部件：document.xml，以及新启用追踪修订时的 settings.xml
+
+    Args:
+        document_changed: 是否有单元格被更新；没有时（如重复运行、全部跳过）document.xml 原样复制
+    """
+    parts = (doc.part,) if document_changed else ()
+    if track_changes_existed:
+        return parts
+    return parts + (doc.part.part_related_by(RT.SETTINGS),)
+
+
+def first_revision_id(element) -> int:
+    """
+    新修订的起始 ID：元素（通常是 w:document）中已有的最大 w:id 加一，不小于 FIRST_REVISION_ID
+
+    修订、批注、书签的 w:id 都计入，一次 XPath 扫描
+    """
+    ids = [int(value) for value in element.xpath('//@w:id') if value.isdigit()]
+    return max(FIRST_REVISION_ID, max(ids, default=0) + 1)
+
+
+def load_translations(translations) -> List[Dict]:
+    """
+    读取翻译映射
+
+    Args:
+        translations: 映射列表、{'translations': [...]}，或 JSON 文件（bytes / 路径 / 文件对象）
+    """
+    if isinstance(translations, (list, tuple)):
+        return list(translations)
+    if isinstance(translations, dict):
+        return list(translations.get('translations', []))
+
+    try:
+        data = json.loads(read_bytes(translations).decode('utf-8'))
+    except json.JSONDecodeError as e:
+        raise MappingError(f"翻译映射 JSON 格式错误: {e}") from e
+    # 提取 translations 数组（如果存在）
+    return data.get('translations', data) if isinstance(data, dict) else data
+
+
+def mapping_texts(translation: Dict) -> Tuple[Optional[str], str, str]:
+    """
+    取出映射中的 segment_id / old_text / new_text
+
+    支持两种键名：old_text/new_text 或 old_translation/new_translation
+    """
+    old_text = translation.get('old_text', translation.get('old_translation', '')).strip()
+    new_text = translation.get('new_text', translation.get('new_translation', '')).strip()
+    return translation.get('segment_id'), old_text, new_text
+
+
+def revision_date(date: Optional[datetime] = None) -> str:
+    """追踪修订使用的日期字符串"""
+    return (date or datetime.now()).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def apply_to_document(
+    doc,
+    translations: List[Dict],
+    author: str = "Translator",
+    reading_mode: str = 'auto',
+    date: Optional[datetime] = None,
+    engine: str = 'docx',
+    granularity: str = 'cell'
+) -> Dict:
+    """
+    把翻译映射应用到已加载的 python-docx 文档（原地修改）
+
+    Args:
+        engine: 目标单元格定位引擎，'docx' | 'lxml'（输出相同，lxml 适合大表格）
+        granularity: 差异粒度，'cell' | 'word' | 'char'（见模块说明）
+
+    Returns:
+        {
+            'success': 成功数量（含已有相同修订而跳过的）,
+            'unchanged': 已有相同修订、未改动的数量,
+            'failed': 失败数量,
+            'revisions': 写入的修订数量,
+            'track_changes_existed': 文档是否已启用追踪修订,
+            'results': [{'segment_id', 'status', 'expected', 'actual', 'source'}, ...]
+        }
+        status 取值：'updated' | 'unchanged' | 'not_found' | 'mismatch'
+        修订 ID 从文档中已有的最大 w:id 之后开始（见 first_revision_id()）
+    """
+    check_granularity(granularity)
+    track_changes_existed = has_track_changes_enabled(doc)
+    if not track_changes_existed:
+        enable_track_changes(doc)
+
+    table = find_table(doc)
+    if table is None:
+        raise DocumentError("文档中未找到表格")
+
+    find_cell = cell_finder(table, engine)
+    date_str = revision_date(date)
+    factory = RevisionFactory(author, date_str)
+    first_id = revision_id = first_revision_id(doc.element)
+    results = []
+
+    for translation in translations:
+        segment_id, old_text, new_text = mapping_texts(translation)
+        result = {'segment_id': segment_id, 'status': 'not_found',
+                  'expected': old_text, 'actual': None, 'source': None}
+        results.append(result)
+
+        cell = find_cell(segment_id) if segment_id else None
+        if cell is None:
+            continue
+
+        outcome = replace_cell(cell, old_text, new_text, author, date_str,
+                               revision_id, reading_mode, factory, granularity)
+        result['actual'] = outcome['actual']
+        result['source'] = outcome['source']
+
+        if outcome['ok']:
+            result['status'] = 'unchanged' if outcome['unchanged'] else 'updated'
+            revision_id += outcome['revisions']
+        else:
+            result['status'] = 'mismatch'
+
+    unchanged = sum(1 for r in results if r['status'] == 'unchanged')
+    success = sum(1 for r in results if r['status'] == 'updated') + unchanged
+    return {
+        'success': success,
+        'unchanged': unchanged,
+        'failed': len(results) - success,
+        'revisions': revision_id - first_id,
+        'track_changes_existed': track_changes_existed,
+        'results': results
+    }
+
+
+def apply(
+    source: Source,
+    mappings,
+    author: str = "Translator",
+    reading_mode: str = 'auto',
+    date: Optional[datetime] = None,
+    output=None,
+    engine: str = 'docx',
+    granularity: str = 'cell'
+) -> Dict:
+    """
+    把翻译映射以追踪修订写入 Word 文档
+
+    Args:
+        source: 输入 Word 文档（bytes / 路径 / 二进制文件对象）
+        mappings: 翻译映射列表、{'translations': [...]}，或映射 JSON 文件
+        author: 追踪修订作者
+        reading_mode: 'auto' | 'read_deleted' | 'read_inserted'
+        date: 修订日期（默认当前时间）
+        output: 可选的输出路径或二进制文件对象
+        engine: 目标单元格定位引擎，'docx' | 'lxml'
+        granularity: 差异粒度，'cell'（整格替换）| 'word' | 'char'（只标记改动的片段）
+
+    Returns:
+        apply_to_document() 的结果，另含 'docx'（输出文档 bytes）
+    """
+    translations = load_translations(mappings)
+
+    # 路径以 mmap 读取；输出时只重写改动的部件，其余成员原样复制
+    with SourcePackage(source) as package:
+        doc = load_document(package)
+        result = apply_to_document(doc, translations, author, reading_mode, date, engine,
+                                   granularity)
+
+        buffer = BytesIO()
+        save_document(doc, package, buffer,
+                      changed_parts(doc, result['track_changes_existed'],
+                                    result['success'] > result['unchanged']))
+        result['docx'] = buffer.getvalue()
+
+    if output is not None:
+        write_bytes(result['docx'], output)
+
+    return result
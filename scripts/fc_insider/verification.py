@@ -0,0 +1,124 @@
+"""
+只校验不更新：检查翻译映射中的 old_text 是否与文档当前的译文一致
+
+与 apply() 使用相同的单元格定位、读取和比较方式（追踪修订中的文本按 reading_mode 读取，
+换行与空格视为相同），
+但只解压、解析 word/document.xml：不加载 python-docx 文档的其余部件，不写入修订，不写出文档。
+适合在提交映射前快速检查。
+
+同一 segment_id 有多条映射时，每条都与文档的当前内容比较（apply() 中后一条比较的是前一条写入后的内容）。
+"""
+
+import zipfile
+from typing import Dict, List, Optional, Union
+
+from docx.oxml import parse_xml
+from docx.table import Table
+from lxml import etree
+
+from .errors import DocumentError
+from .package import SourcePackage
+from .segment_index import segment_finder
+from .sources import Source
+from .streaming import W_BODY, W_TBL, main_part_names
+from .tracked import load_translations, mapping_texts, read_cell_text, texts_match
+
+# 结果中的 status 取值
+MATCH = 'match'
+MISMATCH = 'mismatch'
+NOT_FOUND = 'not_found'
+
+
+def read_first_table(source: Union[Source, SourcePackage]) -> Table:
+    """只解析 word/document.xml，返回正文中的第一个表格"""
+    if not isinstance(source, SourcePackage):
+        with SourcePackage(source) as package:
+            return read_first_table(package)
+
+    try:
+        archive = zipfile.ZipFile(source.stream)
+    except zipfile.BadZipFile as e:
+        raise DocumentError(f"无法打开 Word 文档: {e}") from e
+    with archive:
+        document_name, _ = main_part_names(archive)
+        try:
+            document = parse_xml(archive.read(document_name))
+        except etree.XMLSyntaxError as e:
+            raise DocumentError(f"document.xml 解析失败: {e}") from e
+
+    body = document.find(W_BODY)
+    tbl = body.find(W_TBL) if body is not None else None
+    if tbl is None:
+        raise DocumentError("文档中未找到表格")
+    return Table(tbl, None)
+
+
+def verify_table(table, translations: List[Dict], reading_mode: str = 'auto',
+                 index: Optional[Dict] = None) -> Dict:
+    """
+    逐条比较映射的 old_text 与表格中译文单元格的当前文本
+
+    Args:
+        index: 可选的 segment 位置索引（fc_insider.segment_index）；提供时不再扫描 segment_id 列
+
+    Returns:
+        {
+            'total': 映射数量,
+            'matched' / 'mismatched' / 'not_found': 各状态的数量,
+            'results': [{'segment_id', 'status', 'expected', 'actual', 'source'}, ...]
+        }
+        status 取值：'match' | 'mismatch' | 'not_found'
+    """
+    find_cell = segment_finder(table, index, engine='lxml')
+    results = []
+
+    for translation in translations:
+        segment_id, old_text, _ = mapping_texts(translation)
+        result = {'segment_id': segment_id, 'status': NOT_FOUND,
+                  'expected': old_text, 'actual': None, 'source': None}
+        results.append(result)
+
+        cell = find_cell(segment_id) if segment_id else None
+        if cell is None:
+            continue
+        result['actual'], result['source'] = read_cell_text(cell, reading_mode)
+        result['status'] = MATCH if texts_match(result['actual'], old_text) else MISMATCH
+
+    counts = {status: sum(1 for r in results if r['status'] == status)
+              for status in (MATCH, MISMATCH, NOT_FOUND)}
+    return {
+        'total': len(results),
+        'matched': counts[MATCH],
+        'mismatched': counts[MISMATCH],
+        'not_found': counts[NOT_FOUND],
+        'results': results
+    }
+
+
+def verify(source: Source, mappings, reading_mode: str = 'auto') -> Dict:
+    """
+    校验翻译映射能否应用到 Word 文档，不修改、不写出文档
+
+    Args:
+        source: 输入 Word 文档（bytes / 路径 / 二进制文件对象）
+        mappings: 翻译映射列表、{'translations': [...]}，或映射 JSON 文件
+        reading_mode: 'auto' | 'read_deleted' | 'read_inserted'
+
+    Returns:
+        verify_table() 的结果
+    """
+    return verify_table(read_first_table(source), load_translations(mappings), reading_mode)
+
+
+def mismatch_report(result: Dict, **context) -> Dict:
+    """
+    结构化的不一致报告：统计数量，只列出不一致和未找到的映射
+
+    Args:
+        context: 附加到报告开头的信息（如 input、reading_mode）
+    """
+    report = dict(context)
+    for key in ('total', 'matched', 'mismatched', 'not_found'):
+        report[key] = result[key]
+    report['problems'] = [r for r in result['results'] if r['status'] != MATCH]
+    return report
@@ -0,0 +1,90 @@
+"""
+完整流程：提取 → 匹配 → 应用，一次调用处理一个文档
+
+供批处理、监视目录等场景复用，与 run_complete_workflow.py 的进程内模式一致：
+docx 只读取一次，提取与更新共享同一份字节。
+"""
+
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from .errors import MappingError
+from .extraction import extract
+from .matching import match
+from .sources import Source, read_bytes, write_bytes
+from .tracked import apply
+
+
+def process(
+    source: Source,
+    new_translations: Source,
+    output=None,
+    author: str = "Translator",
+    match_by: str = 'smart',
+    reading_mode: str = 'auto',
+    format: str = 'auto',
+    date: Optional[datetime] = None,
+    engine: str = 'docx',
+    granularity: str = 'cell'
+) -> Dict:
+    """
+    处理一个文档：提取表格、匹配新译文、以追踪修订写入
+
+    Args:
+        source: 输入 Word 文档（bytes / 路径 / 二进制文件对象）
+        new_translations: 新译文文件（bytes / 路径 / 二进制文件对象）
+        output: 可选的输出路径或二进制文件对象
+        author: 追踪修订作者
+        match_by: 'smart' | 'segment_id' | 'index'
+        reading_mode: 'auto' | 'read_deleted' | 'read_inserted'
+        format: 新译文文件格式（'auto' | 'json' | 'text'）
+        date: 修订日期（默认当前时间）
+        engine: 更新阶段的单元格定位引擎，'docx' | 'lxml'
+        granularity: 差异粒度，'cell' | 'word' | 'char'（见 tracked.apply()）
+
+    Returns:
+        {
+            'rows': 参与匹配的行数,
+            'mappings': 对照表,
+            'success': 成功数量,
+            'failed': 失败数量,
+            'results': apply() 的逐条结果,
+            'timings': {'extract', 'match', 'apply'} 各阶段秒数,
+            'docx': 输出文档 bytes
+        }
+
+    Raises:
+        MappingError: 新译文无效、行数不足或对照表校验失败
+        DocumentError / DependencyError: 见 extract() / apply()
+    """
+    docx_bytes = read_bytes(source)
+    timings = {}
+
+    started = time.perf_counter()
+    table = extract(docx_bytes)
+    timings['extract'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matched = match(table, new_translations, match_by=match_by, format=format)
+    if matched['errors']:
+        raise MappingError("对照表校验失败: " + "; ".join(matched['errors']))
+    timings['match'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    applied = apply(docx_bytes, matched['mappings'], author, reading_mode, date,
+                    engine=engine, granularity=granularity)
+    timings['apply'] = time.perf_counter() - started
+
+    if output is not None:
+        write_bytes(applied['docx'], output)
+
+    return {
+        'rows': len(matched['rows']),
+        'mappings': matched['mappings'],
+        'success': applied['success'],
+        'failed': applied['failed'],
+        'results': applied['results'],
+        'timings': timings,
+        'docx': applied['docx']
+    }
@@ -0,0 +1,696 @@
+#!/usr/bin/env python3
+"""
+FC Insider 常驻服务（本地 HTTP / Unix socket）
+
+适用于交互式审校循环：同一份文档反复调用提取/匹配/应用时，
+模块保持已导入，解析后的文档和提取的表格按内容哈希缓存，不再重复解析。
+
+功能：
+1. POST /extract - 上传 docx（或 JSON {"input": 路径}），返回表格行和文档哈希
+2. POST /match   - 匹配新译文，返回对照表
+3. POST /apply   - 应用追踪修订，返回输出 docx（或写入 "output" 路径）
+4. GET  /metrics - 队列深度、缓存状态、各阶段耗时
+5. GET  /health  - 存活检查
+
+安全：
+- JSON 中的路径（input / translations / mappings / new_translations / output）只在指定 --root 时接受，
+  且必须位于该目录内（解析符号链接后判断）；未指定时只能上传 docx、在 JSON 中直接提供内容
+- 指定 --token 时，除 /health 外的请求都需要 Authorization: Bearer <token>；
+  监听非本机地址（--host 不是 127.0.0.1 / ::1 / localhost）时必须指定
+
+使用方法：
+python3 fc_insider_server.py --port 8765 --workers 4 --cache-mb 512
+python3 fc_insider_server.py --socket /tmp/fc_insider.sock --root ~/fc_projects
+"""
+
+import argparse
+import copy
+import hashlib
+import hmac
+import ipaddress
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+try:
+    from fc_insider import extraction, matching, tracked
+    from fc_insider.errors import DocumentError, FcInsiderError
+    from fc_insider.package import SourcePackage, save_document
+    from fc_insider.sources import read_bytes, write_bytes
+except ImportError:
+    print("错误：需要安装 python-docx 和 lxml")
+    print("运行: pip install python-docx lxml")
+    sys.exit(1)
+
+
+# 解析后的 lxml 树约为 XML 文本大小的数倍，用于估算缓存占用
+PARSED_TREE_FACTOR = 4
+
+# 每个阶段保留的耗时样本数（用于计算分位数）
+LATENCY_SAMPLES = 1000
+
+DOCX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+# 令牌的环境变量（与 --token 相同，避免令牌出现在进程列表中）
+TOKEN_ENV = 'FC_INSIDER_SERVER_TOKEN'
+
+# 请求体默认上限（MB，--max-body-mb）
+DEFAULT_MAX_BODY_MB = 256
+
+
+class ForbiddenPath(FcInsiderError):
+    """请求中的路径不被允许（未指定 --root，或不在 --root 目录内）"""
+
+
+class BadRequest(FcInsiderError):
+    """请求格式错误：缺少字段、字段类型错误、Content-Length 无效"""
+
+
+class DocumentNotCached(FcInsiderError):
+    """请求引用的文档哈希不在缓存中"""
+
+
+class RequestTooLarge(FcInsiderError):
+    """请求体超过 --max-body-mb"""
+
+
+class CacheEntry:
+    """缓存的文档：原始字节、解析后的 python-docx 文档、提取结果"""
+
+    def __init__(self, key: str, docx: bytes, document, size: int):
+        self.key = key
+        self.docx = docx
+        self.document = document
+        self.extracted = None
+        self.size = size
+        # 复制模板文档时加锁，避免与其他线程同时遍历同一棵树
+        self.lock = threading.Lock()
+
+
+class DocumentCache:
+    """
+    按内容哈希（SHA-256）缓存解析后的文档
+
+    LRU 淘汰，按估算的内存占用（字节）限制总大小
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_size(docx: bytes) -> int:
+        """估算缓存条目的内存占用：原始字节 + 解析后的 XML 树"""
+        with zipfile.ZipFile(BytesIO(docx)) as zf:
+            xml_bytes = sum(info.file_size for info in zf.infolist()
+                            if info.filename.endswith('.xml') or info.filename.endswith('.rels'))
+        return len(docx) + xml_bytes * PARSED_TREE_FACTOR
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """按哈希取出条目（命中时移到最近使用端）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return entry
+
+    def load(self, docx: bytes, metrics: 'StageMetrics'):
+        """
+        取出或解析文档
+
+        Returns:
+            (entry, cached)
+        """
+        key = hashlib.sha256(docx).hexdigest()
+        entry = self.get(key)
+        if entry is not None:
+            return entry, True
+
+        # 解析在锁外进行，不阻塞其他请求
+        with metrics.timer('parse'):
+            try:
+                document = tracked.load_document(docx)
+                size = self.estimate_size(docx)
+            except zipfile.BadZipFile as e:
+                raise DocumentError(f"无法打开 Word 文档: {e}") from e
+
+        with self._lock:
+            self.misses += 1
+            existing = self._entries.get(key)
+            if existing is not None:
+                return existing, True
+
+            entry = CacheEntry(key, docx, document, size)
+            self._entries[key] = entry
+            self.current_bytes += size
+            self._evict()
+        return entry, False
+
+    def add_size(self, entry: CacheEntry, extra: int):
+        """条目新增提取结果后更新占用"""
+        with self._lock:
+            entry.size += extra
+            if entry.key in self._entries:
+                self.current_bytes += extra
+                self._evict()
+
+    def _evict(self):
+        # 至少保留最近使用的一个条目
+        while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= evicted.size
+            self.evictions += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+class StageMetrics:
+    """各阶段耗时统计与工作池队列深度"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._counts = {}
+        self._totals = {}
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+
+    @contextmanager
+    def timer(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(stage, deque(maxlen=LATENCY_SAMPLES)).append(seconds)
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+            self._totals[stage] = self._totals.get(stage, 0.0) + seconds
+
+    def job_queued(self):
+        with self._lock:
+            self.queued += 1
+
+    def job_started(self):
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+
+    def job_finished(self, ok: bool):
+        with self._lock:
+            self.active -= 1
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            stages = {}
+            for stage, samples in self._samples.items():
+                ordered = sorted(samples)
+                stages[stage] = {
+                    'count': self._counts[stage],
+                    'avg_ms': self._totals[stage] / self._counts[stage] * 1000,
+                    'p50_ms': statistics.median(ordered) * 1000,
+                    'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+                    'max_ms': ordered[-1] * 1000
+                }
+            return {
+                'queue_depth': self.queued,
+                'active_jobs': self.active,
+                'completed_jobs': self.completed,
+                'failed_jobs': self.failed,
+                'stages': stages
+            }
+
+
+class FcInsiderService:
+    """
+    服务核心：工作池 + 文档缓存 + 提取/匹配/应用
+
+    与 HTTP 层无关，便于在其他进程内复用
+    """
+
+    def __init__(self, workers: int = 4, cache_bytes: int = 512 * 1024 * 1024,
+                 root: Optional[str] = None):
+        """
+        Args:
+            root: 允许请求访问的目录；None 时不接受请求中的服务器端路径
+        """
+        self.workers = workers
+        self.root = os.path.realpath(root) if root else None
+        self.cache = DocumentCache(cache_bytes)
+        self.metrics = StageMetrics()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fc_worker')
+        self.started = time.time()
+
+    def submit(self, func, *args):
+        """把任务放入工作池并等待结果"""
+        self.metrics.job_queued()
+
+        def run():
+            self.metrics.job_started()
+            ok = False
+            try:
+                result = func(*args)
+                ok = True
+                return result
+            finally:
+                self.metrics.job_finished(ok)
+
+        return self.pool.submit(run).result()
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True)
+
+    # --- 文档来源 ---------------------------------------------------------
+
+    def local_path(self, value, field: str) -> str:
+        """
+        请求中的路径解析为 --root 内的绝对路径
+
+        相对路径以 --root 为基准；解析符号链接后不在 --root 内的路径抛出 ForbiddenPath
+        """
+        if self.root is None:
+            raise ForbiddenPath(f"服务未指定 --root，不接受服务器端路径（{field}）："
+                                f"请上传 docx，或在 JSON 中直接提供内容")
+        if not isinstance(value, str):
+            raise BadRequest(f"{field} 应为路径字符串")
+        resolved = os.path.realpath(os.path.join(self.root, value))
+        if os.path.commonpath([self.root, resolved]) != self.root:
+            raise ForbiddenPath(f"{field} 不在 --root 目录内: {value}")
+        return resolved
+
+    def resolve_document(self, payload: Dict, body: Optional[bytes] = None):
+        """
+        按请求取得缓存条目
+
+        来源优先级：请求体中的 docx 字节 > "document"（已缓存的哈希）> "input"（--root 内的路径）
+        """
+        if body:
+            return self.cache.load(body, self.metrics)
+
+        if payload.get('document'):
+            entry = self.cache.get(payload['document'])
+            if entry is None:
+                raise DocumentNotCached(f"文档不在缓存中（可能已被淘汰）: {payload['document']}")
+            return entry, True
+
+        if payload.get('input'):
+            return self.cache.load(read_bytes(self.local_path(payload['input'], 'input')),
+                                   self.metrics)
+
+        raise BadRequest("缺少文档：请上传 docx，或提供 document / input")
+
+    def extracted(self, entry: CacheEntry) -> Dict:
+        """取出（必要时计算）条目的提取结果"""
+        if entry.extracted is None:
+            with self.metrics.timer('extract'):
+                result = extraction.extract(entry.docx)
+            entry.extracted = result
+            self.cache.add_size(entry, len(result['markdown'].encode('utf-8')) * 2)
+        return entry.extracted
+
+    # --- 操作 -------------------------------------------------------------
+
+    def extract(self, payload: Dict, body: Optional[bytes] = None) -> Dict:
+        entry, cached = self.resolve_document(payload, body)
+        result = self.extracted(entry)
+        response = {
+            'document': entry.key,
+            'cached': cached,
+            'rows': result['rows'],
+            'table_lines': result['table_lines']
+        }
+        if payload.get('include_markdown'):
+            response['markdown'] = result['markdown']
+        return response
+
+    def match(self, payload: Dict) -> Dict:
+        if 'table' in payload:
+            table = payload['table']
+        else:
+            entry, _ = self.resolve_document(payload)
+            table = self.extracted(entry)
+
+        if 'new_lines' in payload:
+            new_lines = payload['new_lines']
+        elif payload.get('new_translations'):
+            new_lines = self.local_path(payload['new_translations'], 'new_translations')
+        else:
+            raise BadRequest("缺少新译文：请提供 new_lines 或 new_translations")
+
+        with self.metrics.timer('match'):
+            result = matching.match(
+                table,
+                new_lines,
+                match_by=payload.get('match_by', 'smart'),
+                min_similarity=payload.get('min_similarity', 0.15),
+                filter_placeholders=payload.get('filter_placeholders', True)
+            )
+        return result
+
+    def apply(self, payload: Dict) -> Dict:
+        entry, cached = self.resolve_document(payload)
+
+        if 'mappings' in payload:
+            # 映射列表或 {'translations': [...]}；字符串视为路径
+            mappings = payload['mappings']
+            if isinstance(mappings, str):
+                mappings = self.local_path(mappings, 'mappings')
+            mappings = tracked.load_translations(mappings)
+        elif payload.get('translations'):
+            mappings = tracked.load_translations(self.local_path(payload['translations'], 'translations'))
+        else:
+            raise BadRequest("缺少翻译映射：请提供 mappings 或 translations")
+        output = self.local_path(payload['output'], 'output') if payload.get('output') else None
+
+        # 缓存中的文档是模板，每次应用都在副本上修改
+        with self.metrics.timer('clone'):
+            with entry.lock:
+                doc = copy.deepcopy(entry.document)
+
+        with self.metrics.timer('apply'):
+            result = tracked.apply_to_document(
+                doc,
+                mappings,
+                author=payload.get('author', 'Translator'),
+                reading_mode=payload.get('reading_mode', 'auto'),
+                engine=payload.get('engine', 'docx'),
+                granularity=payload.get('granularity', 'cell')
+            )
+
+        # 只重写改动的部件，其余成员从缓存的原始字节原样复制
+        with self.metrics.timer('save'):
+            buffer = BytesIO()
+            with SourcePackage(entry.docx) as package:
+                save_document(doc, package, buffer,
+                              tracked.changed_parts(doc, result['track_changes_existed'],
+                                                    result['success'] > result['unchanged']))
+            result['docx'] = buffer.getvalue()
+
+        if output is not None:
+            write_bytes(result['docx'], output)
+
+        result['document'] = entry.key
+        result['cached'] = cached
+        return result
+
+    def metrics_snapshot(self) -> Dict:
+        snapshot = self.metrics.snapshot()
+        snapshot['workers'] = self.workers
+        snapshot['cache'] = self.cache.stats()
+        snapshot['uptime_s'] = time.time() - self.started
+        return snapshot
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """HTTP 请求分发"""
+
+    server_version = 'FcInsider/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def send_json(self, status: int, data: Dict):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_docx(self, result: Dict):
+        body = result.pop('docx')
+        self.send_response(200)
+        self.send_header('Content-Type', DOCX_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-FC-Success', str(result['success']))
+        self.send_header('X-FC-Failed', str(result['failed']))
+        self.send_header('X-FC-Document', result['document'])
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_body(self):
+        """
+        读取请求体，返回 (payload, docx_bytes)
+
+        Content-Length 无效时抛出 BadRequest，超过上限时抛出 RequestTooLarge（都不读取请求体，
+        连接在回复后关闭）
+        """
+        value = self.headers.get('Content-Length') or '0'
+        try:
+            length = int(value)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            raise BadRequest(f"Content-Length 无效: {value!r}")
+        if length > self.server.max_body:
+            self.close_connection = True
+            raise RequestTooLarge(f"请求体 {length:,} 字节，超过上限 {self.server.max_body:,} 字节")
+
+        body = self.rfile.read(length) if length else b''
+        content_type = self.headers.get('Content-Type', '')
+
+        if content_type.startswith('application/json'):
+            payload = json.loads(body.decode('utf-8')) if body else {}
+            if not isinstance(payload, dict):
+                raise BadRequest("JSON 请求体应为对象")
+            return payload, None
+        return {}, body
+
+    def authorized(self, path: str) -> bool:
+        """检查令牌（未配置令牌或 /health 时总是通过）；未通过时回复 401"""
+        token = self.server.token
+        if token is None or path == '/health':
+            return True
+        supplied = self.headers.get('Authorization', '')
+        if hmac.compare_digest(supplied.encode('utf-8'), f'Bearer {token}'.encode('utf-8')):
+            return True
+        self.send_json(401, {'error': '缺少或错误的令牌（Authorization: Bearer <token>）',
+                             'type': 'Unauthorized'})
+        return False
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        service = self.server.service
+        if not self.authorized(path):
+            return
+
+        if path == '/metrics':
+            self.send_json(200, service.metrics_snapshot())
+        elif path == '/health':
+            self.send_json(200, {'status': 'ok'})
+        else:
+            self.send_json(404, {'error': f'未知路径: {path}'})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        service = self.server.service
+        if not self.authorized(path):
+            # 未读取的请求体会被当作下一个请求，直接关闭连接
+            self.close_connection = True
+            return
+
+        try:
+            payload, body = self.read_body()
+
+            if path == '/extract':
+                self.send_json(200, service.submit(service.extract, payload, body))
+            elif path == '/match':
+                self.send_json(200, service.submit(service.match, payload))
+            elif path == '/apply':
+                result = service.submit(service.apply, payload)
+                if payload.get('output'):
+                    result.pop('docx')
+                    self.send_json(200, result)
+                else:
+                    self.send_docx(result)
+            else:
+                self.send_json(404, {'error': f'未知路径: {path}'})
+
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            self.send_json(400, {'error': f'JSON 格式错误: {e}', 'type': 'BadRequest'})
+        except BadRequest as e:
+            self.send_json(400, {'error': str(e), 'type': 'BadRequest'})
+        except KeyError as e:
+            # 映射等请求内容缺少字段
+            self.send_json(400, {'error': f'缺少字段: {e.args[0]}', 'type': 'BadRequest'})
+        except DocumentNotCached as e:
+            self.send_json(404, {'error': str(e), 'type': 'NotFound'})
+        except RequestTooLarge as e:
+            self.send_json(413, {'error': str(e), 'type': 'RequestTooLarge'})
+        except ForbiddenPath as e:
+            self.send_json(403, {'error': str(e), 'type': 'Forbidden'})
+        except FcInsiderError as e:
+            self.send_json(422, {'error': str(e), 'type': type(e).__name__})
+        except Exception as e:
+            self.send_json(500, {'error': str(e), 'type': type(e).__name__})
+
+
+# 监听队列长度（默认 5，并发请求较多时会被拒绝连接）
+LISTEN_BACKLOG = 128
+
+
+class TCPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+
+
+class UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+
+    def get_request(self):
+        # Unix socket 没有客户端地址，日志中显示为 unix
+        request, _ = super().get_request()
+        return request, ('unix', 0)
+
+
+def is_loopback(host: str) -> bool:
+    """监听地址是否只接受本机连接"""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='FC Insider 常驻服务（保持模块常驻，缓存解析后的文档）',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+示例：
+  # 启动服务（localhost:8765）
+  python3 fc_insider_server.py --port 8765 --workers 4 --cache-mb 512
+
+  # 使用 Unix socket，允许访问 ~/fc_projects 下的文件
+  python3 fc_insider_server.py --socket /tmp/fc_insider.sock --root ~/fc_projects
+
+  # 监听所有网卡（必须指定令牌）
+  FC_INSIDER_SERVER_TOKEN=secret python3 fc_insider_server.py --host 0.0.0.0 --root ~/fc_projects
+
+  # 提取（上传 docx），返回 document 哈希
+  curl --data-binary @input.docx -H 'Content-Type: application/octet-stream' \\
+       http://127.0.0.1:8765/extract
+
+  # 匹配（引用已缓存的文档）
+  curl -H 'Content-Type: application/json' \\
+       -d '{"document": "<hash>", "new_translations": "new_translations.txt"}' \\
+       http://127.0.0.1:8765/match
+
+  # 应用追踪修订并写出（路径相对于 --root）
+  curl -H 'Content-Type: application/json' \\
+       -d '{"input": "input.docx", "translations": "translations.json", "output": "output.docx",
+            "granularity": "word"}' \\
+       http://127.0.0.1:8765/apply
+
+  # 指定了令牌时
+  curl -H "Authorization: Bearer $FC_INSIDER_SERVER_TOKEN" http://127.0.0.1:8765/metrics
+
+  # 查看指标
+  curl http://127.0.0.1:8765/metrics
+
+说明：
+  - JSON 中的路径只在指定 --root 时接受，且必须位于该目录内；未指定时只能上传 docx 或直接提供内容
+  - 监听非本机地址时必须指定 --token（或环境变量 FC_INSIDER_SERVER_TOKEN）
+        '''
+    )
+
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址（默认：127.0.0.1）')
+    parser.add_argument('--port', type=int, default=8765, help='监听端口（默认：8765）')
+    parser.add_argument('--socket', help='改为监听 Unix socket 路径')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4, help='工作线程数（默认：CPU 核数）')
+    parser.add_argument('--cache-mb', type=int, default=512, help='文档缓存上限（MB，默认：512）')
+    parser.add_argument('--root', help='允许请求读写的目录（JSON 中的路径相对于此目录；默认不接受路径）')
+    parser.add_argument('--token', default=os.environ.get(TOKEN_ENV),
+                        help=f'请求需携带的令牌 Authorization: Bearer <token>（默认读取 {TOKEN_ENV}）')
+    parser.add_argument('--max-body-mb', type=int, default=DEFAULT_MAX_BODY_MB,
+                        help=f'请求体上限，超过时回复 413（MB，默认：{DEFAULT_MAX_BODY_MB}）')
+    parser.add_argument('--quiet', action='store_true', help='不输出每个请求的日志')
+
+    args = parser.parse_args()
+    if not args.socket and not is_loopback(args.host) and not args.token:
+        parser.error(f"监听非本机地址 {args.host} 时必须指定 --token（或环境变量 {TOKEN_ENV}）")
+    if args.root and not os.path.isdir(args.root):
+        parser.error(f"--root 不是目录: {args.root}")
+
+    service = FcInsiderService(args.workers, args.cache_mb * 1024 * 1024, args.root)
+
+    if args.socket:
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+        server = UnixHTTPServer(args.socket, RequestHandler)
+        address = f"unix:{args.socket}"
+    else:
+        server = TCPServer((args.host, args.port), RequestHandler)
+        address = f"http://{args.host}:{args.port}"
+
+    server.service = service
+    server.quiet = args.quiet
+    server.token = args.token or None
+    server.max_body = args.max_body_mb * 1024 * 1024
+
+    print("=" * 80)
+    print("FC Insider 常驻服务")
+    print("=" * 80)
+    print(f"  地址: {address}")
+    print(f"  工作线程: {args.workers}")
+    print(f"  缓存上限: {args.cache_mb} MB")
+    print(f"  请求体上限: {args.max_body_mb} MB")
+    print(f"  路径访问: {service.root or '不接受（只接受上传）'}")
+    print(f"  令牌: {'已启用' if server.token else '未启用'}")
+    print("\n按 Ctrl+C 停止")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n正在停止...")
+    finally:
+        server.server_close()
+        service.shutdown()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,127 +14,69 @@
 
 import json
 import argparse
-import re
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
-from difflib import SequenceMatcher
+from typing import List, Dict, Optional
+
+from fc_insider.errors import FcInsiderError, MappingError
+from fc_insider.extraction import iter_markdown_rows
+from fc_insider.matching import (
+    calculate_text_similarity,
+    generate_translation_mapping,
+    is_index_keyed,
+    is_placeholder_row,
+    make_mapping,
+    match,
+    parse_new_translations,
+    smart_pairs,
+    split_placeholder_rows,
+)
+from fc_insider.matching import validate_mappings as collect_mapping_errors
+from fc_insider.stdio import (check_single_stdin, display_name, is_stdio, progress_to_stderr,
+                              read_input_text, write_output_text)
 
 
 def load_markdown_table(md_path: str) -> List[Dict[str, str]]:
     """
     从 Markdown 加载表格数据
 
+    Args:
+        md_path: Markdown 文件路径（"-" 表示 stdin）
+
     Returns:
         List of dicts with keys: segment_id, status, source, target
     """
+    if is_stdio(md_path):
+        return list(iter_markdown_rows(read_input_text(md_path).split('\n')))
     with open(md_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-
-    rows = []
-    in_table = False
-
-    for line in lines:
-        line = line.strip()
-
-        if line.startswith('|') and line.endswith('|'):
-            # 跳过分隔符
-            if set(line.replace('|', '').replace('-', '').strip()) == set():
-                in_table = True
-                continue
-
-            # 跳过表头
-            if 'Segment ID' in line or 'segment_id' in line.lower():
-                in_table = True
-                continue
-
-            if in_table:
-                cells = [cell.strip() for cell in line.split('|')[1:-1]]
-                if len(cells) >= 4:
-                    rows.append({
-                        'segment_id': cells[0],
-                        'status': cells[1],
-                        'source': cells[2],
-                        'target': cells[3]
-                    })
-
-    return rows
-
-
-def is_placeholder_row(text: str) -> bool:
-    """
-    判断是否为占位符行
-
-    占位符行的特征：
-    - 主要由 <数字/> 标记组成
-    - 可能包含少量固定文本（如"在第"、"頁"）
-    - 例如: "<0/>"在第 <1/> 頁, "<2/>", 第 <12/> 頁
-
-    Returns:
-        True if the text is primarily placeholders
-    """
-    # 移除所有占位符
-    without_placeholders = re.sub(r'[<"]?\d+/?[>"]?', '', text)
-    # 移除引号
-    without_placeholders = re.sub(r'["""\'\'<>]', '', without_placeholders)
-    # 移除常见的连接词
-    without_placeholders = re.sub(r'(在第|頁|on page|page)', '', without_placeholders, flags=re.IGNORECASE)
-    # 移除空白
-    without_placeholders = without_placeholders.strip()
-
-    # 如果移除占位符后剩余内容很少，认为是占位符行
-    if len(without_placeholders) <= 3:
-        return True
-
-    # 检查是否包含大量占位符标记
-    placeholder_count = len(re.findall(r'<\d+/>', text))
-    if placeholder_count >= 2:
-        # 如果有2个或更多占位符，且总长度很短
-        if len(text) <= 30:
-            return True
-
-    return False
-
-
-def calculate_text_similarity(text1: str, text2: str) -> float:
-    """
-    计算两段文本的相似度
+        return list(iter_markdown_rows(f))
 
-    使用多种方法综合评分：
-    1. SequenceMatcher - 序列相似度
-    2. 共同字符比例
-    3. 词汇重叠度
 
-    Returns:
-        0.0-1.0 的相似度分数
-    """
-    if not text1 or not text2:
-        return 0.0
+def print_smart_matches(matches: List[Dict], min_similarity: float = 0.15, verbose: bool = False):
+    """打印智能匹配示例与低相似度警告"""
+    if verbose:
+        print(f"✓ 智能匹配完成：{len(matches)} 个配对")
 
-    # 方法 1: SequenceMatcher
-    seq_ratio = SequenceMatcher(None, text1, text2).ratio()
+        # 显示匹配示例
+        print(f"\n匹配示例（按相似度排序，前5个）:")
+        sorted_matches = sorted(matches, key=lambda x: x['similarity'], reverse=True)
+        for i, match in enumerate(sorted_matches[:5], 1):
+            print(f"\n  {i}. 相似度: {match['similarity']:.2%}")
+            print(f"     旧: {match['old_text'][:60]}{'...' if len(match['old_text']) > 60 else ''}")
+            print(f"     新: {match['new_text'][:60]}{'...' if len(match['new_text']) > 60 else ''}")
 
-    # 方法 2: 共同字符比例
-    set1 = set(text1)
-    set2 = set(text2)
-    if not set1 or not set2:
-        char_ratio = 0.0
-    else:
-        common_chars = set1 & set2
-        char_ratio = len(common_chars) / max(len(set1), len(set2))
-
-    # 方法 3: 词汇重叠（按标点和空格分词）
-    words1 = set(re.findall(r'[\w]+', text1))
-    words2 = set(re.findall(r'[\w]+', text2))
-    if not words1 or not words2:
-        word_ratio = 0.0
-    else:
-        common_words = words1 & words2
-        word_ratio = len(common_words) / max(len(words1), len(words2))
+    # 警告：相似度过低的配对
+    low_similarity_warnings = [m for m in matches if m['similarity'] < min_similarity]
+    if low_similarity_warnings:
+        print(f"\n⚠️  警告：{len(low_similarity_warnings)} 个配对的相似度较低（< {min_similarity:.0%}）")
+        print(f"   建议检查这些配对是否正确：")
 
-    # 综合评分（序列相似度权重最高）
-    similarity = (seq_ratio * 0.5) + (char_ratio * 0.2) + (word_ratio * 0.3)
+        for i, match in enumerate(low_similarity_warnings[:5], 1):
+            print(f"\n   {i}. 相似度: {match['similarity']:.2%}")
+            print(f"      旧: {match['old_text'][:50]}{'...' if len(match['old_text']) > 50 else ''}")
+            print(f"      新: {match['new_text'][:50]}{'...' if len(match['new_text']) > 50 else ''}")
 
-    return similarity
+        if len(low_similarity_warnings) > 5:
+            print(f"   ... 还有 {len(low_similarity_warnings) - 5} 个低相似度配对")
 
 
 def smart_match_translations(
@@ -161,81 +103,23 @@ def smart_match_translations(
         print(f"   新翻译数量: {len(new_texts)}")
         print(f"   最小相似度阈值: {min_similarity}")
 
-    # 计算所有可能的配对相似度
-    similarity_matrix = []
-    for old_idx, old_row in enumerate(old_table):
-        old_text = old_row['target']
-        row_similarities = []
-
-        for new_idx, new_text in enumerate(new_texts):
-            similarity = calculate_text_similarity(old_text, new_text)
-            row_similarities.append({
-                'old_idx': old_idx,
-                'new_idx': new_idx,
-                'similarity': similarity,
-                'old_text': old_text,
-                'new_text': new_text,
-                'segment_id': old_row['segment_id']
-            })
-
-        similarity_matrix.append(row_similarities)
-
-    # 贪婪匹配：为每个旧翻译找到最佳新翻译
-    used_new_indices = set()
-    matches = []
-
-    # 按相似度排序所有可能的配对
-    all_pairs = []
-    for row_similarities in similarity_matrix:
-        all_pairs.extend(row_similarities)
-    all_pairs.sort(key=lambda x: x['similarity'], reverse=True)
-
-    # 贪婪选择最佳配对
-    used_old = set()
-    for pair in all_pairs:
-        if pair['old_idx'] not in used_old and pair['new_idx'] not in used_new_indices:
-            matches.append(pair)
-            used_old.add(pair['old_idx'])
-            used_new_indices.add(pair['new_idx'])
-
-            if len(matches) == len(old_table):
-                break
-
-    # 生成映射
-    result = {}
-    low_similarity_warnings = []
-
-    for match in matches:
-        result[match['segment_id']] = match['new_text']
-
-        if match['similarity'] < min_similarity:
-            low_similarity_warnings.append(match)
+    matches = smart_pairs(old_table, new_texts)
+    print_smart_matches(matches, min_similarity, verbose)
 
-    if verbose:
-        print(f"✓ 智能匹配完成：{len(result)} 个配对")
+    return {m['segment_id']: m['new_text'] for m in matches}
 
-        # 显示匹配示例
-        print(f"\n匹配示例（按相似度排序，前5个）:")
-        sorted_matches = sorted(matches, key=lambda x: x['similarity'], reverse=True)
-        for i, match in enumerate(sorted_matches[:5], 1):
-            print(f"\n  {i}. 相似度: {match['similarity']:.2%}")
-            print(f"     旧: {match['old_text'][:60]}{'...' if len(match['old_text']) > 60 else ''}")
-            print(f"     新: {match['new_text'][:60]}{'...' if len(match['new_text']) > 60 else ''}")
 
-    # 警告：相似度过低的配对
-    if low_similarity_warnings:
-        print(f"\n⚠️  警告：{len(low_similarity_warnings)} 个配对的相似度较低（< {min_similarity:.0%}）")
-        print(f"   建议检查这些配对是否正确：")
+def print_skipped_rows(total: int, kept: int, skipped: List[Dict[str, str]]):
+    """打印占位符过滤详情"""
+    print(f"\n占位符过滤:")
+    print(f"  总行数: {total}")
+    print(f"  保留: {kept}")
+    print(f"  跳过: {len(skipped)}")
 
-        for i, match in enumerate(low_similarity_warnings[:5], 1):
-            print(f"\n   {i}. 相似度: {match['similarity']:.2%}")
-            print(f"      旧: {match['old_text'][:50]}{'...' if len(match['old_text']) > 50 else ''}")
-            print(f"      新: {match['new_text'][:50]}{'...' if len(match['new_text']) > 50 else ''}")
-
-        if len(low_similarity_warnings) > 5:
-            print(f"   ... 还有 {len(low_similarity_warnings) - 5} 个低相似度配对")
-
-    return result
+    if skipped:
+        print(f"\n跳过的占位符行（前10个）:")
+        for i, row in enumerate(skipped[:10], 1):
+            print(f"    {i}. {row['segment_id']}: {row['target'][:50]}")
 
 
 def filter_placeholder_rows(rows: List[Dict[str, str]], verbose: bool = False) -> List[Dict[str, str]]:
@@ -249,27 +133,10 @@ def filter_placeholder_rows(rows: List[Dict[str, str]], verbose: bool = False) -
     Returns:
         过滤后的行列表
     """
-    filtered = []
-    skipped = []
-
-    for row in rows:
-        target_text = row['target']
-
-        if is_placeholder_row(target_text):
-            skipped.append(row)
-        else:
-            filtered.append(row)
+    filtered, skipped = split_placeholder_rows(rows)
 
     if verbose:
-        print(f"\n占位符过滤:")
-        print(f"  总行数: {len(rows)}")
-        print(f"  保留: {len(filtered)}")
-        print(f"  跳过: {len(skipped)}")
-
-        if skipped:
-            print(f"\n跳过的占位符行（前10个）:")
-            for i, row in enumerate(skipped[:10], 1):
-                print(f"    {i}. {row['segment_id']}: {row['target'][:50]}")
+        print_skipped_rows(len(rows), len(filtered), skipped)
 
     return filtered
 
@@ -282,79 +149,72 @@ def load_new_translations(input_path: str, format: str = 'auto') -> Dict[str, st
     - json: {"segment_id": "new_text", ...}
     - text: 按行分割的译文（与表格行对应）
     - auto: 自动检测
-    """
-    with open(input_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # 自动检测格式
-    if format == 'auto':
-        if content.strip().startswith('{'):
-            format = 'json'
-        else:
-            format = 'text'
-
-    if format == 'json':
-        data = json.loads(content)
-        # 支持多种 JSON 格式
-        if isinstance(data, dict) and 'translations' in data:
-            # 格式 1: {"translations": [{"segment_id": "...", "text": "..."}, ...]}
-            return {
-                item['segment_id']: item.get('text', item.get('new_text', ''))
-                for item in data['translations']
-            }
-        elif isinstance(data, dict):
-            # 格式 2: {"segment_id": "new_text", ...}
-            return data
-        else:
-            raise ValueError("不支持的 JSON 格式")
-
-    elif format == 'text':
-        # 每行一个译文
-        lines = [line.strip() for line in content.split('\n') if line.strip()]
-        return {str(i): line for i, line in enumerate(lines)}
 
-    else:
-        raise ValueError(f"不支持的格式: {format}")
+    input_path 为 "-" 时从 stdin 读取
+    """
+    return parse_new_translations(read_input_text(input_path), format)
 
 
-def generate_translation_mapping(
+def resolve_mappings(
     old_table: List[Dict[str, str]],
     new_translations: Dict[str, str],
-    match_by: str = 'segment_id'
-) -> List[Dict[str, str]]:
+    match_by: str = 'segment_id',
+    verbose: bool = False
+) -> Optional[List[Dict[str, str]]]:
     """
-    生成新旧翻译对照表
+    按匹配方式把新译文配对到表格行，生成对照表（fc_insider.match 的命令行包装）
 
     Args:
-        old_table: 从 Word 提取的原始表格
-        new_translations: 新译文（segment_id -> new_text）
-        match_by: 匹配方式（'segment_id' 或 'index'）
+        old_table: 已过滤占位符的表格行
+        new_translations: load_new_translations() 的结果
+        match_by: 'segment_id' | 'index' | 'smart'
 
     Returns:
-        List of translation mappings for update_fc_insider_v3.py
+        对照表列表；新翻译行数不足时返回 None
     """
-    mappings = []
-
-    for idx, row in enumerate(old_table):
-        segment_id = row['segment_id']
-        old_text = row['target']
-
-        # 匹配新译文
-        if match_by == 'segment_id' or match_by == 'smart':
-            # smart 模式在之前已经转换为 segment_id 映射
-            new_text = new_translations.get(segment_id)
-        elif match_by == 'index':
-            new_text = new_translations.get(str(idx))
-        else:
-            raise ValueError(f"不支持的匹配方式: {match_by}")
-
-        # 只有当新译文存在且与旧译文不同时才添加
-        if new_text and new_text != old_text:
-            mappings.append({
-                'segment_id': segment_id,
-                'old_text': old_text,
-                'new_text': new_text
-            })
+    text_to_segment_id = match_by == 'segment_id' and is_index_keyed(new_translations)
+
+    if match_by == 'smart' and verbose:
+        print(f"\n🔍 智能匹配模式")
+        print(f"   旧翻译数量: {len(old_table)}")
+        print(f"   新翻译数量: {len(new_translations)}")
+        print(f"   最小相似度阈值: 0.15")
+
+    if text_to_segment_id:
+        # 自动转换：text 格式 + segment_id 匹配，按行顺序转换成 segment_id 映射
+        print(f"\n🔄 检测到纯文本格式 + segment_id 匹配模式")
+        print(f"   自动将文本转换为 JSON 格式（文本行 → segment_id）...")
+
+        if len(new_translations) != len(old_table):
+            print(f"\n⚠️  警告：")
+            print(f"   新翻译行数: {len(new_translations)}")
+            print(f"   过滤后表格行数: {len(old_table)}")
+            if len(new_translations) > len(old_table):
+                print(f"   ⚠ 新翻译行数过多，将只使用前 {len(old_table)} 行")
+
+    try:
+        result = match(old_table, new_translations, match_by=match_by, filter_placeholders=False)
+    except MappingError:
+        print(f"   ✗ 新翻译行数不足！请检查新翻译文件")
+        return None
+
+    if match_by == 'smart':
+        print_smart_matches(result['pairs'], verbose=verbose)
+
+    if text_to_segment_id:
+        converted = min(len(new_translations), len(old_table))
+        print(f"✓ 转换完成：{converted} 个译文已映射到 segment_id")
+
+        if verbose:
+            print(f"\n转换示例（前3个）:")
+            for i, row in enumerate(old_table[:3]):
+                text = new_translations[str(i)]
+                print(f"  {i + 1}. {row['segment_id']}: {text[:50]}{'...' if len(text) > 50 else ''}")
+
+    # 生成对照表
+    mappings = result['mappings']
+    print(f"\n生成对照表（匹配方式: {match_by}）...")
+    print(f"✓ 生成 {len(mappings)} 个变更")
 
     return mappings
 
@@ -391,28 +251,12 @@ def validate_mappings(mappings: List[Dict[str, str]]) -> bool:
     - new_text 不为空
     - 没有重复的 segment_id
     """
+    errors = collect_mapping_errors(mappings)
+
     if not mappings:
         print("✗ 错误：对照表为空")
         return False
 
-    seen_ids = set()
-    errors = []
-
-    for i, mapping in enumerate(mappings, 1):
-        seg_id = mapping.get('segment_id', '').strip()
-        new_text = mapping.get('new_text', '').strip()
-
-        if not seg_id:
-            errors.append(f"行 {i}: segment_id 为空")
-
-        if not new_text:
-            errors.append(f"行 {i} ({seg_id}): new_text 为空")
-
-        if seg_id in seen_ids:
-            errors.append(f"行 {i}: segment_id '{seg_id}' 重复")
-
-        seen_ids.add(seg_id)
-
     if errors:
         print("✗ 验证失败:")
         for error in errors[:10]:  # 只显示前 10 个错误
@@ -449,23 +293,28 @@ def main():
     --new-translations new_trans.txt \\
     --match-by index \\
     --output translations.json
+
+  # 管道：Markdown 来自 stdin，对照表输出到 stdout（进度信息输出到 stderr）
+  python extract_table_markitdown_simple.py input.docx - | \\
+    python generate_translation_mapping.py --markdown - \\
+      --new-translations new_trans.txt --match-by smart --output - > translations.json
         '''
     )
 
     parser.add_argument(
         '--markdown',
         required=True,
-        help='从 Word 提取的 Markdown 表格'
+        help='从 Word 提取的 Markdown 表格（"-" 表示 stdin）'
     )
     parser.add_argument(
         '--new-translations',
         required=True,
-        help='新译文文件（JSON 或文本）'
+        help='新译文文件（JSON 或文本，"-" 表示 stdin）'
     )
     parser.add_argument(
         '--output',
         default='translations.json',
-        help='输出对照表路径（默认：translations.json）'
+        help='输出对照表路径（默认：translations.json，"-" 表示 stdout）'
     )
     parser.add_argument(
         '--match-by',
@@ -497,12 +346,18 @@ def main():
 
     args = parser.parse_args()
 
+    error = check_single_stdin(args.markdown, args.new_translations)
+    if error:
+        parser.error(error)
+    if not args.preview_only:
+        progress_to_stderr(args.output)
+
     print("=" * 80)
     print("生成翻译对照表")
     print("=" * 80)
 
     # 加载数据
-    print(f"\n读取 Markdown 表格: {args.markdown}")
+    print(f"\n读取 Markdown 表格: {display_name(args.markdown)}")
     old_table = load_markdown_table(args.markdown)
     print(f"✓ 加载 {len(old_table)} 行")
 
@@ -511,64 +366,13 @@ def main():
         old_table = filter_placeholder_rows(old_table, args.verbose)
         print(f"✓ 过滤后保留 {len(old_table)} 行（跳过了占位符行）")
 
-    print(f"\n读取新译文: {args.new_translations}")
+    print(f"\n读取新译文: {display_name(args.new_translations)}")
     new_translations = load_new_translations(args.new_translations, args.format)
     print(f"✓ 加载 {len(new_translations)} 个译文")
 
-    # 智能匹配：使用文本相似度自动配对
-    if args.match_by == 'smart':
-        # 将新翻译转换为列表
-        if isinstance(list(new_translations.keys())[0] if new_translations else '', str) and list(new_translations.keys())[0].isdigit() if new_translations else False:
-            # 如果是索引格式，转换为列表
-            text_list = [new_translations[str(i)] for i in range(len(new_translations))]
-        else:
-            # 如果是 segment_id 格式，只提取文本
-            text_list = list(new_translations.values())
-
-        # 使用智能匹配
-        new_translations = smart_match_translations(old_table, text_list, verbose=args.verbose)
-
-    # 自动转换：如果是 text 格式 + segment_id 匹配，自动转换成 JSON 格式
-    elif args.match_by == 'segment_id' and isinstance(list(new_translations.keys())[0] if new_translations else '', str) and list(new_translations.keys())[0].isdigit() if new_translations else False:
-        print(f"\n🔄 检测到纯文本格式 + segment_id 匹配模式")
-        print(f"   自动将文本转换为 JSON 格式（文本行 → segment_id）...")
-
-        # 将索引映射转换为 segment_id 映射
-        text_list = [new_translations[str(i)] for i in range(len(new_translations))]
-
-        if len(text_list) != len(old_table):
-            print(f"\n⚠️  警告：")
-            print(f"   新翻译行数: {len(text_list)}")
-            print(f"   过滤后表格行数: {len(old_table)}")
-            if len(text_list) < len(old_table):
-                print(f"   ✗ 新翻译行数不足！请检查新翻译文件")
-                return 1
-            elif len(text_list) > len(old_table):
-                print(f"   ⚠ 新翻译行数过多，将只使用前 {len(old_table)} 行")
-                text_list = text_list[:len(old_table)]
-
-        # 转换为 segment_id -> text 映射
-        converted_translations = {}
-        for idx, row in enumerate(old_table):
-            if idx < len(text_list):
-                converted_translations[row['segment_id']] = text_list[idx]
-
-        new_translations = converted_translations
-        print(f"✓ 转换完成：{len(new_translations)} 个译文已映射到 segment_id")
-
-        if args.verbose:
-            print(f"\n转换示例（前3个）:")
-            for i, (seg_id, text) in enumerate(list(new_translations.items())[:3], 1):
-                print(f"  {i}. {seg_id}: {text[:50]}{'...' if len(text) > 50 else ''}")
-
-    # 生成对照表
-    print(f"\n生成对照表（匹配方式: {args.match_by}）...")
-    mappings = generate_translation_mapping(
-        old_table,
-        new_translations,
-        match_by=args.match_by
-    )
-    print(f"✓ 生成 {len(mappings)} 个变更")
+    mappings = resolve_mappings(old_table, new_translations, args.match_by, args.verbose)
+    if mappings is None:
+        return 1
 
     # 验证
     if not validate_mappings(mappings):
@@ -580,10 +384,11 @@ def main():
     # 保存
     if not args.preview_only:
         output_data = {'translations': mappings}
-        with open(args.output, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, ensure_ascii=False, indent=2)
+        write_output_text(args.output, json.dumps(output_data, ensure_ascii=False, indent=2))
 
-        print(f"\n✓ 对照表已保存: {args.output}")
+        print(f"\n✓ 对照表已保存: {display_name(args.output, 'stdout')}")
+        if is_stdio(args.output):
+            return 0
         print(f"\n下一步:")
         print(f"  python update_fc_insider_v3.py \\")
         print(f"    --unpacked <unpacked_dir> \\")
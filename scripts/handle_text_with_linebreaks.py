@@ -3,7 +3,11 @@
 處理包含換行符的文本追踪修訂
 
 此腳本用於處理 Word 文檔中包含內嵌換行符（<w:br/>）的翻譯更新。
-當標準工作流程無法處理換行符時，使用此腳本。
+
+update_fc_insider_tracked.py（以及 run_complete_workflow.py）現在已直接處理換行符：
+<w:br/> 讀作 \n、比較時換行與空格視為相同、修訂中以 <w:br/> 分隔，一次更新即可完成，
+不再需要先執行標準流程、再用此腳本處理失敗的單元格。
+此腳本保留作為相容用途：它不校驗舊文本，直接以映射中的文本寫入修訂。
 
 使用方法：
 python3 handle_text_with_linebreaks.py \
@@ -11,6 +15,9 @@ python3 handle_text_with_linebreaks.py \
   --translations "translations.json" \
   --output "output.docx" \
   --author "Claire.lee@amway.com"
+
+同一輸入反復更新時可加 --segment-index auto：Segment 位置索引保存在 <input>.segidx.json
+（與 update_fc_insider_tracked.py 共用），之後不再掃描表格。
 """
 
 import argparse
@@ -23,44 +30,18 @@ from lxml import etree
 
 try:
     from docx import Document
-    from docx.oxml import parse_xml
     from docx.oxml.ns import qn
+    from fc_insider.package import SourcePackage, save_document
+    from fc_insider.segment_index import INDEX_MODES, open_index, segment_finder
+    from fc_insider.tracked import RevisionFactory, first_revision_id, has_identical_revision
+    from fc_insider.stdio import (check_single_stdin, display_name, is_stdio, progress_to_stderr,
+                                  read_input_bytes, write_output_bytes)
 except ImportError:
     print("錯誤：需要安裝 python-docx 和 lxml")
     print("運行: pip install python-docx lxml")
     sys.exit(1)
 
 
-def xml_escape(text: str) -> str:
-    """轉義 XML 特殊字符"""
-    return (text
-            .replace('&', '&amp;')
-            .replace('<', '&lt;')
-            .replace('>', '&gt;')
-            .replace('"', '&quot;')
-            .replace("'", '&apos;'))
-
-
-def create_run_with_linebreaks(text: str) -> str:
-    """
-    創建包含換行符的 run XML
-
-    將文本中的 \n 轉換為 <w:br/> 標籤
-    """
-    parts = text.split('\n')
-    run_xml = '<w:r xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
-
-    for i, part in enumerate(parts):
-        if i > 0:
-            # 添加換行符標籤
-            run_xml += '<w:br/>'
-        if part:  # 只有當部分不為空時才添加文本
-            run_xml += f'<w:t xml:space="preserve">{xml_escape(part)}</w:t>'
-
-    run_xml += '</w:r>'
-    return run_xml
-
-
 def clear_cell_tracked_changes(cell):
     """清除單元格中的所有追踪修訂標記"""
     for paragraph in cell.paragraphs:
@@ -93,11 +74,15 @@ def apply_tracked_change_with_linebreaks(
     author: str,
     date_str: str,
     revision_id: int,
-    verbose: bool = False
+    verbose: bool = False,
+    factory: RevisionFactory = None
 ) -> bool:
     """
     應用包含換行符的追踪修訂
 
+    修訂元素由 RevisionFactory 複製原型生成，文本中的 \n 轉為 <w:br/>，
+    XML 特殊字符由 lxml 自動轉義。
+
     Args:
         cell: Word 表格單元格
         old_text: 舊文本（可能包含 \n）
@@ -106,7 +91,11 @@ def apply_tracked_change_with_linebreaks(
         date_str: 日期字符串
         revision_id: 修訂ID
         verbose: 詳細模式
+        factory: 同一批更新共用的 RevisionFactory（作者、日期須一致）；不提供時臨時建立
     """
+    if factory is None:
+        factory = RevisionFactory(author, date_str)
+
     # 清除現有追踪修訂
     clear_cell_tracked_changes(cell)
 
@@ -121,37 +110,11 @@ def apply_tracked_change_with_linebreaks(
 
     paragraph = cell.paragraphs[0]
 
-    # 創建刪除標記（舊文本）
-    del_element = parse_xml(f'''
-        <w:del w:id="{revision_id}" w:author="{xml_escape(author)}" w:date="{date_str}"
-               xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
-        </w:del>
-    ''')
-
-    # 創建包含換行符的舊文本 run
-    old_run_xml = create_run_with_linebreaks(old_text)
-    old_run_element = parse_xml(old_run_xml)
+    # 刪除標記（舊文本，使用 <w:delText>）
+    paragraph._element.append(factory.linebreak_deletion(revision_id, old_text))
 
-    # 修改 run 以使用 delText
-    for t_elem in old_run_element.findall('.//' + qn('w:t')):
-        t_elem.tag = qn('w:delText')
-
-    del_element.append(old_run_element)
-    paragraph._element.append(del_element)
-
-    # 創建插入標記（新文本）
-    ins_element = parse_xml(f'''
-        <w:ins w:id="{revision_id + 1}" w:author="{xml_escape(author)}" w:date="{date_str}"
-               xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
-        </w:ins>
-    ''')
-
-    # 創建包含換行符的新文本 run
-    new_run_xml = create_run_with_linebreaks(new_text)
-    new_run_element = parse_xml(new_run_xml)
-
-    ins_element.append(new_run_element)
-    paragraph._element.append(ins_element)
+    # 插入標記（新文本）
+    paragraph._element.append(factory.linebreak_insertion(revision_id + 1, new_text))
 
     if verbose:
         print(f"  ✓ 已應用追踪修訂（包含換行符）")
@@ -163,18 +126,22 @@ def apply_tracked_change_with_linebreaks(
     return True
 
 
-def find_cell_by_segment_id(table, segment_id: str):
-    """根據 Segment ID 查找單元格"""
-    for i, row in enumerate(table.rows):
-        if len(row.cells) < 1:
-            continue
+def segment_cell_finder(table, input_path: str, docx_bytes, mode: str = 'auto'):
+    """
+    建立 Segment ID -> Target 列單元格的查找函數
 
-        cell_text = row.cells[0].text.strip()
-        if cell_text == segment_id:
-            if len(row.cells) >= 3:
-                return row.cells[2], i  # 返回 Target 列
+    有效的 segment 索引直接按位置取單元格；否則單次遍歷表格建立（並保存索引）。
+    stdin 輸入沒有可保存 sidecar 的位置，不使用索引。
+    """
+    index = None
+    if mode != 'off' and not is_stdio(input_path):
+        index, status = open_index(table, input_path, docx_bytes, mode)
+        if status == 'loaded':
+            print(f"✓ 使用 segment 索引（{len(index['segments'])} 個）")
+        elif status == 'built':
+            print(f"✓ 已建立 segment 索引（{len(index['segments'])} 個）")
 
-    return None, None
+    return segment_finder(table, index, engine='lxml')
 
 
 def process_translations(
@@ -182,29 +149,36 @@ def process_translations(
     translations_path: str,
     output_path: str,
     author: str,
-    verbose: bool = False
+    verbose: bool = False,
+    segment_index: str = 'off'
 ):
-    """處理翻譯更新"""
-    print(f"📖 加載文檔: {input_path}")
-    doc = Document(input_path)
+    """處理翻譯更新（路徑為 "-" 時使用 stdin / stdout）"""
+    from io import BytesIO
+
+    print(f"📖 加載文檔: {display_name(input_path)}")
+    # 文件以 mmap 讀取
+    package = SourcePackage(read_input_bytes(input_path) if is_stdio(input_path) else input_path)
+    doc = Document(package.stream)
 
     if not doc.tables:
         print("❌ 錯誤：文檔中沒有表格")
+        package.close()
         return False
 
     table = doc.tables[0]
+    find_cell = segment_cell_finder(table, input_path, package.stream, segment_index)
 
     # 加載翻譯映射
-    with open(translations_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-        translations = data.get('translations', data) if isinstance(data, dict) else data
+    data = json.loads(read_input_bytes(translations_path).decode('utf-8'))
+    translations = data.get('translations', data) if isinstance(data, dict) else data
 
     print(f"✓ 加載 {len(translations)} 個翻譯")
     print()
 
-    # 生成日期和修訂 ID
+    # 生成日期和修訂 ID（從文檔中已有的最大 w:id 之後開始）
     date_str = datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
-    base_revision_id = 1000
+    factory = RevisionFactory(author, date_str)
+    base_revision_id = first_revision_id(doc.element)
 
     success_count = 0
     total_count = len(translations)
@@ -220,12 +194,18 @@ def process_translations(
         if verbose:
             print(f"[{idx}/{total_count}] 處理 {segment_id}...")
 
-        cell, row_idx = find_cell_by_segment_id(table, segment_id)
+        cell = find_cell(segment_id) if segment_id else None
 
         if cell is None:
             print(f"  ✗ 找不到 Segment ID: {segment_id}")
             continue
 
+        # 重複執行時，已含相同修訂的單元格不再改動
+        if has_identical_revision(cell, old_text.strip(), new_text.strip()):
+            success_count += 1
+            print(f"[{idx}/{total_count}] ✓ {segment_id}（已有相同修訂，跳過）")
+            continue
+
         # 應用追踪修訂（處理換行符）
         revision_id = base_revision_id + (idx * 2)
         success = apply_tracked_change_with_linebreaks(
@@ -235,7 +215,8 @@ def process_translations(
             author,
             date_str,
             revision_id,
-            verbose
+            verbose,
+            factory
         )
 
         if success:
@@ -248,8 +229,12 @@ def process_translations(
     print()
 
     # 保存文檔
-    print(f"💾 保存文檔: {output_path}")
-    doc.save(output_path)
+    print(f"💾 保存文檔: {display_name(output_path, 'stdout')}")
+    # 只重寫 document.xml，其餘成員原樣複製
+    buffer = BytesIO()
+    save_document(doc, package, buffer, [doc.part])
+    package.close()
+    write_output_bytes(output_path, buffer.getvalue())
     print("✓ 完成")
 
     return True
@@ -274,30 +259,45 @@ def main():
     --output "output.docx" \\
     --author "translator@company.com" \\
     --verbose
+
+  # 管道：docx 來自 stdin，輸出到 stdout（進度信息輸出到 stderr）
+  cat input.docx | python3 handle_text_with_linebreaks.py \\
+    --input - \\
+    --translations "translations.json" \\
+    --output - > output.docx
 '''
     )
 
-    parser.add_argument('--input', required=True, help='輸入 Word 文檔路徑')
-    parser.add_argument('--translations', required=True, help='翻譯映射 JSON 文件路徑')
-    parser.add_argument('--output', required=True, help='輸出 Word 文檔路徑')
+    parser.add_argument('--input', required=True, help='輸入 Word 文檔路徑（"-" 表示 stdin）')
+    parser.add_argument('--translations', required=True, help='翻譯映射 JSON 文件路徑（"-" 表示 stdin）')
+    parser.add_argument('--output', required=True, help='輸出 Word 文檔路徑（"-" 表示 stdout）')
     parser.add_argument('--author', default='Claire.lee@amway.com',
                        help='追踪修訂作者名稱（默認：Claire.lee@amway.com）')
+    parser.add_argument('--segment-index', choices=INDEX_MODES, default='off',
+                       help='segment 位置索引（<input>.segidx.json）：off 不使用（默認）；'
+                            'auto 有效時復用、否則建立並保存；rebuild 強制重建')
     parser.add_argument('--verbose', action='store_true', help='詳細輸出')
 
     args = parser.parse_args()
 
+    error = check_single_stdin(args.input, args.translations)
+    if error:
+        parser.error(error)
+    progress_to_stderr(args.output)
+
     # 驗證文件存在
-    if not Path(args.input).exists():
+    if not is_stdio(args.input) and not Path(args.input).exists():
         print(f"❌ 錯誤：輸入文件不存在: {args.input}")
         sys.exit(1)
 
-    if not Path(args.translations).exists():
+    if not is_stdio(args.translations) and not Path(args.translations).exists():
         print(f"❌ 錯誤：翻譯文件不存在: {args.translations}")
         sys.exit(1)
 
     print("=" * 80)
     print("處理包含換行符的翻譯更新")
     print("=" * 80)
+    print("提示：update_fc_insider_tracked.py 已可直接處理換行符（一次更新，並校驗舊文本）")
     print()
 
     success = process_translations(
@@ -305,7 +305,8 @@ def main():
         args.translations,
         args.output,
         args.author,
-        args.verbose
+        args.verbose,
+        args.segment_index
     )
 
     sys.exit(0 if success else 1)
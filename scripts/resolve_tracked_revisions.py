@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+批量接受 / 拒绝追踪修订：一次处理整个文档的修订，可按作者和日期筛选
+
+新一轮翻译前接受上一轮已审定的修订，或拒绝某位审阅者的全部修订。只解析、重写 document.xml，
+数万条修订也只需几秒；除内容修订外，也处理格式修订、段落标记、表格行和移动的修订。
+
+用法:
+    python resolve_tracked_revisions.py accept-all --input reviewed.docx --output accepted.docx
+
+  # 只拒绝某位审阅者在某段时间内的修订
+  python resolve_tracked_revisions.py reject-all --input reviewed.docx --output rejected.docx \\
+    --author "Reviewer B" --since 2025-03-01 --before 2025-04-01
+
+  # 从 stdin 读取、输出到 stdout（进度信息输出到 stderr）
+  cat reviewed.docx | python resolve_tracked_revisions.py accept-all --input - --output - > accepted.docx
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from fc_insider.errors import FcInsiderError
+from fc_insider.revisions import parse_revision_date, resolve
+from fc_insider.stats import document_stats
+from fc_insider.stdio import (display_name, is_stdio, progress_to_stderr,
+                              read_input_bytes, write_output_bytes)
+
+# 命令 -> fc_insider.revisions.resolve() 的操作
+COMMANDS = {'accept-all': 'accept', 'reject-all': 'reject'}
+
+# 各类修订的名称（按输出顺序）
+KINDS = [
+    ('insertions', '插入'),
+    ('deletions', '删除'),
+    ('moves', '移动'),
+    ('formatting', '格式修订'),
+    ('paragraph_marks', '段落标记'),
+    ('rows', '表格行'),
+]
+
+
+def print_resolution(result: Dict, action: str, before: Dict, after: Dict, elapsed: float) -> None:
+    """打印处理结果：各类修订数、作者与 document.xml 的大小（fc_insider.stats.document_stats()）"""
+    verb = '接受' if action == 'accept' else '拒绝'
+    print(f"✓ {verb}修订: {result['resolved']:,}，耗时 {elapsed:.2f}s")
+    for key, label in KINDS:
+        if result[key]:
+            print(f"  {label}: {result[key]:,}")
+    for author, count in sorted(result['authors'].items(), key=lambda item: -item[1]):
+        print(f"  作者 {author or '(无)'}: {count:,}")
+    if result['remaining']:
+        print(f"⚠ 不符合筛选条件、保留的修订: {result['remaining']:,}")
+    if result['discarded']:
+        print(f"⚠ 不符合筛选条件、但随外层内容一并删除的修订: {result['discarded']:,}")
+
+    saved = before['xml_bytes'] - after['xml_bytes']
+    ratio = saved / before['xml_bytes'] * 100 if before['xml_bytes'] else 0.0
+    print(f"📄 document.xml: {before['xml_bytes']:,} → {after['xml_bytes']:,} 字节"
+          f"（节省 {saved:,} 字节，{ratio:.1f}%），"
+          f"修订: {before['revisions']:,} → {after['revisions']:,}")
+
+
+def resolve_file(input_path: str, output_path: str, action: str,
+                 authors: Optional[List[str]] = None, since: Optional[str] = None,
+                 before: Optional[str] = None) -> Dict:
+    """
+    接受或拒绝文档中的修订并写出
+
+    Args:
+        input_path: 输入 Word 文档路径（"-" 表示 stdin）
+        output_path: 输出 Word 文档路径（"-" 表示 stdout）
+        action: 'accept' | 'reject'
+        authors: 只处理这些作者的修订
+        since / before: 只处理日期不早于 since、早于 before 的修订（ISO 8601 日期或时间）
+
+    Returns:
+        fc_insider.revisions.resolve() 的结果
+    """
+    print(f"\n📖 读取文档: {display_name(input_path)}")
+    source = read_input_bytes(input_path)
+
+    conditions = []
+    if authors:
+        conditions.append(f"作者 {', '.join(authors)}")
+    if since:
+        conditions.append(f"日期 ≥ {since}")
+    if before:
+        conditions.append(f"日期 < {before}")
+    print(f"🔍 {'接受' if action == 'accept' else '拒绝'}修订"
+          f"{'（' + '；'.join(conditions) + '）' if conditions else '（全部）'}...")
+
+    started = time.perf_counter()
+    result = resolve(source, action, authors=authors,
+                     since=parse_revision_date(since), before=parse_revision_date(before))
+    elapsed = time.perf_counter() - started
+
+    print(f"\n💾 保存文档: {display_name(output_path, 'stdout')}")
+    write_output_bytes(output_path, result['docx'])
+
+    print_resolution(result, action, document_stats(source), document_stats(result['docx']), elapsed)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='接受或拒绝整个文档的追踪修订，可按作者和日期筛选',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+示例:
+  # 接受全部修订
+  python resolve_tracked_revisions.py accept-all --input reviewed.docx --output accepted.docx
+
+  # 拒绝某位审阅者的全部修订
+  python resolve_tracked_revisions.py reject-all --input reviewed.docx --output rejected.docx \\
+    --author "Reviewer B"
+
+  # 只接受 2025 年 3 月的修订（--author 可重复）
+  python resolve_tracked_revisions.py accept-all --input reviewed.docx --output accepted.docx \\
+    --author Translator --author "Reviewer A" --since 2025-03-01 --before 2025-04-01
+
+  # 从 stdin 读取、输出到 stdout（进度信息输出到 stderr）
+  cat reviewed.docx | python resolve_tracked_revisions.py accept-all --input - --output - > accepted.docx
+
+说明:
+  - 处理 <w:ins> / <w:del>（含嵌套）、<w:moveFrom> / <w:moveTo>、<w:rPrChange> / <w:pPrChange>，
+    以及段落标记和表格行的插入、删除
+  - 接受删除的段落标记（或拒绝插入的）时段落并入下一段落；表格行随之删除，表格没有行时整表删除
+  - 日期按 UTC 比较；指定 --since / --before 时，没有日期的修订不处理
+  - 单元格的插入删除（<w:cellIns> 等）与表格、节属性的格式修订不处理，保留在文档中
+  - 没有匹配的修订时输出与输入相同
+        '''
+    )
+
+    parser.add_argument('command', choices=sorted(COMMANDS), help='accept-all（接受）或 reject-all（拒绝）')
+    parser.add_argument('--input', required=True, help='输入 Word 文档路径（"-" 表示 stdin）')
+    parser.add_argument('--output', required=True, help='输出 Word 文档路径（"-" 表示 stdout）')
+    parser.add_argument('--author', action='append', dest='authors', metavar='AUTHOR',
+                        help='只处理此作者的修订（可重复；默认全部作者）')
+    parser.add_argument('--since', help='只处理此日期或时间及之后的修订（ISO 8601，如 2025-03-01）')
+    parser.add_argument('--before', help='只处理此日期或时间之前的修订（ISO 8601，如 2025-04-01T00:00:00Z）')
+
+    args = parser.parse_args()
+    for option, value in (('--since', args.since), ('--before', args.before)):
+        if value is not None and parse_revision_date(value) is None:
+            parser.error(f"{option} 不是有效的 ISO 8601 日期或时间: {value}")
+
+    progress_to_stderr(args.output)
+
+    if not is_stdio(args.input) and not Path(args.input).exists():
+        print(f"✗ 错误：文件不存在 - {args.input}")
+        return 1
+
+    print("=" * 80)
+    print("批量接受 / 拒绝修订")
+    print("=" * 80)
+
+    try:
+        resolve_file(args.input, args.output, COMMANDS[args.command],
+                     args.authors, args.since, args.before)
+    except FcInsiderError as e:
+        print(f"\n✗ 错误: {e}")
+        return 1
+
+    print("\n" + "=" * 80)
+    print("✓ 处理完成！")
+    print("=" * 80)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,7 +5,7 @@ FC Insider 翻译更新 - 一键执行完整工作流程
 功能：
 1. 从 Word 文档提取表格（使用 MarkItDown）
 2. 生成翻译映射（智能匹配）
-3. 应用追踪修订到 Word 文档
+3. 应用追踪修订到 Word 文档（--verify-only 时只校验旧译文，不生成输出文档）
 
 使用方法：
 python3 run_complete_workflow.py \\
@@ -21,8 +21,96 @@ import sys
 import os
 import subprocess
 import tempfile
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    from fc_insider.stdio import (check_single_stdin, display_name, is_stdio, progress_to_stderr,
+                                  read_input_bytes, write_output_bytes)
+except ImportError as e:
+    print(f"错误：缺少依赖 ({e})")
+    print("运行: pip install python-docx lxml markitdown[docx]")
+    sys.exit(1)
+
+
+# 流水线模式：提取线程与匹配阶段之间的有界队列长度
+PIPELINE_QUEUE_SIZE = 256
+
+# 队列结束标记
+_END = object()
+
+# 中间产物的文件名（--keep-temp 时写出）
+INTERMEDIATE_FILES = {
+    'table': 'extracted_table.md',
+    'translations': 'translations.json',
+}
+
+
+class Intermediates:
+    """
+    中间产物（提取的表格、翻译映射）
+
+    只在 --keep-temp 时记录（keep=True），否则 write() / write_json() 不做任何事，
+    不序列化也不占用内存。记录的产物保存在 SpooledTemporaryFile 中：小于阈值时只在内存，
+    超过阈值才溢出到临时文件；运行结束后由 dump() 写出到目录供检查
+    """
+
+    def __init__(self, spool_bytes: int, keep: bool = False):
+        self.spool_bytes = spool_bytes
+        self.keep = keep
+        self.buffers = {}
+
+    def write(self, name: str, text: str) -> None:
+        if not self.keep:
+            return
+        buffer = self.buffers.get(name)
+        if buffer is not None:
+            buffer.close()
+        data = text.encode('utf-8')
+        buffer = tempfile.SpooledTemporaryFile(max_size=self.spool_bytes, mode='w+b')
+        if self.spool_bytes <= 0:
+            # max_size=0 表示永不溢出，这里按"始终写入临时文件"处理
+            buffer.rollover()
+        buffer.write(data)
+        self.buffers[name] = buffer
+
+    def write_json(self, name: str, data) -> None:
+        if not self.keep:
+            return
+        self.write(name, json.dumps(data, ensure_ascii=False, indent=2))
+
+    def read(self, name: str) -> str:
+        buffer = self.buffers[name]
+        buffer.seek(0)
+        return buffer.read().decode('utf-8')
+
+    def dump(self, directory: str) -> dict:
+        """写出到目录，返回 名称 -> 路径"""
+        paths = {}
+        for name in self.buffers:
+            path = os.path.join(directory, INTERMEDIATE_FILES[name])
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.read(name))
+            paths[name] = path
+        return paths
+
+    def close(self) -> None:
+        for buffer in self.buffers.values():
+            buffer.close()
+        self.buffers.clear()
+
+
+def read_workflow_input(args, path: str) -> bytes:
+    """读取 --input / --new-translations；"-" 对应的 stdin 内容已在 main() 中读入 args.stdin_data"""
+    if is_stdio(path):
+        return args.stdin_data
+    with open(path, 'rb') as f:
+        return f.read()
+
 
 def print_step(step_num, total_steps, description):
     """打印步骤信息"""
@@ -35,6 +123,8 @@ def run_command(cmd, description, verbose=False):
     """
     运行命令并检查结果
 
+    子进程输出逐行转发，不在内存中缓存整段 stdout
+
     Args:
         cmd: 命令列表
         description: 命令描述
@@ -45,29 +135,27 @@ def run_command(cmd, description, verbose=False):
     if verbose:
         print(f"  命令: {' '.join(cmd)}")
 
-    try:
-        result = subprocess.run(
-            cmd,
-            check=True,
-            capture_output=not verbose,
-            text=True
-        )
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True
+    )
 
-        if not verbose and result.stdout:
-            print(f"  {result.stdout.strip()}")
+    for line in process.stdout:
+        line = line.rstrip('\n')
+        print(line if verbose else f"  {line}")
 
-        print(f"✓ {description}完成")
-        return True
+    returncode = process.wait()
 
-    except subprocess.CalledProcessError as e:
+    if returncode != 0:
         print(f"\n✗ 错误：{description}失败")
-        print(f"  退出码: {e.returncode}")
-        if e.stdout:
-            print(f"  输出: {e.stdout}")
-        if e.stderr:
-            print(f"  错误: {e.stderr}")
+        print(f"  退出码: {returncode}")
         return False
 
+    print(f"✓ {description}完成")
+    return True
+
 
 def check_dependencies():
     """检查必需的依赖"""
@@ -119,6 +207,478 @@ def get_script_path(script_name):
     return os.path.join(current_dir, script_name)
 
 
+def run_subprocess(args, temp_table: str, temp_translations: str) -> int:
+    """
+    子进程模式（后备方案）：依次以独立进程运行三个阶段脚本，通过临时文件传递数据
+
+    stdin / stdout（"-"）在临时目录中落地为文件，子进程的输出仍由本进程转发显示
+
+    Returns:
+        退出码（0 成功，1 失败）
+    """
+    temp_dir = os.path.dirname(temp_table)
+    input_path = args.input
+    new_translations_path = args.new_translations
+    output_path = args.output
+
+    if is_stdio(input_path):
+        input_path = os.path.join(temp_dir, 'input.docx')
+        with open(input_path, 'wb') as f:
+            f.write(args.stdin_data)
+    if is_stdio(new_translations_path):
+        new_translations_path = os.path.join(temp_dir, 'new_translations.txt')
+        with open(new_translations_path, 'wb') as f:
+            f.write(args.stdin_data)
+    if is_stdio(output_path):
+        output_path = os.path.join(temp_dir, 'output.docx')
+    report_path = args.report
+    if is_stdio(report_path):
+        report_path = os.path.join(temp_dir, 'report.json')
+
+    # 步骤 1: 提取表格
+    print_step(1, 3, "提取表格")
+
+    extract_cmd = [
+        sys.executable,
+        get_script_path('extract_table_markitdown_simple.py'),
+        input_path,
+        temp_table
+    ]
+
+    if not run_command(extract_cmd, "提取表格", args.verbose):
+        return 1
+
+    # 步骤 2: 生成翻译映射
+    print_step(2, 3, "生成翻译映射")
+
+    mapping_cmd = [
+        sys.executable,
+        get_script_path('generate_translation_mapping.py'),
+        '--markdown', temp_table,
+        '--new-translations', new_translations_path,
+        '--output', temp_translations,
+        '--match-by', args.match_by
+    ]
+
+    if args.verbose:
+        mapping_cmd.append('--verbose')
+
+    if not run_command(mapping_cmd, "生成翻译映射", args.verbose):
+        return 1
+
+    # 步骤 3: 应用追踪修订（或只校验）
+    stage_name = "校验旧译文" if args.verify_only else "应用追踪修订"
+    print_step(3, 3, stage_name)
+
+    update_cmd = [
+        sys.executable,
+        get_script_path('update_fc_insider_tracked.py'),
+        '--input', input_path,
+        '--translations', temp_translations,
+        '--author', args.author,
+        '--mode', args.update_mode,
+        '--engine', args.engine,
+        '--diff-granularity', args.diff_granularity
+    ]
+    if args.verify_only:
+        update_cmd.append('--verify-only')
+        if report_path:
+            update_cmd.extend(['--report', report_path])
+    else:
+        update_cmd.extend(['--output', output_path])
+
+    if args.verbose:
+        update_cmd.append('--verbose')
+
+    succeeded = run_command(update_cmd, stage_name, args.verbose)
+
+    if report_path != args.report and os.path.exists(report_path):
+        with open(report_path, 'rb') as f:
+            write_output_bytes(args.report, f.read())
+    if not succeeded:
+        return 1
+    if args.verify_only:
+        return 0
+
+    if output_path != args.output:
+        with open(output_path, 'rb') as f:
+            write_output_bytes(args.output, f.read())
+
+    return 0
+
+
+def open_stage_cache(args):
+    """按命令行参数创建阶段缓存（--no-cache 时返回 None）"""
+    if args.no_cache:
+        return None
+    from fc_insider.cache import StageCache
+
+    def warn(error: OSError) -> None:
+        print(f"⚠ 阶段缓存不可用，本次不使用缓存（{args.cache_dir}）: {error}", file=sys.stderr)
+
+    return StageCache(args.cache_dir, args.cache_mb * 1024 * 1024, on_error=warn)
+
+
+def cached_stage(cache, args, stage: str, key: str):
+    """读取阶段缓存；--force-stage 指定的阶段总是重新执行"""
+    if cache is None or stage in args.force_stage:
+        return None
+    data = cache.get(stage, key)
+    if data is not None:
+        print(f"✓ 输入未变，使用缓存（{stage} {key[:12]}）")
+    return data
+
+
+def run_in_process(args, intermediates: Intermediates) -> int:
+    """
+    进程内模式（默认）：直接调用三个阶段的函数，阶段之间传递 Python 对象
+
+    - 依赖只导入一次，不再启动三个 python3 子进程
+    - docx 只从磁盘读取一次，提取与更新共享同一份字节
+    - 各阶段产物按输入内容缓存，输入未变的阶段直接复用（--no-cache 关闭）
+    - 中间结果保存在内存中，--keep-temp 时才写出
+
+    Returns:
+        退出码（0 成功，1 失败）
+    """
+    from io import BytesIO
+    from docx import Document
+    from fc_insider.cache import content_hash, mappings_hash, stage_key
+    from fc_insider.package import SourcePackage, save_document
+    from fc_insider.stats import document_stats
+    import generate_translation_mapping as mapping_stage
+    import update_fc_insider_tracked as update_stage
+
+    timings = {}
+    cache = open_stage_cache(args)
+
+    docx_bytes = read_workflow_input(args, args.input)
+    docx_hash = content_hash(docx_bytes)
+
+    # 步骤 1: 提取表格（键：docx 哈希）
+    print_step(1, 3, "提取表格")
+    started = time.perf_counter()
+
+    cached = cached_stage(cache, args, 'extract', docx_hash)
+    if cached is not None:
+        markdown_content = cached.decode('utf-8')
+    else:
+        # MarkItDown 导入较慢，命中缓存时不导入
+        import extract_table_markitdown_simple as extract_stage
+        markdown_content = extract_stage.convert_docx_to_markdown(BytesIO(docx_bytes))
+        if cache is not None:
+            cache.put('extract', docx_hash, markdown_content)
+
+    intermediates.write('table', markdown_content)
+
+    timings['提取表格'] = time.perf_counter() - started
+    print(f"✓ 提取表格完成")
+
+    # 步骤 2: 生成翻译映射（键：表格哈希 + 新译文哈希 + 匹配方式）
+    print_step(2, 3, "生成翻译映射")
+    started = time.perf_counter()
+
+    translations_bytes = read_workflow_input(args, args.new_translations)
+    translations_hash = content_hash(translations_bytes)
+    mapping_key = stage_key(content_hash(markdown_content), translations_hash, args.match_by)
+
+    cached = cached_stage(cache, args, 'match', mapping_key)
+    if cached is not None:
+        mappings = json.loads(cached.decode('utf-8'))
+        print(f"✓ 对照表 {len(mappings)} 条")
+    else:
+        old_table = list(mapping_stage.iter_markdown_rows(markdown_content.split('\n')))
+        print(f"✓ 加载 {len(old_table)} 行")
+        old_table = mapping_stage.filter_placeholder_rows(old_table, args.verbose)
+        print(f"✓ 过滤后保留 {len(old_table)} 行（跳过了占位符行）")
+
+        new_translations = mapping_stage.parse_new_translations(translations_bytes.decode('utf-8'))
+        print(f"✓ 加载 {len(new_translations)} 个译文")
+
+        mappings = mapping_stage.resolve_mappings(
+            old_table, new_translations, args.match_by, args.verbose)
+        if mappings is None or not mapping_stage.validate_mappings(mappings):
+            print(f"\n✗ 错误：生成翻译映射失败")
+            return 1
+
+        mapping_stage.preview_changes(mappings)
+        if cache is not None:
+            cache.put('match', mapping_key, json.dumps(mappings, ensure_ascii=False))
+
+    intermediates.write_json('translations', {'translations': mappings})
+
+    timings['生成翻译映射'] = time.perf_counter() - started
+    print(f"✓ 生成翻译映射完成")
+
+    if args.verify_only:
+        # 步骤 3: 只校验旧译文，不写入修订、不生成输出文档
+        print_step(3, 3, "校验旧译文")
+        started = time.perf_counter()
+
+        from fc_insider.verification import verify
+        result = verify(docx_bytes, mappings, args.update_mode)
+        update_stage.report_verification(result, args.input, args.update_mode, args.report)
+
+        timings['校验旧译文'] = time.perf_counter() - started
+        print_timings(timings)
+        return 0 if result['matched'] == result['total'] else 1
+
+    # 步骤 3: 应用追踪修订（键：docx 哈希 + 对照表哈希 + 作者 + 更新模式 + 差异粒度）
+    print_step(3, 3, "应用追踪修订")
+    started = time.perf_counter()
+
+    update_key = stage_key(docx_hash, mappings_hash(mappings), args.author, args.update_mode,
+                           args.diff_granularity)
+
+    cached = cached_stage(cache, args, 'update', update_key)
+    if cached is not None:
+        print(f"\n💾 保存文档: {display_name(args.output, 'stdout')}")
+        write_output_bytes(args.output, cached)
+        output_bytes = cached
+        fail_count = 0
+    else:
+        doc = Document(BytesIO(docx_bytes))
+        track_changes_existed = update_stage.has_track_changes_enabled(doc)
+        success_count, fail_count, unchanged_count = update_stage.apply_translations(
+            doc, mappings, args.author, args.verbose, args.update_mode, engine=args.engine,
+            granularity=args.diff_granularity)
+
+        # 只重写改动的部件，其余成员从输入原样复制
+        output_buffer = BytesIO()
+        with SourcePackage(docx_bytes) as package:
+            save_document(doc, package, output_buffer,
+                          update_stage.tracked.changed_parts(doc, track_changes_existed,
+                                                             success_count > unchanged_count))
+
+        print(f"\n💾 保存文档: {display_name(args.output, 'stdout')}")
+        output_bytes = output_buffer.getvalue()
+        write_output_bytes(args.output, output_bytes)
+
+        # 只缓存全部成功的结果，失败的更新下次总会重新执行
+        if cache is not None and fail_count == 0:
+            cache.put('update', update_key, output_bytes)
+
+    update_stage.print_document_stats(document_stats(docx_bytes), document_stats(output_bytes))
+
+    timings['应用追踪修订'] = time.perf_counter() - started
+    print(f"✓ 应用追踪修订完成")
+
+    print_timings(timings)
+
+    return 0 if fail_count == 0 else 1
+
+
+def print_timings(timings: dict) -> None:
+    print(f"\n阶段耗时:")
+    for stage, seconds in timings.items():
+        print(f"  {stage}: {seconds:.2f}s")
+
+
+def _put(q, item, stop_event):
+    """向有界队列放入数据；下游已停止时放弃，避免生产者永久阻塞"""
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def run_pipelined(args, intermediates: Intermediates) -> int:
+    """
+    流水线模式：提取 → 匹配 → 更新 在同一进程内重叠执行
+
+    - 后台线程预取 docx（解压 + XML 解析），与提取并行
+    - 提取线程增量解析表格 XML（fc_insider.streaming.iter_table_rows），
+      每解析完一行就放入有界队列，不经过 MarkItDown 的整文档转换
+    - segment_id / index 匹配的行立即送入更新线程；
+      smart 模式需要全局配对，等全部行到齐后再统一分配
+    - 更新线程边接收边写入追踪修订，最后由主线程校验并保存
+
+    Returns:
+        退出码（0 成功，1 失败）
+    """
+    from docx import Document
+    from fc_insider.package import SourcePackage, save_document
+    from fc_insider.stats import document_stats
+    from fc_insider.streaming import iter_table_rows
+    import extract_table_markitdown_simple as extract_stage
+    import generate_translation_mapping as mapping_stage
+    import update_fc_insider_tracked as update_stage
+
+    started = time.perf_counter()
+    stop_event = threading.Event()
+    row_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    mapping_queue = queue.Queue()
+
+    from io import BytesIO
+
+    docx_bytes = read_workflow_input(args, args.input)
+    new_translations = mapping_stage.parse_new_translations(
+        read_workflow_input(args, args.new_translations).decode('utf-8'))
+    index_keyed = mapping_stage.is_index_keyed(new_translations)
+    print(f"✓ 加载 {len(new_translations)} 个译文")
+
+    text_list = None
+    if index_keyed and args.match_by in ('smart', 'segment_id'):
+        text_list = [new_translations[str(i)] for i in range(len(new_translations))]
+    elif args.match_by == 'smart':
+        text_list = list(new_translations.values())
+
+    def extract_rows():
+        # 生产者：增量解析表格 XML，每解析完一行立即放入队列（不等整个文档转换完）
+        try:
+            if intermediates.keep:
+                # --keep-temp 的 extracted_table.md 仍由 MarkItDown 生成，与其他模式一致
+                intermediates.write('table', extract_stage.convert_docx_to_markdown(docx_bytes))
+            for row in iter_table_rows(docx_bytes, args.update_mode):
+                if not _put(row_queue, row, stop_event):
+                    return
+        finally:
+            _put(row_queue, _END, stop_event)
+
+    def apply_mappings():
+        # 消费者：等待预取的文档，逐条应用追踪修订
+        doc = doc_future.result()
+        track_changes_existed = update_stage.has_track_changes_enabled(doc)
+        table = update_stage.prepare_document(doc)
+        find_cell = update_stage.cell_finder(table, args.engine)
+        date_str = update_stage.tracked.revision_date()
+        factory = update_stage.tracked.RevisionFactory(args.author, date_str)
+        revision_id = update_stage.tracked.first_revision_id(doc.element)
+        success_count = 0
+        fail_count = 0
+        unchanged_count = 0
+        idx = 0
+
+        while True:
+            translation = mapping_queue.get()
+            if translation is _END:
+                break
+            idx += 1
+            print(f"[{idx}] 处理 {translation['segment_id']}...", end=" ")
+            outcome = update_stage.apply_translation(
+                find_cell, translation, args.author, date_str, revision_id, args.update_mode,
+                verbose=args.verbose, factory=factory, granularity=args.diff_granularity)
+            if outcome is not None:
+                success_count += 1
+                unchanged_count += outcome['unchanged']
+                revision_id += outcome['revisions']
+            else:
+                fail_count += 1
+
+        return doc, track_changes_existed, success_count, fail_count, unchanged_count
+
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix='fc_pipeline') as executor:
+        doc_future = executor.submit(Document, BytesIO(docx_bytes))
+        extract_future = executor.submit(extract_rows)
+        update_future = executor.submit(apply_mappings)
+
+        mappings = []
+        pending_rows = []
+        kept = 0
+        error = None
+
+        try:
+            # 匹配阶段（主线程）：占位符过滤 + 逐行配对
+            while True:
+                row = row_queue.get()
+                if row is _END:
+                    break
+                if mapping_stage.is_placeholder_row(row['target']):
+                    continue
+
+                idx = kept
+                kept += 1
+
+                if args.match_by == 'smart':
+                    pending_rows.append(row)
+                    continue
+
+                if args.match_by == 'index':
+                    new_text = new_translations.get(str(idx))
+                elif text_list is not None:
+                    new_text = text_list[idx] if idx < len(text_list) else None
+                else:
+                    new_text = new_translations.get(row['segment_id'])
+
+                mapping = mapping_stage.make_mapping(row['segment_id'], row['target'], new_text)
+                if mapping:
+                    mappings.append(mapping)
+                    mapping_queue.put(mapping)
+
+            extract_future.result()
+            print(f"✓ 提取完成：{kept} 行（已过滤占位符行）")
+
+            if args.match_by == 'smart':
+                # 模糊匹配需要全部行参与全局贪婪配对
+                matched = mapping_stage.smart_match_translations(
+                    pending_rows, text_list, verbose=args.verbose)
+                for mapping in mapping_stage.generate_translation_mapping(
+                        pending_rows, matched, match_by='smart'):
+                    mappings.append(mapping)
+                    mapping_queue.put(mapping)
+            elif text_list is not None and len(text_list) < kept:
+                error = (f"新翻译行数不足！新翻译 {len(text_list)} 行，"
+                         f"过滤后表格 {kept} 行")
+
+        finally:
+            stop_event.set()
+            mapping_queue.put(_END)
+
+        doc, track_changes_existed, success_count, fail_count, unchanged_count = \
+            update_future.result()
+
+    if error:
+        print(f"\n✗ 错误：{error}")
+        return 1
+
+    intermediates.write_json('translations', {'translations': mappings})
+
+    if not mapping_stage.validate_mappings(mappings):
+        return 1
+
+    print(f"\n✓ 更新完成: {success_count}/{len(mappings)}")
+    if unchanged_count > 0:
+        print(f"✓ 已有相同修订（跳过）: {unchanged_count}")
+    if fail_count > 0:
+        print(f"✗ 失败: {fail_count}")
+
+    print(f"\n💾 保存文档: {display_name(args.output, 'stdout')}")
+    output_buffer = BytesIO()
+    with SourcePackage(docx_bytes) as package:
+        save_document(doc, package, output_buffer,
+                      update_stage.tracked.changed_parts(doc, track_changes_existed,
+                                                         success_count > unchanged_count))
+    write_output_bytes(args.output, output_buffer.getvalue())
+    update_stage.print_document_stats(document_stats(docx_bytes),
+                                      document_stats(output_buffer.getvalue()))
+    print(f"✓ 流水线总耗时: {time.perf_counter() - started:.2f}s")
+
+    return 0 if fail_count == 0 else 1
+
+
+def finish(args) -> int:
+    """打印完成信息"""
+    print("\n" + "="*80)
+    print("✓ 工作流程完成！")
+    print("="*80)
+    if args.verify_only:
+        print(f"\n旧译文全部一致（--verify-only，未生成输出文档）")
+        if args.report:
+            print(f"校验报告: {display_name(args.report, 'stdout')}")
+        return 0
+
+    print(f"\n输出文档: {display_name(args.output, 'stdout')}")
+
+    if not is_stdio(args.output) and os.path.exists(args.output):
+        file_size = os.path.getsize(args.output)
+        print(f"文件大小: {file_size:,} 字节")
+
+    return 0
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='FC Insider 翻译更新 - 一键执行完整工作流程',
@@ -140,6 +700,33 @@ def main():
     --author "Gemini" \\
     --verbose
 
+  # 流水线模式（提取、匹配、更新重叠执行）
+  python3 run_complete_workflow.py \\
+    --input "input.docx" \\
+    --new-translations "new_translations.txt" \\
+    --output "output.docx" \\
+    --pipeline
+
+  # 管道：docx 来自 stdin，输出到 stdout（进度信息输出到 stderr）
+  cat input.docx | python3 run_complete_workflow.py \\
+    --input - \\
+    --new-translations "new_translations.txt" \\
+    --output - > output.docx
+
+  # 输入未变的阶段会复用缓存；调试时强制重新执行某个阶段
+  python3 run_complete_workflow.py \\
+    --input "input.docx" \\
+    --new-translations "new_translations.txt" \\
+    --output "output.docx" \\
+    --force-stage update
+
+  # 只校验旧译文是否仍与文档一致（不生成输出文档），报告写入 JSON
+  python3 run_complete_workflow.py \\
+    --input "input.docx" \\
+    --new-translations "new_translations.txt" \\
+    --verify-only \\
+    --report "mismatches.json"
+
   # 自定义匹配方式
   python3 run_complete_workflow.py \\
     --input "input.docx" \\
@@ -154,17 +741,26 @@ def main():
     parser.add_argument(
         '--input',
         required=True,
-        help='输入 Word 文档路径'
+        help='输入 Word 文档路径（"-" 表示 stdin）'
     )
     parser.add_argument(
         '--new-translations',
         required=True,
-        help='新翻译文件路径（纯文本或 JSON）'
+        help='新翻译文件路径（纯文本或 JSON，"-" 表示 stdin）'
     )
     parser.add_argument(
         '--output',
-        required=True,
-        help='输出 Word 文档路径'
+        help='输出 Word 文档路径（"-" 表示 stdout，进度信息改为输出到 stderr）；'
+             '--verify-only 时不需要'
+    )
+    parser.add_argument(
+        '--verify-only',
+        action='store_true',
+        help='只校验映射的旧译文是否与文档一致，不写入修订、不生成输出文档（不一致时退出码为 1）'
+    )
+    parser.add_argument(
+        '--report',
+        help='--verify-only 的结构化不一致报告（JSON）输出路径（"-" 表示 stdout）'
     )
     parser.add_argument(
         '--author',
@@ -183,10 +779,64 @@ def main():
         default='auto',
         help='更新模式（默认：auto 自动检测）'
     )
+    parser.add_argument(
+        '--engine',
+        choices=['docx', 'lxml'],
+        default='docx',
+        help='更新阶段的单元格定位引擎（lxml 单次遍历表格 XML，大表格更快，输出相同；默认：docx）'
+    )
+    parser.add_argument(
+        '--diff-granularity',
+        choices=['cell', 'word', 'char'],
+        default='cell',
+        help='差异粒度：cell 整格替换；word / char 只在改动的词（中日韩文逐字）/ 字符前后写入修订，'
+             '保留未改动的 run 及格式（默认：cell）'
+    )
+    execution_group = parser.add_mutually_exclusive_group()
+    execution_group.add_argument(
+        '--subprocess',
+        action='store_true',
+        help='后备方案：以三个独立子进程依次运行各阶段脚本（默认在进程内执行）'
+    )
+    execution_group.add_argument(
+        '--pipeline',
+        action='store_true',
+        help='流水线模式：提取、匹配、更新在同一进程内重叠执行'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=None,
+        help='阶段缓存目录（默认：$FC_INSIDER_CACHE_DIR，否则 $XDG_CACHE_HOME/fc_insider，'
+             '否则 ~/.cache/fc_insider）'
+    )
+    parser.add_argument(
+        '--cache-mb',
+        type=int,
+        default=256,
+        help='阶段缓存容量上限，超出时淘汰最久未用的产物（MB，默认：256）'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='不读取也不写入阶段缓存'
+    )
+    parser.add_argument(
+        '--force-stage',
+        action='append',
+        choices=['extract', 'match', 'update'],
+        default=[],
+        help='忽略缓存，强制重新执行指定阶段（可重复指定）'
+    )
     parser.add_argument(
         '--keep-temp',
         action='store_true',
-        help='保留临时文件（用于调试）'
+        help='保留临时文件（用于调试）；进程内 / 流水线模式下把内存中的中间产物写出到临时目录'
+    )
+    parser.add_argument(
+        '--spool-mb',
+        type=int,
+        default=32,
+        help='--keep-temp 时中间产物在内存中的上限，超过后溢出到临时文件（MB，默认：32）'
     )
     parser.add_argument(
         '--verbose',
@@ -201,12 +851,26 @@ def main():
 
     args = parser.parse_args()
 
+    if args.cache_dir is None:
+        from fc_insider.cache import default_cache_dir
+        args.cache_dir = default_cache_dir()
+
+    if args.output is None and not args.verify_only:
+        parser.error("需要 --output（只校验时使用 --verify-only）")
+    if args.report and not args.verify_only:
+        parser.error("--report 只用于 --verify-only")
+
+    error = check_single_stdin(args.input, args.new_translations)
+    if error:
+        parser.error(error)
+    progress_to_stderr(args.output, args.report)
+
     # 检查输入文件
-    if not os.path.exists(args.input):
+    if not is_stdio(args.input) and not os.path.exists(args.input):
         print(f"✗ 错误：输入文件不存在: {args.input}")
         return 1
 
-    if not os.path.exists(args.new_translations):
+    if not is_stdio(args.new_translations) and not os.path.exists(args.new_translations):
         print(f"✗ 错误：新翻译文件不存在: {args.new_translations}")
         return 1
 
@@ -214,12 +878,35 @@ def main():
     print("FC Insider 翻译更新 - 一键执行工作流程")
     print("="*80)
     print(f"\n配置:")
-    print(f"  输入文档: {args.input}")
-    print(f"  新翻译: {args.new_translations}")
-    print(f"  输出文档: {args.output}")
+    print(f"  输入文档: {display_name(args.input)}")
+    print(f"  新翻译: {display_name(args.new_translations)}")
+    if args.verify_only:
+        print(f"  只校验: 不生成输出文档")
+    else:
+        print(f"  输出文档: {display_name(args.output, 'stdout')}")
     print(f"  作者: {args.author}")
     print(f"  匹配方式: {args.match_by}")
     print(f"  更新模式: {args.update_mode}")
+    if args.engine != 'docx':
+        print(f"  定位引擎: {args.engine}")
+    if args.diff_granularity != 'cell':
+        print(f"  差异粒度: {args.diff_granularity}")
+    if args.pipeline and args.verify_only:
+        # 流水线为边提取边写入修订而设计，只校验时没有写入阶段可以重叠
+        args.pipeline = False
+        print(f"  执行方式: 进程内（--verify-only 不使用流水线）")
+    elif args.pipeline:
+        print(f"  执行方式: 流水线")
+    elif args.subprocess:
+        print(f"  执行方式: 子进程（后备）")
+    else:
+        print(f"  执行方式: 进程内")
+        if args.no_cache:
+            print(f"  阶段缓存: 关闭")
+        else:
+            print(f"  阶段缓存: {args.cache_dir}（上限 {args.cache_mb} MB）")
+            if args.force_stage:
+                print(f"  强制执行: {', '.join(args.force_stage)}")
 
     # 检查依赖
     if not args.skip_dependencies_check:
@@ -228,75 +915,61 @@ def main():
     else:
         print("\n⚠️  跳过依赖检查")
 
-    # 创建临时目录
-    temp_dir = tempfile.mkdtemp(prefix='fc_insider_')
-    temp_table = os.path.join(temp_dir, 'extracted_table.md')
-    temp_translations = os.path.join(temp_dir, 'translations.json')
+    # "-" 表示 stdin：一次读入内存，各执行方式共用
+    args.stdin_data = None
+    if is_stdio(args.input) or is_stdio(args.new_translations):
+        args.stdin_data = read_input_bytes('-')
 
-    print(f"\n临时目录: {temp_dir}")
+    if args.subprocess:
+        return run_with_temp_dir(args)
 
-    try:
-        # 步骤 1: 提取表格
-        print_step(1, 3, "提取表格")
+    # 进程内 / 流水线：中间产物只在 --keep-temp 时保存（内存中，运行结束后写出）
+    intermediates = Intermediates(args.spool_mb * 1024 * 1024, keep=args.keep_temp)
 
-        extract_cmd = [
-            'python3',
-            get_script_path('extract_table_markitdown_simple.py'),
-            args.input,
-            temp_table
-        ]
+    try:
+        if args.pipeline:
+            rc = run_pipelined(args, intermediates)
+        else:
+            rc = run_in_process(args, intermediates)
 
-        if not run_command(extract_cmd, "提取表格", args.verbose):
+        if rc != 0:
             return 1
 
-        # 步骤 2: 生成翻译映射
-        print_step(2, 3, "生成翻译映射")
+        return finish(args)
 
-        mapping_cmd = [
-            'python3',
-            get_script_path('generate_translation_mapping.py'),
-            '--markdown', temp_table,
-            '--new-translations', args.new_translations,
-            '--output', temp_translations,
-            '--match-by', args.match_by
-        ]
+    except Exception as e:
+        print(f"\n✗ 发生错误: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
 
-        if args.verbose:
-            mapping_cmd.append('--verbose')
+    finally:
+        if args.keep_temp and intermediates.buffers:
+            temp_dir = tempfile.mkdtemp(prefix='fc_insider_')
+            paths = intermediates.dump(temp_dir)
+            print(f"\n保留临时文件:")
+            if 'table' in paths:
+                print(f"  - 提取的表格: {paths['table']}")
+            if 'translations' in paths:
+                print(f"  - 翻译映射: {paths['translations']}")
+        intermediates.close()
 
-        if not run_command(mapping_cmd, "生成翻译映射", args.verbose):
-            return 1
 
-        # 步骤 3: 应用追踪修订
-        print_step(3, 3, "应用追踪修订")
+def run_with_temp_dir(args) -> int:
+    """子进程模式：各阶段脚本通过临时目录中的文件传递中间结果"""
+    temp_dir = tempfile.mkdtemp(prefix='fc_insider_')
+    temp_table = os.path.join(temp_dir, INTERMEDIATE_FILES['table'])
+    temp_translations = os.path.join(temp_dir, INTERMEDIATE_FILES['translations'])
 
-        update_cmd = [
-            'python3',
-            get_script_path('update_fc_insider_tracked.py'),
-            '--input', args.input,
-            '--translations', temp_translations,
-            '--output', args.output,
-            '--author', args.author,
-            '--mode', args.update_mode
-        ]
+    print(f"\n临时目录: {temp_dir}")
 
-        if args.verbose:
-            update_cmd.append('--verbose')
+    try:
+        rc = run_subprocess(args, temp_table, temp_translations)
 
-        if not run_command(update_cmd, "应用追踪修订", args.verbose):
+        if rc != 0:
             return 1
 
-        # 完成
-        print("\n" + "="*80)
-        print("✓ 工作流程完成！")
-        print("="*80)
-        print(f"\n输出文档: {args.output}")
-
-        if os.path.exists(args.output):
-            file_size = os.path.getsize(args.output)
-            print(f"文件大小: {file_size:,} 字节")
-
-        return 0
+        return finish(args)
 
     except Exception as e:
         print(f"\n✗ 发生错误: {e}")
@@ -20,22 +20,58 @@ python3 update_fc_insider_tracked.py \
   --author "Translator Name" \
   --mode read_deleted \
   --verbose
+
+大表格可加 --engine lxml：单次遍历表格 XML 定位单元格，输出与默认引擎完全相同
+同一输入反复更新时可加 --segment-index auto：segment 位置索引保存在 <input>.segidx.json，之后不再扫描表格
+数百 MB 的文档可加 --streaming：逐行读取和写出 document.xml，内存占用与文档大小无关
+上万行的单个表格可加 --shards N：表格的行分成 N 段在多个进程中同时更新，输出与串行完全相同
+--verify-only 只检查 old_text 是否与文档一致并输出不一致报告，不写入修订、不生成输出文档
+--diff-granularity word|char 只在改动的片段前后写入修订，未改动的 run 及格式保留（默认 cell 整格替换）；
+更新后报告 document.xml 的大小与修订数量（更新前 → 更新后）
+--base-mapping previous.json 以上一轮的输出为输入，只应用与上一轮映射相比新增或改动的映射，
+并写出增量摘要（<输出名>.delta.json）
+--coalesce-runs 更新前合并单元格中相邻、格式相同的 run，去掉拼写检查标记、空 run 和多余的语言标注
+
+多个输入（--input 列出多个文件或使用通配符）时，同一份映射以进程池并行应用到每个文档，
+输出到 --output 目录下的 <名称>_tracked.docx，最大的文档最先处理，最后输出逐文档汇总
 """
 
 import argparse
+import glob
+import io
 import json
+import os
 import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
-from pathlib import Path
-import re
 
 try:
     from docx import Document
-    from docx.oxml import parse_xml
-    from docx.oxml.ns import qn
-    from docx.shared import RGBColor
-    from lxml import etree
+    from fc_insider import tracked
+    from fc_insider.tracked import (
+        ENGINES,
+        cell_finder,
+        clear_cell_tracked_changes,
+        find_table,
+        has_track_changes_enabled,
+        load_translations,
+        mapping_texts,
+    )
+    from fc_insider.coalescing import coalesce
+    from fc_insider.delta import delta_mappings, delta_report
+    from fc_insider.diff import GRANULARITIES
+    from fc_insider.package import SourcePackage, save_document
+    from fc_insider.segment_index import INDEX_MODES, open_index, segment_finder
+    from fc_insider.sharded import apply_sharded
+    from fc_insider.stats import document_stats
+    from fc_insider.streaming import apply_streaming
+    from fc_insider.verification import mismatch_report, read_first_table, verify_table
+    from fc_insider.stdio import (check_single_stdin, display_name, is_stdio, progress_to_stderr,
+                                  read_input_bytes, write_output_bytes, write_output_text)
 except ImportError:
     print("错误：需要安装 python-docx 和 lxml")
     print("运行: pip install python-docx lxml")
@@ -51,32 +87,7 @@ def get_cell_text_from_tracked_changes(cell, mode: str = 'read_deleted', verbose
               'read_inserted' - 读取插入的文本
               'read_both' - 读取两者（先删除，后插入，用换行分隔）
     """
-    text_parts = []
-
-    for paragraph in cell.paragraphs:
-        para_element = paragraph._element
-
-        if mode == 'read_deleted' or mode == 'read_both':
-            # 查找所有 <w:del> 元素
-            del_elements = para_element.findall(qn('w:del'))
-            for del_elem in del_elements:
-                # 在 <w:del> 中查找 <w:delText>
-                del_texts = del_elem.findall('.//' + qn('w:delText'))
-                for del_text in del_texts:
-                    if del_text.text:
-                        text_parts.append(del_text.text)
-
-        if mode == 'read_inserted' or mode == 'read_both':
-            # 查找所有 <w:ins> 元素
-            ins_elements = para_element.findall(qn('w:ins'))
-            for ins_elem in ins_elements:
-                # 在 <w:ins> 中查找 <w:t>
-                t_elements = ins_elem.findall('.//' + qn('w:t'))
-                for t_elem in t_elements:
-                    if t_elem.text:
-                        text_parts.append(t_elem.text)
-
-    full_text = ''.join(text_parts).strip()
+    full_text = tracked.get_cell_text_from_tracked_changes(cell, mode)
 
     if verbose:
         print(f"    模式 {mode} 读取到: '{full_text[:80]}...'")
@@ -92,73 +103,18 @@ def get_cell_text_normal_or_tracked(cell, mode: str = 'auto', verbose: bool = Fa
         text: 读取到的文本
         source: 'normal' | 'deleted' | 'inserted' | 'empty'
     """
-    # 先尝试普通读取
-    normal_text = cell.text.strip()
-    if normal_text:
-        return (normal_text, 'normal')
-
-    # 尝试从追踪修订读取
-    deleted_text = get_cell_text_from_tracked_changes(cell, 'read_deleted', verbose)
-    if deleted_text:
-        return (deleted_text, 'deleted')
-
-    inserted_text = get_cell_text_from_tracked_changes(cell, 'read_inserted', verbose)
-    if inserted_text:
-        return (inserted_text, 'inserted')
-
-    return ('', 'empty')
-
-
-def clear_cell_tracked_changes(cell):
-    """
-    清除单元格中的所有追踪修订标记
+    text, source = tracked.get_cell_text_normal_or_tracked(cell)
 
-    保留实际内容，移除 <w:del> 和 <w:ins> 包装
-    """
-    for paragraph in cell.paragraphs:
-        para_element = paragraph._element
-
-        # 处理 <w:del> - 完全移除
-        del_elements = para_element.findall(qn('w:del'))
-        for del_elem in del_elements:
-            para_element.remove(del_elem)
-
-        # 处理 <w:ins> - 移除包装，保留内容
-        ins_elements = para_element.findall(qn('w:ins'))
-        for ins_elem in ins_elements:
-            # 将 <w:ins> 中的 <w:r> 移到段落级别
-            runs = ins_elem.findall(qn('w:r'))
-            insert_position = para_element.index(ins_elem)
-
-            for run in runs:
-                ins_elem.remove(run)
-                para_element.insert(insert_position, run)
-                insert_position += 1
+    if verbose and source != 'normal':
+        print(f"    模式 read_{source} 读取到: '{text[:80]}...'")
 
-            # 移除空的 <w:ins>
-            para_element.remove(ins_elem)
-
-
-def has_track_changes_enabled(doc) -> bool:
-    """检查文档是否已启用追踪修订"""
-    try:
-        settings = doc.settings.element
-        track_revisions = settings.find(qn('w:trackRevisions'))
-        return track_revisions is not None
-    except:
-        return False
+    return (text, source)
 
 
 def enable_track_changes(doc):
     """启用文档层级的追踪修订"""
     try:
-        settings = doc.settings.element
-        track_revisions = settings.find(qn('w:trackRevisions'))
-        if track_revisions is None:
-            track_revisions = parse_xml('<w:trackRevisions {} />'.format(
-                'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
-            ))
-            settings.append(track_revisions)
+        tracked.enable_track_changes(doc)
     except Exception as e:
         print(f"⚠ 警告：无法启用文档层级追踪修订: {e}")
 
@@ -172,8 +128,10 @@ def replace_cell_with_track_changes_from_tracked(
     revision_id: int,
     reading_mode: str = 'read_deleted',
     update_mode: str = 'clear_and_replace',
-    verbose: bool = False
-) -> bool:
+    verbose: bool = False,
+    factory=None,
+    granularity: str = 'cell'
+) -> Optional[Dict]:
     """
     替换已包含追踪修订的单元格
 
@@ -181,195 +139,663 @@ def replace_cell_with_track_changes_from_tracked(
         reading_mode: 'read_deleted' | 'read_inserted' | 'auto'
         update_mode: 'clear_and_replace' - 清除现有追踪修订后替换
                     'keep_and_add' - 保留现有追踪修订，添加新的（不推荐）
+        factory: 同一批更新共用的 tracked.RevisionFactory
+        granularity: 'cell' | 'word' | 'char'，见 fc_insider.diff
+
+    Returns:
+        tracked.replace_cell() 的结果（'revisions' 为占用的修订 ID 数，已有相同修订时
+        'unchanged' 为 True）；文本不匹配时为 None
     """
-    # 读取当前文本
-    if reading_mode == 'auto':
-        current_text, source = get_cell_text_normal_or_tracked(cell, reading_mode, verbose)
-        if verbose:
-            print(f"    自动检测到文本来源: {source}")
-    else:
-        current_text = get_cell_text_from_tracked_changes(cell, reading_mode, verbose)
+    outcome = tracked.replace_cell(cell, old_text, new_text, author, date_str,
+                                   revision_id, reading_mode, factory, granularity)
+
+    if verbose:
+        print(f"    模式 {reading_mode} 读取到: '{outcome['actual'][:80]}...'")
+        if reading_mode == 'auto':
+            print(f"    自动检测到文本来源: {outcome['source']}")
 
     # 验证
-    if current_text != old_text:
+    if not outcome['ok']:
         print(f"  ✗ 文本不匹配")
         print(f"    预期: '{old_text[:100]}...'")
-        print(f"    实际: '{current_text[:100]}...'")
-        return False
-
-    # 根据更新模式处理
-    if update_mode == 'clear_and_replace':
-        # 清除所有追踪修订
-        clear_cell_tracked_changes(cell)
-
-        # 清空单元格
-        for paragraph in cell.paragraphs:
-            for run in paragraph.runs:
-                run._element.getparent().remove(run._element)
-
-        # 确保至少有一个段落
-        if not cell.paragraphs:
-            cell.add_paragraph()
-
-        paragraph = cell.paragraphs[0]
-
-        # 添加新的追踪修订
-        # 删除标记
-        del_run = paragraph.add_run(old_text)
-        del_run_element = del_run._element
-
-        del_element = parse_xml(f'''
-            <w:del w:id="{revision_id}" w:author="{author}" w:date="{date_str}"
-                   xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
-            </w:del>
-        ''')
-
-        parent = del_run_element.getparent()
-        parent.remove(del_run_element)
-        del_element.append(del_run_element)
-        paragraph._element.append(del_element)
-
-        # 插入标记
-        ins_element = parse_xml(f'''
-            <w:ins w:id="{revision_id + 1}" w:author="{author}" w:date="{date_str}"
-                   xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
-            </w:ins>
-        ''')
-
-        ins_run_xml = f'''
-            <w:r xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
-                <w:t xml:space="preserve">{new_text}</w:t>
-            </w:r>
-        '''
-
-        ins_run_element = parse_xml(ins_run_xml)
-        ins_element.append(ins_run_element)
-        paragraph._element.append(ins_element)
-
-    return True
-
-
-def find_table(doc) -> Optional:
-    """查找文档中的第一个表格"""
-    if not doc.tables:
+        print(f"    实际: '{outcome['actual'][:100]}...'")
         return None
-    return doc.tables[0]
 
+    return outcome
 
-def update_translations(
-    input_path: str,
-    translations_path: str,
-    output_path: str,
-    author: str = "Translator",
-    verbose: bool = False,
-    reading_mode: str = 'auto',
-    update_mode: str = 'clear_and_replace'
-) -> Tuple[int, int]:
-    """
-    更新包含追踪修订的翻译
 
-    Args:
-        reading_mode: 'auto' | 'read_deleted' | 'read_inserted'
-        update_mode: 'clear_and_replace'
-    """
-    # 加载文档
-    print(f"\n📖 加载文档: {input_path}")
-    doc = Document(input_path)
-
-    # 启用追踪修订
+def prepare_document(doc):
+    """启用文档层级追踪修订，并返回第一个表格"""
     if has_track_changes_enabled(doc):
         print("✓ 文档层级追踪修订已存在")
     else:
         enable_track_changes(doc)
         print("✓ 已启用文档层级追踪修订")
 
-    # 加载翻译
-    with open(translations_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-        # 提取 translations 数组（如果存在）
-        translations = data.get('translations', data) if isinstance(data, dict) else data
-
-    # 查找表格
     table = find_table(doc)
     if not table:
         raise ValueError("文档中未找到表格")
+    return table
+
+
+def apply_translation(
+    find_cell,
+    translation: Dict,
+    author: str,
+    date_str: str,
+    revision_id: int,
+    reading_mode: str = 'auto',
+    update_mode: str = 'clear_and_replace',
+    verbose: bool = False,
+    factory=None,
+    granularity: str = 'cell'
+) -> Optional[Dict]:
+    """
+    将单条翻译映射应用到表格
+
+    find_cell 由 fc_insider.tracked.cell_finder() 构建；factory 为同一批更新共用的
+    tracked.RevisionFactory（不提供时每个单元格临时创建）；
+    调用方负责打印 "[idx/total] 处理 ..." 前缀
+
+    Returns:
+        成功时为 tracked.replace_cell() 的结果（revision_id 需要加上其中的 'revisions'，
+        整格替换时为 2，已有相同修订时为 0）；失败时为 None
+    """
+    segment_id, old_text, new_text = mapping_texts(translation)
+
+    target_cell = find_cell(segment_id) if segment_id else None
+    if target_cell is None:
+        print(f"✗ Segment ID 未找到")
+        return None
+
+    if verbose:
+        print()
+
+    outcome = replace_cell_with_track_changes_from_tracked(
+        target_cell,
+        old_text,
+        new_text,
+        author,
+        date_str,
+        revision_id,
+        reading_mode,
+        update_mode,
+        verbose,
+        factory,
+        granularity
+    )
+
+    if outcome is not None and outcome['unchanged']:
+        print("✓ 已有相同修订，跳过" if not verbose else "  ✓ 已有相同修订，跳过")
+    elif outcome is not None:
+        print("✓" if not verbose else "  ✓ 成功")
+    return outcome
+
 
-    # 构建 segment_id -> row 映射
-    row_map = {}
-    for i, row in enumerate(table.rows[1:], start=1):  # 跳过表头
-        if len(row.cells) >= 4:
-            segment_id = row.cells[0].text.strip()
-            if segment_id:
-                row_map[segment_id] = i
+def apply_translations(
+    doc,
+    translations: List[Dict],
+    author: str = "Translator",
+    verbose: bool = False,
+    reading_mode: str = 'auto',
+    update_mode: str = 'clear_and_replace',
+    engine: str = 'docx',
+    index: Optional[Dict] = None,
+    granularity: str = 'cell'
+) -> Tuple[int, int, int]:
+    """
+    将翻译映射应用到已加载的文档（不负责加载和保存）
+
+    Args:
+        engine: 'docx' | 'lxml'，单元格定位引擎
+        index: 可选的 segment 位置索引（fc_insider.segment_index）；提供时不再扫描表格
+        granularity: 'cell' | 'word' | 'char'，差异粒度
+
+    Returns:
+        (success_count, fail_count, unchanged_count)；success_count 含已有相同修订而跳过的
+    """
+    # 启用追踪修订并查找表格
+    table = prepare_document(doc)
+
+    # 构建 segment_id -> 译文单元格 查找
+    find_cell = segment_finder(table, index, engine)
 
     print(f"\n{'='*80}")
     print(f"FC Insider 翻译更新 - 方案 4 (处理追踪修订)")
     print(f"读取模式: {reading_mode}")
     print(f"更新模式: {update_mode}")
+    print(f"引擎: {engine}")
+    print(f"差异粒度: {granularity}")
     print(f"作者: {author}")
     print(f"翻译数量: {len(translations)}")
     print(f"{'='*80}")
 
     success_count = 0
     fail_count = 0
-    date_str = datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
-    revision_id = 1000
+    unchanged_count = 0
+    date_str = tracked.revision_date()
+    factory = tracked.RevisionFactory(author, date_str)
+    # 新修订的 ID 从文档中已有的最大 w:id 之后开始
+    revision_id = tracked.first_revision_id(doc.element)
 
     print(f"\n开始处理 {len(translations)} 个翻译...")
     print("="*80)
 
     for idx, translation in enumerate(translations, 1):
-        segment_id = translation.get('segment_id')
-        # 支持两种键名：old_text/new_text 或 old_translation/new_translation
-        old_text = translation.get('old_text', translation.get('old_translation', '')).strip()
-        new_text = translation.get('new_text', translation.get('new_translation', '')).strip()
-
-        print(f"[{idx}/{len(translations)}] 处理 {segment_id}...", end=" ")
+        print(f"[{idx}/{len(translations)}] 处理 {translation.get('segment_id')}...", end=" ")
 
-        if not segment_id or segment_id not in row_map:
-            print(f"✗ Segment ID 未找到")
-            fail_count += 1
-            continue
-
-        row_idx = row_map[segment_id]
-        target_cell = table.rows[row_idx].cells[3]
-
-        if verbose:
-            print()
-
-        success = replace_cell_with_track_changes_from_tracked(
-            target_cell,
-            old_text,
-            new_text,
-            author,
-            date_str,
-            revision_id,
-            reading_mode,
-            update_mode,
-            verbose
-        )
-
-        if success:
-            print("✓" if not verbose else "  ✓ 成功")
+        outcome = apply_translation(find_cell, translation, author, date_str, revision_id,
+                                    reading_mode, update_mode, verbose, factory, granularity)
+        if outcome is not None:
             success_count += 1
-            revision_id += 2
+            unchanged_count += outcome['unchanged']
+            revision_id += outcome['revisions']
         else:
             fail_count += 1
 
     print("="*80)
     print(f"\n{'✓ 更新完成' if fail_count == 0 else '⚠ 更新完成（有失败项）'}: {success_count}/{len(translations)}")
+    if unchanged_count > 0:
+        print(f"✓ 已有相同修订（跳过）: {unchanged_count}")
     if fail_count > 0:
         print(f"✗ 失败: {fail_count}")
     print("="*80)
 
-    # 保存
-    print(f"\n💾 保存文档: {output_path}")
-    doc.save(output_path)
+    return success_count, fail_count, unchanged_count
+
+
+def load_segment_index(table, input_path: str, docx_bytes, mode: str = 'auto'):
+    """读取或构建 segment 位置索引（stdin 输入没有可保存 sidecar 的位置，不使用索引）"""
+    if table is None or mode == 'off' or is_stdio(input_path):
+        return None
+
+    index, status = open_index(table, input_path, docx_bytes, mode)
+    if status == 'loaded':
+        print(f"✓ 使用 segment 索引（{len(index['segments'])} 个）")
+    elif status == 'built':
+        print(f"✓ 已构建 segment 索引（{len(index['segments'])} 个）")
+    return index
+
+
+def update_translations(
+    input_path: str,
+    translations_path: Optional[str],
+    output_path: str,
+    author: str = "Translator",
+    verbose: bool = False,
+    reading_mode: str = 'auto',
+    update_mode: str = 'clear_and_replace',
+    engine: str = 'docx',
+    segment_index: str = 'off',
+    streaming: bool = False,
+    translations: Optional[List[Dict]] = None,
+    shards: Optional[int] = None,
+    granularity: str = 'cell',
+    coalesce: bool = False
+) -> Tuple[int, int]:
+    """
+    更新包含追踪修订的翻译
+
+    Args:
+        input_path / translations_path: 输入路径（"-" 表示 stdin）
+        output_path: 输出路径（"-" 表示 stdout）
+        reading_mode: 'auto' | 'read_deleted' | 'read_inserted'
+        update_mode: 'clear_and_replace'
+        engine: 'docx' | 'lxml'
+        segment_index: 'auto' | 'rebuild' | 'off'，见 fc_insider.segment_index
+        streaming: 流式更新（fc_insider.streaming），不使用 engine 和 segment_index
+        translations: 已读取的翻译映射（多文档模式共用）；提供时忽略 translations_path
+        shards: 分片并行更新的进程数（fc_insider.sharded），不使用 engine 和 segment_index
+        granularity: 'cell' | 'word' | 'char'，差异粒度（fc_insider.diff）
+        coalesce: 更新前合并单元格中的 run（fc_insider.coalescing），不能与 streaming / shards 同时使用
+    """
+    from io import BytesIO
+
+    if translations is None:
+        translations = load_translations(read_input_bytes(translations_path))
+
+    if streaming:
+        return update_translations_streaming(input_path, translations, output_path,
+                                             author, reading_mode, granularity)
+    if shards:
+        return update_translations_sharded(input_path, translations, output_path,
+                                           author, reading_mode, shards, granularity)
+
+    # 加载文档（文件以 mmap 读取）
+    print(f"\n📖 加载文档: {display_name(input_path)}")
+    source = read_input_bytes(input_path) if is_stdio(input_path) else input_path
+    original = source
+    if coalesce:
+        source = coalesce_runs(source)
+
+    with SourcePackage(source) as package:
+        doc = Document(package.stream)
+        track_changes_existed = has_track_changes_enabled(doc)
+
+        index = load_segment_index(find_table(doc), input_path, package.stream, segment_index)
+
+        success_count, fail_count, unchanged_count = apply_translations(
+            doc, translations, author, verbose, reading_mode, update_mode, engine, index,
+            granularity
+        )
+
+        # 保存：只重写改动的部件，图片、字体等其余成员原样复制
+        # （全部已有相同修订时 document.xml 也原样复制）
+        print(f"\n💾 保存文档: {display_name(output_path, 'stdout')}")
+        buffer = BytesIO()
+        save_document(doc, package, buffer,
+                      tracked.changed_parts(doc, track_changes_existed,
+                                            success_count > unchanged_count))
+        write_output_bytes(output_path, buffer.getvalue())
+        print_document_stats(document_stats(original), document_stats(buffer.getvalue()))
     print("✓ 完成")
 
     return success_count, fail_count
 
 
+def update_translations_streaming(
+    input_path: str,
+    translations: List[Dict],
+    output_path: str,
+    author: str = "Translator",
+    reading_mode: str = 'auto',
+    granularity: str = 'cell'
+) -> Tuple[int, int]:
+    """
+    流式更新：document.xml 逐行读取、写入修订并直接写出到输出文件
+
+    逐条结果在写出完成后按映射顺序打印；输出到 stdout 时不报告更新后的 document.xml
+    """
+    print(f"\n📖 流式更新: {display_name(input_path)} → {display_name(output_path, 'stdout')}")
+    print(f"读取模式: {reading_mode}")
+    print(f"作者: {author}")
+    print(f"翻译数量: {len(translations)}")
+
+    source = read_input_bytes(input_path) if is_stdio(input_path) else input_path
+    if is_stdio(output_path):
+        result = apply_streaming(source, translations, sys.__stdout__.buffer,
+                                 author, reading_mode, granularity=granularity)
+        sys.__stdout__.buffer.flush()
+    else:
+        result = apply_streaming(source, translations, output_path, author, reading_mode,
+                                 granularity=granularity)
+
+    if result['track_changes_existed']:
+        print("✓ 文档层级追踪修订已存在")
+    else:
+        print("✓ 已启用文档层级追踪修订")
+    print(f"✓ 已扫描 {result['rows']} 行")
+
+    success_count, fail_count = print_results(result)
+    if not is_stdio(output_path):
+        print_document_stats(document_stats(source), document_stats(output_path))
+    print("✓ 完成")
+
+    return success_count, fail_count
+
+
+def update_translations_sharded(
+    input_path: str,
+    translations: List[Dict],
+    output_path: str,
+    author: str = "Translator",
+    reading_mode: str = 'auto',
+    shards: int = 1,
+    granularity: str = 'cell'
+) -> Tuple[int, int]:
+    """
+    分片并行更新：第一个表格的行分成 shards 段，在多个进程中同时写入修订
+
+    逐条结果在写出完成后按映射顺序打印
+    """
+    print(f"\n📖 分片更新: {display_name(input_path)}（{shards} 个进程）")
+    print(f"读取模式: {reading_mode}")
+    print(f"作者: {author}")
+    print(f"翻译数量: {len(translations)}")
+
+    source = read_input_bytes(input_path) if is_stdio(input_path) else input_path
+    result = apply_sharded(source, translations, author, reading_mode, workers=shards,
+                           granularity=granularity)
+
+    if result['track_changes_existed']:
+        print("✓ 文档层级追踪修订已存在")
+    else:
+        print("✓ 已启用文档层级追踪修订")
+    print(f"✓ 表格分为 {result['shards']} 段")
+
+    success_count, fail_count = print_results(result)
+
+    print(f"\n💾 保存文档: {display_name(output_path, 'stdout')}")
+    write_output_bytes(output_path, result['docx'])
+    print_document_stats(document_stats(source), document_stats(result['docx']))
+    print("✓ 完成")
+
+    return success_count, fail_count
+
+
+def verify_translations(
+    input_path: str,
+    translations: List[Dict],
+    reading_mode: str = 'auto',
+    segment_index: str = 'off',
+    report_path: Optional[str] = None
+) -> Dict:
+    """
+    只校验：比较每条映射的 old_text 与文档中的当前译文，不写入修订、不写出文档
+
+    只解析 word/document.xml；segment 索引有效时直接按位置读取译文单元格
+
+    Args:
+        report_path: 结构化报告（JSON）的输出路径，"-" 表示 stdout；None 时只打印
+
+    Returns:
+        fc_insider.verification.verify_table() 的结果
+    """
+    print(f"\n🔍 校验翻译映射: {display_name(input_path)}")
+    print(f"读取模式: {reading_mode}")
+    print(f"翻译数量: {len(translations)}")
+
+    source = read_input_bytes(input_path) if is_stdio(input_path) else input_path
+    with SourcePackage(source) as package:
+        table = read_first_table(package)
+        index = load_segment_index(table, input_path, package.stream, segment_index)
+    result = verify_table(table, translations, reading_mode, index)
+
+    report_verification(result, input_path, reading_mode, report_path)
+    return result
+
+
+def report_verification(result: Dict, input_path: str, reading_mode: str,
+                        report_path: Optional[str] = None) -> None:
+    """打印校验结果（只列出不一致项），并按需写出结构化报告"""
+    print("="*80)
+    for idx, item in enumerate(result['results'], 1):
+        if item['status'] == 'not_found':
+            print(f"[{idx}/{result['total']}] {item['segment_id']}: ✗ Segment ID 未找到")
+        elif item['status'] == 'mismatch':
+            print(f"[{idx}/{result['total']}] {item['segment_id']}: ✗ 文本不匹配"
+                  f"（来源: {item['source']}）")
+            print(f"    预期: '{item['expected'][:100]}...'")
+            print(f"    实际: '{item['actual'][:100]}...'")
+    print("="*80)
+    problems = result['mismatched'] + result['not_found']
+    print(f"\n{'✓ 全部一致' if problems == 0 else '⚠ 有不一致项'}: "
+          f"{result['matched']}/{result['total']}")
+    if problems:
+        print(f"✗ 文本不匹配: {result['mismatched']}，Segment ID 未找到: {result['not_found']}")
+
+    if report_path:
+        report = mismatch_report(result, input=display_name(input_path),
+                                 reading_mode=reading_mode)
+        write_output_text(report_path, json.dumps(report, ensure_ascii=False, indent=2) + '\n')
+        print(f"📄 不一致报告: {display_name(report_path, 'stdout')}")
+
+
+def load_delta(translations_path: str, base_path: str) -> Dict:
+    """读取本轮与上一轮的映射并打印增量（fc_insider.delta.delta_mappings()）"""
+    delta = delta_mappings(read_input_bytes(translations_path), read_input_bytes(base_path))
+    print(f"\n🔁 增量应用（基准: {display_name(base_path)}，{delta['base_total']} 条）")
+    print(f"  新增 {len(delta['added'])}，改动 {len(delta['changed'])}，"
+          f"未变 {delta['unchanged']}（跳过）")
+    if delta['removed']:
+        print(f"  ⚠ 只在基准中出现（已写入的修订不会撤销）: {len(delta['removed'])}")
+    return delta
+
+
+def default_delta_report(output_path: str) -> Optional[str]:
+    """增量摘要的默认路径：输出文档旁的 <名称>.delta.json；输出到 stdout 时不写出"""
+    if is_stdio(output_path):
+        return None
+    return os.path.splitext(output_path)[0] + '.delta.json'
+
+
+def write_delta_report(delta: Dict, report_path: str, **context) -> None:
+    """写出增量摘要（JSON）"""
+    report = delta_report(delta, **context)
+    write_output_text(report_path, json.dumps(report, ensure_ascii=False, indent=2) + '\n')
+    print(f"📄 增量摘要: {display_name(report_path, 'stdout')}")
+
+
+def coalesce_runs(source) -> bytes:
+    """
+    合并单元格中的 run（fc_insider.coalescing），打印 run 数量的变化与耗时
+
+    Returns:
+        合并后的文档 bytes（之后的载入、定位和保存都基于它；没有可合并的内容时与输入相同）
+    """
+    started = time.perf_counter()
+    result = coalesce(source)
+    before, after = result['runs']
+    print(f"🔁 合并 run: {before:,} → {after:,}（合并 {result['merged']:,}，空 run {result['empty']:,}，"
+          f"拼写检查标记 {result['proofing']:,}，语言标注 {result['languages']:,}），"
+          f"{time.perf_counter() - started:.2f}s")
+    return result['docx']
+
+
+def print_document_stats(before: Dict, after: Dict) -> None:
+    """打印更新前后 document.xml 的大小与修订数量（fc_insider.stats.document_stats()）"""
+    change = (after['xml_bytes'] - before['xml_bytes']) / before['xml_bytes'] * 100 \
+        if before['xml_bytes'] else 0.0
+    print(f"📄 document.xml: {before['xml_bytes']:,} → {after['xml_bytes']:,} 字节（{change:+.1f}%），"
+          f"修订: {before['revisions']:,} → {after['revisions']:,}")
+
+
+def print_results(result: Dict) -> Tuple[int, int]:
+    """按映射顺序打印 apply_streaming() / apply_sharded() 的逐条结果和统计"""
+    print("="*80)
+    total = len(result['results'])
+    for idx, item in enumerate(result['results'], 1):
+        print(f"[{idx}/{total}] 处理 {item['segment_id']}...", end=" ")
+        if item['status'] == 'updated':
+            print("✓")
+        elif item['status'] == 'unchanged':
+            print("✓ 已有相同修订，跳过")
+        elif item['status'] == 'not_found':
+            print("✗ Segment ID 未找到")
+        else:
+            print("✗ 文本不匹配")
+            print(f"    预期: '{item['expected'][:100]}...'")
+            print(f"    实际: '{item['actual'][:100]}...'")
+
+    success_count, fail_count = result['success'], result['failed']
+    print("="*80)
+    print(f"\n{'✓ 更新完成' if fail_count == 0 else '⚠ 更新完成（有失败项）'}: {success_count}/{total}")
+    if result['unchanged'] > 0:
+        print(f"✓ 已有相同修订（跳过）: {result['unchanged']}")
+    if fail_count > 0:
+        print(f"✗ 失败: {fail_count}")
+    print("="*80)
+
+    return success_count, fail_count
+
+
+# ---- 多文档模式 ----
+
+OUTPUT_SUFFIX = '_tracked.docx'
+SUMMARY_NAME = 'update_summary.json'
+
+# 工作进程中共用的翻译映射（进程池 initializer 设置，每个进程只接收一次）
+_worker_translations: Optional[List[Dict]] = None
+
+
+def expand_inputs(patterns: List[str]) -> Tuple[List[str], bool]:
+    """
+    展开 --input 中的通配符（去重，保持顺序）
+
+    Returns:
+        (路径列表, 是否使用了通配符)
+    """
+    paths = []
+    used_glob = False
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            used_glob = True
+            matches = sorted(glob.glob(pattern))
+        else:
+            matches = [pattern]
+        for path in matches:
+            if path not in paths:
+                paths.append(path)
+    return paths, used_glob
+
+
+def plan_documents(inputs: List[str], output_dir: str) -> List[Dict]:
+    """
+    生成逐文档任务：输出到 output_dir/<名称>_tracked.docx，按文件大小从大到小排列
+
+    最大的文档最先开始，总耗时（最后一个文档完成的时间）最短
+    """
+    jobs = []
+    outputs = {}
+    for path in inputs:
+        if not os.path.isfile(path):
+            raise ValueError(f"输入文件不存在: {path}")
+        stem = os.path.splitext(os.path.basename(path))[0]
+        output = os.path.join(output_dir, stem + OUTPUT_SUFFIX)
+        if output in outputs:
+            raise ValueError(f"输出文件名冲突: {outputs[output]} 与 {path} 都会写到 {output}")
+        outputs[output] = path
+        jobs.append({'input': path, 'output': output, 'bytes': os.path.getsize(path)})
+    jobs.sort(key=lambda job: job['bytes'], reverse=True)
+    return jobs
+
+
+def _init_worker(translations: List[Dict]) -> None:
+    global _worker_translations
+    _worker_translations = translations
+
+
+def update_document(job: Dict, options: Dict) -> Dict:
+    """
+    在工作进程中更新一个文档（与单文档模式相同的 update_translations）
+
+    逐条进度输出被捕获，只在文档未全部成功时保存在结果的 'log' 中
+    """
+    result = {'input': job['input'], 'output': job['output'], 'bytes': job['bytes'],
+              'status': 'failed', 'success': 0, 'failed': 0}
+    log = io.StringIO()
+    started = time.perf_counter()
+    try:
+        with redirect_stdout(log):
+            success, fail = update_translations(
+                job['input'], None, job['output'], translations=_worker_translations, **options)
+        result.update(success=success, failed=fail,
+                      status='done' if fail == 0 else 'partial')
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        log.write(traceback.format_exc())
+
+    result['seconds'] = round(time.perf_counter() - started, 3)
+    if result['status'] != 'done':
+        result['log'] = log.getvalue()
+    return result
+
+
+def update_documents(jobs: List[Dict], translations: List[Dict], options: Dict,
+                     workers: int) -> List[Dict]:
+    """以进程池更新多个文档，按完成顺序输出进度，按 jobs 顺序返回结果"""
+    results = [None] * len(jobs)
+    icons = {'done': '✓', 'partial': '⚠️ ', 'failed': '✗'}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(translations,)) as pool:
+        futures = {pool.submit(update_document, job, options): i for i, job in enumerate(jobs)}
+        for finished, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results[futures[future]] = result
+            detail = result.get('error') or f"成功 {result['success']}，失败 {result['failed']}"
+            print(f"[{finished}/{len(jobs)}] {icons[result['status']]} {result['input']}: "
+                  f"{detail}（{result['seconds']:.2f}s）")
+
+    return results
+
+
+def print_documents_summary(results: List[Dict], elapsed: float, workers: int) -> None:
+    """输出多文档汇总"""
+    counts = {status: sum(1 for r in results if r['status'] == status)
+              for status in ('done', 'partial', 'failed')}
+    busy = sum(r['seconds'] for r in results)
+
+    print("\n" + "=" * 80)
+    print("多文档更新汇总")
+    print("=" * 80)
+    print(f"  文档: {len(results)}（完成 {counts['done']}，部分失败 {counts['partial']}，"
+          f"失败 {counts['failed']}）")
+    print(f"  更新段落: {sum(r['success'] for r in results)}，"
+          f"失败段落: {sum(r['failed'] for r in results)}")
+    print(f"  总耗时: {elapsed:.2f}s（各文档耗时合计 {busy:.2f}s，{workers} 个进程）")
+
+    problems = [r for r in results if r['status'] != 'done']
+    if problems:
+        print("\n需要检查的文档:")
+        for r in problems:
+            detail = r.get('error') or f"{r['failed']} 个段落未更新"
+            print(f"  - {r['input']}: {detail}")
+
+
+def run_multi_document(args, inputs: List[str]) -> int:
+    """多文档模式的入口"""
+    if any(is_stdio(path) for path in
+           inputs + [args.translations, args.output, args.base_mapping, args.delta_report]):
+        print("❌ 错误: 多文档模式不支持 \"-\"（stdin/stdout）", file=sys.stderr)
+        return 1
+    if args.shards or args.verify_only:
+        option = '--shards' if args.shards else '--verify-only'
+        print(f"❌ 错误: 多文档模式不支持 {option}", file=sys.stderr)
+        return 1
+    if os.path.isfile(args.output):
+        print(f"❌ 错误: 多文档模式下 --output 必须是目录: {args.output}", file=sys.stderr)
+        return 1
+    os.makedirs(args.output, exist_ok=True)
+
+    try:
+        jobs = plan_documents(inputs, args.output)
+    except ValueError as e:
+        print(f"❌ 错误: {e}", file=sys.stderr)
+        return 1
+    if not jobs:
+        print("❌ 错误: 没有匹配的输入文档", file=sys.stderr)
+        return 1
+
+    # 映射只读取、解析一次，再交给每个工作进程
+    delta = None
+    if args.base_mapping:
+        delta = load_delta(args.translations, args.base_mapping)
+        translations = delta['mappings']
+    else:
+        translations = load_translations(read_input_bytes(args.translations))
+    workers = max(1, min(args.workers, len(jobs)))
+    options = {'author': args.author, 'verbose': args.verbose, 'reading_mode': args.mode,
+               'engine': args.engine, 'segment_index': args.segment_index,
+               'streaming': args.streaming, 'granularity': args.diff_granularity,
+               'coalesce': args.coalesce_runs}
+
+    print(f"📦 {len(jobs)} 个文档，{len(translations)} 条翻译（进程池 {workers}，从大到小处理）")
+    started = time.perf_counter()
+    results = update_documents(jobs, translations, options, workers)
+    elapsed = time.perf_counter() - started
+
+    summary = {
+        'finished_at': datetime.now().isoformat(timespec='seconds'),
+        'seconds': round(elapsed, 3),
+        'workers': workers,
+        'translations': len(translations),
+        'documents': results
+    }
+    if delta is not None:
+        summary['delta'] = delta_report(delta, base_mapping=args.base_mapping)
+    summary_path = args.summary or os.path.join(args.output, SUMMARY_NAME)
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    print_documents_summary(results, elapsed, workers)
+    print(f"\n📄 汇总报告: {summary_path}")
+    if delta is not None and args.delta_report:
+        write_delta_report(delta, args.delta_report, base_mapping=args.base_mapping)
+
+    return 0 if all(r['status'] == 'done' for r in results) else 1
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='方案 4: 处理已包含追踪修订的单元格',
@@ -402,21 +828,177 @@ def main():
     --author "Gemini" \\
     --mode read_inserted \\
     --verbose
+
+  # 大表格（数千行）：单次遍历表格 XML 定位单元格
+  python3 update_fc_insider_tracked.py \\
+    --input "input.docx" \\
+    --translations "translations.json" \\
+    --output "output.docx" \\
+    --engine lxml
+
+  # 同一输入反复更新（修改译文后重跑）：保存并复用 segment 索引
+  python3 update_fc_insider_tracked.py \\
+    --input "input.docx" \\
+    --translations "translations.json" \\
+    --output "output.docx" \\
+    --segment-index auto
+
+  # 数百 MB 的文档：流式更新，内存占用取决于最大的一行而不是整个文档
+  python3 update_fc_insider_tracked.py \\
+    --input "catalogue.docx" \\
+    --translations "translations.json" \\
+    --output "output.docx" \\
+    --streaming
+
+  # 上万行的单个表格：分成 4 段在 4 个进程中同时更新（输出与串行完全相同）
+  python3 update_fc_insider_tracked.py \\
+    --input "catalogue.docx" \\
+    --translations "translations.json" \\
+    --output "output.docx" \\
+    --shards 4
+
+  # 只标记改动的词（中日韩文逐字），未改动的文本及格式保留
+  python3 update_fc_insider_tracked.py \\
+    --input "input.docx" \\
+    --translations "translations.json" \\
+    --output "output.docx" \\
+    --diff-granularity word
+
+  # 审阅循环：以上一轮的输出为输入，只应用新增或改动的映射（写出 output.delta.json）
+  python3 update_fc_insider_tracked.py \\
+    --input "output_round1.docx" \\
+    --translations "translations.json" \\
+    --base-mapping "translations_round1.json" \\
+    --output "output_round2.docx"
+
+  # Word / CAT 工具把单元格拆成很多 run 时：更新前先合并相邻、格式相同的 run
+  python3 update_fc_insider_tracked.py \\
+    --input "input.docx" \\
+    --translations "translations.json" \\
+    --output "output.docx" \\
+    --coalesce-runs
+
+  # 只校验旧译文是否与文档一致（不生成输出文档），不一致时退出码为 1
+  python3 update_fc_insider_tracked.py \\
+    --input "input.docx" \\
+    --translations "translations.json" \\
+    --verify-only \\
+    --report "mismatches.json"
+
+  # 多个文档应用同一份映射：进程池并行，输出到目录
+  python3 update_fc_insider_tracked.py \\
+    --input "cards/*.docx" \\
+    --translations "translations.json" \\
+    --output "cards_tracked/" \\
+    --workers 4
+
+  # 管道：docx 来自 stdin，输出到 stdout（进度信息输出到 stderr）
+  cat input.docx | python3 update_fc_insider_tracked.py \\
+    --input - \\
+    --translations "translations.json" \\
+    --output - > output.docx
         """
     )
 
-    parser.add_argument('--input', required=True, help='输入 Word 文档路径')
-    parser.add_argument('--translations', required=True, help='翻译映射 JSON 文件路径')
-    parser.add_argument('--output', required=True, help='输出 Word 文档路径')
+    parser.add_argument('--input', required=True, nargs='+',
+                       help='输入 Word 文档路径（"-" 表示 stdin）；'
+                            '多个路径或通配符时为多文档模式')
+    parser.add_argument('--translations', required=True, help='翻译映射 JSON 文件路径（"-" 表示 stdin）')
+    parser.add_argument('--output',
+                       help='输出 Word 文档路径（"-" 表示 stdout）；多文档模式下为输出目录；'
+                            '--verify-only 时不需要')
     parser.add_argument('--author', default='Claire.lee@amway.com', help='追踪修订作者名称（默认：Claire.lee@amway.com）')
     parser.add_argument('--mode',
                        choices=['auto', 'read_deleted', 'read_inserted'],
                        default='auto',
                        help='读取模式')
+    parser.add_argument('--engine', choices=ENGINES, default='docx',
+                       help='单元格定位引擎：docx（python-docx 表格模型）或 lxml（单次遍历表格 XML，'
+                            '大表格更快，输出相同）')
+    parser.add_argument('--segment-index', choices=INDEX_MODES, default='off',
+                       help='segment 位置索引（<input>.segidx.json）：off 不使用（默认）；'
+                            'auto 有效时复用、否则构建并保存；rebuild 强制重建。'
+                            '只在同一输入反复更新时有收益')
+    parser.add_argument('--streaming', action='store_true',
+                       help='流式更新：逐行读取、改写并写出 document.xml，内存占用与文档大小无关'
+                            '（不使用 --engine / --segment-index）')
+    parser.add_argument('--shards', type=int,
+                       help='分片并行更新：第一个表格的行分成 N 段，在 N 个进程中同时更新，'
+                            '输出与串行完全相同（不使用 --engine / --segment-index）')
+    parser.add_argument('--diff-granularity', choices=GRANULARITIES, default='cell',
+                       help='差异粒度：cell 删除整格旧译文并插入新译文；word / char 只在改动的词'
+                            '（中日韩文逐字）/ 字符前后写入修订，保留未改动的 run 及格式（默认：cell）')
+    parser.add_argument('--coalesce-runs', action='store_true',
+                       help='更新前合并单元格中相邻、格式相同的 run，去掉拼写检查标记、空 run '
+                            '和多余的语言标注（不能与 --streaming / --shards / --verify-only 同时使用）')
+    parser.add_argument('--verify-only', action='store_true',
+                       help='只校验 old_text 是否与文档一致，不写入修订、不生成输出文档；'
+                            '全部一致时退出码为 0')
+    parser.add_argument('--report',
+                       help='--verify-only 的结构化不一致报告（JSON）输出路径（"-" 表示 stdout）')
+    parser.add_argument('--base-mapping',
+                       help='上一轮的翻译映射 JSON（"-" 表示 stdin）：按 segment_id 与文本哈希比较，'
+                            '只应用新增或改动的映射（--input 为上一轮的输出文档）')
+    parser.add_argument('--delta-report',
+                       help='--base-mapping 的增量摘要（JSON）输出路径（"-" 表示 stdout；'
+                            '默认：<输出文档名>.delta.json，多文档模式写入汇总报告）')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                       help='多文档模式的进程数（默认：CPU 核数）')
+    parser.add_argument('--summary',
+                       help=f'多文档模式的汇总报告路径（默认：<输出目录>/{SUMMARY_NAME}）')
     parser.add_argument('--verbose', action='store_true', help='显示详细信息')
 
     args = parser.parse_args()
 
+    if args.output is None and not args.verify_only:
+        parser.error("需要 --output（只校验时使用 --verify-only）")
+    if args.report and not args.verify_only:
+        parser.error("--report 只用于 --verify-only")
+    if args.delta_report and not args.base_mapping:
+        parser.error("--delta-report 只用于 --base-mapping")
+    if args.shards is not None and args.shards < 1:
+        parser.error("--shards 必须为正整数")
+    if args.shards and args.streaming:
+        parser.error("--shards 与 --streaming 不能同时使用")
+    if args.coalesce_runs and (args.streaming or args.shards or args.verify_only):
+        parser.error("--coalesce-runs 需要载入整个文档，不能与 --streaming / --shards / --verify-only 同时使用")
+
+    inputs, used_glob = expand_inputs(args.input)
+    if len(inputs) > 1 or used_glob:
+        sys.exit(run_multi_document(args, inputs))
+    args.input = inputs[0]
+
+    error = check_single_stdin(args.input, args.translations, args.base_mapping)
+    if error:
+        parser.error(error)
+    if is_stdio(args.output) and is_stdio(args.delta_report):
+        parser.error("--output 与 --delta-report 不能同时为 \"-\"（stdout）")
+    progress_to_stderr(args.output, args.report, args.delta_report)
+
+    delta = None
+    if args.base_mapping:
+        try:
+            delta = load_delta(args.translations, args.base_mapping)
+        except Exception as e:
+            print(f"\n❌ 错误: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    if args.verify_only:
+        try:
+            result = verify_translations(
+                args.input,
+                delta['mappings'] if delta is not None
+                else load_translations(read_input_bytes(args.translations)),
+                args.mode,
+                segment_index=args.segment_index,
+                report_path=args.report
+            )
+        except Exception as e:
+            print(f"\n❌ 错误: {e}", file=sys.stderr)
+            traceback.print_exc()
+            sys.exit(1)
+        sys.exit(0 if result['matched'] == result['total'] else 1)
+
     try:
         success, fail = update_translations(
             args.input,
@@ -424,14 +1006,28 @@ def main():
             args.output,
             args.author,
             args.verbose,
-            args.mode
+            args.mode,
+            engine=args.engine,
+            segment_index=args.segment_index,
+            streaming=args.streaming,
+            shards=args.shards,
+            translations=delta['mappings'] if delta is not None else None,
+            granularity=args.diff_granularity,
+            coalesce=args.coalesce_runs
         )
 
+        report_path = args.delta_report or (default_delta_report(args.output)
+                                            if delta is not None else None)
+        if report_path:
+            write_delta_report(delta, report_path, input=display_name(args.input),
+                               base_mapping=display_name(args.base_mapping),
+                               output=display_name(args.output, 'stdout'),
+                               success=success, failed=fail)
+
         sys.exit(0 if fail == 0 else 1)
 
     except Exception as e:
         print(f"\n❌ 错误: {e}", file=sys.stderr)
-        import traceback
         traceback.print_exc()
         sys.exit(1)
 
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+监视目录，自动处理放入的翻译任务
+
+译者把任务放入共享目录，本脚本轮询发现完整的任务，在后台执行完整流程，
+输出文档和日志写在输入文件旁边。
+
+任务形式：
+1. 任务目录 - 目录中同时有 input.docx 和 new_translations.txt（或 .json）
+   输出：output.docx、job.log
+2. 任务清单 - *.job.json，路径相对于清单所在目录：
+   {"input": "card1.docx", "new_translations": "card1.txt",
+    "output": "card1_tracked.docx", "author": "...", "match_by": "smart"}
+   输出：清单指定的 output（默认 <input>_tracked.docx）、<清单名>.log
+
+处理规则：
+- 防抖：任务的所有文件大小和修改时间连续 --stable-checks 次轮询不变才开始处理
+- 去重：按输入内容、选项和输出位置计算哈希，已成功（done）的任务不再重复处理；
+  修改译文后哈希变化，会重新处理；失败或部分失败的任务在文件更新（或重启监视）后重试
+- 容错：单个任务出错（执行异常、日志或输出写入失败、文件在处理前被移走）只记录失败，继续监视；
+  无效的任务清单（不是 JSON 对象、字段类型或 match_by 无效）提示后跳过
+- 并发：最多 --workers 个任务同时处理
+
+使用方法：
+python3 watch_translation_jobs.py --watch-dir /shared/fc_jobs --author "translator@company.com"
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    from fc_insider import FcInsiderError
+    from fc_insider.workflow import process
+except ImportError as e:
+    print(f"错误：缺少依赖 ({e})")
+    print("运行: pip install python-docx lxml markitdown[docx]")
+    sys.exit(1)
+
+
+# 已处理任务记录（位于监视目录下）
+LEDGER_NAME = '.fc_insider_done.json'
+
+JOB_INPUT = 'input.docx'
+JOB_TRANSLATIONS = ('new_translations.txt', 'new_translations.json')
+JOB_OUTPUT = 'output.docx'
+JOB_LOG = 'job.log'
+MANIFEST_SUFFIX = '.job.json'
+MATCH_BY = ('smart', 'segment_id', 'index')
+
+
+def load_ledger(path: str) -> Dict[str, Dict]:
+    """读取已成功任务的记录（内容哈希 -> 结果）"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        print(f"⚠️  警告：无法读取处理记录 {path}，将重新开始记录")
+        return {}
+
+
+def save_ledger(path: str, ledger: Dict[str, Dict]) -> None:
+    """原子写入处理记录"""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(ledger, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def directory_job(directory: str, defaults: Dict) -> Optional[Dict]:
+    """任务目录：同时存在 input.docx 和 new_translations.* 时返回任务"""
+    input_path = os.path.join(directory, JOB_INPUT)
+    if not os.path.isfile(input_path):
+        return None
+
+    for name in JOB_TRANSLATIONS:
+        translations_path = os.path.join(directory, name)
+        if os.path.isfile(translations_path):
+            return dict(defaults,
+                        name=os.path.relpath(directory, defaults['watch_dir']),
+                        input=input_path,
+                        new_translations=translations_path,
+                        output=os.path.join(directory, JOB_OUTPUT),
+                        log=os.path.join(directory, JOB_LOG),
+                        files=[input_path, translations_path])
+    return None
+
+
+def manifest_value(manifest: Dict, field: str) -> str:
+    """清单中的值转为去掉首尾空白的字符串（JSON 中的数字等标量按字面转换，与 batch_translate 相同）"""
+    value = manifest.get(field)
+    if value is None:
+        return ''
+    if isinstance(value, (list, dict)):
+        raise ValueError(f"{field} 应为字符串: {value!r}")
+    return str(value).strip()
+
+
+def manifest_job(manifest_path: str, defaults: Dict) -> Optional[Dict]:
+    """
+    任务清单：读取 *.job.json，清单或其引用的文件不完整时返回 None
+
+    Raises:
+        ValueError: 清单不是 JSON 对象，或字段类型、取值无效
+    """
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        # 可能仍在写入，下次轮询再试
+        return None
+
+    if not isinstance(manifest, dict):
+        raise ValueError("任务清单应为 JSON 对象")
+
+    fields = {field: manifest_value(manifest, field)
+              for field in ('input', 'new_translations', 'output', 'author', 'match_by')}
+    match_by = fields['match_by'] or defaults['match_by']
+    if match_by not in MATCH_BY:
+        raise ValueError(f"match_by 应为 {' / '.join(MATCH_BY)}: {match_by!r}")
+
+    if not fields['input'] or not fields['new_translations']:
+        return None
+
+    base_dir = os.path.dirname(manifest_path)
+    input_path = os.path.join(base_dir, fields['input'])
+    translations_path = os.path.join(base_dir, fields['new_translations'])
+    if not os.path.isfile(input_path) or not os.path.isfile(translations_path):
+        return None
+
+    output = fields['output'] or os.path.splitext(fields['input'])[0] + '_tracked.docx'
+    stem = os.path.basename(manifest_path)[:-len(MANIFEST_SUFFIX)]
+
+    return dict(defaults,
+                name=os.path.relpath(manifest_path, defaults['watch_dir']),
+                input=input_path,
+                new_translations=translations_path,
+                output=os.path.join(base_dir, output),
+                log=os.path.join(base_dir, stem + '.log'),
+                author=fields['author'] or defaults['author'],
+                match_by=match_by,
+                files=[manifest_path, input_path, translations_path])
+
+
+def discover_jobs(watch_dir: str, defaults: Dict,
+                  invalid: Optional[Dict[str, str]] = None) -> List[Dict]:
+    """
+    扫描监视目录（及其一级子目录），返回完整的任务
+
+    无效的任务清单跳过，不影响其他任务；invalid（清单路径 -> 错误）用于同一错误只提示一次
+    """
+    if invalid is None:
+        invalid = {}
+    jobs = []
+    directories = [watch_dir] + [
+        entry.path for entry in os.scandir(watch_dir)
+        if entry.is_dir() and not entry.name.startswith('.')
+    ]
+
+    for directory in directories:
+        job = directory_job(directory, defaults)
+        if job:
+            jobs.append(job)
+
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith(MANIFEST_SUFFIX):
+                try:
+                    job = manifest_job(entry.path, defaults)
+                except Exception as e:
+                    error = str(e)
+                    if invalid.get(entry.path) != error:
+                        invalid[entry.path] = error
+                        print(f"⚠️  跳过任务清单 {os.path.relpath(entry.path, watch_dir)}: {error}")
+                    continue
+                invalid.pop(entry.path, None)
+                if job:
+                    jobs.append(job)
+
+    return jobs
+
+
+def file_signature(paths: List[str]) -> Optional[tuple]:
+    """文件大小和修改时间；文件消失或为空时返回 None"""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if stat.st_size == 0:
+            return None
+        signature.append((stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+def job_hash(job: Dict) -> str:
+    """
+    按输入内容、处理选项和输出位置计算任务哈希
+
+    包含输出位置：同样的文件放到另一个任务目录时仍会处理，在原处重新放入则跳过
+    """
+    digest = hashlib.sha256()
+    for path in (job['input'], job['new_translations']):
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        digest.update(b'\0')
+    digest.update(f"{job['author']}\0{job['match_by']}\0{job['output']}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def run_job(job: Dict) -> Dict:
+    """执行一个任务，把日志写在输入旁边，返回结果摘要"""
+    started = time.perf_counter()
+    lines = [
+        f"任务: {job['name']}",
+        f"开始: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        f"输入: {job['input']}",
+        f"新译文: {job['new_translations']}",
+        f"输出: {job['output']}",
+        f"作者: {job['author']}",
+        f"匹配方式: {job['match_by']}",
+        "",
+    ]
+    summary = {'status': 'failed', 'success': 0, 'failed': 0}
+
+    try:
+        result = process(job['input'], job['new_translations'], output=job['output'],
+                         author=job['author'], match_by=job['match_by'])
+
+        for item in result['results']:
+            lines.append(f"  [{item['status']}] {item['segment_id']}")
+            if item['status'] == 'mismatch':
+                lines.append(f"      期望: {item['expected'][:80]}")
+                lines.append(f"      实际: {(item['actual'] or '')[:80]}")
+
+        lines.append("")
+        lines.append(f"成功: {result['success']}  失败: {result['failed']}")
+        lines.append("阶段耗时: " + ", ".join(
+            f"{stage} {seconds:.2f}s" for stage, seconds in result['timings'].items()))
+
+        summary.update(success=result['success'], failed=result['failed'],
+                       status='done' if result['failed'] == 0 else 'partial')
+
+    except FcInsiderError as e:
+        lines.append(f"✗ 错误: {e}")
+        summary['error'] = str(e)
+    except Exception as e:
+        lines.append(f"✗ 未预期的错误: {e}")
+        lines.append(traceback.format_exc())
+        summary['error'] = str(e)
+
+    summary['seconds'] = round(time.perf_counter() - started, 3)
+    lines.append(f"状态: {summary['status']}（{summary['seconds']:.2f}s）")
+
+    with open(job['log'], 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+    return summary
+
+
+def watch(args) -> int:
+    """轮询监视目录，直到 Ctrl+C（或 --once 时处理完当前任务）"""
+    watch_dir = os.path.abspath(args.watch_dir)
+    ledger_path = os.path.join(watch_dir, LEDGER_NAME)
+    ledger = load_ledger(ledger_path)
+    defaults = {'watch_dir': watch_dir, 'author': args.author, 'match_by': args.match_by}
+
+    # 防抖状态：任务名 -> (签名, 连续不变次数)
+    pending: Dict[str, tuple] = {}
+    # 已判定（已提交或已处理过）时的签名，签名不变就不再计算哈希
+    settled: Dict[str, tuple] = {}
+    # 正在处理：任务名 -> (future, 任务, 哈希)
+    running: Dict[str, tuple] = {}
+    # 无效的任务清单：路径 -> 错误（同一错误只提示一次）
+    invalid: Dict[str, str] = {}
+
+    executor = ThreadPoolExecutor(max_workers=args.workers)
+    print(f"👀 监视目录: {watch_dir}（每 {args.interval}s 轮询，并发 {args.workers}）")
+
+    try:
+        while True:
+            # 收集已完成的任务
+            for name, (future, job, digest) in list(running.items()):
+                if not future.done():
+                    continue
+                del running[name]
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    # run_job 本身出错（如日志写入失败）：记为失败，继续监视
+                    summary = {'status': 'failed', 'success': 0, 'failed': 0,
+                               'error': str(e), 'seconds': 0.0}
+                summary.update(job=name, output=job['output'],
+                               finished_at=datetime.now().isoformat(timespec='seconds'))
+
+                icon = '✓' if summary['status'] == 'done' else '✗'
+                print(f"{icon} {name}: {summary['status']} "
+                      f"（成功 {summary['success']}，失败 {summary['failed']}，{summary['seconds']:.2f}s）"
+                      + (f" - {summary['error']}" if summary.get('error') else ''))
+
+                # 只记录成功的任务；失败的任务在文件更新或重启后重试
+                if summary['status'] == 'done':
+                    ledger[digest] = summary
+                    try:
+                        save_ledger(ledger_path, ledger)
+                    except OSError as e:
+                        print(f"⚠️  警告：无法写入处理记录 {ledger_path}: {e}")
+
+            # 发现新任务
+            seen = set()
+            try:
+                jobs = discover_jobs(watch_dir, defaults, invalid)
+            except OSError as e:
+                # 目录在扫描时被移走等：下次轮询再试
+                print(f"⚠️  警告：扫描监视目录失败: {e}")
+                jobs = []
+            for job in jobs:
+                name = job['name']
+                seen.add(name)
+                if name in running:
+                    continue
+
+                signature = file_signature(job['files'])
+                if signature is not None and settled.get(name) == signature:
+                    continue
+
+                previous, stable = pending.get(name, (None, 0))
+                stable = stable + 1 if signature is not None and signature == previous else 0
+                pending[name] = (signature, stable)
+
+                if stable < args.stable_checks:
+                    continue
+
+                del pending[name]
+
+                try:
+                    digest = job_hash(job)
+                except OSError as e:
+                    # 文件在防抖检查之后被移走或改名：下次轮询重新判定
+                    print(f"⚠️  {name}: 无法读取任务文件，稍后重试: {e}")
+                    continue
+                settled[name] = signature
+                if digest in ledger:
+                    continue
+
+                print(f"▶ {name}")
+                running[name] = (executor.submit(run_job, job), job, digest)
+
+            # 任务被移走后清除状态
+            for name in list(pending):
+                if name not in seen:
+                    del pending[name]
+            for name in list(settled):
+                if name not in seen:
+                    del settled[name]
+
+            # --once：没有进行中的任务，也没有等待稳定的任务
+            if args.once and not running and all(sig is None for sig, _ in pending.values()):
+                break
+
+            time.sleep(args.interval)
+
+    except KeyboardInterrupt:
+        print("\n正在停止，等待进行中的任务完成...")
+    finally:
+        executor.shutdown(wait=True)
+
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='监视目录，自动处理放入的翻译任务',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+示例：
+  # 监视共享目录
+  python3 watch_translation_jobs.py --watch-dir /shared/fc_jobs --author "translator@company.com"
+
+  # 目录结构
+  /shared/fc_jobs/
+    card1/
+      input.docx
+      new_translations.txt      → 处理后生成 output.docx、job.log
+    card2.job.json               → {"input": "card2.docx", "new_translations": "card2.txt"}
+    card2.docx
+    card2.txt                    → 处理后生成 card2_tracked.docx、card2.log
+
+  # 处理当前已有的任务后退出
+  python3 watch_translation_jobs.py --watch-dir /shared/fc_jobs --once
+        '''
+    )
+
+    parser.add_argument('--watch-dir', required=True, help='监视目录')
+    parser.add_argument('--author', default='Claire.lee@amway.com',
+                        help='追踪修订作者（默认：Claire.lee@amway.com，任务清单可覆盖）')
+    parser.add_argument('--match-by', choices=MATCH_BY, default='smart',
+                        help='匹配方式（默认：smart，任务清单可覆盖）')
+    parser.add_argument('--interval', type=float, default=2.0, help='轮询间隔（秒，默认：2）')
+    parser.add_argument('--stable-checks', type=int, default=2,
+                        help='文件连续多少次轮询不变才开始处理（默认：2）')
+    parser.add_argument('--workers', type=int, default=2, help='最多同时处理的任务数（默认：2）')
+    parser.add_argument('--once', action='store_true', help='处理完当前已有的任务后退出')
+
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.watch_dir):
+        print(f"✗ 错误：监视目录不存在: {args.watch_dir}")
+        return 1
+
+    return watch(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
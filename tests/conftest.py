@@ -0,0 +1,24 @@
+"""测试公共设置：脚本目录加入 sys.path，提供示例文档与合成文档"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = os.path.join(ROOT, 'scripts')
+if SCRIPTS not in sys.path:
+    sys.path.insert(0, SCRIPTS)
+
+SAMPLE_DOCX = os.path.join(ROOT, 'FC26_Invite_Card1_Arch_English_2025Oct27_.review.docx')
+SAMPLE_TRANSLATIONS = os.path.join(ROOT, 'new_translations.txt')
+
+
+@pytest.fixture(scope='session')
+def synthetic_docx(tmp_path_factory):
+    """300 行的合成文档及其映射（benchmark_fc_insider 生成）"""
+    import benchmark_fc_insider
+
+    path = str(tmp_path_factory.mktemp('synthetic') / 'synthetic.docx')
+    benchmark_fc_insider.make_synthetic_docx(path, 300)
+    return path, benchmark_fc_insider.synthetic_mappings(300)
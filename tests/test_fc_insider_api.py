@@ -0,0 +1,177 @@
+"""fc_insider Python API：提取 → 匹配 → 应用的往返、各更新引擎输出一致、错误路径"""
+
+import io
+import json
+import shutil
+import zipfile
+from datetime import datetime
+
+import pytest
+from docx import Document
+from lxml import etree
+
+import fc_insider
+from conftest import SAMPLE_DOCX, SAMPLE_TRANSLATIONS
+from fc_insider.extraction import load_markitdown
+from fc_insider.revisions import RevisionFilter, resolve_revisions
+from fc_insider.segment_index import index_path, open_index
+from fc_insider.sharded import apply_sharded
+from fc_insider.streaming import apply_streaming, iter_table_rows
+
+DATE = datetime(2025, 1, 1)
+
+needs_markitdown = pytest.mark.skipif(load_markitdown() is None, reason='需要 markitdown')
+
+
+def document_xml(docx: bytes) -> bytes:
+    with zipfile.ZipFile(io.BytesIO(docx)) as archive:
+        return archive.read('word/document.xml')
+
+
+@needs_markitdown
+def test_extract_sample_table():
+    table = fc_insider.extract(SAMPLE_DOCX)
+
+    assert len(table['rows']) == 19
+    assert all(set(row) == {'segment_id', 'status', 'source', 'target'} for row in table['rows'])
+    assert table['table_lines'] > len(table['rows'])
+
+
+@needs_markitdown
+def test_extract_match_apply_round_trip():
+    table = fc_insider.extract(SAMPLE_DOCX)
+    matched = fc_insider.match(table, SAMPLE_TRANSLATIONS, match_by='smart')
+    assert matched['errors'] == []
+    assert matched['mappings']
+
+    result = fc_insider.apply(SAMPLE_DOCX, matched['mappings'], date=DATE)
+    assert result['success'] == len(matched['mappings'])
+    assert result['failed'] == 0
+
+    # 接受全部修订后，译文列即为新译文
+    accepted = fc_insider.resolve(result['docx'], 'accept')
+    targets = {row['segment_id']: row['target'] for row in fc_insider.extract(accepted['docx'])['rows']}
+    for mapping in matched['mappings']:
+        assert targets[mapping['segment_id']] == mapping['new_text']
+
+
+@needs_markitdown
+@pytest.mark.parametrize('source', ['sample', 'synthetic'])
+def test_streamed_rows_match_extract(source, synthetic_docx):
+    path = SAMPLE_DOCX if source == 'sample' else synthetic_docx[0]
+    expected = [{key: row[key] for key in ('segment_id', 'status', 'source', 'target')}
+                for row in fc_insider.extract(path)['rows']]
+
+    assert list(iter_table_rows(path)) == expected
+
+
+def test_reapply_is_unchanged(synthetic_docx):
+    path, mappings = synthetic_docx
+    first = fc_insider.apply(path, mappings, date=DATE, engine='lxml')
+    again = fc_insider.apply(first['docx'], mappings, date=DATE, engine='lxml')
+
+    assert again['unchanged'] == len(mappings)
+    assert again['failed'] == 0
+    assert document_xml(again['docx']) == document_xml(first['docx'])
+
+
+@pytest.mark.parametrize('granularity', ['cell', 'word'])
+def test_engines_write_identical_documents(synthetic_docx, granularity):
+    path, mappings = synthetic_docx
+    reference = fc_insider.apply(path, mappings, date=DATE, engine='lxml', granularity=granularity)
+    expected = document_xml(reference['docx'])
+    assert reference['success'] == len(mappings)
+
+    docx_engine = fc_insider.apply(path, mappings, date=DATE, engine='docx', granularity=granularity)
+    assert document_xml(docx_engine['docx']) == expected
+    assert docx_engine['results'] == reference['results']
+
+    streamed = io.BytesIO()
+    streaming = apply_streaming(path, mappings, streamed, date=DATE, granularity=granularity)
+    assert document_xml(streamed.getvalue()) == expected
+    assert streaming['success'] == reference['success']
+
+    sharded = apply_sharded(path, mappings, date=DATE, workers=2, granularity=granularity)
+    assert document_xml(sharded['docx']) == expected
+    assert sharded['results'] == reference['results']
+
+
+def test_apply_reports_mismatch_and_missing_segments(synthetic_docx):
+    path, mappings = synthetic_docx
+    mappings = [dict(mappings[0], old_text='不是文档中的旧译文'),
+                {'segment_id': 'no-such-segment', 'old_text': 'a', 'new_text': 'b'}]
+
+    result = fc_insider.apply(path, mappings, date=DATE)
+
+    assert result['success'] == 0
+    assert result['failed'] == 2
+    assert [item['status'] for item in result['results']] == ['mismatch', 'not_found']
+
+
+@pytest.mark.parametrize('entry', [{'row': 1, 'target': 5}, {'row': 1, 'target': [1]},
+                                   {'row': 1, 'target': [999, 3]}, [1, 3]])
+def test_invalid_segment_index_is_rebuilt(entry, tmp_path):
+    path = str(tmp_path / 'sample.docx')
+    shutil.copy(SAMPLE_DOCX, path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    table = Document(path).tables[0]
+    assert open_index(table, path, data)[1] == 'built'
+
+    with open(index_path(path), encoding='utf-8') as f:
+        index = json.load(f)
+    index['segments'][next(iter(index['segments']))] = entry
+    with open(index_path(path), 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+
+    assert open_index(table, path, data)[1] == 'built'
+    assert open_index(table, path, data)[1] == 'loaded'
+
+
+def test_resolve_counts_nested_revisions_removed_with_outer():
+    body = ('<w:p><w:ins w:id="1" w:author="A"><w:r><w:t>ab</w:t></w:r>'
+            '<w:del w:id="2" w:author="B"><w:r><w:delText>c</w:delText></w:r></w:del></w:ins></w:p>'
+            '<w:p><w:pPr><w:numPr><w:numId w:val="1"/><w:ins w:id="3" w:author="A"/></w:numPr>'
+            '</w:pPr><w:r><w:t>x</w:t></w:r></w:p>')
+    document = etree.fromstring(
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{body}</w:body></w:document>')
+
+    result = resolve_revisions(document, 'reject', RevisionFilter(['A']))
+
+    # B 的删除随 A 的插入一并删除；拒绝插入的编号时删除 numPr
+    assert (result['resolved'], result['remaining'], result['discarded']) == (2, 0, 1)
+    assert b'numPr' not in etree.tostring(document)
+
+
+@pytest.mark.parametrize('data', [b'not a docx', b'PK\x03\x04 truncated'])
+def test_extract_rejects_non_docx(data):
+    with pytest.raises(fc_insider.DocumentError):
+        fc_insider.extract(data)
+
+
+def test_extract_rejects_zip_without_main_document():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('readme.txt', 'not a Word document')
+
+    with pytest.raises(fc_insider.DocumentError):
+        fc_insider.extract(buffer.getvalue())
+
+
+def test_apply_rejects_non_docx(synthetic_docx):
+    _, mappings = synthetic_docx
+    with pytest.raises(fc_insider.DocumentError):
+        fc_insider.apply(b'not a docx', mappings)
+
+
+def test_apply_missing_translations_file():
+    with pytest.raises(fc_insider.FcInsiderError):
+        fc_insider.apply(SAMPLE_DOCX, '/nonexistent/translations.json')
+
+
+def test_match_rejects_unknown_mode():
+    table = {'rows': [{'segment_id': 's1', 'status': 'Translation Approved (PM)',
+                       'source': 'See you at the conference', 'target': '会议上见'}]}
+    with pytest.raises(fc_insider.MappingError):
+        fc_insider.match(table, ['期待在会议上见到您'], match_by='fuzzy')